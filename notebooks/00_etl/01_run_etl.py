@@ -9,8 +9,11 @@ Ejecuta los 3 notebooks de ETL en orden:
 
 Uso:
     python run_etl.py
+    python run_etl.py --offline   # reproduce las respuestas en caché, sin red
+    python run_etl.py --incremental   # INE: solo periodos nuevos (ver src/etl/incremental.py)
 """
 
+import argparse
 import os
 import subprocess
 import sys
@@ -65,11 +68,62 @@ def ejecutar_notebook(notebook_path):
         return False
 
 
+def extraer_ine_incremental(repo_root):
+    """
+    Actualiza las tablas INE del almacén en proceso (solo periodos nuevos) en lugar de 01a.
+
+    Returns:
+        True si exitoso, False si error
+    """
+    print(f"\n{'='*80}")
+    print(">>> Extracción INE incremental (src/etl/incremental.py)")
+    print(f"{'='*80}")
+    if str(repo_root) not in sys.path:
+        sys.path.insert(0, str(repo_root))
+    try:
+        from src.etl.cache_http import CacheHTTP
+        from src.etl.incremental import extraer_ine_incremental as _extraer
+
+        _extraer(cache=CacheHTTP.desde_entorno())
+        print("[OK] Extracción INE incremental completada")
+        return True
+    except Exception as e:
+        print(f"[ERR] Error en la extracción INE incremental: {e}")
+        return False
+
+
 def main():
+    parser = argparse.ArgumentParser(description="Pipeline ETL (01a -> 01b -> 01c)")
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="No usar la red: reproducir las respuestas de outputs/raw_cache",
+    )
+    parser.add_argument(
+        "--ttl-horas",
+        type=float,
+        default=None,
+        help="TTL de la caché para respuestas sin ETag/Last-Modified (def. 24)",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="INE: pedir solo los periodos nuevos y fusionarlos con las tablas guardadas "
+        "(sustituye a 01a; descarga completa si se detectan revisiones)",
+    )
+    args = parser.parse_args()
+    # Los notebooks heredan el entorno y crean la caché con CacheHTTP.desde_entorno()
+    if args.offline:
+        os.environ["ETL_OFFLINE"] = "1"
+    if args.ttl_horas is not None:
+        os.environ["ETL_CACHE_TTL_HORAS"] = str(args.ttl_horas)
+
     print("\n" + "=" * 80)
     print("PIPELINE ETL - DESIGUALDAD SOCIAL")
     print("=" * 80)
     print(f"Inicio: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    if args.offline:
+        print("[INFO] Modo offline: solo respuestas en caché (outputs/raw_cache)")
 
     # Directorio de notebooks (current file parent)
     notebooks_dir = Path(__file__).resolve().parent
@@ -96,6 +150,9 @@ def main():
         )
         notebooks = [nb for nb in notebooks if nb.stem != "01c_load_to_sql"]
 
+    if args.incremental:
+        notebooks = [nb for nb in notebooks if nb.stem != "01a_extract_transform_INE"]
+
     # Verificar que existen
     for nb in notebooks:
         if not nb.exists():
@@ -105,6 +162,17 @@ def main():
     # Ejecutar notebooks en orden
     inicio = datetime.now()
     exitosos = 0
+    total_pasos = len(notebooks)
+
+    if args.incremental:
+        total_pasos += 1
+        if extraer_ine_incremental(repo_root):
+            exitosos += 1
+        else:
+            print(
+                "\n[ERR] Pipeline detenido por error en la extracción INE incremental"
+            )
+            notebooks = []
 
     for notebook in notebooks:
         if ejecutar_notebook(notebook):
@@ -116,7 +184,7 @@ def main():
         if notebook.name == "01b_extract_transform_EUROSTAT.ipynb" and exitosos >= 2:
             # After extraction, ensure 'Anio' columns in pickles to avoid encoding problems
             print(
-                '\nAsegurando columnas "Anio" en pickles (scripts/ensure_anio_columns.py)'
+                '\nAsegurando columnas "Anio" en las tablas de caché (scripts/ensure_anio_columns.py)'
             )
             ensure_cmd = [
                 sys.executable,
@@ -134,7 +202,7 @@ def main():
                 print(f"[WARN] No se pudo ejecutar ensure_anio_columns: {e_ens}")
 
             print(
-                "\nVerificando pickles críticos antes de cargar (scripts/check_pickles.py)"
+                "\nVerificando tablas críticas antes de cargar (scripts/check_pickles.py)"
             )
             check_cmd = [
                 sys.executable,
@@ -164,11 +232,11 @@ def main():
     print("\n" + "=" * 80)
     print("RESUMEN DE EJECUCIÓN")
     print("=" * 80)
-    print(f"Notebooks ejecutados: {exitosos}/{len(notebooks)}")
+    print(f"Pasos ejecutados: {exitosos}/{total_pasos}")
     print(f"Duración total: {duracion:.1f} segundos ({duracion/60:.1f} minutos)")
     print(f"Fin: {fin.strftime('%Y-%m-%d %H:%M:%S')}")
 
-    if exitosos == len(notebooks):
+    if exitosos == total_pasos:
         print("\nPipeline ETL completado exitosamente!")
         print("\nSiguiente paso:")
         print("   • Ejecutar validación: python 02_run_validation.py")
@@ -1,105 +1,51 @@
 """
 Orquestador de Validación de Datos
 ===================================
-Script que ejecuta todos los notebooks de validación en secuencia.
+Valida todas las tablas de `ALL_VALIDATION_RULES` en paralelo, en este
+proceso, con utils/validation_runner.py: cada tabla es una tarea de un pool
+de procesos que devuelve su ValidationReport, y el resumen se construye en
+memoria (sin releer los logs). Las comprobaciones INE <-> EUROSTAT de 02c son
+una tarea más.
 
-Arquitectura Modular:
+Los notebooks quedan como presentación opcional (`--notebooks`):
 - 02a_validacion_INE.ipynb       → Valida tablas INE
 - 02b_validacion_EUROSTAT.ipynb  → Valida tablas EUROSTAT
 - 02c_validacion_integracion.ipynb → Valida coherencia entre fuentes
 
 Uso:
     python 02_run_validation.py
+    python 02_run_validation.py --workers 4 --tablas INE_AROPE_Hogar INE_IPC_Nacional
+    python 02_run_validation.py --origen almacen   # lee el almacén del ETL, sin SQL
+    python 02_run_validation.py --notebooks        # además ejecuta 02a/02b/02c
+    python 02_run_validation.py --incremental      # solo lo que cambió desde la última
 
 Autor: Proyecto Desigualdad Social ETL
 Fecha: 2025-11-13
 """
 
-import json
+import argparse
 import os
 import subprocess
 import sys
 from datetime import datetime
 from pathlib import Path
 
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
 
-def analyze_validation_logs(logs_dir: str = "../data/validated/logs") -> dict:
-    """
-    Analiza los logs de validación y genera un resumen.
-
-    Args:
-        logs_dir: Directorio donde se encuentran los logs JSON
+from utils.validation_cache import ValidationCache  # noqa: E402
+from utils.validation_runner import (  # noqa: E402
+    SqlLoader,
+    StoreLoader,
+    run_validation,
+)
 
-    Returns:
-        Diccionario con tablas agrupadas por estado
-    """
-    # Resolver ruta absoluta desde el directorio del script
-    if not Path(logs_dir).is_absolute():
-        script_dir = Path(__file__).parent.resolve()
-        # Desde notebooks/00_etl/ ir a raíz del proyecto
-        project_root = script_dir.parent.parent
-        logs_path = project_root / "data" / "validated" / "logs"
-    else:
-        logs_path = Path(logs_dir)
-
-    if not logs_path.exists():
-        return {"passed": [], "failed": [], "no_logs": True}
-
-    # Buscar todos los archivos JSON en el directorio
-    json_files = list(logs_path.glob("*.json"))
-
-    if not json_files:
-        return {"passed": [], "failed": [], "no_logs": True}
-
-    # Agrupar por timestamp para obtener solo los logs más recientes
-    logs_by_table = {}
-
-    for json_file in json_files:
-        try:
-            with open(json_file, "r", encoding="utf-8") as f:
-                log_data = json.load(f)
-
-                table_name = log_data.get("table_name", "UNKNOWN")
-                timestamp = log_data.get("timestamp", "")
-                status = log_data.get("status", "UNKNOWN")
-                errors = log_data.get("errors", [])
-                warnings = log_data.get("warnings", [])
-
-                # Guardar solo el log más reciente por tabla
-                if (
-                    table_name not in logs_by_table
-                    or timestamp > logs_by_table[table_name]["timestamp"]
-                ):
-                    logs_by_table[table_name] = {
-                        "timestamp": timestamp,
-                        "status": status,
-                        "errors": errors,
-                        "warnings": warnings,
-                        "error_count": len(errors),
-                        "warning_count": len(warnings),
-                    }
-        except Exception:
-            continue
-
-    # Agrupar por estado
-    passed = []
-    failed = []
-
-    for table_name, log_info in sorted(logs_by_table.items()):
-        if log_info["status"] == "FAILED":
-            failed.append(
-                {
-                    "table": table_name,
-                    "errors": log_info["errors"],
-                    "error_count": log_info["error_count"],
-                }
-            )
-        elif log_info["status"] == "PASSED":
-            passed.append(
-                {"table": table_name, "warning_count": log_info["warning_count"]}
-            )
-
-    return {"passed": passed, "failed": failed, "no_logs": False}
+NOTEBOOKS = [
+    "02a_validacion_INE.ipynb",
+    "02b_validacion_EUROSTAT.ipynb",
+    "02c_validacion_integracion.ipynb",
+]
 
 
 def run_notebook(notebook_path: str) -> bool:
@@ -141,8 +87,93 @@ def run_notebook(notebook_path: str) -> bool:
         return False
 
 
-def main():
+def run_notebooks() -> bool:
+    """Ejecuta 02a / 02b / 02c (presentación; la validación ya está hecha)."""
+    script_dir = Path(__file__).parent.resolve()
+    ok = True
+    print("\nEjecutando notebooks de presentación...")
+    for notebook in NOTEBOOKS:
+        notebook_path = script_dir / notebook
+        print(f"  - {notebook}...", end=" ", flush=True)
+        if not notebook_path.exists():
+            print("[ERR] no encontrado")
+            ok = False
+        elif run_notebook(str(notebook_path)):
+            print("[OK]")
+        else:
+            print("[ERR]")
+            ok = False
+    return ok
+
+
+def print_summary(validation_summary: dict):
+    """Resumen por estado: tablas con errores y tablas correctas."""
+    failed_tables = validation_summary["failed"]
+    passed_tables = validation_summary["passed"]
+
+    print(f"\nTotal de tablas validadas: {len(failed_tables) + len(passed_tables)}")
+    print(f"   Correctas (PASSED): {len(passed_tables)}")
+    print(f"   Con errores (FAILED): {len(failed_tables)}")
+
+    # Mostrar tablas con errores
+    if failed_tables:
+        print("\n" + "=" * 80)
+        print("TABLAS CON ERRORES CRÍTICOS")
+        print("=" * 80)
+        for item in failed_tables:
+            print(f"\n[TABLE] {item['table']} ({item['error_count']} errores)")
+            for error in item["errors"]:
+                print(f"   - {error}")
+
+    # Mostrar tablas correctas (solo nombres)
+    if passed_tables:
+        print("\n" + "=" * 80)
+        print("TABLAS VALIDADAS CORRECTAMENTE")
+        print("=" * 80)
+        for item in passed_tables:
+            warnings_info = (
+                f" ({item['warning_count']} advertencias)"
+                if item["warning_count"] > 0
+                else ""
+            )
+            print(f"   {item['table']}{warnings_info}")
+
+
+def main(argv=None):
     """Función principal del orquestador"""
+    parser = argparse.ArgumentParser(description="Validación de tablas en paralelo")
+    parser.add_argument(
+        "--workers", type=int, default=None, help="Procesos (1: secuencial)"
+    )
+    parser.add_argument(
+        "--origen",
+        choices=["sql", "almacen"],
+        default="sql",
+        help="Leer las tablas de SQL Server o del almacén del ETL",
+    )
+    parser.add_argument("--tablas", nargs="+", help="Solo estas tablas")
+    parser.add_argument(
+        "--sin-integracion",
+        action="store_true",
+        help="Omitir las comprobaciones INE <-> EUROSTAT (02c)",
+    )
+    parser.add_argument(
+        "--sin-logs",
+        action="store_true",
+        help="No guardar los reportes JSON/CSV en data/validated/logs",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Reutilizar la validación anterior de lo que no cambió "
+        "(caché en data/validated/cache)",
+    )
+    parser.add_argument(
+        "--notebooks",
+        action="store_true",
+        help="Ejecutar además los notebooks 02a/02b/02c (presentación)",
+    )
+    args = parser.parse_args(argv)
 
     # Skip validation if DB_CONNECTION_STRING is not available (CI without DB)
     skip_db_load = os.environ.get("SKIP_DB_LOAD", "false").lower() in (
@@ -156,126 +187,78 @@ def main():
     print("=" * 80)
     print(f"Inicio: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
 
-    if skip_db_load:
+    if skip_db_load and args.origen == "sql":
         print(
             "[INFO] SKIP_DB_LOAD is set -> Skipping validation (requires DB connection)"
         )
         print(
-            "   Validation notebooks require SQL Server access and will not run in CI without DB."
+            "   Validation from SQL Server will not run in CI without DB "
+            "(use --origen almacen)."
         )
         return True
 
-    # Definir notebooks a ejecutar (en orden)
-    notebooks = [
-        "02a_validacion_INE.ipynb",
-        "02b_validacion_EUROSTAT.ipynb",
-        "02c_validacion_integracion.ipynb",
-    ]
-
-    # Determinar directorio de notebooks (mismo donde está este script)
-    script_dir = Path(__file__).parent.resolve()
-
-    # Verificar que los notebooks existen
-    missing_notebooks = []
-
-    for notebook in notebooks:
-        notebook_path = script_dir / notebook
-        if not notebook_path.exists():
-            missing_notebooks.append(str(notebook_path))
-
-    if missing_notebooks:
-        print("[ERR] Error: No se encontraron los siguientes notebooks:")
-        for nb in missing_notebooks:
-            print(f"   - {nb}")
+    loader = SqlLoader() if args.origen == "sql" else StoreLoader()
+    print(f"Validando tablas ({args.origen}, workers={args.workers or 'auto'})...")
+    try:
+        run = run_validation(
+            tables=args.tablas,
+            loader=loader,
+            workers=args.workers,
+            integration=not args.sin_integracion,
+            cache=ValidationCache() if args.incremental else None,
+        )
+    except ValueError as e:
+        print(f"[ERR] {e}")
         return False
+    for result in run.results:
+        tag = "[OK]" if result.status == "PASSED" else "[ERR]"
+        if result.cached:
+            detalle = "sin cambios (caché)"
+        else:
+            detalle = (
+                f"carga {result.load_seconds:.2f}s, "
+                f"validación {result.validate_seconds:.2f}s"
+            )
+        print(f"  {tag} {result.table}: {detalle}")
+    total = sum(r.seconds for r in run.results)
+    print(
+        f"[INFO] {len(run.results)} validaciones en {run.wall_seconds:.2f}s "
+        f"(secuencial: {total:.2f}s, x{run.speedup:.1f})"
+    )
 
-    # Ejecutar notebooks en secuencia
-    print("Ejecutando validación...")
-    results = {}
-
-    for notebook in notebooks:
-        notebook_path = str(script_dir / notebook)
-        print(f"  - {notebook}...", end=" ", flush=True)
-        success = run_notebook(notebook_path)
-        results[notebook] = success
+    if not args.sin_logs:
+        # Los reportes de la caché ya se guardaron en la ejecución que los produjo
+        for result in run.results:
+            if result.cached:
+                continue
+            result.report.save_json()
+            result.report.save_csv()
 
-        if success:
-            print("[OK]")
-        else:
-            print("[ERR]")
-            # In CI environments, auto-continue on error instead of prompting
-            is_ci = os.environ.get("CI", "false").lower() == "true"
-            if is_ci:
-                print(f"\n[WARN]  Error en {notebook}. Continuando en modo CI...")
-            else:
-                print(f"\n[WARN]  Error en {notebook}. ¿Continuar? (SI/NO): ", end="")
-                response = input().strip().upper()
-                if response != "SI":
-                    print("\n[ERR] Validación interrumpida por el usuario")
-                    break
+    if args.notebooks and not run_notebooks():
+        print(
+            "\n[WARN]  Algún notebook de presentación falló (la validación es válida)"
+        )
 
     # Resumen final
     print("\n" + "=" * 80)
     print("RESUMEN DE VALIDACIÓN")
     print("=" * 80)
-
-    # Analizar logs de validación
-    validation_summary = analyze_validation_logs()
-
-    if validation_summary["no_logs"]:
-        print("\n[WARN]  No se encontraron logs de validación")
-        print("   Los reportes deberían estar en: ../data/validated/logs/")
-    else:
-        failed_tables = validation_summary["failed"]
-        passed_tables = validation_summary["passed"]
-
-        print(f"\nTotal de tablas validadas: {len(failed_tables) + len(passed_tables)}")
-        print(f"   Correctas (PASSED): {len(passed_tables)}")
-        print(f"   Con errores (FAILED): {len(failed_tables)}")
-
-        # Mostrar tablas con errores
-        if failed_tables:
-            print("\n" + "=" * 80)
-            print("TABLAS CON ERRORES CRÍTICOS")
-            print("=" * 80)
-            for item in failed_tables:
-                print(f"\n[TABLE] {item['table']} ({item['error_count']} errores)")
-                for error in item["errors"]:
-                    print(f"   - {error}")
-
-        # Mostrar tablas correctas (solo nombres)
-        if passed_tables:
-            print("\n" + "=" * 80)
-            print("TABLAS VALIDADAS CORRECTAMENTE")
-            print("=" * 80)
-            for item in passed_tables:
-                warnings_info = (
-                    f" ({item['warning_count']} advertencias)"
-                    if item["warning_count"] > 0
-                    else ""
-                )
-                print(f"   {item['table']}{warnings_info}")
+    validation_summary = run.summary()
+    print_summary(validation_summary)
 
     print(f"\nFin: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
 
-    # Determinar éxito basado en logs de validación
-    has_failed_tables = len(validation_summary.get("failed", [])) > 0
-
-    if not has_failed_tables and not validation_summary["no_logs"]:
+    if not validation_summary["failed"]:
         print("\nVALIDACIÓN COMPLETA EXITOSA! Todas las tablas están correctas.")
         return True
-    elif has_failed_tables:
-        print(
-            f"\n[WARN] VALIDACIÓN COMPLETADA CON ERRORES: {len(validation_summary['failed'])} tabla(s) requieren atención."
-        )
-        print("\n🎯 Acción requerida:")
-        print("   1. Revisar errores listados arriba")
-        print("   2. Corregir datos en origen o ajustar reglas de validación")
-        print("   3. Volver a ejecutar validación")
-        return False
-    else:
-        print("\n[WARN]  No se pudieron analizar los logs de validación")
-        return True
+    print(
+        f"\n[WARN] VALIDACIÓN COMPLETADA CON ERRORES: {len(validation_summary['failed'])} tabla(s) requieren atención."
+    )
+    print("\n🎯 Acción requerida:")
+    print("   1. Revisar errores listados arriba")
+    print("   2. Corregir datos en origen o ajustar reglas de validación")
+    print("   3. Volver a ejecutar validación")
+    return False
 
 
 if __name__ == "__main__":
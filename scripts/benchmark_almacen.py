@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Benchmark de apertura de tablas del almacén frente a `pd.read_pickle`.
+Escribe una tabla sintética como pickle, Parquet y Arrow IPC y, en un proceso
+nuevo por medida, toma el tiempo de apertura y la memoria residente que añade
+(RSS total, privada `RssAnon` y compartida con la caché de páginas `RssFile`,
+leídas de /proc/self/status).
+Usage: python scripts/benchmark_almacen.py [--filas 5000000] [--repeticiones 3]
+       [--salida outputs/benchmarks/almacen.json]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from src.almacen import AlmacenTablas  # noqa: E402
+
+NOMBRE = "df_benchmark"
+# variante -> (formato del almacén o None para pickle, mmap)
+VARIANTES = {
+    "pickle": (None, False),
+    "parquet": ("parquet", False),
+    "arrow": ("arrow", False),
+    "arrow_mmap": ("arrow", True),
+}
+
+
+def tabla_sintetica(filas: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    territorios = np.array([f"CCAA {i:02d}" for i in range(19)], dtype=object)
+    return pd.DataFrame(
+        {
+            "Anio": rng.integers(2008, 2025, filas),
+            "Territorio": territorios[rng.integers(0, len(territorios), filas)],
+            "Decil": rng.integers(1, 11, filas),
+            "Valor": rng.normal(20_000, 5_000, filas),
+            "Gini": rng.uniform(25, 40, filas),
+            "AROPE_%": rng.uniform(10, 35, filas),
+        }
+    )
+
+
+def _memoria() -> dict:
+    """RSS del proceso en MB (0 si /proc no está disponible)."""
+    campos = {"VmRSS": "rss", "RssAnon": "anon", "RssFile": "file"}
+    memoria = dict.fromkeys(campos.values(), 0.0)
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for linea in f:
+                clave = linea.split(":")[0]
+                if clave in campos:
+                    memoria[campos[clave]] = int(linea.split()[1]) / 1024
+    except OSError:
+        pass
+    return memoria
+
+
+def medir_en_proceso(directorio: Path, variante: str) -> dict:
+    """Abre la tabla una vez en este proceso (llamado en un proceso hijo)."""
+    formato, mmap = VARIANTES[variante]
+    antes = _memoria()
+    inicio = time.perf_counter()
+    if formato is None:
+        df = pd.read_pickle(directorio / f"{NOMBRE}.pkl")
+    else:
+        df = AlmacenTablas(directorio, formato=formato).leer(NOMBRE, mmap=mmap)
+    apertura = time.perf_counter() - inicio
+    # Recorrer las columnas numéricas obliga a cargar las páginas mapeadas
+    total = float(df.select_dtypes("number").sum().sum())
+    primer_uso = time.perf_counter() - inicio
+    despues = _memoria()
+    return {
+        "apertura_s": apertura,
+        "primer_uso_s": primer_uso,
+        **{f"{k}_mb": despues[k] - antes[k] for k in antes},
+        "checksum": total,
+    }
+
+
+def _medir(directorio: Path, variante: str) -> dict:
+    salida = subprocess.run(
+        [
+            sys.executable,
+            __file__,
+            "--medir",
+            variante,
+            "--directorio",
+            str(directorio),
+        ],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(salida.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de apertura del almacén")
+    parser.add_argument("--filas", type=int, default=5_000_000)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--salida", type=Path, default=None)
+    parser.add_argument("--medir", choices=list(VARIANTES), help=argparse.SUPPRESS)
+    parser.add_argument("--directorio", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.medir:
+        print(json.dumps(medir_en_proceso(args.directorio, args.medir)))
+        return 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directorio = Path(tmp)
+        df = tabla_sintetica(args.filas)
+        df.to_pickle(directorio / f"{NOMBRE}.pkl")
+        # Cada formato en su subdirectorio: el almacén guarda un fichero por tabla
+        tamanos = {"pickle": (directorio / f"{NOMBRE}.pkl").stat().st_size}
+        for formato in ("parquet", "arrow"):
+            ruta = AlmacenTablas(directorio / formato, formato=formato).guardar(
+                df, NOMBRE
+            )
+            tamanos[formato] = ruta.stat().st_size
+        del df
+
+        resultado = {}
+        for variante, (formato, _) in VARIANTES.items():
+            sub = directorio if formato is None else directorio / formato
+            medidas = [_medir(sub, variante) for _ in range(args.repeticiones)]
+            resultado[variante] = {
+                clave: round(statistics.median(m[clave] for m in medidas), 4)
+                for clave in medidas[0]
+                if clave != "checksum"
+            }
+            resultado[variante]["fichero_mb"] = round(
+                tamanos[formato or "pickle"] / 1e6, 1
+            )
+
+    print(f"\n[INFO] {args.filas:,} filas, mediana de {args.repeticiones} procesos")
+    print(
+        f"  {'variante':12s} {'apertura':>10s} {'1er uso':>10s} {'RSS':>9s} {'privada':>9s} {'compart.':>9s} {'fichero':>9s}"
+    )
+    base = resultado["pickle"]
+    for variante, m in resultado.items():
+        print(
+            f"  {variante:12s} {m['apertura_s'] * 1000:8.1f}ms {m['primer_uso_s'] * 1000:8.1f}ms "
+            f"{m['rss_mb']:7.1f}MB {m['anon_mb']:7.1f}MB {m['file_mb']:7.1f}MB {m['fichero_mb']:7.1f}MB"
+        )
+    mmap = resultado["arrow_mmap"]
+    print(
+        f"[INFO] arrow_mmap frente a read_pickle: apertura "
+        f"x{base['apertura_s'] / max(mmap['apertura_s'], 1e-9):.1f} más rápida, memoria privada "
+        f"{mmap['anon_mb']:.0f} MB frente a {base['anon_mb']:.0f} MB"
+    )
+
+    if args.salida:
+        args.salida.parent.mkdir(parents=True, exist_ok=True)
+        resultado["config"] = {"filas": args.filas, "repeticiones": args.repeticiones}
+        args.salida.write_text(json.dumps(resultado, indent=2), encoding="utf-8")
+        print(f"[OK] Resultados guardados en {args.salida}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la etapa de extracción (registro de fuentes) sin red.
+Levanta `ServidorLocal` con payloads sintéticos (o grabados en la caché bruta),
+mide tiempo, peticiones/s y pico de memoria por fuente y de la etapa completa,
+y falla (exit 1) si las peticiones/s caen más del umbral frente a la referencia.
+Usage: python scripts/benchmark_extraccion.py [--escala 4] [--latencia 0.05]
+       [--ancho-banda 5e6] [--jobs 8] [--grabados] [--guardar-referencia]
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from src.etl.cache_http import CacheHTTP  # noqa: E402
+from src.etl.rendimiento import (  # noqa: E402
+    DEFAULT_UMBRAL_REGRESION,
+    comparar_con_referencia,
+    medir_extraccion,
+)
+from src.etl.servidor_local import ServidorLocal, payloads_sinteticos  # noqa: E402
+
+REFERENCIA = BASE_DIR / "outputs" / "benchmarks" / "extraccion_referencia.json"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de extracción")
+    parser.add_argument("--escala", type=int, default=4)
+    parser.add_argument("--latencia", type=float, default=0.05, help="segundos")
+    parser.add_argument("--ancho-banda", type=float, default=None, help="bytes/s")
+    parser.add_argument("--jobs", type=int, default=8)
+    parser.add_argument(
+        "--grabados", action="store_true", help="Servir la caché bruta grabada"
+    )
+    parser.add_argument("--referencia", type=Path, default=REFERENCIA)
+    parser.add_argument("--umbral", type=float, default=DEFAULT_UMBRAL_REGRESION)
+    parser.add_argument("--guardar-referencia", action="store_true")
+    args = parser.parse_args()
+
+    cache = CacheHTTP(offline=True) if args.grabados else None
+    with ServidorLocal(args.latencia, args.ancho_banda, cache=cache) as servidor:
+        if not args.grabados:
+            servidor.registrar_payloads(payloads_sinteticos(escala=args.escala))
+        resultado = medir_extraccion(servidor, jobs=args.jobs)
+    resultado["config"] = {
+        "escala": args.escala,
+        "latencia": args.latencia,
+        "ancho_banda": args.ancho_banda,
+        "jobs": args.jobs,
+        "grabados": args.grabados,
+    }
+
+    print("\n[INFO] Por fuente (en serie, con tracemalloc):")
+    for tabla, m in resultado["fuentes"].items():
+        print(
+            f"  {tabla:42s} {m['segundos']:7.3f}s {m['peticiones_s']:7.1f} pet/s "
+            f"{m['mb']:7.2f} MB pico {m['pico_mb']:6.1f} MB {m['filas']:>8,} filas"
+        )
+    etapa = resultado["etapa"]
+    print(
+        f"[INFO] Etapa completa ({args.jobs} hilos): {etapa['segundos']:.3f}s, "
+        f"{etapa['peticiones_s']:.1f} pet/s, {etapa['mb_s']:.2f} MB/s"
+    )
+
+    if args.guardar_referencia:
+        args.referencia.parent.mkdir(parents=True, exist_ok=True)
+        args.referencia.write_text(json.dumps(resultado, indent=2), encoding="utf-8")
+        print(f"[OK] Referencia guardada en {args.referencia}")
+        return 0
+    if not args.referencia.exists():
+        print("[WARN] Sin referencia; ejecutar con --guardar-referencia")
+        return 0
+
+    referencia = json.loads(args.referencia.read_text(encoding="utf-8"))
+    if referencia.get("config") != resultado["config"]:
+        print("[WARN] La referencia se midió con otra configuración")
+    regresiones = comparar_con_referencia(resultado, referencia, args.umbral)
+    for mensaje in regresiones:
+        print(f"  [ERR] {mensaje}")
+    if regresiones:
+        return 1
+    print(f"[OK] Sin regresiones de rendimiento (umbral {args.umbral:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Benchmark del aplanado de series INE ("Data" anidado -> formato largo).
+Compara el patrón de 01a (iterrows + un dict por observación + parseo del
+nombre por fila) con `aplanar_series` + parseo vectorizado sobre nombres únicos.
+Usage: python scripts/benchmark_ine_flatten.py [--series 2000] [--periodos 500]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from src.etl.ine import aplanar_series, transformar_arope_edad_sexo  # noqa: E402
+from src.etl.sinteticos import generar_ine_sintetico  # noqa: E402
+
+
+def arope_edad_sexo_patron_01a(data_arope_raw):
+    """Celda 2.4.1 de 01a tal cual (parseo del nombre en cada observación)."""
+    arope_records = []
+    for idx, record in pd.DataFrame(data_arope_raw).iterrows():
+        nombre = record.get("Nombre", "")
+        if isinstance(record["Data"], list):
+            for data_point in record["Data"]:
+                year = data_point.get("Anyo")
+                valor = data_point.get("Valor")
+                if year is not None and valor is not None:
+                    sexo = (
+                        "Hombre"
+                        if "Hombre" in nombre
+                        else "Mujer" if "Mujer" in nombre else "Total"
+                    )
+                    if "Total" in nombre and not any(
+                        x in nombre
+                        for x in [
+                            "Menos de 16",
+                            "16 a 29",
+                            "30 a 44",
+                            "45 a 64",
+                            "65 y más",
+                            "Menos de 18",
+                            "18 a 64",
+                        ]
+                    ):
+                        edad = "Total"
+                    elif "Menos de 16" in nombre or "Menores de 16" in nombre:
+                        edad = "Menores de 16 años"
+                    elif "16 a 29" in nombre:
+                        edad = "16 a 29 años"
+                    elif "30 a 44" in nombre:
+                        edad = "30 a 44 años"
+                    elif "45 a 64" in nombre:
+                        edad = "45 a 64 años"
+                    elif "65 y más" in nombre or "65 y +" in nombre:
+                        edad = "65 y más años"
+                    elif "Menos de 18" in nombre or "Menores de 18" in nombre:
+                        edad = "Menos de 18 años"
+                    elif "18 a 64" in nombre:
+                        edad = "18 a 64 años"
+                    else:
+                        edad = "Total"
+                    indicador = (
+                        "AROP"
+                        if "En riesgo de pobreza" in nombre and "AROPE" not in nombre
+                        else (
+                            "Carencia Material Severa"
+                            if "Carencia material" in nombre
+                            else (
+                                "Baja Intensidad Laboral"
+                                if "Baja intensidad" in nombre
+                                else "AROPE"
+                            )
+                        )
+                    )
+                    arope_records.append(
+                        {
+                            "Año": int(year),
+                            "Sexo": sexo,
+                            "Edad": edad,
+                            "Indicador": indicador,
+                            "Valor": float(valor),
+                        }
+                    )
+    df = pd.DataFrame(arope_records)
+    return df.drop_duplicates(subset=["Año", "Sexo", "Edad"], keep="first")
+
+
+def _medir(funcion, data):
+    inicio = time.perf_counter()
+    resultado = funcion(data)
+    return time.perf_counter() - inicio, resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del aplanado INE")
+    parser.add_argument("--series", type=int, default=2000)
+    parser.add_argument("--periodos", type=int, default=500)
+    args = parser.parse_args()
+
+    data = generar_ine_sintetico(n_series=args.series, n_periodos=args.periodos)
+    print(f"[INFO] Payload sintético: {args.series * args.periodos:,} observaciones")
+
+    t_aplanar, largo = _medir(aplanar_series, data)
+    print(f"  aplanar_series: {t_aplanar:.2f}s ({len(largo):,} filas)")
+
+    t_01a, df_01a = _medir(arope_edad_sexo_patron_01a, data)
+    t_vec, df_vec = _medir(transformar_arope_edad_sexo, data)
+    iguales = df_01a.reset_index(drop=True).equals(
+        df_vec.astype({c: object for c in ("Sexo", "Edad", "Indicador")}).reset_index(
+            drop=True
+        )
+    )
+    estado = "[OK]" if iguales else "[ERR]"
+    print(
+        f"  {estado} AROPE edad/sexo: patrón 01a {t_01a:.2f}s | "
+        f"vectorizado {t_vec:.2f}s | x{t_01a / max(t_vec, 1e-9):.1f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Benchmark de normalize_tipo_metrica sobre un IPC sectorial sintético.
+Compara la versión anterior (`series.apply` con normalize_text por fila) con
+la actual (diccionario TIPO_METRICA de utils/canonical_labels.py: un cálculo
+por valor distinto y recodificación de códigos), con la columna como `object`
+y como `category`. Las filas que la versión anterior dejaba sin reconocer
+pueden tener ahora valor canónico (formas con mojibake del diccionario).
+Usage: python scripts/benchmark_normalizacion.py [--filas 5000000]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from utils.canonical_labels import TIPO_METRICA  # noqa: E402
+from utils.validation_framework import normalize_tipo_metrica  # noqa: E402
+
+# Variantes reales de Tipo_Metrica: acentos, mojibake, espacios y mayúsculas
+VARIANTES = [
+    "Índice",
+    "Variación anual",
+    "Variación mensual",
+    "Variación en lo que va de año",
+    "Ã\xadndice",
+    "VariaciÃ³n anual",
+    "VariaciÃ³n mensual",
+    "VariaciÃ³n en lo que va de aÃ±o",
+    "variacion  anual",
+    "Variaci\ufffdn mensual",
+    "INDICE",
+]
+CATEGORIAS = [f"{i:02d} Grupo ECOICOP {i}" for i in range(1, 13)]
+
+
+# --- Versión anterior de utils/validation_framework.py, sin cambios -------------
+
+
+def fix_mojibake_anterior(s: str) -> str:
+    """Attempt to fix common mojibake sequences from CP1252 -> UTF-8 mismatches.
+    This is a best-effort approach using common sequences such as 'Ã¡' -> 'á'.
+    """
+    if s is None:
+        return s
+    if not isinstance(s, str):
+        s = str(s)
+    replacements = {
+        "Ã¡": "á",
+        "Ã©": "é",
+        "Ã­": "í",
+        "Ã³": "ó",
+        "Ãº": "ú",
+        "Ã±": "ñ",
+        "Ã‘": "Ñ",
+        "Ã€": "À",
+        "Ã´": "ô",
+        "Ã“": "Ó",
+        "â": "'",
+        "\ufffd": "",
+        "�": "",
+        "Â€": "€",
+        "â‚¬": "€",
+    }
+    for k, v in replacements.items():
+        if k in s:
+            s = s.replace(k, v)
+    return s
+
+
+def normalize_text_anterior(s: str) -> str:
+    """Normalize text for stable comparisons.
+
+    - Attempts to fix common mojibake sequences
+    - Strips diacritics (returns ascii/lowercased normalized string)
+    - Collapses whitespace
+    """
+    import unicodedata
+
+    if s is None:
+        return s
+    s = fix_mojibake_anterior(s)
+    # Remove Unicode replacement character if still present
+    s = s.replace("\ufffd", "").replace("�", "")
+    # Remove non-letter and non-digit characters (keep spaces)
+    import unicodedata as _ud
+
+    s = "".join(c for c in s if _ud.category(c)[0] in ("L", "N") or c.isspace())
+    # Normalize NFC to composed, then remove accents
+    s_nfkd = unicodedata.normalize("NFKD", s)
+    s_ascii = "".join([c for c in s_nfkd if not unicodedata.combining(c)])
+    s_clean = " ".join(s_ascii.strip().split())
+    return s_clean
+
+
+def normalize_tipo_metrica_anterior(series: pd.Series) -> pd.Series:
+    """Convert a serie of Tipo_Metrica to canonical values.
+
+    Recognizes and maps a variety of variants to canonical Spanish metric names:
+        - 'Variación anual'
+        - 'Variación mensual'
+        - 'Variación en lo que va de año'
+        - 'Índice'
+    """
+    if series is None:
+        return series
+
+    def _map_value(v):
+        if pd.isna(v):
+            return v
+        s = normalize_text_anterior(v).lower()
+        # Accept variants like 'variación anual', 'variacin anual', 'variacion anual', etc.
+        s = (
+            s.replace("á", "a")
+            .replace("é", "e")
+            .replace("í", "i")
+            .replace("ó", "o")
+            .replace("ú", "u")
+            .replace("ñ", "n")
+        )
+        s = " ".join(s.split())
+
+        # Basic substring checks
+        if "variacion anual" in s or ("variacion" in s and "anual" in s):
+            return "Variación anual"
+        if "variacion mensual" in s or ("variacion" in s and "mensual" in s):
+            return "Variación mensual"
+        if (
+            "variacion en lo que va de ano" in s
+            or "variacion en lo que va de año" in s
+            or "variacion en lo que va de" in s
+            or ("variacion" in s and "ano" in s)
+            or ("variacion" in s and "va de" in s)
+        ):
+            return "Variación en lo que va de año"
+        if "indice" in s or "ndice" in s:
+            return "Índice"
+        return v
+
+    return series.apply(_map_value)
+
+
+# ---------------------------------------------------------------------------------
+
+
+def ipc_sectorial_sintetico(filas: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "Anio": rng.integers(2002, 2025, filas),
+            "Categoria_ECOICOP": np.array(CATEGORIAS, dtype=object)[
+                rng.integers(0, len(CATEGORIAS), filas)
+            ],
+            "Tipo_Metrica": np.array(VARIANTES, dtype=object)[
+                rng.integers(0, len(VARIANTES), filas)
+            ],
+            "IPC_Indice": np.round(rng.uniform(80, 130, filas), 3),
+        }
+    )
+
+
+def _medir(funcion, serie):
+    inicio = time.perf_counter()
+    resultado = funcion(serie)
+    return time.perf_counter() - inicio, resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de normalize_tipo_metrica")
+    parser.add_argument("--filas", type=int, default=5_000_000)
+    args = parser.parse_args()
+
+    df = ipc_sectorial_sintetico(args.filas)
+    serie = df["Tipo_Metrica"]
+    print(
+        f"[INFO] IPC sectorial sintético: {len(df):,} filas, {serie.nunique()} variantes"
+    )
+
+    t_anterior, anterior = _medir(normalize_tipo_metrica_anterior, serie)
+    t_actual, actual = _medir(normalize_tipo_metrica, serie)
+    t_categoria, categoria = _medir(normalize_tipo_metrica, serie.astype("category"))
+
+    reconocidas = anterior.isin(TIPO_METRICA.canonical)
+    iguales = actual[reconocidas].equals(anterior[reconocidas]) and categoria.astype(
+        object
+    ).equals(actual)
+    recuperadas = int((~reconocidas & actual.isin(TIPO_METRICA.canonical)).sum())
+    estado = "[OK]" if iguales else "[ERR]"
+    print(f"  {estado} mismos valores canónicos: {sorted(actual.unique())}")
+    print(f"  [INFO] filas que antes quedaban sin reconocer: {recuperadas:,}")
+    print(f"  anterior (apply por fila): {t_anterior:.2f}s")
+    print(
+        f"  valores únicos (object):   {t_actual:.2f}s | x{t_anterior / max(t_actual, 1e-9):.0f}"
+    )
+    print(
+        f"  valores únicos (category): {t_categoria:.2f}s | "
+        f"x{t_anterior / max(t_categoria, 1e-9):.0f}"
+    )
+    return 0 if iguales else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Benchmark del decodificador SDMX-JSON de Eurostat.
+Compara la versión columnar (`parsear_eurostat_sdmx`) con la implementación
+original por observación sobre un payload sintético.
+Usage: python scripts/benchmark_sdmx_decoder.py [--geos 60] [--repeticiones 3]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from src.etl.eurostat import (  # noqa: E402
+    parsear_eurostat_sdmx,
+    parsear_eurostat_sdmx_por_observacion,
+)
+from src.etl.sinteticos import generar_sdmx_sintetico  # noqa: E402
+
+ESCENARIOS = {
+    "todas las geos (filter_geo=None)": {"filter_geo": None},
+    "solo ES": {"filter_geo": "ES"},
+    "sin filtros": {"filter_geo": None, "filter_age": None, "filter_sex": None},
+}
+
+
+def _medir(funcion, payload, repeticiones, **filtros):
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        df = funcion(payload, "Valor", **filtros)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor, len(df)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del decodificador SDMX")
+    parser.add_argument("--geos", type=int, default=60)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    args = parser.parse_args()
+
+    payload = generar_sdmx_sintetico(n_geo=args.geos)
+    print(f"[INFO] Payload sintético: {len(payload['value']):,} observaciones")
+
+    for nombre, filtros in ESCENARIOS.items():
+        t_orig, filas = _medir(
+            parsear_eurostat_sdmx_por_observacion, payload, args.repeticiones, **filtros
+        )
+        t_col, filas_col = _medir(
+            parsear_eurostat_sdmx, payload, args.repeticiones, **filtros
+        )
+        estado = "[OK]" if filas == filas_col else "[ERR]"
+        print(
+            f"  {estado} {nombre}: {filas:,} filas | por observación {t_orig:.3f}s | "
+            f"columnar {t_col:.3f}s | x{t_orig / max(t_col, 1e-9):.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Benchmark del motor de validación compilado (utils/validation_engine.py).
+Compara, sobre un IPC sectorial sintético con nulos, fuera de rango y un año
+faltante, la ruta anterior (las funciones `check_*` en el orden de los
+notebooks 02a / 02b, cada una recorriendo el DataFrame) con `validate_table`
+(un recorrido por columna), y comprueba que escriben los mismos mensajes.
+La tabla se mide como la guarda el almacén (dimensiones `category`, año
+int16) y como llega de SQL (dimensiones `object`).
+Usage: python scripts/benchmark_validacion.py [--filas 10000000]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from src.tipos import aplicar_politica  # noqa: E402
+from utils.config import MAX_NULL_PERCENT  # noqa: E402
+from utils.validation_engine import validate_table  # noqa: E402
+from utils.validation_framework import (  # noqa: E402
+    ValidationReport,
+    check_conditional_nulls,
+    check_nulls,
+    check_range,
+    check_schema,
+    check_uniqueness,
+    check_year_continuity,
+)
+from utils.validation_rules import get_rules  # noqa: E402
+
+TABLA = "INE_IPC_Sectorial_ECOICOP"
+CATEGORIAS = [f"{i:02d} Grupo ECOICOP {i}" for i in range(1, 13)]
+TIPOS = ["Índice", "�ndice", "Variación anual", "Variación mensual"]
+MEJORA_MINIMA = 5
+
+
+def validar_anterior(df: pd.DataFrame, table_name: str) -> ValidationReport:
+    """Las funciones del framework una a una, como validate_ine_table (02a)."""
+    report = ValidationReport(table_name)
+    report.records_original = len(df)
+    rules = get_rules(table_name)
+    if "expected_columns" in rules or "expected_types" in rules:
+        check_schema(
+            df,
+            expected_columns=rules.get("expected_columns", []),
+            expected_types=rules.get("expected_types", {}),
+            report=report,
+        )
+    if "primary_key" in rules:
+        pk_columns = rules["primary_key"]
+        missing_pk_cols = [col for col in pk_columns if col not in df.columns]
+        if missing_pk_cols:
+            report.add_warning(f"Columnas de PK no encontradas: {missing_pk_cols}")
+        else:
+            check_uniqueness(df, primary_key=pk_columns, report=report)
+    if "critical_columns" in rules:
+        critical_cols = [col for col in rules["critical_columns"] if col in df.columns]
+        if critical_cols:
+            check_nulls(
+                df,
+                critical_columns=critical_cols,
+                max_null_percent=MAX_NULL_PERCENT,
+                report=report,
+            )
+    if "conditional_nulls" in rules:
+        check_conditional_nulls(df, rules.get("conditional_nulls", {}), report=report)
+    if "range_checks" in rules:
+        for column, (min_val, max_val) in rules["range_checks"].items():
+            if column in df.columns:
+                check_range(
+                    df, column=column, min_val=min_val, max_val=max_val, report=report
+                )
+    if "expected_years" in rules and "Anio" in df.columns:
+        check_year_continuity(
+            df,
+            year_column="Anio",
+            expected_years=rules["expected_years"],
+            report=report,
+        )
+    records_excluded = 0
+    for column, categories in rules.get("exclude_categories", {}).items():
+        if column in df.columns:
+            for category in categories:
+                count = len(df[df[column] == category])
+                if count > 0:
+                    records_excluded += count
+                    report.add_warning(
+                        f"Encontrados {count} registros de categoría '{category}' "
+                        f"en columna '{column}' (se recomienda excluir en análisis)"
+                    )
+    report.records_excluded = records_excluded
+    return report
+
+
+def ipc_sectorial_sintetico(filas: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    anios = np.arange(2002, 2024)
+    tipos = np.array(TIPOS, dtype=object)[rng.integers(0, len(TIPOS), filas)]
+    inflacion = rng.normal(2, 1.5, filas)
+    inflacion[pd.Series(tipos).str.contains("ndice").to_numpy()] = np.nan
+    df = pd.DataFrame(
+        {
+            "Anio": anios[rng.integers(0, len(anios) - 1, filas)],  # falta 2023
+            "Categoria_ECOICOP": np.array(CATEGORIAS, dtype=object)[
+                rng.integers(0, len(CATEGORIAS), filas)
+            ],
+            "Tipo_Metrica": tipos,
+            "IPC": np.round(rng.uniform(60, 150, filas), 3),
+            "Inflacion_Sectorial_%": inflacion,
+        }
+    )
+    pocas = max(filas // 100_000, 1)
+    df.loc[rng.integers(0, filas, pocas), "IPC"] = np.nan
+    df.loc[rng.integers(0, filas, pocas), "IPC"] = 250.0
+    df.loc[rng.integers(0, filas, pocas), "Inflacion_Sectorial_%"] = np.nan
+    return df
+
+
+def _medir(funcion, df):
+    inicio = time.perf_counter()
+    resultado = funcion(df, TABLA)
+    return time.perf_counter() - inicio, resultado
+
+
+def _mensajes(report: ValidationReport):
+    return report.errors, report.warnings, report.info, report.records_excluded
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del motor de validación")
+    parser.add_argument("--filas", type=int, default=10_000_000)
+    args = parser.parse_args()
+
+    df = ipc_sectorial_sintetico(args.filas)
+    print(f"[INFO] IPC sectorial sintético: {len(df):,} filas, reglas de {TABLA}")
+    ok = True
+    for nombre, tabla in [
+        ("almacén (category)", aplicar_politica(df)),
+        ("SQL (object)", df),
+    ]:
+        t_anterior, anterior = _medir(validar_anterior, tabla)
+        t_motor, motor = _medir(validate_table, tabla)
+        iguales = _mensajes(anterior) == _mensajes(motor)
+        mejora = t_anterior / max(t_motor, 1e-9)
+        ok &= iguales
+        estado = "[OK]" if iguales else "[ERR]"
+        print(f"\n  {nombre}")
+        print(
+            f"  {estado} mismos mensajes: {len(motor.errors)} errores, "
+            f"{len(motor.warnings)} advertencias, {len(motor.info)} info"
+        )
+        print(f"  anterior (check_* por separado): {t_anterior:.2f}s")
+        print(f"  motor compilado:                 {t_motor:.2f}s | x{mejora:.1f}")
+        if nombre.startswith("almacén") and mejora < MEJORA_MINIMA:
+            print(f"  [WARN] mejora por debajo de x{MEJORA_MINIMA}")
+            ok = False
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,17 +1,44 @@
 #!/usr/bin/env python3
 """
-Check pickles for corrupted strings (mojibake or replacement chars).
-Exits with code 1 if corruption is detected.
+Check cached tables (outputs/pickle_cache) for corrupted strings (mojibake or replacement chars).
+
+The offending values of each text column, with their row counts, are recorded
+in the store manifest when each table is written (src/manifiesto.py), so by
+default the scan reads metadata only. Tables whose manifest entry predates
+that record or hit its per-column cap (`MAX_VALORES_MOJIBAKE`, so the list
+may be incomplete), or all tables with --data, are scanned from the data:
+only string and categorical columns are read (Parquet dictionary pages stay
+dictionary-encoded), the pattern runs once per distinct value, and tables are
+scanned in parallel across a process pool.
+
+    python scripts/check_pickles_encoding.py [--data] [--workers N] [--json report.json]
+
+The JSON report lists (table, column, value, count) tuples. Exits with code 1
+if corruption is detected.
 """
-import pickle
-import re
+
+import argparse
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(BASE_DIR))
 
+from src.almacen import AlmacenTablas, formato_de  # noqa: E402
+from src.manifiesto import (  # noqa: E402
+    MAX_VALORES_MOJIBAKE,
+    escribir_json,
+    mojibake_por_columna,
+)
+
+Issue = Tuple[str, str, str, int]  # (table, column, value, count)
+
 
 def find_project_root():
     p = Path.cwd()
@@ -22,49 +49,145 @@ def find_project_root():
     return Path.cwd()
 
 
-def scan_pickle_for_mojibake(pickle_path: Path) -> List[str]:
-    issues = []
+def _is_text(tipo: pa.DataType) -> bool:
+    return (
+        pa.types.is_string(tipo)
+        or pa.types.is_large_string(tipo)
+        or pa.types.is_dictionary(tipo)
+    )
+
+
+def read_text_columns(directory: Path, nombre: str) -> pd.DataFrame:
+    """String and categorical columns of a table, without reading the rest."""
+    almacen = AlmacenTablas(directory)
+    ruta = almacen.ruta(nombre)
+    if ruta.exists() and formato_de(ruta) == "parquet":
+        columnas = [c.name for c in pq.read_schema(ruta) if _is_text(c.type)]
+        # Dictionary-encoded pages come back as categoricals: one string per
+        # distinct value instead of one per row
+        return pq.read_table(
+            ruta, columns=columnas, read_dictionary=columnas
+        ).to_pandas()
+    # Arrow IPC is memory-mapped (numeric columns are not copied); pickles
+    # have to be read whole anyway
+    df = almacen.leer(nombre, mmap=True)
+    return df.select_dtypes(include=["object", "string", "category"])
+
+
+def scan_table(directory: Path, nombre: str) -> List[Issue]:
+    """Offending (table, column, value, count) tuples read from the data."""
+    df = read_text_columns(directory, nombre)
+    return [
+        (nombre, columna, valor, filas)
+        for columna, valores in mojibake_por_columna(df).items()
+        for valor, filas in valores.items()
+    ]
+
+
+def scan_manifest(almacen: AlmacenTablas, nombre: str) -> Optional[List[Issue]]:
+    """
+    Offending tuples recorded in the manifest (None if the entry has none, or
+    if a column reached the cap and its list may be truncated).
+    """
+    meta = almacen.metadatos(nombre)
+    if "valores_mojibake" not in meta:
+        return None
+    if any(len(v) >= MAX_VALORES_MOJIBAKE for v in meta["valores_mojibake"].values()):
+        return None
+    return [
+        (nombre, columna, valor, filas)
+        for columna, valores in meta["valores_mojibake"].items()
+        for valor, filas in valores.items()
+    ]
+
+
+def scan_store(
+    directory: Path, data: bool = False, workers: Optional[int] = None
+) -> Tuple[List[Issue], Dict[str, str]]:
+    """
+    Returns:
+        (issues, {table: 'manifest' | 'data' | 'error: ...'})
+    """
+    almacen = AlmacenTablas(directory)
+    issues: List[Issue] = []
+    sources: Dict[str, str] = {}
+    pending = []
+    for nombre in almacen.nombres():
+        try:
+            found = None if data else scan_manifest(almacen, nombre)
+        except Exception as e:
+            sources[nombre] = f"error: {type(e).__name__}: {e}"
+            continue
+        if found is None:
+            pending.append(nombre)
+        else:
+            issues.extend(found)
+            sources[nombre] = "manifest"
+
+    if pending:
+        if workers == 1 or len(pending) == 1:
+            results = [_scan_or_error(directory, n) for n in pending]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(
+                    pool.map(_scan_or_error, [directory] * len(pending), pending)
+                )
+        for nombre, (found, error) in zip(pending, results):
+            issues.extend(found)
+            sources[nombre] = error or "data"
+    return issues, sources
+
+
+def _scan_or_error(directory: Path, nombre: str) -> Tuple[List[Issue], Optional[str]]:
     try:
-        df = pickle.load(open(pickle_path, "rb"))
-        if df is None or getattr(df, "empty", False):
-            return issues
-        # Convert to strings and search for common mojibake patterns
-        # Wider detection: any 'Ã' followed by a char, 'Â', 'â', Unicode replacement char or common 'Â€' sequences
-        mojibake_patterns = [r"Ã.", r"Â", r"â", r"�", r"\ufffd", r"Â€", r"â\u20ac"]
-        regex = re.compile("|".join(mojibake_patterns))
-
-        # Check object dtype columns
-        for col in df.select_dtypes(include=["object"]).columns:
-            # Sample values to limit memory, but scan all if small
-            values = df[col].astype(str)
-            if any(values.str.contains(regex, na=False)):
-                issues.append(f"Column {col} contains mojibake sequences")
+        return scan_table(directory, nombre), None
     except Exception as e:
-        issues.append(f"Error reading pickle {pickle_path.name}: {e}")
-    return issues
-
-
-def main():
-    project_root = find_project_root()
-    cache_dir = project_root / "outputs" / "pickle_cache"
-    pickles = list(Path(cache_dir).glob("*.pkl"))
-    all_issues = {}
-    for p in pickles:
-        issues = scan_pickle_for_mojibake(p)
-        if issues:
-            all_issues[p.name] = issues
-
-    if all_issues:
-        print("Mojibake / encoding issues detected in pickles:")
-        for k, v in all_issues.items():
-            print(f" - {k}:")
-            for item in v:
-                print(f"    - {item}")
-        sys.exit(1)
-    else:
-        print("No encoding issues detected in pickles.")
-        sys.exit(0)
+        return [], f"error: {type(e).__name__}: {e}"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--directory", type=Path, default=None)
+    parser.add_argument(
+        "--data", action="store_true", help="Scan the data, not the manifest"
+    )
+    parser.add_argument("--workers", type=int, default=None, help="Process pool size")
+    parser.add_argument("--json", type=Path, help="Write a machine-readable report")
+    args = parser.parse_args(argv)
+
+    cache_dir = args.directory or find_project_root() / "outputs" / "pickle_cache"
+    issues, sources = scan_store(cache_dir, data=args.data, workers=args.workers)
+    errors = {k: v for k, v in sources.items() if v.startswith("error")}
+
+    if args.json:
+        escribir_json(
+            args.json,
+            {
+                "directory": str(cache_dir),
+                "tables": sources,
+                "issues": [
+                    {"table": t, "column": c, "value": v, "count": n}
+                    for t, c, v, n in issues
+                ],
+            },
+        )
+
+    for nombre, error in errors.items():
+        print(f"[ERR] {nombre}: {error}")
+    if issues:
+        print("Mojibake / encoding issues detected in cached tables:")
+        tabla_actual = None
+        for tabla, columna, valor, filas in issues:
+            if tabla != tabla_actual:
+                print(f" - {tabla}:")
+                tabla_actual = tabla
+            print(f"    - {columna}: {valor!r} ({filas} rows)")
+        return 1
+    if errors:
+        return 1
+    print("No encoding issues detected in cached tables.")
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
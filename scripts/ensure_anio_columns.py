@@ -1,11 +1,13 @@
 """
-Script to ensure pickles in outputs/pickle_cache use 'Anio' as canonical year column.
+Script to ensure cached tables in outputs/pickle_cache (src/almacen.py) use 'Anio' as canonical year column.
 Renames columns 'Año', 'Anyo', 'A�o' to 'Anio' when present.
 
 This is meant to be run after extraction notebooks and before the load stage.
+Tables whose manifest columns need no change are skipped without being read;
+before the first rewrite the store takes a snapshot (`python -m src.almacen
+rollback <id>` restores it) and every rewrite is atomic.
 """
 
-import pickle
 import sys
 from pathlib import Path
 from pathlib import Path as _Path
@@ -17,6 +19,8 @@ if str(BASE_DIR) not in sys.path:
     sys.path.insert(0, str(BASE_DIR))
 
 # Imports del proyecto (después de configurar sys.path)
+from src.almacen import AlmacenTablas  # noqa: E402
+from utils.canonical_schema import YEAR_VARIANTS, canonical_year  # noqa: E402
 from utils.validation_framework import normalize_tipo_metrica  # noqa: E402
 
 
@@ -32,48 +36,54 @@ def find_project_root():
 project_root = find_project_root()
 CACHE_DIR = project_root / "outputs" / "pickle_cache"
 
-PICKLES = [p for p in CACHE_DIR.glob("*.pkl")]
+ALMACEN = AlmacenTablas(CACHE_DIR)
+TABLAS = ALMACEN.nombres()
 
 print(f"Cache dir: {CACHE_DIR}")
-print(f"Total pickles: {len(PICKLES)}")
+print(f"Total tables: {len(TABLAS)}")
 
 # We'll check for these variants and rename to 'Anio'
-VARIANTS = ["Año", "Anyo", "A�o"]
+VARIANTS = YEAR_VARIANTS
 
 fixed = []
-for p in PICKLES:
+snapshot = None
+for nombre in TABLAS:
     try:
-        with open(p, "rb") as f:
-            df = pickle.load(f)
+        cols = list(ALMACEN.metadatos(nombre)["columnas"])
+        if "Tipo_Metrica" not in cols and not (
+            "Anio" not in cols and any(bad in cols for bad in VARIANTS)
+        ):
+            continue
+        df = ALMACEN.leer(nombre)
         if not isinstance(df, pd.DataFrame):
             continue
-        cols = df.columns.tolist()
-        rename = {}
-        for bad in ["Año", "Anyo", "A�o"]:
-            if bad in cols and "Anio" not in cols:
-                rename[bad] = "Anio"
+        rename = {
+            bad: "Anio" for bad in VARIANTS if bad in df.columns and "Anio" not in df
+        }
         modified = False
         if rename:
-            df = df.rename(columns=rename)
+            # Same rename as the load stage, without copying the data
+            df = canonical_year(df)
             modified = True
         # Normalize Tipo_Metrica if present
         if "Tipo_Metrica" in df.columns:
-            df = df.copy()
             df["Tipo_Metrica"] = normalize_tipo_metrica(df["Tipo_Metrica"])
             modified = True
 
-        # If we made modifications (rename or normalization), write back pickle
+        # If we made modifications (rename or normalization), write back table
         if modified:
             try:
-                with open(p, "wb") as f:
-                    pickle.dump(df, f)
-                fixed.append((p.name, rename))
+                if snapshot is None:
+                    snapshot = ALMACEN.crear_snapshot("ensure_anio_columns")
+                    print(f"Snapshot before rewriting: {snapshot}")
+                ALMACEN.guardar(df, nombre, etapa="ensure_anio_columns", compactar=True)
+                fixed.append((nombre, rename))
             except Exception as e:
-                print(f"Failed to write back modified pickle {p}: {e}")
+                print(f"Failed to write back modified table {nombre}: {e}")
     except Exception as e:
-        print(f"Error processing {p}: {e}")
+        print(f"Error processing {nombre}: {e}")
 
-print(f"Fixed {len(fixed)} pickles:")
+print(f"Fixed {len(fixed)} tables:")
 for name, rename in fixed:
     print(f" - {name}: {rename}")
 
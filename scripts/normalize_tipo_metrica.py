@@ -1,19 +1,22 @@
 #!/usr/bin/env python3
 """
-Normalize 'Tipo_Metrica' values in pickles (remove diacritics and fix mojibake).
+Normalize 'Tipo_Metrica' values in cached tables (src/almacen.py) (remove diacritics and fix mojibake).
 
 Usage:
     python scripts/normalize_tipo_metrica.py --in-place
     python scripts/normalize_tipo_metrica.py --output-dir outputs/pickle_cache/normalized
-    python scripts/normalize_tipo_metrica.py --in-place --backup-dir outputs/pickle_cache/backups/2025
+    python scripts/normalize_tipo_metrica.py --in-place --etiqueta nightly-2025
+
+--in-place first takes a snapshot of the table store (deduplicated, see
+`python -m src.almacen snapshots` / `rollback <id>`); --backup-dir additionally
+copies the files to a directory, as before.
 
 Run `python scripts/normalize_tipo_metrica.py --help` for more options.
 """
+
 import argparse
-import pickle
 import shutil
 import sys
-from datetime import datetime
 from pathlib import Path
 
 import pandas as pd
@@ -23,6 +26,8 @@ if str(BASE_DIR) not in sys.path:
     sys.path.insert(0, str(BASE_DIR))
 
 # Imports del proyecto (después de configurar sys.path)
+from src.almacen import AlmacenTablas  # noqa: E402
+from utils.canonical_labels import TIPO_METRICA  # noqa: E402
 from utils.validation_framework import normalize_tipo_metrica  # noqa: E402
 
 
@@ -36,7 +41,12 @@ def find_project_root():
 
 
 def main(
-    cache_dir=None, in_place=False, output_dir=None, backup_dir=None, dry_run=False
+    cache_dir=None,
+    in_place=False,
+    output_dir=None,
+    backup_dir=None,
+    dry_run=False,
+    etiqueta=None,
 ):
     project_root = find_project_root()
     if cache_dir is None:
@@ -44,65 +54,80 @@ def main(
     cache_dir = Path(cache_dir)
     if output_dir is None and not in_place:
         output_dir = cache_dir / "normalized"
-    if backup_dir is None:
-        backup_dir = cache_dir / "backups" / datetime.utcnow().strftime("%Y%m%d_%H%M%S")
     output_dir = Path(output_dir) if output_dir is not None else None
-    backup_dir = Path(backup_dir)
+    backup_dir = Path(backup_dir) if backup_dir is not None else None
 
-    pickles = list(Path(cache_dir).glob("*.pkl"))
+    almacen = AlmacenTablas(cache_dir)
     updated = []
+    snapshot = None
 
-    for p in pickles:
+    for nombre in almacen.nombres():
         try:
-            df = pickle.load(open(p, "rb"))
+            if "Tipo_Metrica" not in almacen.metadatos(nombre)["columnas"]:
+                continue
+            df = almacen.leer(nombre)
             if isinstance(df, pd.DataFrame) and "Tipo_Metrica" in df.columns:
                 df = df.copy()
                 df["Tipo_Metrica"] = normalize_tipo_metrica(df["Tipo_Metrica"])
                 # Prepare target path
                 if in_place:
-                    target_path = p
-                    # Make backup before overwriting
-                    if not dry_run:
+                    destino = almacen
+                    # Snapshot (once) before overwriting: unchanged tables cost no bytes
+                    if not dry_run and snapshot is None:
+                        snapshot = almacen.crear_snapshot(
+                            etiqueta or "normalize_tipo_metrica"
+                        )
+                        print(
+                            f"Snapshot {snapshot} (rollback: python -m src.almacen rollback {snapshot})"
+                        )
+                    if not dry_run and backup_dir is not None:
                         backup_dir.mkdir(parents=True, exist_ok=True)
+                        p = almacen.ruta(nombre)
                         backup_path = backup_dir / p.name
                         shutil.copy2(p, backup_path)
                         print(f"Backed up {p.name} -> {backup_path}")
                 else:
-                    target_path = output_dir / p.name
-                    if not dry_run:
-                        output_dir.mkdir(parents=True, exist_ok=True)
+                    destino = AlmacenTablas(output_dir)
                 if not dry_run:
-                    with open(target_path, "wb") as f:
-                        pickle.dump(df, f)
-                    print(f"Wrote normalized pickle: {target_path}")
-                updated.append(p.name)
+                    target_path = destino.guardar(
+                        df, nombre, etapa="normalize_tipo_metrica", compactar=True
+                    )
+                    print(f"Wrote normalized table: {target_path}")
+                updated.append(nombre)
         except Exception as e:
-            print(f"Error processing {p}: {e}")
+            print(f"Error processing {nombre}: {e}")
             continue
 
-    print(f"Normalized Tipo_Metrica in {len(updated)} pickles")
+    print(f"Normalized Tipo_Metrica in {len(updated)} tables")
     for u in updated:
         print(" -", u)
+    # Labels the TIPO_METRICA dictionary did not recognize (kept unchanged)
+    for label, rows in TIPO_METRICA.report()["misses"].items():
+        print(f"[WARN] Unrecognized Tipo_Metrica {label!r}: {rows} rows")
 
 
 if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description="Normalize Tipo_Metrica in pickles")
+    parser = argparse.ArgumentParser(
+        description="Normalize Tipo_Metrica in cached tables"
+    )
     parser.add_argument(
         "--cache-dir",
         "-c",
-        help="Directory where pickles to normalize live (defaults to outputs/pickle_cache)",
+        help="Directory where tables to normalize live (defaults to outputs/pickle_cache)",
     )
     parser.add_argument(
         "--in-place",
         "-i",
         action="store_true",
-        help="Modify pickles in place (will create backups)",
+        help="Modify tables in place (takes a snapshot of the store first)",
     )
     parser.add_argument(
-        "--output-dir", "-o", help="Where to write normalized pickles when not in-place"
+        "--output-dir", "-o", help="Where to write normalized tables when not in-place"
     )
     parser.add_argument(
-        "--backup-dir", "-b", help="Where to store backups when using --in-place"
+        "--backup-dir",
+        "-b",
+        help="Also copy the modified files here when using --in-place",
     )
     parser.add_argument(
         "--dry-run",
@@ -110,6 +135,9 @@ if __name__ == "__main__":
         action="store_true",
         help="Show what would be modified but do not write files",
     )
+    parser.add_argument(
+        "--etiqueta", "-e", help="Label for the snapshot taken before --in-place"
+    )
     args = parser.parse_args()
     main(
         cache_dir=args.cache_dir,
@@ -117,4 +145,5 @@ if __name__ == "__main__":
         output_dir=args.output_dir,
         backup_dir=args.backup_dir,
         dry_run=args.dry_run,
+        etiqueta=args.etiqueta,
     )
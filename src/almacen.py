@@ -0,0 +1,801 @@
+"""
+Almacén de tablas intermedias del pipeline
+==========================================
+
+Sustituye a los pickles de `CACHE_DIR` (outputs/pickle_cache) por formatos
+Arrow escritos con pyarrow:
+
+- Parquet (por defecto): comprimido con zstd.
+    - Proyección: `leer(nombre, columnas=[...])` solo descomprime esas columnas.
+    - Filtro por año: `leer(nombre, anios=(2015, 2023))` se empuja a los row
+      groups mediante sus estadísticas min/max de `Anio` / `Año`.
+- Arrow IPC (`formato="arrow"` o `ALMACEN_FORMATO=arrow`): sin comprimir y en
+  un solo record batch, se abre con `mmap`. Con `leer(nombre, mmap=True)` las
+  columnas numéricas sin nulos apuntan directamente al fichero mapeado: abrir
+  la tabla no copia datos y varios procesos (notebooks, tests en paralelo)
+  comparten las mismas páginas de la caché del sistema operativo. Esas
+  columnas son de solo lectura; hacer `.copy()` antes de modificarlas.
+- Sin `pickle.load`: leer no ejecuta código y no depende de la versión de
+  pandas con la que se escribió.
+
+Cada tabla vive en un único fichero (`guardar` borra las copias en otros
+formatos) y cada escritura actualiza el manifiesto del directorio
+(`src/manifiesto.py`: hash, esquema, filas, rango de años y etapa), de modo que
+`metadatos(nombre)` responde sin leer los datos.
+
+Versiones: el contenido se guarda una sola vez en `_objetos/<sha256>` (inmutable,
+direccionado por hash) y el fichero visible de cada tabla es un enlace duro a su
+objeto. Una escritura va a un temporal y se publica con `os.replace`, así que un
+fallo a mitad nunca deja una tabla a medias. Un snapshot es la lista de
+objetos de cada tabla (`_snapshots/<id>.json`): las tablas sin cambios entre
+ejecuciones no ocupan bytes extra y `rollback` solo vuelve a enlazar ficheros:
+    python -m src.almacen snapshot --etiqueta antes-de-normalizar
+    python -m src.almacen snapshots
+    python -m src.almacen rollback 20251120T111345123456
+    python -m src.almacen purgar --conservar 10
+
+Tipos compactos: `guardar(..., compactar=True)` (lo usan las etapas del
+pipeline) aplica la política de `src/tipos.py` (categóricas para dimensiones,
+int16 para `Anio`, float32 cuando no se pierden decimales) y anota en el
+manifiesto la memoria antes y después; los formatos Arrow conservan esos tipos
+al leer. Para compactar las tablas ya guardadas:
+    python -m src.almacen compactar [--only df_gini_ccaa]
+
+Los `.pkl` existentes se siguen leyendo hasta ejecutar la migración:
+    python -m src.almacen migrar [--directorio outputs/pickle_cache] [--conservar]
+    python -m src.almacen convertir --formato arrow [--only df_gini_ccaa]
+
+Los nombres son las claves de siempre (`df_gini_ccaa`); se acepta también el
+nombre de fichero antiguo (`df_gini_ccaa.pkl`).
+"""
+
+import argparse
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from src.config import CACHE_DIR, ensure_dir
+from src.manifiesto import Manifiesto, describir, escribir_json, hash_fichero
+from src.tipos import compactar as compactar_tipos
+
+EXTENSION = ".parquet"
+EXTENSION_ARROW = ".arrow"
+EXTENSION_LEGADO = ".pkl"
+# Formato -> extensión; al leer se prueban en este orden
+FORMATOS = {"arrow": EXTENSION_ARROW, "parquet": EXTENSION, "pickle": EXTENSION_LEGADO}
+DEFAULT_FORMATO = "parquet"
+DIR_OBJETOS = "_objetos"
+DIR_SNAPSHOTS = "_snapshots"
+COLUMNAS_ANIO = ("Anio", "Año")
+COMPRESION = "zstd"
+FILAS_POR_GRUPO = 65_536
+
+Anios = Union[int, Tuple[Optional[int], Optional[int]]]
+
+
+def nombre_tabla(nombre: Union[str, Path]) -> str:
+    """Clave de la tabla sin directorio ni extensión ('df_x.pkl' -> 'df_x')."""
+    nombre = Path(nombre).name
+    for ext in FORMATOS.values():
+        if nombre.endswith(ext):
+            return nombre[: -len(ext)]
+    return nombre
+
+
+def formato_de(ruta: Path) -> str:
+    """Formato de un fichero del almacén según su extensión."""
+    return next(f for f, ext in FORMATOS.items() if ruta.name.endswith(ext))
+
+
+def _filtros_anio(columna: str, anios: Anios) -> list:
+    if isinstance(anios, int):
+        return [(columna, "==", anios)]
+    desde, hasta = anios
+    filtros = []
+    if desde is not None:
+        filtros.append((columna, ">=", desde))
+    if hasta is not None:
+        filtros.append((columna, "<=", hasta))
+    return filtros
+
+
+def _columna_anio(disponibles: Sequence[str], nombre: str) -> str:
+    columna = next((c for c in COLUMNAS_ANIO if c in disponibles), None)
+    if columna is None:
+        raise KeyError(f"{nombre_tabla(nombre)} no tiene columna de año")
+    return columna
+
+
+class AlmacenTablas:
+    """Tablas {nombre: DataFrame} persistidas como Parquet o Arrow IPC en un directorio."""
+
+    def __init__(
+        self,
+        directorio: Optional[Path] = None,
+        compresion: str = COMPRESION,
+        filas_por_grupo: int = FILAS_POR_GRUPO,
+        formato: Optional[str] = None,
+    ):
+        self.directorio = Path(directorio) if directorio is not None else CACHE_DIR
+        self.compresion = compresion
+        self.filas_por_grupo = filas_por_grupo
+        self.formato = formato or os.environ.get("ALMACEN_FORMATO", DEFAULT_FORMATO)
+        if self.formato not in ("parquet", "arrow"):
+            raise ValueError(f"Formato de almacén no soportado: {self.formato}")
+        self.manifiesto = Manifiesto(self.directorio)
+
+    # ------------------------------------------------------------------ rutas
+    def ruta(self, nombre: str) -> Path:
+        """Fichero de la tabla: el existente o, si no hay, el que escribiría `guardar`."""
+        return self._ruta_existente(nombre) or self._ruta_formato(nombre, self.formato)
+
+    def ruta_legado(self, nombre: str) -> Path:
+        return self._ruta_formato(nombre, "pickle")
+
+    def _ruta_formato(self, nombre: str, formato: str) -> Path:
+        return self.directorio / f"{nombre_tabla(nombre)}{FORMATOS[formato]}"
+
+    def _ruta_existente(self, nombre: str) -> Optional[Path]:
+        for formato in FORMATOS:
+            ruta = self._ruta_formato(nombre, formato)
+            if ruta.exists():
+                return ruta
+        return None
+
+    def existe(self, nombre: str) -> bool:
+        return self._ruta_existente(nombre) is not None
+
+    def nombres(self) -> List[str]:
+        """Tablas disponibles (en cualquier formato, incluido pickle sin migrar)."""
+        rutas = [
+            r for ext in FORMATOS.values() for r in self.directorio.glob(f"*{ext}")
+        ]
+        return sorted({nombre_tabla(r) for r in rutas})
+
+    # -------------------------------------------------------------- escritura
+    def guardar(
+        self,
+        df: pd.DataFrame,
+        nombre: str,
+        etapa: Optional[str] = None,
+        compactar: bool = False,
+        extra: Optional[dict] = None,
+    ) -> Path:
+        """
+        Escribe la tabla en el formato del almacén (de forma atómica), elimina
+        sus copias en otros formatos y la registra en el manifiesto.
+
+        Los DataFrames que Arrow no puede representar (p.ej. columnas object con
+        tipos mezclados) se guardan como pickle con un aviso.
+
+        Args:
+            etapa: Etapa que escribe la tabla (p.ej. 'ine', 'eurostat', '01a')
+            compactar: Aplicar la política de tipos de `src/tipos.py` y anotar
+                en el manifiesto la memoria ahorrada
+            extra: Campos adicionales para la entrada del manifiesto (p.ej. la
+                clave de una tabla derivada, ver `src/derivadas.py`)
+        """
+        informe = None
+        if compactar:
+            df, informe = compactar_tipos(df)
+        ruta, sha256 = self._guardar(df, nombre)
+        entrada = describir(df, ruta, etapa, formato_de(ruta), sha256=sha256)
+        if informe is not None:
+            entrada["memoria"] = informe
+        entrada.update(extra or {})
+        self.manifiesto.registrar(nombre_tabla(nombre), entrada)
+        return ruta
+
+    def _guardar(self, df: pd.DataFrame, nombre: str) -> Tuple[Path, str]:
+        ensure_dir(self.directorio)
+        if isinstance(df.columns, pd.CategoricalIndex):
+            # Pivots sobre columnas categóricas: Arrow no reconstruye ese índice
+            df = df.set_axis(pd.Index(list(df.columns), name=df.columns.name), axis=1)
+        try:
+            tabla = pa.Table.from_pandas(df, preserve_index=None)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError, ValueError) as e:
+            print(
+                f"[WARN] {nombre_tabla(nombre)}: no representable en Arrow ({e}); se guarda como pickle"
+            )
+            return self._escribir(nombre, "pickle", lambda tmp: pd.to_pickle(df, tmp))
+
+        if self.formato == "arrow":
+            return self._escribir(
+                nombre, "arrow", lambda tmp: _escribir_ipc(tabla, tmp)
+            )
+        return self._escribir(
+            nombre,
+            "parquet",
+            lambda tmp: pq.write_table(
+                tabla,
+                tmp,
+                compression=self.compresion,
+                row_group_size=self.filas_por_grupo,
+            ),
+        )
+
+    def _escribir(
+        self, nombre: str, formato: str, escribir: Callable[[str], None]
+    ) -> Tuple[Path, str]:
+        ruta = self._ruta_formato(nombre, formato)
+        fd, tmp = tempfile.mkstemp(dir=self.directorio, prefix=f".{ruta.name}.")
+        os.close(fd)
+        try:
+            escribir(tmp)
+            sha256 = hash_fichero(Path(tmp))
+            objeto = self._ruta_objeto(sha256, FORMATOS[formato])
+            if objeto.exists():
+                os.remove(tmp)  # mismo contenido ya guardado: no ocupa más
+            else:
+                ensure_dir(objeto.parent)
+                os.replace(tmp, objeto)
+                _solo_lectura(objeto)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        _enlazar(objeto, ruta)
+        self._eliminar_otros_formatos(nombre, formato)
+        return ruta, sha256
+
+    def _eliminar_otros_formatos(self, nombre: str, formato: str):
+        for otro in FORMATOS:
+            if otro != formato:
+                self._ruta_formato(nombre, otro).unlink(missing_ok=True)
+
+    def _ruta_objeto(self, sha256: str, extension: str) -> Path:
+        return self.directorio / DIR_OBJETOS / sha256[:2] / f"{sha256}{extension}"
+
+    # ---------------------------------------------------------------- lectura
+    def columnas(self, nombre: str) -> List[str]:
+        """Nombres de columna (solo metadatos en Parquet / Arrow IPC)."""
+        ruta = self._ruta_existente(nombre)
+        if ruta is None or formato_de(ruta) == "pickle":
+            return list(self._leer_legado(nombre).columns)
+        if formato_de(ruta) == "arrow":
+            esquema = _abrir_ipc(ruta).schema
+        else:
+            esquema = pq.read_schema(ruta)
+        return [c for c in esquema.names if not c.startswith("__index_level_")]
+
+    def leer(
+        self,
+        nombre: str,
+        columnas: Optional[Sequence[str]] = None,
+        anios: Optional[Anios] = None,
+        mmap: bool = False,
+    ) -> pd.DataFrame:
+        """
+        Lee una tabla.
+
+        Args:
+            nombre: Clave de la tabla (o nombre de fichero antiguo)
+            columnas: Columnas a leer (todas si None)
+            anios: Año o rango (desde, hasta) inclusive sobre `Anio` / `Año`
+            mmap: En tablas Arrow IPC sin filtro por año, devolver las columnas
+                numéricas sin copiar (apuntan al fichero mapeado, solo lectura).
+                Sin efecto en los demás formatos.
+
+        Raises:
+            FileNotFoundError: Si la tabla no existe
+            KeyError: Si se filtra por año y la tabla no tiene columna de año
+        """
+        ruta = self._ruta_existente(nombre)
+        if ruta is None or formato_de(ruta) == "pickle":
+            return self._filtrar_legado(
+                self._leer_legado(nombre), nombre, columnas, anios
+            )
+        if formato_de(ruta) == "arrow":
+            return self._leer_ipc(ruta, nombre, columnas, anios, mmap)
+
+        filtros = None
+        if anios is not None:
+            columna = _columna_anio(pq.read_schema(ruta).names, nombre)
+            filtros = _filtros_anio(columna, anios) or None
+        tabla = pq.read_table(
+            ruta,
+            columns=list(columnas) if columnas is not None else None,
+            filters=filtros,
+        )
+        df = tabla.to_pandas()
+        if filtros is not None and isinstance(df.index, pd.RangeIndex):
+            df = df.reset_index(drop=True)
+        return df
+
+    @staticmethod
+    def _leer_ipc(
+        ruta: Path,
+        nombre: str,
+        columnas: Optional[Sequence[str]],
+        anios: Optional[Anios],
+        mmap: bool,
+    ) -> pd.DataFrame:
+        tabla = _abrir_ipc(ruta).read_all()
+        if anios is not None:
+            columna = _columna_anio(tabla.column_names, nombre)
+            mascara = None
+            for _, op, valor in _filtros_anio(columna, anios):
+                funcion = {"==": pc.equal, ">=": pc.greater_equal, "<=": pc.less_equal}[
+                    op
+                ]
+                condicion = funcion(tabla[columna], valor)
+                mascara = condicion if mascara is None else pc.and_(mascara, condicion)
+            if mascara is not None:
+                tabla = tabla.filter(mascara)
+        if columnas is not None:
+            tabla = tabla.select(list(columnas))
+        if mmap and anios is None:
+            # Un bloque por columna: pandas no consolida y no copia los buffers
+            return tabla.to_pandas(split_blocks=True)
+        df = tabla.to_pandas()
+        if anios is not None and isinstance(df.index, pd.RangeIndex):
+            df = df.reset_index(drop=True)
+        return df
+
+    def _leer_legado(self, nombre: str) -> pd.DataFrame:
+        ruta = self.ruta_legado(nombre)
+        if not ruta.exists():
+            raise FileNotFoundError(f"Tabla no encontrada: {self.ruta(nombre)}")
+        return pd.read_pickle(ruta)
+
+    @staticmethod
+    def _filtrar_legado(
+        df: pd.DataFrame,
+        nombre: str,
+        columnas: Optional[Sequence[str]],
+        anios: Optional[Anios],
+    ) -> pd.DataFrame:
+        if anios is not None:
+            columna = _columna_anio(df.columns, nombre)
+            mascara = pd.Series(True, index=df.index)
+            for _, op, valor in _filtros_anio(columna, anios):
+                serie = df[columna]
+                mascara &= {
+                    "==": serie == valor,
+                    ">=": serie >= valor,
+                    "<=": serie <= valor,
+                }[op]
+            df = df[mascara.fillna(False).astype(bool)].reset_index(drop=True)
+        return df[list(columnas)] if columnas is not None else df
+
+    def eliminar(self, nombre: str):
+        for formato in FORMATOS:
+            self._ruta_formato(nombre, formato).unlink(missing_ok=True)
+        self.manifiesto.eliminar(nombre_tabla(nombre))
+
+    # ------------------------------------------------------------- metadatos
+    def metadatos(self, nombre: str) -> dict:
+        """
+        Entrada del manifiesto (filas, columnas y dtypes, rango de años, hash,
+        etapa...) sin leer los datos; si falta o el fichero ha cambiado desde
+        que se registró, se reconstruye leyendo la tabla una vez.
+
+        Raises:
+            FileNotFoundError: Si la tabla no existe
+        """
+        clave = nombre_tabla(nombre)
+        entrada = self.manifiesto.entrada(clave)
+        if entrada is not None:
+            return entrada
+        df = self.leer(clave)
+        anterior = self.manifiesto.leer().get(clave, {})
+        ruta = self.ruta(clave)
+        entrada = describir(df, ruta, anterior.get("etapa"), formato_de(ruta))
+        self.manifiesto.registrar(clave, entrada)
+        return entrada
+
+    def reconstruir_manifiesto(self) -> Dict[str, dict]:
+        """Regenera las entradas ausentes o desactualizadas de todas las tablas."""
+        return {nombre: self.metadatos(nombre) for nombre in self.nombres()}
+
+    # ------------------------------------------------------------- snapshots
+    def crear_snapshot(self, etiqueta: Optional[str] = None) -> str:
+        """
+        Fija el estado actual de todas las tablas.
+
+        Solo escribe `_snapshots/<id>.json`; los datos ya están en `_objetos`
+        (las tablas escritas antes de existir el almacén de objetos se copian
+        allí una vez).
+
+        Returns:
+            Identificador del snapshot (marca de tiempo + etiqueta)
+        """
+        tablas = {}
+        for nombre in self.nombres():
+            entrada = self.metadatos(nombre)
+            vista = self.directorio / entrada["fichero"]
+            objeto = self._ruta_objeto(entrada["sha256"], vista.suffix)
+            if not objeto.exists():
+                ensure_dir(objeto.parent)
+                tmp = objeto.with_name(f".{objeto.name}.{os.getpid()}")
+                shutil.copy2(vista, tmp)
+                os.replace(tmp, objeto)
+                _solo_lectura(objeto)
+            tablas[nombre] = entrada
+        ident = datetime.now().strftime("%Y%m%dT%H%M%S%f")
+        if etiqueta:
+            ident += "_" + re.sub(r"[^\w.-]", "_", etiqueta)
+        ruta = self.directorio / DIR_SNAPSHOTS / f"{ident}.json"
+        ensure_dir(ruta.parent)
+        escribir_json(
+            ruta,
+            {
+                "id": ident,
+                "etiqueta": etiqueta,
+                "creado": datetime.now().isoformat(timespec="seconds"),
+                "tablas": tablas,
+            },
+        )
+        return ident
+
+    def snapshots(self) -> List[dict]:
+        """Snapshots del directorio, del más antiguo al más reciente."""
+        resultado = []
+        for ruta in sorted((self.directorio / DIR_SNAPSHOTS).glob("*.json")):
+            datos = json.loads(ruta.read_text(encoding="utf-8"))
+            datos["bytes"] = sum(e["bytes"] for e in datos["tablas"].values())
+            resultado.append(datos)
+        return resultado
+
+    def _leer_snapshot(self, ident: str) -> dict:
+        candidatos = [s for s in self.snapshots() if s["id"].startswith(ident)]
+        if len(candidatos) != 1:
+            estado = "ambiguo" if candidatos else "no encontrado"
+            raise KeyError(f"Snapshot {estado}: {ident}")
+        return candidatos[0]
+
+    def rollback(self, ident: str, verificar: bool = False) -> str:
+        """
+        Vuelve a publicar las tablas de un snapshot (antes fija el estado actual
+        en otro snapshot, para poder deshacer el rollback).
+
+        Args:
+            ident: Identificador del snapshot (o prefijo único)
+            verificar: Comprobar el SHA-256 de cada objeto (por defecto, solo
+                existencia y tamaño)
+
+        Returns:
+            Identificador del snapshot del estado previo
+
+        Raises:
+            KeyError: Si el snapshot no existe o el prefijo es ambiguo
+            ValueError: Si falta algún objeto o está dañado (no se toca nada)
+        """
+        destino = self._leer_snapshot(ident)
+        objetos = {}
+        for nombre, entrada in destino["tablas"].items():
+            objeto = self._ruta_objeto(
+                entrada["sha256"], Path(entrada["fichero"]).suffix
+            )
+            if not objeto.exists() or objeto.stat().st_size != entrada["bytes"]:
+                raise ValueError(f"{nombre}: objeto ausente o dañado ({objeto})")
+            if verificar and hash_fichero(objeto) != entrada["sha256"]:
+                raise ValueError(f"{nombre}: el hash del objeto no coincide ({objeto})")
+            objetos[nombre] = objeto
+
+        previo = self.crear_snapshot(etiqueta=f"antes-de-rollback-{destino['id']}")
+        for nombre in set(self.nombres()) - set(objetos):
+            for formato in FORMATOS:
+                self._ruta_formato(nombre, formato).unlink(missing_ok=True)
+        entradas = {}
+        for nombre, objeto in objetos.items():
+            entrada = dict(destino["tablas"][nombre])
+            vista = self.directorio / entrada["fichero"]
+            _enlazar(objeto, vista)
+            self._eliminar_otros_formatos(nombre, formato_de(vista))
+            stat = vista.stat()
+            entrada.update(bytes=stat.st_size, mtime_ns=stat.st_mtime_ns)
+            entradas[nombre] = entrada
+        self.manifiesto.reemplazar(entradas)
+        return previo
+
+    def purgar(self, conservar: Optional[int] = None) -> Tuple[int, int]:
+        """
+        Borra los snapshots más antiguos (si `conservar` se indica) y los
+        objetos que ya no usa ningún snapshot ni la vista actual.
+
+        Returns:
+            (objetos borrados, bytes liberados)
+        """
+        snapshots = self.snapshots()
+        if conservar is not None:
+            corte = max(len(snapshots) - conservar, 0)
+            for datos in snapshots[:corte]:
+                (self.directorio / DIR_SNAPSHOTS / f"{datos['id']}.json").unlink()
+            snapshots = snapshots[corte:]
+        en_uso = {e["sha256"] for s in snapshots for e in s["tablas"].values()}
+        en_uso |= {e["sha256"] for e in self.reconstruir_manifiesto().values()}
+        borrados = liberados = 0
+        for objeto in (self.directorio / DIR_OBJETOS).glob("*/*"):
+            if nombre_tabla(objeto) not in en_uso:
+                liberados += objeto.stat().st_size
+                objeto.unlink()
+                borrados += 1
+        return borrados, liberados
+
+    # -------------------------------------------------------------- migración
+    def migrar_pickles(self, conservar: bool = False) -> Dict[str, str]:
+        """
+        Convierte los `.pkl` del directorio al formato del almacén.
+
+        Args:
+            conservar: Mantener los pickles tras convertirlos (como `.pkl.bak`)
+
+        Returns:
+            {nombre: 'parquet' | 'arrow' | 'pickle' (no representable) | 'error: ...'}
+        """
+        resultado = {}
+        for ruta in sorted(self.directorio.glob(f"*{EXTENSION_LEGADO}")):
+            nombre = nombre_tabla(ruta)
+            # `guardar` borra el .pkl al escribir el nuevo formato: la copia se
+            # hace antes y solo se queda si la tabla migrada está en el manifiesto
+            copia = ruta.with_suffix(".pkl.bak") if conservar else None
+            try:
+                df = pd.read_pickle(ruta)
+                if not isinstance(df, pd.DataFrame):
+                    raise TypeError(f"contiene {type(df).__name__}, no un DataFrame")
+                if copia is not None:
+                    shutil.copy2(ruta, copia)
+                destino = self.guardar(df, nombre, etapa="migracion")
+                if self.manifiesto.entrada(nombre) is None:
+                    raise RuntimeError(f"{nombre} no quedó registrada en el manifiesto")
+                resultado[nombre] = formato_de(destino)
+            except Exception as e:
+                if copia is not None and ruta.exists():
+                    copia.unlink(missing_ok=True)
+                resultado[nombre] = f"error: {type(e).__name__}: {e}"
+        return resultado
+
+    def convertir(self, nombres: Optional[Sequence[str]] = None) -> Dict[str, str]:
+        """
+        Reescribe tablas existentes en el formato del almacén.
+
+        Returns:
+            {nombre: formato final | 'error: ...'}
+        """
+        resultado = {}
+        for nombre in nombres if nombres is not None else self.nombres():
+            try:
+                ruta = self._ruta_existente(nombre)
+                if ruta is not None and formato_de(ruta) == self.formato:
+                    resultado[nombre] = self.formato
+                    continue
+                etapa = (
+                    self.manifiesto.leer().get(nombre_tabla(nombre), {}).get("etapa")
+                )
+                destino = self.guardar(self.leer(nombre), nombre, etapa=etapa)
+                resultado[nombre] = formato_de(destino)
+            except Exception as e:
+                resultado[nombre] = f"error: {type(e).__name__}: {e}"
+        return resultado
+
+    def compactar_tablas(
+        self, nombres: Optional[Sequence[str]] = None
+    ) -> Dict[str, Union[dict, str]]:
+        """
+        Reescribe tablas existentes con la política de tipos de `src/tipos.py`
+        (las que ya la cumplen producen el mismo objeto y no ocupan más).
+
+        Returns:
+            {nombre: {"antes": bytes, "despues": bytes, "columnas": {...}} | 'error: ...'}
+        """
+        resultado = {}
+        for nombre in nombres if nombres is not None else self.nombres():
+            clave = nombre_tabla(nombre)
+            try:
+                etapa = self.manifiesto.leer().get(clave, {}).get("etapa")
+                self.guardar(self.leer(clave), clave, etapa=etapa, compactar=True)
+                resultado[clave] = self.manifiesto.leer()[clave]["memoria"]
+            except Exception as e:
+                resultado[clave] = f"error: {type(e).__name__}: {e}"
+        return resultado
+
+
+def _enlazar(objeto: Path, vista: Path):
+    """Publica `objeto` como `vista` de forma atómica (enlace duro o copia)."""
+    if vista.exists() and os.path.samefile(objeto, vista):
+        return
+    tmp = vista.with_name(f".{vista.name}.{os.getpid()}.{threading.get_ident()}")
+    tmp.unlink(missing_ok=True)
+    try:
+        os.link(objeto, tmp)
+    except OSError:
+        # Sistemas de ficheros sin enlaces duros
+        shutil.copy2(objeto, tmp)
+    try:
+        os.replace(tmp, vista)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def _solo_lectura(ruta: Path):
+    # En Windows un destino de solo lectura impediría os.replace sobre la vista
+    if os.name != "nt":
+        os.chmod(ruta, 0o444)
+
+
+def _escribir_ipc(tabla: pa.Table, ruta: str):
+    # Sin compresión y en un único batch: cada columna es un buffer contiguo
+    # que `to_pandas` puede usar sin copiar desde el mapa de memoria
+    tabla = tabla.combine_chunks()
+    with pa.OSFile(ruta, "wb") as destino:
+        with pa.ipc.new_file(destino, tabla.schema) as escritor:
+            escritor.write_table(tabla, max_chunksize=max(tabla.num_rows, 1))
+
+
+def _abrir_ipc(ruta: Path) -> pa.ipc.RecordBatchFileReader:
+    return pa.ipc.open_file(pa.memory_map(str(ruta), "r"))
+
+
+def guardar_tabla(
+    df: pd.DataFrame,
+    nombre: str,
+    directorio: Optional[Path] = None,
+    etapa: Optional[str] = None,
+    compactar: bool = False,
+) -> Path:
+    """Atajo de `AlmacenTablas(directorio).guardar`."""
+    return AlmacenTablas(directorio).guardar(
+        df, nombre, etapa=etapa, compactar=compactar
+    )
+
+
+def leer_tabla(
+    nombre: str,
+    directorio: Optional[Path] = None,
+    columnas: Optional[Sequence[str]] = None,
+    anios: Optional[Anios] = None,
+    mmap: bool = False,
+) -> pd.DataFrame:
+    """Atajo de `AlmacenTablas(directorio).leer`."""
+    return AlmacenTablas(directorio).leer(
+        nombre, columnas=columnas, anios=anios, mmap=mmap
+    )
+
+
+def _imprimir_memoria(resultado: Dict[str, Union[dict, str]]) -> int:
+    errores = 0
+    antes = despues = 0
+    for nombre, informe in resultado.items():
+        if isinstance(informe, str):
+            errores += 1
+            print(f"  [ERR] {nombre}: {informe}")
+            continue
+        antes += informe["antes"]
+        despues += informe["despues"]
+        ahorro = 1 - informe["despues"] / max(informe["antes"], 1)
+        print(
+            f"  [OK] {nombre:34s} {informe['antes'] / 1e6:9.2f} MB -> "
+            f"{informe['despues'] / 1e6:9.2f} MB ({ahorro:6.1%} menos)"
+        )
+        for columna, cambio in informe["columnas"].items():
+            print(f"         {columna}: {cambio}")
+    if antes:
+        print(
+            f"[INFO] Total: {antes / 1e6:.2f} MB -> {despues / 1e6:.2f} MB "
+            f"({1 - despues / antes:.1%} menos)"
+        )
+    return 1 if errores else 0
+
+
+def _imprimir_resultado(resultado: Dict[str, str], formato: str) -> int:
+    errores = 0
+    for nombre, estado in resultado.items():
+        if estado == formato:
+            print(f"  [OK] {nombre} -> {nombre}{FORMATOS[formato]}")
+        elif not estado.startswith("error"):
+            print(f"  [WARN] {nombre}: se mantiene como {estado}")
+        else:
+            errores += 1
+            print(f"  [ERR] {nombre}: {estado}")
+    return 1 if errores else 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.almacen", description="Almacén de tablas intermedias"
+    )
+    sub = parser.add_subparsers(dest="comando", required=True)
+    p_mig = sub.add_parser("migrar", help="Convierte los pickles existentes")
+    p_mig.add_argument(
+        "--conservar", action="store_true", help="Renombrar los pickles a .pkl.bak"
+    )
+    p_conv = sub.add_parser("convertir", help="Reescribe tablas en otro formato")
+    p_comp = sub.add_parser(
+        "compactar", help="Aplica la política de tipos y muestra la memoria ahorrada"
+    )
+    for p in (p_conv, p_comp):
+        p.add_argument(
+            "--only", action="append", help="Tabla(s), repetible o separadas por comas"
+        )
+    p_list = sub.add_parser("list", help="Tablas y formato")
+    p_man = sub.add_parser("manifiesto", help="Filas, años y etapa desde el manifiesto")
+    p_snap = sub.add_parser("snapshot", help="Fija el estado actual de las tablas")
+    p_snap.add_argument("--etiqueta", default=None)
+    p_snaps = sub.add_parser("snapshots", help="Lista los snapshots")
+    p_roll = sub.add_parser("rollback", help="Vuelve a publicar un snapshot")
+    p_roll.add_argument("snapshot", help="Identificador (o prefijo único)")
+    p_roll.add_argument("--verificar", action="store_true", help="Comprobar SHA-256")
+    p_purg = sub.add_parser("purgar", help="Borra snapshots antiguos y objetos sin uso")
+    p_purg.add_argument(
+        "--conservar", type=int, default=None, help="Snapshots a mantener"
+    )
+    for p in (p_mig, p_conv, p_comp, p_list, p_man, p_snap, p_snaps, p_roll, p_purg):
+        p.add_argument("--directorio", type=Path, default=CACHE_DIR)
+    for p in (p_mig, p_conv):
+        p.add_argument("--formato", choices=["parquet", "arrow"], default=None)
+    args = parser.parse_args(argv)
+
+    almacen = AlmacenTablas(args.directorio, formato=getattr(args, "formato", None))
+    if args.comando == "list":
+        for nombre in almacen.nombres():
+            print(f"{nombre:40s} {formato_de(almacen.ruta(nombre))}")
+        return 0
+
+    if args.comando == "snapshot":
+        print(f"[OK] Snapshot {almacen.crear_snapshot(args.etiqueta)}")
+        return 0
+
+    if args.comando == "snapshots":
+        for s in almacen.snapshots():
+            print(
+                f"{s['id']:48s} {len(s['tablas']):>3} tablas {s['bytes'] / 1e6:9.2f} MB"
+            )
+        return 0
+
+    if args.comando == "rollback":
+        try:
+            previo = almacen.rollback(args.snapshot, verificar=args.verificar)
+        except (KeyError, ValueError) as e:
+            print(f"[ERR] {e}")
+            return 1
+        print(f"[OK] Publicado {args.snapshot} (estado anterior: {previo})")
+        return 0
+
+    if args.comando == "purgar":
+        borrados, liberados = almacen.purgar(args.conservar)
+        print(f"[OK] {borrados} objetos borrados, {liberados / 1e6:.2f} MB liberados")
+        return 0
+
+    if args.comando == "manifiesto":
+        for nombre, m in almacen.reconstruir_manifiesto().items():
+            anios = (
+                f"{m['anio_min']}-{m['anio_max']}" if m["anio_min"] is not None else "-"
+            )
+            print(
+                f"{nombre:34s} {m['formato']:8s} {m['filas']:>9,} filas "
+                f"{len(m['columnas']):>3} cols {anios:>9s} {m['etapa'] or '-':10s} "
+                f"{m['sha256'][:12]}"
+            )
+        return 0
+
+    if args.comando in ("convertir", "compactar"):
+        nombres = (
+            [n for valor in args.only for n in valor.split(",") if n]
+            if args.only
+            else None
+        )
+        if args.comando == "compactar":
+            return _imprimir_memoria(almacen.compactar_tablas(nombres))
+        return _imprimir_resultado(almacen.convertir(nombres), almacen.formato)
+
+    resultado = almacen.migrar_pickles(conservar=args.conservar)
+    if not resultado:
+        print(f"[INFO] Sin pickles que migrar en {args.directorio}")
+    return _imprimir_resultado(resultado, almacen.formato)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,8 +2,12 @@ from pathlib import Path
 
 # Repository root (assumes this module is under repo/src)
 BASE_DIR = Path(__file__).resolve().parent.parent
+# Analysis outputs of the notebooks (see src/salidas.py)
+OUTPUTS_DIR = BASE_DIR / "outputs"
 # Common cache dir used by notebooks and scripts
-CACHE_DIR = BASE_DIR / "outputs" / "pickle_cache"
+CACHE_DIR = OUTPUTS_DIR / "pickle_cache"
+# Raw HTTP payloads from INE / Eurostat (see src/etl/cache_http.py)
+RAW_CACHE_DIR = BASE_DIR / "outputs" / "raw_cache"
 
 
 def ensure_dir(path: Path):
@@ -0,0 +1,314 @@
+"""
+Tablas derivadas materializadas
+===============================
+
+Series que varios notebooks recalculaban a partir de las mismas tablas del
+almacén (pivot de renta por decil, serie anual de AROPE, renta real por
+decil) se registran aquí con sus tablas de entrada. `materializar(nombre)` las
+guarda en el almacén junto a una clave:
+
+    sha256(nombre, versión, {entrada: sha256 de la entrada en el manifiesto})
+
+Mientras las entradas no cambien, la tabla se lee tal cual (comprobar la
+clave solo consulta el manifiesto); en cuanto una entrada se reescribe con
+otro contenido, la clave deja de coincidir y se recalcula. Una entrada puede
+ser a su vez una derivada: se materializa antes.
+
+    python -m src.derivadas                 # materializa las desactualizadas
+    python -m src.derivadas --estado        # vigente / desactualizada / ausente...
+    python -m src.derivadas --only df_arope_anual --forzar
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from src.almacen import AlmacenTablas
+from src.config import CACHE_DIR
+from src.notebook_fixtures import (
+    derive_arope_anual,
+    derive_pivot_deciles,
+    normalize_columns,
+    normalize_loaded_table,
+)
+from src.tipos import ampliar
+
+ETAPA = "derivada"
+SIN_ENTRADAS = "sin entradas"
+ANIO_BASE_DEFLACTOR = 2008
+
+
+class Derivada:
+    """Tabla calculada a partir de otras tablas del almacén."""
+
+    def __init__(
+        self,
+        nombre: str,
+        entradas: Sequence[str],
+        funcion: Callable[[Dict[str, pd.DataFrame]], Optional[pd.DataFrame]],
+        version: str = "1",
+        descripcion: str = "",
+    ):
+        """
+        Args:
+            nombre: Clave de la tabla derivada en el almacén
+            entradas: Claves de las tablas (o derivadas) de las que depende
+            funcion: {entrada: DataFrame} -> DataFrame (None si no es derivable)
+            version: Cambiarla al modificar `funcion` invalida lo materializado
+        """
+        self.nombre = nombre
+        self.entradas = list(entradas)
+        self.funcion = funcion
+        self.version = version
+        self.descripcion = descripcion
+
+
+REGISTRO: Dict[str, Derivada] = {}
+
+
+def registrar(derivada: Derivada) -> Derivada:
+    REGISTRO[derivada.nombre] = derivada
+    return derivada
+
+
+# =============================================================================
+# CLAVES Y MATERIALIZACIÓN
+# =============================================================================
+
+
+def _clave(
+    derivada: Derivada, almacen: AlmacenTablas, materializar_entradas: bool
+) -> Tuple[Optional[str], Dict[str, str]]:
+    """(clave, {entrada: sha256}); clave None si una entrada derivada no está al día."""
+    hashes = {}
+    for entrada in derivada.entradas:
+        if entrada in REGISTRO:
+            if materializar_entradas:
+                materializar(entrada, almacen)
+            elif estado(entrada, almacen) != "vigente":
+                return None, hashes
+        hashes[entrada] = almacen.metadatos(entrada)["sha256"]
+    contenido = json.dumps(
+        {"nombre": derivada.nombre, "version": derivada.version, "entradas": hashes},
+        sort_keys=True,
+    )
+    return hashlib.sha256(contenido.encode("utf-8")).hexdigest(), hashes
+
+
+def _clave_guardada(nombre: str, almacen: AlmacenTablas) -> Optional[str]:
+    if not almacen.existe(nombre):
+        return None
+    return almacen.metadatos(nombre).get("derivada", {}).get("clave")
+
+
+def _entradas_disponibles(derivada: Derivada, almacen: AlmacenTablas) -> bool:
+    return all(
+        (
+            _entradas_disponibles(REGISTRO[e], almacen)
+            if e in REGISTRO
+            else almacen.existe(e)
+        )
+        for e in derivada.entradas
+    )
+
+
+def estado(nombre: str, almacen: Optional[AlmacenTablas] = None) -> str:
+    """
+    'vigente', 'desactualizada', 'ausente' o 'sin entradas' (falta alguna
+    tabla de entrada). Solo consulta el manifiesto.
+    """
+    almacen = almacen or AlmacenTablas()
+    if not _entradas_disponibles(REGISTRO[nombre], almacen):
+        return SIN_ENTRADAS
+    guardada = _clave_guardada(nombre, almacen)
+    if guardada is None:
+        return "ausente"
+    clave, _ = _clave(REGISTRO[nombre], almacen, materializar_entradas=False)
+    return "vigente" if clave == guardada else "desactualizada"
+
+
+def materializar(
+    nombre: str, almacen: Optional[AlmacenTablas] = None, forzar: bool = False
+) -> pd.DataFrame:
+    """
+    Devuelve la tabla derivada, recalculándola solo si falta o si alguna de
+    sus entradas ha cambiado desde que se guardó.
+
+    Raises:
+        KeyError: Si `nombre` no es una derivada registrada
+        FileNotFoundError: Si falta una tabla de entrada
+        ValueError: Si las entradas no permiten derivar la tabla
+    """
+    almacen = almacen or AlmacenTablas()
+    derivada = REGISTRO[nombre]
+    clave, hashes = _clave(derivada, almacen, materializar_entradas=True)
+    if not forzar and _clave_guardada(nombre, almacen) == clave:
+        return almacen.leer(nombre)
+
+    df = derivada.funcion({e: almacen.leer(e) for e in derivada.entradas})
+    if df is None:
+        raise ValueError(f"{nombre}: no derivable de {derivada.entradas}")
+    almacen.guardar(
+        df,
+        nombre,
+        etapa=ETAPA,
+        extra={
+            "derivada": {
+                "clave": clave,
+                "version": derivada.version,
+                "entradas": hashes,
+            }
+        },
+    )
+    return df
+
+
+def materializar_todas(
+    nombres: Optional[Sequence[str]] = None,
+    almacen: Optional[AlmacenTablas] = None,
+    forzar: bool = False,
+) -> Dict[str, str]:
+    """
+    Returns:
+        {nombre: 'vigente' | 'sin entradas' | 'recalculada (x.xxs)' | 'error: ...'}
+    """
+    almacen = almacen or AlmacenTablas()
+    resultado = {}
+    for nombre in nombres if nombres is not None else list(REGISTRO):
+        try:
+            actual = estado(nombre, almacen)
+            if actual == SIN_ENTRADAS or (not forzar and actual == "vigente"):
+                resultado[nombre] = actual
+                continue
+            inicio = time.perf_counter()
+            materializar(nombre, almacen, forzar=forzar)
+            resultado[nombre] = f"recalculada ({time.perf_counter() - inicio:.2f}s)"
+        except Exception as e:
+            resultado[nombre] = f"error: {type(e).__name__}: {e}"
+    return resultado
+
+
+# =============================================================================
+# DERIVADAS REGISTRADAS
+# =============================================================================
+
+
+def deflactor_ipc(
+    df_ipc: pd.DataFrame, anio_base: int = ANIO_BASE_DEFLACTOR
+) -> Dict[int, float]:
+    """
+    Deflactor acumulado {año: índice} con `anio_base` = 1.0, encadenando la
+    `Inflacion_Anual_%` de cada año posterior (el cálculo del notebook 02).
+
+    Raises:
+        ValueError: Si el IPC no incluye el año base
+    """
+    ipc = ampliar(normalize_columns(df_ipc))
+    inflacion = (
+        ipc.dropna(subset=["Anio"])
+        .groupby("Anio")["Inflacion_Anual_%"]
+        .first()
+        .sort_index()
+    )
+    inflacion = inflacion[inflacion.index >= anio_base]
+    if anio_base not in inflacion.index:
+        raise ValueError(f"El IPC no incluye el año base {anio_base}")
+    deflactor = {anio_base: 1.0}
+    anterior = anio_base
+    for anio, valor in inflacion.iloc[1:].items():
+        deflactor[int(anio)] = deflactor[anterior] * (1 + valor / 100)
+        anterior = int(anio)
+    return deflactor
+
+
+def renta_real_deciles(
+    df_renta: pd.DataFrame, df_ipc: pd.DataFrame
+) -> Optional[pd.DataFrame]:
+    """Renta media real (€ de 2008) por año x decil (D1..D10, Total)."""
+    renta = ampliar(normalize_columns(df_renta)).copy(deep=False)
+    if not {"Anio", "Decil", "Media"} <= set(renta.columns):
+        return None
+    deflactor = deflactor_ipc(df_ipc)
+    renta["Renta_Real_€2008"] = renta["Media"] / renta["Anio"].map(deflactor)
+    return renta.pivot_table(
+        index="Anio", columns="Decil", values="Renta_Real_€2008", observed=True
+    )
+
+
+registrar(
+    Derivada(
+        "df_pivot_deciles",
+        ["df_renta_decil"],
+        lambda t: derive_pivot_deciles(
+            normalize_loaded_table(t["df_renta_decil"], "df_renta", "df_renta_decil")
+        ),
+        descripcion="Renta media nominal por año x decil (D1..D10)",
+    )
+)
+registrar(
+    Derivada(
+        "df_arope_anual",
+        ["df_arope_edad_sexo"],
+        lambda t: derive_arope_anual(
+            normalize_loaded_table(
+                t["df_arope_edad_sexo"], "df_arope_edad", "df_arope_edad_sexo"
+            )
+        ),
+        descripcion="Tasa AROPE nacional (Sexo y Edad Total) por año",
+    )
+)
+registrar(
+    Derivada(
+        "df_renta_real_deciles",
+        ["df_renta_decil", "df_ipc_anual"],
+        lambda t: renta_real_deciles(t["df_renta_decil"], t["df_ipc_anual"]),
+        descripcion="Renta media real (€ de 2008) por año x decil",
+    )
+)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.derivadas", description="Tablas derivadas materializadas"
+    )
+    parser.add_argument("--directorio", type=Path, default=CACHE_DIR)
+    parser.add_argument(
+        "--only", action="append", help="Derivada(s), repetible o separadas por comas"
+    )
+    parser.add_argument("--forzar", action="store_true", help="Recalcular siempre")
+    parser.add_argument(
+        "--estado", action="store_true", help="Solo mostrar si están al día"
+    )
+    args = parser.parse_args(argv)
+
+    almacen = AlmacenTablas(args.directorio)
+    nombres = (
+        [n for valor in args.only for n in valor.split(",") if n]
+        if args.only
+        else list(REGISTRO)
+    )
+    if args.estado:
+        for nombre in nombres:
+            print(f"  {nombre:28s} {estado(nombre, almacen)}")
+        return 0
+
+    errores = 0
+    for nombre, resultado in materializar_todas(nombres, almacen, args.forzar).items():
+        if resultado.startswith("error"):
+            errores += 1
+            print(f"  [ERR] {nombre}: {resultado}")
+        elif resultado == SIN_ENTRADAS:
+            print(f"  [WARN] {nombre}: {resultado}")
+        else:
+            print(f"  [OK] {nombre}: {resultado}")
+    return 1 if errores else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
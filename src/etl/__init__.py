@@ -0,0 +1 @@
+# Paquete de extracción (INE / Eurostat) importable desde notebooks y scripts.
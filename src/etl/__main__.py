@@ -0,0 +1,81 @@
+"""
+CLI del ETL sobre el registro de fuentes
+========================================
+
+    python -m src.etl list [--only TABLA] [--origen INE]
+    python -m src.etl extract [--only INE_Gini_S80S20_CCAA] [--origen EUROSTAT] [--jobs 8]
+
+`--only` acepta tablas SQL o claves de caché, repetido o separado por comas.
+Variables de entorno de la caché HTTP: ver `src/etl/cache_http.py`.
+"""
+
+import argparse
+import sys
+
+from src.etl.cache_http import CacheHTTP
+from src.etl.registro import extraer_fuentes, seleccionar
+
+
+def _nombres(valores):
+    if not valores:
+        return None
+    return [n.strip() for v in valores for n in v.split(",") if n.strip()]
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.etl", description=__doc__.split("\n")[1]
+    )
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p_list = sub.add_parser("list", help="Muestra las fuentes registradas")
+    p_list.add_argument("--only", action="append", metavar="TABLA")
+    p_list.add_argument("--origen", choices=["INE", "EUROSTAT"])
+
+    p_ext = sub.add_parser(
+        "extract", help="Descarga y guarda las fuentes seleccionadas"
+    )
+    p_ext.add_argument(
+        "--only", action="append", metavar="TABLA", help="Tabla SQL o clave de caché"
+    )
+    p_ext.add_argument("--origen", choices=["INE", "EUROSTAT"])
+    p_ext.add_argument("--jobs", type=int, default=8, help="Descargas simultáneas (8)")
+    p_ext.add_argument(
+        "--offline", action="store_true", help="Solo desde la caché HTTP"
+    )
+    p_ext.add_argument(
+        "--no-guardar", action="store_true", help="No escribir las tablas en el almacén"
+    )
+    return parser
+
+
+def main(argv=None) -> int:
+    args = _parser().parse_args(argv)
+    try:
+        fuentes = seleccionar(_nombres(args.only), args.origen)
+    except ValueError as e:
+        print(f"[ERR] {e}")
+        return 2
+
+    if args.comando == "list":
+        for f in fuentes:
+            print(f"{f.tabla_sql:45s} {f.origen:9s} {f.codigo:30s} {f.clave_cache}")
+        return 0
+
+    cache = CacheHTTP.desde_entorno()
+    if args.offline:
+        if cache is None:
+            print("[ERR] --offline requiere la caché HTTP (ETL_SIN_CACHE está activo)")
+            return 2
+        cache.offline = True
+    dataframes = extraer_fuentes(
+        fuentes, jobs=args.jobs, guardar=not args.no_guardar, cache=cache
+    )
+    vacias = [t for t, df in dataframes.items() if df.empty]
+    if vacias:
+        print(f"[WARN] Fuentes sin datos: {vacias}")
+    return 1 if vacias else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,209 @@
+"""
+Caché en disco de respuestas HTTP brutas (INE / Eurostat)
+=========================================================
+
+Cada respuesta se guarda comprimida (gzip) y direccionada por contenido en
+`objetos/<sha256>.gz`; un índice por petición (URL + parámetros de query)
+apunta al objeto vigente junto con sus validadores HTTP.
+
+Revalidación:
+- Si el servidor envió ETag / Last-Modified, cada uso hace un GET condicional
+  (If-None-Match / If-Modified-Since) y un 304 reutiliza la copia local.
+- Si no hay validadores, la copia se sirve sin red mientras no supere el TTL.
+- En modo offline nunca se toca la red: se reproducen las copias guardadas.
+
+Variables de entorno (`CacheHTTP.desde_entorno`):
+    ETL_OFFLINE=1            reproducir solo desde caché
+    ETL_CACHE_TTL_HORAS=24   TTL para respuestas sin validadores
+    ETL_SIN_CACHE=1          desactivar la caché
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import IO, Any, Dict, Optional
+
+from src.config import RAW_CACHE_DIR
+
+DEFAULT_TTL_HORAS = 24.0
+
+
+def _escribir_atomico(ruta: Path, datos: bytes):
+    """Escribe en un temporal del mismo directorio y lo renombra (seguro entre hilos)."""
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=ruta.parent, prefix=f".{ruta.name}.")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(datos)
+        os.replace(tmp, ruta)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+class CacheHTTP:
+    """Caché de payloads brutos con revalidación condicional y modo offline."""
+
+    def __init__(
+        self,
+        directorio: Path = RAW_CACHE_DIR,
+        ttl_horas: float = DEFAULT_TTL_HORAS,
+        offline: bool = False,
+    ):
+        self.directorio = Path(directorio)
+        self.ttl = ttl_horas * 3600
+        self.offline = offline
+
+    @classmethod
+    def desde_entorno(cls, directorio: Optional[Path] = None) -> Optional["CacheHTTP"]:
+        """Crea la caché según ETL_OFFLINE / ETL_CACHE_TTL_HORAS / ETL_SIN_CACHE."""
+
+        def _activa(nombre):
+            return os.environ.get(nombre, "").lower() in ("1", "true", "yes")
+
+        if _activa("ETL_SIN_CACHE"):
+            return None
+        return cls(
+            directorio=directorio or RAW_CACHE_DIR,
+            ttl_horas=float(os.environ.get("ETL_CACHE_TTL_HORAS", DEFAULT_TTL_HORAS)),
+            offline=_activa("ETL_OFFLINE"),
+        )
+
+    # ------------------------------------------------------------------ claves
+    @staticmethod
+    def clave(url: str, params: Optional[Dict[str, Any]] = None) -> str:
+        """Hash estable de URL + parámetros (ordenados)."""
+        canonica = json.dumps(
+            [url, sorted((str(k), str(v)) for k, v in (params or {}).items())]
+        )
+        return hashlib.sha256(canonica.encode("utf-8")).hexdigest()
+
+    def _ruta_indice(self, clave: str) -> Path:
+        return self.directorio / "indice" / f"{clave}.json"
+
+    def _ruta_objeto(self, digest: str) -> Path:
+        return self.directorio / "objetos" / digest[:2] / f"{digest}.gz"
+
+    # ------------------------------------------------------------- operaciones
+    def buscar(
+        self, url: str, params: Optional[Dict[str, Any]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Entrada del índice para la petición, o None si no hay copia utilizable."""
+        ruta = self._ruta_indice(self.clave(url, params))
+        try:
+            entrada = json.loads(ruta.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if not self._ruta_objeto(entrada["objeto"]).exists():
+            return None
+        return entrada
+
+    def leer(self, entrada: Dict[str, Any]) -> bytes:
+        """Contenido descomprimido del objeto al que apunta la entrada."""
+        with gzip.open(self._ruta_objeto(entrada["objeto"]), "rb") as f:
+            return f.read()
+
+    def abrir(self, entrada: Dict[str, Any]) -> IO[bytes]:
+        """Flujo de lectura (descomprimido al vuelo) del objeto de la entrada."""
+        return gzip.open(self._ruta_objeto(entrada["objeto"]), "rb")
+
+    def vigente(self, entrada: Optional[Dict[str, Any]]) -> bool:
+        """True si se puede servir sin red (sin validadores y dentro del TTL)."""
+        if entrada is None or entrada.get("etag") or entrada.get("last_modified"):
+            return False
+        return time.time() - entrada.get("validado", 0) < self.ttl
+
+    @staticmethod
+    def cabeceras_condicionales(entrada: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        if entrada is None:
+            return {}
+        cabeceras = {}
+        if entrada.get("etag"):
+            cabeceras["If-None-Match"] = entrada["etag"]
+        if entrada.get("last_modified"):
+            cabeceras["If-Modified-Since"] = entrada["last_modified"]
+        return cabeceras
+
+    def guardar(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]],
+        contenido: bytes,
+        cabeceras: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, Any]:
+        """Guarda el payload (deduplicado por hash) y actualiza el índice."""
+        digest = hashlib.sha256(contenido).hexdigest()
+        ruta_objeto = self._ruta_objeto(digest)
+        if not ruta_objeto.exists():
+            _escribir_atomico(ruta_objeto, gzip.compress(contenido, compresslevel=6))
+        return self._registrar(url, params, digest, len(contenido), cabeceras)
+
+    def guardar_archivo(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]],
+        ruta: Path,
+        cabeceras: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, Any]:
+        """Como `guardar`, leyendo el payload de disco por bloques (sin cargarlo)."""
+        digest = hashlib.sha256()
+        with open(ruta, "rb") as f:
+            for bloque in iter(lambda: f.read(1 << 20), b""):
+                digest.update(bloque)
+        digest = digest.hexdigest()
+        ruta_objeto = self._ruta_objeto(digest)
+        if not ruta_objeto.exists():
+            ruta_objeto.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(
+                dir=ruta_objeto.parent, prefix=f".{ruta_objeto.name}."
+            )
+            try:
+                with open(ruta, "rb") as origen, os.fdopen(fd, "wb") as destino:
+                    with gzip.GzipFile(
+                        fileobj=destino, mode="wb", compresslevel=6
+                    ) as comprimido:
+                        shutil.copyfileobj(origen, comprimido, 1 << 20)
+                os.replace(tmp, ruta_objeto)
+            except BaseException:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+                raise
+        tamano = os.path.getsize(ruta)
+        return self._registrar(url, params, digest, tamano, cabeceras)
+
+    def _registrar(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]],
+        digest: str,
+        tamano: int,
+        cabeceras: Optional[Dict[str, str]],
+    ) -> Dict[str, Any]:
+        cabeceras = {k.lower(): v for k, v in (cabeceras or {}).items()}
+        entrada = {
+            "url": url,
+            "params": {str(k): str(v) for k, v in (params or {}).items()},
+            "objeto": digest,
+            "bytes": tamano,
+            "etag": cabeceras.get("etag"),
+            "last_modified": cabeceras.get("last-modified"),
+            "descargado": time.time(),
+            "validado": time.time(),
+        }
+        self._escribir_indice(entrada)
+        return entrada
+
+    def renovar(self, entrada: Dict[str, Any]):
+        """Marca la entrada como revalidada (respuesta 304)."""
+        entrada["validado"] = time.time()
+        self._escribir_indice(entrada)
+
+    def _escribir_indice(self, entrada: Dict[str, Any]):
+        ruta = self._ruta_indice(self.clave(entrada["url"], entrada["params"]))
+        _escribir_atomico(ruta, json.dumps(entrada, indent=2).encode("utf-8"))
@@ -0,0 +1,334 @@
+"""
+Descarga HTTP concurrente para las fuentes del ETL
+==================================================
+
+Una única sesión keep-alive compartida, un pool de hilos acotado y reintentos
+con backoff exponencial por petición. Cada descarga devuelve un
+`ResultadoDescarga` con latencia, bytes e intentos para poder informar por tabla.
+Con `cache=CacheHTTP(...)` las respuestas se revalidan contra la copia en disco
+(ver src/etl/cache_http.py). Con `en_disco=True` el cuerpo se vuelca a un
+temporal por bloques en vez de quedarse en memoria y se lee con
+`ResultadoDescarga.abrir()` (ver src/etl/streaming.py).
+"""
+
+import io
+import json
+import os
+import tempfile
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import IO, Any, Callable, Dict, Optional, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.etl.cache_http import CacheHTTP
+
+# Límites por defecto (conservadores para no saturar los servicios públicos)
+DEFAULT_MAX_WORKERS = 6
+DEFAULT_TIMEOUT = (10, 120)  # (conexión, lectura) en segundos
+DEFAULT_REINTENTOS = 3
+DEFAULT_BACKOFF = 1.0  # segundos; se duplica en cada reintento
+STATUS_REINTENTABLES = (429, 500, 502, 503, 504)
+TAM_BLOQUE_DESCARGA = 1 << 20  # bytes por bloque al volcar a disco
+
+Peticion = Union[str, Tuple[str, Optional[Dict[str, Any]]]]
+
+
+class ResultadoDescarga:
+    """Resultado de una descarga: contenido bruto más métricas de red."""
+
+    def __init__(self, clave: str, url: str, params: Optional[Dict[str, Any]] = None):
+        self.clave = clave
+        self.url = url
+        self.params = params or {}
+        self.status: Optional[int] = None
+        self.contenido = b""
+        self.latencia = 0.0
+        self.intentos = 0
+        self.error: Optional[str] = None
+        self.cabeceras: Dict[str, str] = {}
+        self.desde_cache = False
+        self.ruta: Optional[str] = None  # temporal con el cuerpo (en_disco=True)
+        self.tamano = 0
+        self._abrir: Optional[Callable[[], IO[bytes]]] = None
+        self._json: Any = None
+
+    @property
+    def bytes(self) -> int:
+        return self.tamano if self.en_disco else len(self.contenido)
+
+    @property
+    def en_disco(self) -> bool:
+        """True si el cuerpo no está en `contenido` sino en disco (o en caché)."""
+        return self._abrir is not None
+
+    def abrir(self) -> IO[bytes]:
+        """Flujo binario de lectura del cuerpo, esté en memoria o en disco."""
+        if self._abrir is not None:
+            return self._abrir()
+        return io.BytesIO(self.contenido)
+
+    def volcar_a_disco(self, ruta: str):
+        """Apunta el cuerpo a un temporal propio, que se borra con el resultado."""
+        self.ruta = ruta
+        self.tamano = os.path.getsize(ruta)
+        self._abrir = lambda: open(ruta, "rb")
+        weakref.finalize(self, _borrar, ruta)
+
+    @property
+    def status_code(self) -> Optional[int]:
+        """Alias de `status` (misma interfaz que `requests.Response`)."""
+        return self.status
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.status == 200
+
+    def json(self) -> Any:
+        """Decodifica el contenido como JSON (equivale a `response.json()`), una sola vez."""
+        if self._json is None:
+            if self.en_disco:
+                with self.abrir() as f:
+                    self._json = json.load(f)
+            else:
+                self._json = json.loads(self.contenido)
+        return self._json
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "clave": self.clave,
+            "url": self.url,
+            "status": self.status,
+            "latencia_s": round(self.latencia, 3),
+            "bytes": self.bytes,
+            "intentos": self.intentos,
+            "desde_cache": self.desde_cache,
+            "error": self.error,
+        }
+
+
+def crear_sesion(pool_size: int = DEFAULT_MAX_WORKERS) -> requests.Session:
+    """Crea una sesión con pool keep-alive dimensionado para `pool_size` hilos."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"Accept": "application/json"})
+    return session
+
+
+def descargar(
+    session: requests.Session,
+    clave: str,
+    url: str,
+    params: Optional[Dict[str, Any]] = None,
+    timeout=DEFAULT_TIMEOUT,
+    reintentos: int = DEFAULT_REINTENTOS,
+    backoff: float = DEFAULT_BACKOFF,
+    cache: Optional[CacheHTTP] = None,
+    en_disco: bool = False,
+) -> ResultadoDescarga:
+    """
+    Descarga una URL con reintentos y backoff exponencial.
+
+    Reintenta ante errores de conexión, timeouts y los códigos de
+    `STATUS_REINTENTABLES`. No lanza excepciones: el fallo queda en `error`.
+    Con caché: sirve la copia local si sigue vigente (o en modo offline), hace
+    GET condicional si hay validadores y recurre a la copia si la red falla.
+
+    Args:
+        session: Sesión HTTP compartida
+        clave: Identificador de la tabla (para informes)
+        url: URL a descargar
+        params: Parámetros de query opcionales
+        timeout: Timeout de requests (float o tupla conexión/lectura)
+        reintentos: Número máximo de reintentos tras el primer intento
+        backoff: Espera base en segundos (se duplica en cada reintento)
+        cache: Caché de respuestas en disco (opcional)
+        en_disco: Volcar el cuerpo a un temporal (leer con `abrir()`) en vez de
+            guardarlo en `contenido`
+
+    Returns:
+        ResultadoDescarga con contenido, status, latencia e intentos
+    """
+    resultado = ResultadoDescarga(clave, url, params)
+    inicio = time.perf_counter()
+
+    entrada = cache.buscar(url, params) if cache is not None else None
+    if cache is not None and (cache.offline or cache.vigente(entrada)):
+        return _desde_cache(resultado, cache, entrada, inicio, en_disco)
+    cabeceras = CacheHTTP.cabeceras_condicionales(entrada)
+    kwargs_get = {"stream": True} if en_disco else {}
+
+    for intento in range(reintentos + 1):
+        resultado.intentos = intento + 1
+        try:
+            response = session.get(
+                url, params=params, timeout=timeout, headers=cabeceras, **kwargs_get
+            )
+            resultado.status = response.status_code
+            if response.status_code == 304:
+                response.close()
+                if entrada is not None:
+                    cache.renovar(entrada)
+                    return _desde_cache(resultado, cache, entrada, inicio, en_disco)
+                # Solo se envían validadores con copia local: 304 sin ella es
+                # una respuesta inválida del servidor, no un reintento
+                resultado.error = "HTTP 304 sin copia en caché"
+                break
+            if response.status_code in STATUS_REINTENTABLES and intento < reintentos:
+                # Con stream=True la conexión no vuelve al pool hasta cerrarla
+                response.close()
+                time.sleep(backoff * (2**intento))
+                continue
+            if en_disco and response.status_code == 200:
+                _volcar_respuesta(response, resultado)
+            else:
+                resultado.contenido = response.content
+            resultado.cabeceras = dict(getattr(response, "headers", None) or {})
+            resultado.error = (
+                None if response.status_code == 200 else f"HTTP {response.status_code}"
+            )
+            break
+        except (requests.ConnectionError, requests.Timeout) as e:
+            resultado.error = f"{type(e).__name__}: {e}"
+            if intento < reintentos:
+                time.sleep(backoff * (2**intento))
+                continue
+        except requests.RequestException as e:
+            resultado.error = f"{type(e).__name__}: {e}"
+            break
+
+    if cache is not None:
+        if resultado.ok and resultado.ruta:
+            cache.guardar_archivo(url, params, resultado.ruta, resultado.cabeceras)
+        elif resultado.ok:
+            cache.guardar(url, params, resultado.contenido, resultado.cabeceras)
+        elif entrada is not None:
+            print(f"[WARN] {clave}: {resultado.error}; usando copia en caché")
+            return _desde_cache(resultado, cache, entrada, inicio, en_disco)
+
+    resultado.latencia = time.perf_counter() - inicio
+    return resultado
+
+
+def _borrar(ruta: str):
+    try:
+        os.remove(ruta)
+    except OSError:
+        pass
+
+
+def _volcar_respuesta(response, resultado: ResultadoDescarga):
+    """Escribe el cuerpo de la respuesta en un temporal, por bloques."""
+    fd, ruta = tempfile.mkstemp(prefix=f"etl_{resultado.clave}_", suffix=".json")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            if hasattr(response, "iter_content"):
+                for bloque in response.iter_content(TAM_BLOQUE_DESCARGA):
+                    f.write(bloque)
+            else:
+                f.write(response.content)
+    except BaseException:
+        _borrar(ruta)
+        raise
+    resultado.volcar_a_disco(ruta)
+
+
+def _desde_cache(
+    resultado: ResultadoDescarga,
+    cache: CacheHTTP,
+    entrada: Optional[Dict[str, Any]],
+    inicio: float,
+    en_disco: bool = False,
+) -> ResultadoDescarga:
+    """Rellena el resultado con la copia local (o con error si no existe)."""
+    if entrada is None:
+        resultado.status = None
+        resultado.error = "sin copia en caché (modo offline)"
+    else:
+        if en_disco:
+            # Se lee del objeto comprimido de la caché, sin copiarlo a memoria
+            resultado._abrir = lambda: cache.abrir(entrada)
+            resultado.tamano = entrada.get("bytes", 0)
+        else:
+            resultado.contenido = cache.leer(entrada)
+        resultado.status = 200
+        resultado.error = None
+        resultado.desde_cache = True
+    resultado.latencia = time.perf_counter() - inicio
+    return resultado
+
+
+def descargar_varias(
+    peticiones: Dict[str, Peticion],
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    session: Optional[requests.Session] = None,
+    timeout=DEFAULT_TIMEOUT,
+    reintentos: int = DEFAULT_REINTENTOS,
+    backoff: float = DEFAULT_BACKOFF,
+    cache: Optional[CacheHTTP] = None,
+    en_disco: bool = False,
+) -> Dict[str, ResultadoDescarga]:
+    """
+    Descarga varias URLs en paralelo con un máximo de `max_workers` a la vez.
+
+    Args:
+        peticiones: Diccionario {clave: url} o {clave: (url, params)}
+        max_workers: Límite de concurrencia
+        session: Sesión compartida (se crea una si no se indica)
+        cache: Caché de respuestas en disco (opcional)
+        en_disco: Volcar cada cuerpo a un temporal (ver `descargar`)
+
+    Returns:
+        Diccionario {clave: ResultadoDescarga} en el mismo orden que `peticiones`
+    """
+    propia = session is None
+    if propia:
+        session = crear_sesion(pool_size=max_workers)
+
+    def _tarea(item):
+        clave, peticion = item
+        url, params = (peticion, None) if isinstance(peticion, str) else peticion
+        return descargar(
+            session,
+            clave,
+            url,
+            params=params,
+            timeout=timeout,
+            reintentos=reintentos,
+            backoff=backoff,
+            cache=cache,
+            en_disco=en_disco,
+        )
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+            resultados = list(pool.map(_tarea, peticiones.items()))
+    finally:
+        if propia:
+            session.close()
+
+    return {r.clave: r for r in resultados}
+
+
+def imprimir_resumen_descargas(resultados: Dict[str, ResultadoDescarga]):
+    """Imprime latencia y tamaño por tabla, y el total descargado."""
+    total_bytes = 0
+    for r in resultados.values():
+        estado = "[OK]" if r.ok else "[ERR]"
+        detalle = " (caché)" if r.desde_cache else ""
+        detalle = detalle if r.ok else f" ({r.error})"
+        print(
+            f"  {estado} {r.clave}: {r.latencia:.2f}s, {r.bytes / 1024:.1f} KB, "
+            f"{r.intentos} intento(s){detalle}"
+        )
+        total_bytes += r.bytes
+    if resultados:
+        mas_lenta = max(r.latencia for r in resultados.values())
+        print(
+            f"[INFO] {len(resultados)} descargas, {total_bytes / 1024 / 1024:.2f} MB, "
+            f"tabla más lenta: {mas_lenta:.2f}s"
+        )
@@ -0,0 +1,755 @@
+"""
+Decodificación de respuestas SDMX-JSON de Eurostat
+==================================================
+
+`parsear_eurostat_sdmx` decodifica el formato JSON-stat de la API de
+diseminación de forma columnar: las claves y valores de `value` pasan a arrays
+NumPy, los índices planos se descomponen con `np.unravel_index` y los filtros
+(geo/unit/indic_il/age/sex) se aplican como máscaras booleanas antes de
+construir ninguna fila. Los códigos de dimensión salen como columnas categóricas.
+
+`extraer_dataset_eurostat` traslada esos mismos filtros al servidor: construye
+la clave SDMX (`A.PC.LI_R_MD60.T.TOTAL.`) y `sinceTimePeriod`/`untilTimePeriod`
+para que solo viaje el corte necesario, y vuelve al dataset completo si la
+consulta filtrada no devuelve datos (p.ej. un código inexistente). El orden de
+dimensiones de cada dataset se aprende de `id` en cualquier respuesta correcta
+y, con caché HTTP, se guarda junto a ella (`dimensiones_eurostat.json`) para
+que las descargas siguientes ya lleven clave.
+
+`parsear_eurostat_sdmx_flujo` hace lo mismo leyendo la respuesta como flujo
+(ver src/etl/streaming.py): `value` se decodifica y filtra por bloques, así que
+la memoria depende del resultado filtrado y no del tamaño del payload.
+
+`parsear_eurostat_sdmx_por_observacion` conserva la implementación original de
+`01b_extract_transform_EUROSTAT.ipynb` (bucle por observación) como referencia
+para tests de equivalencia y benchmarks.
+"""
+
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import requests
+
+from src.etl import streaming
+from src.etl.cache_http import CacheHTTP
+from src.etl.descarga import ResultadoDescarga, crear_sesion, descargar
+
+URL_EUROSTAT = "https://ec.europa.eu/eurostat/api/dissemination/sdmx/2.1/data"
+PARAMS_EUROSTAT = {"format": "JSON", "lang": "en", "detail": "full"}
+
+# Orden de dimensiones de la clave SDMX (sin `time`) por dataset.
+# Si un dataset no figura, solo se filtra por periodo en servidor. Cada
+# respuesta correcta actualiza el orden con su `id` (ver `_aprender_dimensiones`)
+# y, con caché HTTP, se persiste en ARCHIVO_DIMENSIONES.
+DIMENSIONES_DATASET: Dict[str, List[str]] = {
+    "ilc_li02": ["freq", "unit", "indic_il", "sex", "age", "geo"],
+    "ilc_di12b": ["freq", "indic_il", "geo"],
+    "ilc_di12c": ["freq", "indic_il", "geo"],
+}
+ARCHIVO_DIMENSIONES = "dimensiones_eurostat.json"
+_lock_dimensiones = threading.Lock()
+_dimensiones_cargadas: set = set()
+
+
+def arrays_valores(values) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Convierte `value` (dict {"indice": valor} o lista densa) en arrays NumPy.
+
+    Los valores nulos quedan como NaN.
+
+    Returns:
+        (claves int64, valores float64)
+    """
+    if isinstance(values, dict):
+        n = len(values)
+        claves = np.fromiter((int(k) for k in values.keys()), dtype=np.int64, count=n)
+        valores = np.fromiter(
+            (np.nan if v is None else v for v in values.values()),
+            dtype=np.float64,
+            count=n,
+        )
+        return claves, valores
+    valores = np.array(
+        [np.nan if v is None else v for v in values or []], dtype=np.float64
+    )
+    return np.arange(len(valores), dtype=np.int64), valores
+
+
+def _codigos_por_posicion(dimension: dict, n: int) -> np.ndarray:
+    """Array (posición -> código) de una dimensión; None en posiciones sin código."""
+    codigos = np.full(n, None, dtype=object)
+    for codigo, pos in dimension.get("category", {}).get("index", {}).items():
+        if 0 <= pos < n:
+            codigos[pos] = codigo
+    return codigos
+
+
+def decodificar_arrays(
+    claves: np.ndarray,
+    valores: np.ndarray,
+    dimensions: dict,
+    size: list,
+    value_name: str,
+    filtros: Optional[Dict[str, Optional[str]]] = None,
+) -> pd.DataFrame:
+    """
+    Decodifica arrays de claves planas y valores a un DataFrame filtrado.
+
+    Args:
+        claves: Índices planos (orden C sobre `size`)
+        valores: Valores observados (NaN = sin dato)
+        dimensions: Bloque `dimension` del JSON
+        size: Tamaño de cada dimensión, en el orden de `dimensions`
+        value_name: Nombre de la columna de valores
+        filtros: {dimensión: código} a conservar (None = sin filtro)
+
+    Returns:
+        DataFrame con value_name, geo_code, geo_name, Anio y, si existen, age/sex
+    """
+    filtros = filtros or {}
+    dim_keys = list(dimensions.keys())
+    size = [int(s) for s in size]
+    if len(size) != len(dim_keys):
+        raise ValueError(f"size {size} no coincide con dimensiones {dim_keys}")
+
+    codigos, validas = _posiciones_validas(dimensions, size, filtros)
+    mask, indices = _mascara_observaciones(claves, valores, size, validas)
+
+    sel = np.flatnonzero(mask)
+    columnas = {value_name: valores[sel]}
+    for d, key in enumerate(dim_keys):
+        pos = indices[d][sel]
+        if key == "geo":
+            columnas["geo_code"] = _categorica(codigos[key], pos)
+            columnas["geo_name"] = _categorica(
+                _etiquetas(dimensions[key], codigos[key]), pos
+            )
+        elif key == "time":
+            anios = np.array(
+                [-1 if c is None else int(c) for c in codigos[key]], dtype=np.int64
+            )
+            columnas["Anio"] = anios[pos]
+        elif key in ("age", "sex"):
+            columnas[key] = _categorica(codigos[key], pos)
+            columnas[f"{key}_label"] = _categorica(
+                _etiquetas(dimensions[key], codigos[key]), pos
+            )
+    return pd.DataFrame(columnas)
+
+
+def _posiciones_validas(
+    dimensions: dict, size: List[int], filtros: Dict[str, Optional[str]]
+) -> Tuple[Dict[str, np.ndarray], List[np.ndarray]]:
+    """
+    Códigos (posición -> código) y máscara de posiciones aceptadas por dimensión.
+
+    Las posiciones sin código se descartan, como en el bucle original; con
+    filtro solo queda la posición de ese código.
+    """
+    codigos, validas = {}, []
+    for d, key in enumerate(dimensions):
+        codigos[key] = _codigos_por_posicion(dimensions[key], size[d])
+        aceptadas = np.array([c is not None for c in codigos[key]], dtype=bool)
+        filtro = filtros.get(key)
+        if filtro:
+            aceptadas &= codigos[key] == filtro
+        validas.append(aceptadas)
+    return codigos, validas
+
+
+def _mascara_observaciones(
+    claves: np.ndarray,
+    valores: np.ndarray,
+    size: List[int],
+    validas: List[np.ndarray],
+) -> Tuple[np.ndarray, tuple]:
+    """Máscara de observaciones con valor y en posiciones aceptadas, e índices por dimensión."""
+    mask = ~np.isnan(valores)
+    mask &= (claves >= 0) & (claves < int(np.prod(size)))
+    indices = np.unravel_index(np.where(mask, claves, 0), size)
+    # Máscara por posición (tamaño de la dimensión), indexada por observación
+    for d, aceptadas in enumerate(validas):
+        mask &= aceptadas[indices[d]]
+    return mask, indices
+
+
+def _etiquetas(dimension: dict, codigos: np.ndarray) -> np.ndarray:
+    labels = dimension.get("category", {}).get("label", {})
+    return np.array([labels.get(c, c) for c in codigos], dtype=object)
+
+
+def _categorica(por_posicion: np.ndarray, pos: np.ndarray) -> pd.Categorical:
+    """Categórico a partir de posiciones, sin materializar strings por fila."""
+    categorias, codigos = np.unique(
+        np.array(["" if c is None else c for c in por_posicion], dtype=object),
+        return_inverse=True,
+    )
+    return pd.Categorical.from_codes(
+        codigos.astype(np.int32)[pos], categories=pd.Index(categorias, dtype=object)
+    ).remove_unused_categories()
+
+
+def parsear_eurostat_sdmx(
+    data_json,
+    value_name,
+    filter_geo="ES",
+    filter_unit=None,
+    filter_indic=None,
+    filter_age="TOTAL",
+    filter_sex="T",
+):
+    """
+    Parsea la respuesta SDMX-JSON de Eurostat a un DataFrame (versión columnar).
+
+    Misma interfaz y columnas que la función original de 01b. Solo extrae
+    age/sex cuando la dimensión existe en la respuesta (ilc_di12b/c no la tienen).
+
+    Parámetros:
+    - filter_geo: código de geografía (ej: 'ES', 'EU27_2020', None para todos)
+    - filter_unit: unidad (ej: 'PC' para porcentaje, None para ignorar)
+    - filter_indic: indicador específico (ej: 'LI_R_MD60', None para ignorar)
+    - filter_age: rango de edad (default 'TOTAL', None para ignorar)
+    - filter_sex: sexo (default 'T' para Total, None para ignorar)
+    """
+    try:
+        claves, valores = arrays_valores(data_json.get("value", {}))
+        return decodificar_arrays(
+            claves,
+            valores,
+            data_json.get("dimension", {}),
+            data_json.get("size", []),
+            value_name,
+            filtros=filtros_sdmx(
+                filter_geo, filter_unit, filter_indic, filter_age, filter_sex
+            ),
+        )
+    except Exception as e:
+        print(f"Error parseando SDMX: {e}")
+        return pd.DataFrame()
+
+
+def parsear_eurostat_sdmx_flujo(
+    fuente: streaming.Fuente,
+    value_name,
+    filter_geo="ES",
+    filter_unit=None,
+    filter_indic=None,
+    filter_age="TOTAL",
+    filter_sex="T",
+    tam_bloque: int = streaming.TAM_BLOQUE_VALORES,
+):
+    """
+    Versión de `parsear_eurostat_sdmx` que lee el SDMX-JSON como flujo.
+
+    Primero se leen `id`/`size`/`dimension`; después `value` llega en bloques de
+    `tam_bloque` observaciones y de cada bloque solo se conservan las que pasan
+    los filtros. Mismo resultado que `parsear_eurostat_sdmx(json.load(...))`.
+
+    Args:
+        fuente: Ruta, bytes o fichero binario con la respuesta
+        tam_bloque: Observaciones decodificadas a la vez
+    """
+    filtros = filtros_sdmx(
+        filter_geo, filter_unit, filter_indic, filter_age, filter_sex
+    )
+    try:
+        with streaming.abrir_fuente(fuente) as f:
+            _, size, dimensions = streaming.metadatos_sdmx(f)
+            size = [int(s) for s in size]
+            if len(size) != len(dimensions):
+                raise ValueError(
+                    f"size {size} no coincide con dimensiones {list(dimensions)}"
+                )
+            _, validas = _posiciones_validas(dimensions, size, filtros)
+            bloques_claves, bloques_valores = [], []
+            for claves, valores in streaming.bloques_valores_sdmx(f, tam_bloque):
+                mask, _ = _mascara_observaciones(claves, valores, size, validas)
+                bloques_claves.append(claves[mask])
+                bloques_valores.append(valores[mask])
+        return decodificar_arrays(
+            np.concatenate(bloques_claves or [np.empty(0, dtype=np.int64)]),
+            np.concatenate(bloques_valores or [np.empty(0, dtype=np.float64)]),
+            dimensions,
+            size,
+            value_name,
+            filtros=filtros,
+        )
+    except Exception as e:
+        print(f"Error parseando SDMX: {e}")
+        return pd.DataFrame()
+
+
+def filtros_sdmx(
+    filter_geo="ES",
+    filter_unit=None,
+    filter_indic=None,
+    filter_age="TOTAL",
+    filter_sex="T",
+) -> Dict[str, Optional[str]]:
+    """Traduce los argumentos de `parsear_eurostat_sdmx` a {dimensión: código}."""
+    return {
+        "geo": filter_geo,
+        "unit": filter_unit,
+        "indic_il": filter_indic,
+        "age": filter_age,
+        "sex": filter_sex,
+    }
+
+
+def construir_clave_sdmx(
+    dimensiones: List[str], filtros: Dict[str, Optional[str]]
+) -> Optional[str]:
+    """
+    Construye la clave SDMX 2.1 (`A.PC..T.TOTAL.`) para el orden de dimensiones dado.
+
+    Las dimensiones sin filtro quedan vacías (comodín). Devuelve None si no hay
+    ningún filtro aplicable, para pedir el dataset sin clave.
+    """
+    partes = [filtros.get(d) or "" for d in dimensiones]
+    return ".".join(partes) if any(partes) else None
+
+
+def consulta_eurostat(
+    codigo: str,
+    filtros: Optional[Dict[str, Optional[str]]] = None,
+    desde: Optional[int] = None,
+    hasta: Optional[int] = None,
+) -> Tuple[str, Dict[str, str]]:
+    """
+    URL y parámetros de la consulta filtrada en servidor.
+
+    Args:
+        codigo: Código del dataset (ej: 'ilc_li02')
+        filtros: {dimensión: código}, como devuelve `filtros_sdmx`
+        desde: Primer año (sinceTimePeriod)
+        hasta: Último año (untilTimePeriod)
+
+    Returns:
+        (url, params)
+    """
+    url = f"{URL_EUROSTAT}/{codigo}"
+    dimensiones = DIMENSIONES_DATASET.get(codigo)
+    if dimensiones and filtros:
+        clave = construir_clave_sdmx(dimensiones, filtros)
+        if clave:
+            url = f"{url}/{clave}"
+    params = dict(PARAMS_EUROSTAT)
+    if desde is not None:
+        params["sinceTimePeriod"] = str(desde)
+    if hasta is not None:
+        params["untilTimePeriod"] = str(hasta)
+    return url, params
+
+
+def _leer_en_flujo(resultado: ResultadoDescarga) -> bool:
+    return resultado.en_disco and streaming.disponible()
+
+
+def _tiene_valores(resultado: ResultadoDescarga) -> bool:
+    if not resultado.ok:
+        return False
+    try:
+        if _leer_en_flujo(resultado):
+            with resultado.abrir() as f:
+                return next(streaming.bloques_valores_sdmx(f, 1), None) is not None
+        return bool(resultado.json().get("value"))
+    except ValueError:
+        return False
+
+
+def descargar_eurostat(
+    codigo: str,
+    filtros: Optional[Dict[str, Optional[str]]] = None,
+    desde: Optional[int] = None,
+    hasta: Optional[int] = None,
+    session: Optional[requests.Session] = None,
+    **kwargs_descarga,
+) -> Tuple[ResultadoDescarga, bool]:
+    """
+    Descarga el corte filtrado en servidor, con vuelta al dataset completo.
+
+    Si la consulta filtrada falla o llega sin observaciones (código de filtro
+    inexistente, orden de dimensiones desactualizado...), se descarga el
+    dataset completo y el filtrado queda en manos de `parsear_eurostat_sdmx`.
+
+    Returns:
+        (ResultadoDescarga, filtrado_en_servidor)
+    """
+    cache = kwargs_descarga.get("cache")
+    cargar_dimensiones(cache)
+    propia = session is None
+    if propia:
+        session = crear_sesion(pool_size=1)
+    try:
+        url, params = consulta_eurostat(codigo, filtros, desde, hasta)
+        resultado = descargar(session, codigo, url, params=params, **kwargs_descarga)
+        if _tiene_valores(resultado):
+            _aprender_dimensiones(codigo, resultado, cache)
+            return resultado, True
+
+        motivo = resultado.error or "sin observaciones"
+        print(
+            f"[WARN] {codigo}: consulta filtrada sin datos ({motivo}); "
+            "descargando dataset completo"
+        )
+        url_completa = f"{URL_EUROSTAT}/{codigo}"
+        resultado = descargar(
+            session,
+            codigo,
+            url_completa,
+            params=dict(PARAMS_EUROSTAT),
+            **kwargs_descarga,
+        )
+        if resultado.ok:
+            _aprender_dimensiones(codigo, resultado, cache)
+        return resultado, False
+    finally:
+        if propia:
+            session.close()
+
+
+def _ruta_dimensiones(cache: CacheHTTP):
+    return cache.directorio / ARCHIVO_DIMENSIONES
+
+
+def cargar_dimensiones(cache: Optional[CacheHTTP]):
+    """Incorpora a DIMENSIONES_DATASET los órdenes guardados junto a la caché HTTP."""
+    if cache is None:
+        return
+    ruta = _ruta_dimensiones(cache)
+    with _lock_dimensiones:
+        if ruta in _dimensiones_cargadas:
+            return
+        _dimensiones_cargadas.add(ruta)
+        try:
+            guardadas = json.loads(ruta.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        DIMENSIONES_DATASET.update(guardadas)
+
+
+def _aprender_dimensiones(
+    codigo: str, resultado: ResultadoDescarga, cache: Optional[CacheHTTP] = None
+):
+    """Actualiza DIMENSIONES_DATASET con el orden real (`id`) de la respuesta."""
+    try:
+        if _leer_en_flujo(resultado):
+            with resultado.abrir() as f:
+                ids = streaming.metadatos_sdmx(f)[0]
+        else:
+            ids = resultado.json().get("id", [])
+    except ValueError:
+        return
+    ids = [d for d in ids if d != "time"]
+    with _lock_dimensiones:
+        if not ids or DIMENSIONES_DATASET.get(codigo) == ids:
+            return
+        print(f"[INFO] {codigo}: orden de dimensiones SDMX {ids}")
+        DIMENSIONES_DATASET[codigo] = ids
+        if cache is None:
+            return
+        ruta = _ruta_dimensiones(cache)
+        try:
+            guardadas = json.loads(ruta.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            guardadas = {}
+        guardadas[codigo] = ids
+        ruta.parent.mkdir(parents=True, exist_ok=True)
+        ruta.write_text(json.dumps(guardadas, indent=2), encoding="utf-8")
+
+
+def extraer_dataset_eurostat(
+    codigo: str,
+    value_name: str,
+    filter_geo="ES",
+    filter_unit=None,
+    filter_indic=None,
+    filter_age="TOTAL",
+    filter_sex="T",
+    desde: Optional[int] = None,
+    hasta: Optional[int] = None,
+    session: Optional[requests.Session] = None,
+    comparar: bool = False,
+    flujo: Optional[bool] = None,
+    **kwargs_descarga,
+) -> pd.DataFrame:
+    """
+    Descarga y parsea un dataset Eurostat filtrando en servidor.
+
+    Los filtros son los de `parsear_eurostat_sdmx` y se aplican también en
+    cliente, así que el resultado es el mismo que descargando el dataset
+    completo. Registra tamaño del payload y tiempo de parseo.
+
+    Args:
+        codigo: Código del dataset (ej: 'ilc_li02')
+        value_name: Nombre de la columna de valores
+        desde/hasta: Ventana de años a pedir al servidor (inclusive)
+        session: Sesión HTTP compartida (opcional)
+        comparar: Descarga también el dataset completo y registra ambos tamaños
+        flujo: Volcar la respuesta a disco y decodificarla como flujo (por
+            defecto, si `ijson` está instalado)
+
+    Returns:
+        DataFrame como el de `parsear_eurostat_sdmx` (vacío si falla la descarga)
+    """
+    filtros = filtros_sdmx(
+        filter_geo, filter_unit, filter_indic, filter_age, filter_sex
+    )
+    if flujo is None:
+        flujo = streaming.disponible()
+    kwargs_descarga.setdefault("en_disco", flujo)
+    resultado, filtrado = descargar_eurostat(
+        codigo, filtros, desde, hasta, session=session, **kwargs_descarga
+    )
+    if not resultado.ok:
+        print(f"[ERR] {codigo}: {resultado.error}")
+        return pd.DataFrame()
+
+    df, t_parse = _parsear_resultado(resultado, value_name, filtros)
+    if desde is not None and "Anio" in df.columns:
+        df = df[df["Anio"] >= desde]
+    if hasta is not None and "Anio" in df.columns:
+        df = df[df["Anio"] <= hasta]
+    df = df.reset_index(drop=True)
+    modo = "filtrado" if filtrado else "completo"
+    print(
+        f"[INFO] {codigo} ({modo}): {resultado.bytes / 1024:.1f} KB, "
+        f"parseo {t_parse:.3f}s, {len(df)} filas"
+    )
+
+    if comparar and filtrado:
+        sesion_completo = session or crear_sesion(pool_size=1)
+        completo = descargar(
+            sesion_completo,
+            codigo,
+            f"{URL_EUROSTAT}/{codigo}",
+            params=dict(PARAMS_EUROSTAT),
+            **kwargs_descarga,
+        )
+        if session is None:
+            sesion_completo.close()
+        if completo.ok:
+            _, t_completo = _parsear_resultado(completo, value_name, filtros)
+            print(
+                f"[INFO] {codigo} (completo): {completo.bytes / 1024:.1f} KB, "
+                f"parseo {t_completo:.3f}s -> ahorro "
+                f"{1 - resultado.bytes / max(completo.bytes, 1):.0%} de bytes"
+            )
+    return df
+
+
+# Gini antes y después de transferencias (ilc_di12b/c) y tras transferencias (ilc_di12)
+DATASETS_REDISTRIBUTIVOS = [
+    ("ilc_di12b", "Gini_Antes_SinPensiones"),
+    ("ilc_di12c", "Gini_Antes_ConPensiones"),
+    ("ilc_di12", "Gini_Despues"),
+]
+CLAVE_IMPACTO = ["geo_code", "Anio"]
+
+
+def _serie_impacto(df: pd.DataFrame, codigo: str, columna: str) -> pd.DataFrame:
+    """Columnas geo_name + valor indexadas por (geo_code, Anio), sin claves repetidas."""
+    if df.empty:
+        return pd.DataFrame(columns=["geo_name", columna])
+    serie = df.set_index(CLAVE_IMPACTO)[["geo_name", columna]]
+    serie = serie.astype({"geo_name": object})
+    repetidas = serie.index.duplicated()
+    if repetidas.any():
+        print(
+            f"[WARN] {codigo}: {repetidas.sum()} filas repetidas por (geo_code, Anio)"
+        )
+        serie = serie[~repetidas]
+    return serie
+
+
+def extraer_impacto_redistributivo(
+    filter_geo: Optional[str] = None,
+    desde: Optional[int] = None,
+    hasta: Optional[int] = None,
+    session: Optional[requests.Session] = None,
+    **kwargs_extraccion,
+) -> pd.DataFrame:
+    """
+    Gini antes/después de transferencias de todas las geografías en una pasada.
+
+    Los tres datasets se descargan en paralelo y se decodifican una sola vez
+    (sin filtro geográfico); se combinan con un único `concat` alineado por
+    (geo_code, Anio) en lugar de merges sucesivos por geografía.
+
+    Args:
+        filter_geo: Geografía a conservar (None = todas, para rankings)
+        desde, hasta: Rango de años (inclusive)
+        session: Sesión HTTP compartida (opcional)
+        **kwargs_extraccion: Argumentos de `extraer_dataset_eurostat` (cache, flujo...)
+
+    Returns:
+        DataFrame con geo_code, geo_name, Anio y una columna por dataset,
+        ordenado por geo_code y Anio
+    """
+    propia = session is None
+    if propia:
+        session = crear_sesion(pool_size=len(DATASETS_REDISTRIBUTIVOS))
+
+    def _extraer(codigo: str, columna: str) -> pd.DataFrame:
+        return extraer_dataset_eurostat(
+            codigo,
+            columna,
+            filter_geo=None,
+            filter_unit="PC",
+            filter_age="TOTAL",
+            filter_sex="T",
+            desde=desde,
+            hasta=hasta,
+            session=session,
+            **kwargs_extraccion,
+        )
+
+    try:
+        with ThreadPoolExecutor(max_workers=len(DATASETS_REDISTRIBUTIVOS)) as pool:
+            futuros = [
+                pool.submit(_extraer, codigo, columna)
+                for codigo, columna in DATASETS_REDISTRIBUTIVOS
+            ]
+            series = [
+                _serie_impacto(futuro.result(), codigo, columna)
+                for futuro, (codigo, columna) in zip(futuros, DATASETS_REDISTRIBUTIVOS)
+            ]
+    finally:
+        if propia:
+            session.close()
+
+    if all(s.empty for s in series):
+        return pd.DataFrame()
+    columnas = [columna for _, columna in DATASETS_REDISTRIBUTIVOS]
+    unidas = pd.concat([s[[c]] for s, c in zip(series, columnas)], axis=1, join="outer")
+    # geo_name del primer dataset que cubra cada (geo_code, Anio)
+    nombres = (
+        pd.concat([s["geo_name"] for s in series], axis=1).bfill(axis=1).iloc[:, 0]
+    )
+    unidas.insert(0, "geo_name", nombres.reindex(unidas.index).astype(object))
+    if filter_geo is not None:
+        unidas = unidas[unidas.index.get_level_values("geo_code") == filter_geo]
+    df = unidas.sort_index().reset_index()
+    df["geo_code"] = df["geo_code"].astype(object)
+    return df[["geo_code", "geo_name", "Anio", *columnas]]
+
+
+def _parsear_resultado(
+    resultado: ResultadoDescarga, value_name: str, filtros: Dict[str, Optional[str]]
+) -> Tuple[pd.DataFrame, float]:
+    inicio = time.perf_counter()
+    kwargs_filtros = dict(
+        filter_geo=filtros["geo"],
+        filter_unit=filtros["unit"],
+        filter_indic=filtros["indic_il"],
+        filter_age=filtros["age"],
+        filter_sex=filtros["sex"],
+    )
+    if _leer_en_flujo(resultado):
+        with resultado.abrir() as f:
+            df = parsear_eurostat_sdmx_flujo(f, value_name, **kwargs_filtros)
+    else:
+        df = parsear_eurostat_sdmx(resultado.json(), value_name, **kwargs_filtros)
+    return df, time.perf_counter() - inicio
+
+
+def parsear_eurostat_sdmx_por_observacion(
+    data_json,
+    value_name,
+    filter_geo="ES",
+    filter_unit=None,
+    filter_indic=None,
+    filter_age="TOTAL",
+    filter_sex="T",
+):
+    """
+    Implementación original de 01b (un dict por observación).
+
+    Se mantiene solo como referencia para tests de equivalencia y benchmarks.
+    """
+    try:
+        dimensions = data_json.get("dimension", {})
+        size = data_json.get("size", [])
+        values = data_json.get("value", {})
+
+        dim_maps = {}
+        dim_labels = {}
+        dim_keys = list(dimensions.keys())
+        dimensions_exist = set(dim_keys)
+
+        for key in dim_keys:
+            idx_map = dimensions.get(key, {}).get("category", {}).get("index", {})
+            dim_maps[key] = {v: k for k, v in idx_map.items()}
+            dim_labels[key] = (
+                dimensions.get(key, {}).get("category", {}).get("label", {})
+            )
+
+        records = []
+        for key_str, value in values.items():
+            if value is None:
+                continue
+
+            key = int(key_str)
+            indices = []
+            for s in reversed(size):
+                indices.append(key % s)
+                key //= s
+            indices.reverse()
+
+            record = {value_name: float(value)}
+            valid_record = True
+
+            for i, dim_key in enumerate(dim_keys):
+                dim_idx = indices[i]
+                code = dim_maps.get(dim_key, {}).get(dim_idx)
+                if code is None:
+                    valid_record = False
+                    break
+
+                if dim_key == "geo":
+                    if filter_geo and code != filter_geo:
+                        valid_record = False
+                        break
+                    record["geo_code"] = code
+                    record["geo_name"] = dim_labels.get("geo", {}).get(code, code)
+
+                if dim_key == "time":
+                    record["Anio"] = int(code)
+
+                if dim_key == "unit":
+                    if filter_unit and code != filter_unit:
+                        valid_record = False
+                        break
+
+                if dim_key == "indic_il":
+                    if filter_indic and code != filter_indic:
+                        valid_record = False
+                        break
+
+                if dim_key == "age" and "age" in dimensions_exist:
+                    record["age"] = code
+                    record["age_label"] = dim_labels.get("age", {}).get(code, code)
+                    if filter_age is not None and code != filter_age:
+                        valid_record = False
+                        break
+
+                if dim_key == "sex" and "sex" in dimensions_exist:
+                    record["sex"] = code
+                    record["sex_label"] = dim_labels.get("sex", {}).get(code, code)
+                    if filter_sex is not None and code != filter_sex:
+                        valid_record = False
+                        break
+
+            if valid_record:
+                records.append(record)
+
+        return pd.DataFrame(records)
+
+    except Exception as e:
+        print(f"Error parseando SDMX: {e}")
+        return pd.DataFrame()
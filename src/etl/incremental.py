@@ -0,0 +1,434 @@
+"""
+Extracción incremental de tablas INE
+====================================
+
+Las series del INE solo ganan un punto (anual, o pocos mensuales) en cada
+publicación, así que no hace falta descargar el histórico completo a diario:
+
+1. Se lee la tabla ya guardada en el almacén (`src/almacen.py`) y, por serie (clave primaria sin el año), el
+   último año disponible; la tabla se pide desde el más atrasado.
+2. La petición usa `nult` (últimos N periodos) de wstempus, con N calculado a
+   partir de la periodicidad de la tabla.
+3. Las filas nuevas sustituyen a las guardadas con la misma `primary_key` de
+   `utils/validation_rules.py` y se recalculan las columnas derivadas
+   (variaciones anuales del IPC).
+
+Cada `dias_revision` días la petición se amplía `anios_revision` años hacia
+atrás y se compara con lo guardado: si el INE ha revisado algún dato histórico,
+la tabla se vuelve a descargar completa. Sin tabla previa también.
+
+Uso:
+    from src.etl.incremental import extraer_ine_incremental
+    dfs = extraer_ine_incremental(max_workers=6)
+"""
+
+import json
+import time
+from datetime import date
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.almacen import AlmacenTablas, guardar_tabla
+from src.config import CACHE_DIR, ensure_dir
+from src.etl import streaming
+from src.etl.descarga import (
+    DEFAULT_MAX_WORKERS,
+    descargar_varias,
+    imprimir_resumen_descargas,
+)
+from src.etl.ine import (
+    COLUMNAS_VACIAS,
+    TABLA_VALIDACION_INE,
+    TABLAS_INE,
+    _anadir_inflacion_sectorial,
+    transformar_resultado,
+    url_tabla_ine,
+)
+from src.tipos import ampliar
+from utils.validation_rules import get_rules
+
+COLUMNAS_ANIO = ("Anio", "Año")
+
+# Periodos publicados por año (tablas mensuales / semestrales); el resto, 1
+PERIODOS_POR_ANIO = {
+    "df_ipc_anual": 12,
+    "df_ipc_sectorial": 12,
+    "df_poblacion": 2,
+    "df_poblacion_ccaa_edad": 2,
+}
+
+DEFAULT_DIAS_REVISION = 30
+DEFAULT_ANIOS_REVISION = 3
+ARCHIVO_ESTADO = "_estado_incremental_ine.json"
+
+
+# =============================================================================
+# CLAVES Y AÑOS
+# =============================================================================
+
+
+def columna_anio(df: pd.DataFrame) -> Optional[str]:
+    """Nombre de la columna de año del DataFrame ('Anio' o 'Año')."""
+    return next((c for c in COLUMNAS_ANIO if c in df.columns), None)
+
+
+def clave_primaria(clave: str, df: pd.DataFrame) -> List[str]:
+    """
+    `primary_key` de la tabla según las reglas de validación, con los nombres
+    de columna de la tabla (la regla puede decir 'Anio' y la tabla 'Año').
+
+    Las columnas de la regla que la tabla no tiene se omiten; sin regla, la
+    clave es el año más todas las columnas no numéricas.
+    """
+    anio = columna_anio(df)
+    regla = get_rules(TABLA_VALIDACION_INE.get(clave, "")).get("primary_key")
+    if not regla:
+        return [anio] + [
+            c
+            for c in df.columns
+            if c != anio and not pd.api.types.is_numeric_dtype(df[c])
+        ]
+    columnas = [anio if c in COLUMNAS_ANIO else c for c in regla]
+    return [c for c in columnas if c in df.columns]
+
+
+def ultimo_anio_por_serie(df: pd.DataFrame, clave: List[str]) -> pd.Series:
+    """Último año guardado de cada serie (clave primaria sin el año)."""
+    anio = columna_anio(df)
+    anios = pd.to_numeric(df[anio], errors="coerce")
+    resto = [c for c in clave if c != anio]
+    if not resto:
+        return pd.Series([anios.max()])
+    return anios.groupby([df[c] for c in resto], observed=True, dropna=False).max()
+
+
+def periodos_a_pedir(
+    clave: str, desde: int, anio_actual: int, anios_extra: int = 0
+) -> int:
+    """Valor de `nult` que cubre desde enero de `desde` (más `anios_extra`)."""
+    anios = max(anio_actual - desde + 1, 1) + anios_extra
+    return anios * PERIODOS_POR_ANIO.get(clave, 1)
+
+
+# =============================================================================
+# FUSIÓN Y DETECCIÓN DE REVISIONES
+# =============================================================================
+
+
+def _recalcular_ipc_anual(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.sort_values("Anio").reset_index(drop=True)
+    inflacion = df["IPC_Medio_Anual"].astype(float).pct_change() * 100
+    df["Inflacion_Anual_%"] = inflacion.round(2)
+    return df
+
+
+def _recalcular_ipc_sectorial(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.sort_values(by=["Categoria_ECOICOP", "Tipo_Metrica", "Anio"])
+    return _anadir_inflacion_sectorial(
+        df.drop(columns="Inflacion_Sectorial_%").reset_index(drop=True)
+    )
+
+
+# Columnas calculadas con años anteriores: se rehacen sobre la tabla fusionada
+# y no cuentan como revisión (dependen del primer año, a medias, del incremento)
+COLUMNAS_DERIVADAS = {
+    "df_ipc_anual": ["Inflacion_Anual_%"],
+    "df_ipc_sectorial": ["Inflacion_Sectorial_%"],
+}
+RECALCULOS_INE: Dict[str, Callable[[pd.DataFrame], pd.DataFrame]] = {
+    "df_ipc_anual": _recalcular_ipc_anual,
+    "df_ipc_sectorial": _recalcular_ipc_sectorial,
+}
+
+
+def _restaurar_categoricas(df: pd.DataFrame, *origenes: pd.DataFrame) -> pd.DataFrame:
+    """concat de categóricas con categorías distintas da object: se recupera."""
+    for col in df.columns:
+        if any(
+            isinstance(o.get(col, pd.Series(dtype=object)).dtype, pd.CategoricalDtype)
+            for o in origenes
+        ):
+            df[col] = df[col].astype("category")
+    return df
+
+
+def fusionar_incremento(
+    anterior: pd.DataFrame,
+    nuevo: pd.DataFrame,
+    clave: List[str],
+    desde: int,
+    tabla: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Añade a `anterior` las filas de `nuevo` con año >= `desde`.
+
+    Las filas guardadas cuya clave primaria aparece en el incremento se
+    sustituyen (el último año suele ser provisional o estar incompleto).
+
+    Args:
+        anterior: Tabla guardada
+        nuevo: Tabla transformada a partir de la respuesta con `nult`
+        clave: Columnas de la clave primaria
+        desde: Primer año que se acepta del incremento
+        tabla: Clave de `TABLAS_INE` (para recalcular columnas derivadas)
+
+    Returns:
+        Tabla fusionada, ordenada por la clave primaria
+    """
+    anio = columna_anio(nuevo)
+    nuevo = nuevo[pd.to_numeric(nuevo[anio], errors="coerce") >= desde]
+    indice_nuevo = pd.MultiIndex.from_frame(nuevo[clave].astype(object))
+    reemplazadas = pd.MultiIndex.from_frame(anterior[clave].astype(object)).isin(
+        indice_nuevo
+    )
+    fusion = pd.concat([anterior[~reemplazadas], nuevo], ignore_index=True)
+    fusion = _restaurar_categoricas(fusion, anterior, nuevo)
+    fusion = fusion.sort_values(clave, kind="stable").reset_index(drop=True)
+    if tabla in RECALCULOS_INE:
+        fusion = RECALCULOS_INE[tabla](fusion)
+    return fusion
+
+
+def _comparable(df: pd.DataFrame) -> pd.DataFrame:
+    """Copia con categóricas como object y flotantes redondeados (para merge)."""
+    salida = {}
+    for col in df.columns:
+        serie = df[col]
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            serie = serie.astype(object)
+        elif pd.api.types.is_float_dtype(serie):
+            serie = serie.round(6)
+        salida[col] = serie.to_numpy()
+    return pd.DataFrame(salida)
+
+
+def contar_revisiones(
+    anterior: pd.DataFrame,
+    nuevo: pd.DataFrame,
+    hasta: int,
+    excluir: Iterable[str] = (),
+) -> int:
+    """
+    Filas históricas que difieren entre lo guardado y lo recién descargado.
+
+    Solo se comparan los años completos que cubren ambas versiones: los
+    posteriores al primer año del incremento (que puede venir a medias) y
+    anteriores a `hasta` (el año que se va a sustituir igualmente). Las
+    columnas de `excluir` (derivadas) no se comparan.
+    """
+    anio_nuevo = columna_anio(nuevo)
+    anio_anterior = columna_anio(anterior)
+    anios_nuevo = pd.to_numeric(nuevo[anio_nuevo], errors="coerce")
+    if anios_nuevo.notna().sum() == 0:
+        return 0
+    inicio = anios_nuevo.min()
+    anios_anterior = pd.to_numeric(anterior[anio_anterior], errors="coerce")
+
+    columnas = [
+        c for c in anterior.columns if c in nuevo.columns and c not in set(excluir)
+    ]
+    a = anterior.loc[(anios_anterior > inicio) & (anios_anterior < hasta), columnas]
+    b = nuevo.loc[(anios_nuevo > inicio) & (anios_nuevo < hasta), columnas]
+    comparacion = _comparable(a).merge(
+        _comparable(b), how="outer", on=columnas, indicator=True
+    )
+    return int((comparacion["_merge"] != "both").sum())
+
+
+# =============================================================================
+# ESTADO Y ORQUESTACIÓN
+# =============================================================================
+
+
+def _leer_estado(ruta: Path) -> Dict[str, dict]:
+    try:
+        return json.loads(ruta.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def _leer_previa(almacen: AlmacenTablas, clave: str) -> Optional[pd.DataFrame]:
+    try:
+        # Tipos como los de una descarga nueva (float32 -> float64 con sus
+        # decimales): si no, contar_revisiones vería revisiones inexistentes
+        df = ampliar(almacen.leer(clave))
+    except Exception:
+        return None
+    if not isinstance(df, pd.DataFrame) or df.empty or columna_anio(df) is None:
+        return None
+    if pd.to_numeric(df[columna_anio(df)], errors="coerce").isna().all():
+        return None
+    return df
+
+
+def _transformar(clave: str, resultado) -> Optional[pd.DataFrame]:
+    try:
+        if not resultado.ok:
+            raise RuntimeError(resultado.error)
+        return transformar_resultado(clave, resultado)
+    except Exception as e:
+        print(f"[ERR] {clave}: {e}")
+        return None
+
+
+def extraer_ine_incremental(
+    tablas: Optional[Iterable[str]] = None,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    cache_dir: Optional[Path] = None,
+    guardar: bool = True,
+    session=None,
+    dias_revision: float = DEFAULT_DIAS_REVISION,
+    anios_revision: int = DEFAULT_ANIOS_REVISION,
+    completa: bool = False,
+    anio_actual: Optional[int] = None,
+    **kwargs_descarga,
+) -> Dict[str, pd.DataFrame]:
+    """
+    Actualiza las tablas INE pidiendo solo los periodos nuevos.
+
+    Args:
+        tablas: Claves de `TABLAS_INE` a actualizar (todas si None)
+        max_workers: Número máximo de descargas simultáneas
+        cache_dir: Directorio del almacén de tablas (por defecto `CACHE_DIR`)
+        guardar: Si True, escribe las tablas y el estado incremental
+        session: Sesión HTTP compartida opcional
+        dias_revision: Cada cuántos días se comprueba si hay revisiones históricas
+        anios_revision: Años de histórico que se comparan en la comprobación
+        completa: Forzar la descarga completa de todas las tablas
+        anio_actual: Año de referencia para `nult` (por defecto, el actual)
+        **kwargs_descarga: timeout / reintentos / backoff / cache para `descargar_varias`
+
+    Returns:
+        Diccionario {clave: DataFrame} con las tablas actualizadas
+    """
+    tablas = list(tablas) if tablas is not None else list(TABLAS_INE)
+    desconocidas = [t for t in tablas if t not in TABLAS_INE]
+    if desconocidas:
+        raise ValueError(f"Tablas INE no configuradas: {desconocidas}")
+
+    cache_dir = Path(cache_dir) if cache_dir is not None else CACHE_DIR
+    if guardar:
+        ensure_dir(cache_dir)
+    anio_actual = anio_actual or date.today().year
+    ruta_estado = cache_dir / ARCHIVO_ESTADO
+    estado = _leer_estado(ruta_estado)
+    ahora = time.time()
+    kwargs_descarga.setdefault("en_disco", streaming.disponible())
+
+    # 1) Plan por tabla: completa, incremental o incremental con revisión
+    planes = {}
+    for clave in tablas:
+        anterior = None if completa else _leer_previa(AlmacenTablas(cache_dir), clave)
+        if anterior is None:
+            planes[clave] = {"modo": "completa"}
+            continue
+        pk = clave_primaria(clave, anterior)
+        desde = int(ultimo_anio_por_serie(anterior, pk).min())
+        ultima = estado.get(clave, {}).get("ultima_revision", 0)
+        revisar = ahora - ultima >= dias_revision * 86400
+        nult = periodos_a_pedir(
+            clave, desde, anio_actual, anios_revision if revisar else 0
+        )
+        planes[clave] = {
+            "modo": "revision" if revisar else "incremental",
+            "anterior": anterior,
+            "clave": pk,
+            "desde": desde,
+            "nult": nult,
+        }
+
+    def _peticion(clave):
+        url = url_tabla_ine(TABLAS_INE[clave])
+        plan = planes[clave]
+        return url if plan["modo"] == "completa" else (url, {"nult": plan["nult"]})
+
+    resultados = descargar_varias(
+        {t: _peticion(t) for t in tablas},
+        max_workers=max_workers,
+        session=session,
+        **kwargs_descarga,
+    )
+    imprimir_resumen_descargas(resultados)
+
+    # 2) Fusión; las tablas con revisiones históricas pasan a descarga completa
+    dataframes = {}
+    for clave in tablas:
+        plan = planes[clave]
+        nuevo = _transformar(clave, resultados[clave])
+        if plan["modo"] == "completa" or nuevo is None:
+            continue
+        if plan["modo"] == "revision":
+            revisadas = contar_revisiones(
+                plan["anterior"],
+                nuevo,
+                plan["desde"],
+                excluir=COLUMNAS_DERIVADAS.get(clave, ()),
+            )
+            if revisadas:
+                print(
+                    f"[WARN] {clave}: {revisadas} filas históricas revisadas "
+                    "por el INE; descarga completa"
+                )
+                plan["modo"] = "completa"
+                continue
+        dataframes[clave] = fusionar_incremento(
+            plan["anterior"], nuevo, plan["clave"], plan["desde"], tabla=clave
+        )
+
+    completas = [t for t in tablas if planes[t]["modo"] == "completa"]
+    refrescar = [t for t in completas if "anterior" in planes[t]]
+    if refrescar:
+        resultados.update(
+            descargar_varias(
+                {t: url_tabla_ine(TABLAS_INE[t]) for t in refrescar},
+                max_workers=max_workers,
+                session=session,
+                **kwargs_descarga,
+            )
+        )
+    for clave in completas:
+        df = _transformar(clave, resultados[clave])
+        if df is not None:
+            dataframes[clave] = df
+        elif "anterior" not in planes[clave]:
+            dataframes[clave] = pd.DataFrame(columns=COLUMNAS_VACIAS[clave])
+
+    # 3) Guardado y estado
+    for clave in tablas:
+        plan = planes[clave]
+        if clave not in dataframes:
+            # Incremento fallido: se conserva la tabla guardada tal cual
+            dataframes[clave] = plan["anterior"]
+            print(f"  [WARN] {clave}: sin actualizar, se mantiene la tabla previa")
+            continue
+        df = dataframes[clave]
+        if plan["modo"] == "completa":
+            detalle = "completa"
+        else:
+            nuevas = len(df) - len(plan["anterior"])
+            detalle = (
+                f"{plan['modo']} desde {plan['desde']} "
+                f"(nult={plan['nult']}, {nuevas:+d} filas)"
+            )
+        if guardar:
+            ruta = guardar_tabla(
+                df, clave, cache_dir, etapa="ine_incremental", compactar=True
+            )
+            print(f"  [OK] {clave}: {len(df)} registros, {detalle} -> {ruta.name}")
+        registro = estado.setdefault(clave, {})
+        registro["ultima_extraccion"] = ahora
+        registro["modo"] = plan["modo"]
+        if plan["modo"] in ("completa", "revision"):
+            registro["ultima_revision"] = ahora
+        anio = columna_anio(df)
+        if anio is not None and len(df):
+            registro["ultimo_anio"] = int(
+                np.nanmax(pd.to_numeric(df[anio], errors="coerce"))
+            )
+
+    if guardar:
+        ruta_estado.write_text(json.dumps(estado, indent=2), encoding="utf-8")
+    return dataframes
@@ -0,0 +1,922 @@
+"""
+Extracción y transformación de tablas INE (wstempus DATOS_TABLA)
+=================================================================
+
+Versión importable de `01a_extract_transform_INE.ipynb`: descarga todas las
+tablas configuradas en paralelo (ver `src.etl.descarga`) y aplica la misma
+transformación que cada celda del notebook, devolviendo los mismos DataFrames
+y guardándolos en el almacén de tablas (`src/almacen.py`, Parquet en `CACHE_DIR`).
+
+Las transformaciones parten de `aplanar_series` (lista `Data` -> formato largo
+en una pasada) y parsean los `Nombre` de serie solo sobre los valores únicos.
+
+Uso:
+    from src.etl.ine import extraer_ine
+    dfs = extraer_ine(max_workers=6)
+"""
+
+import re
+from itertools import chain, islice
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.almacen import guardar_tabla
+from src.config import CACHE_DIR, ensure_dir
+from src.etl import streaming
+from src.etl.descarga import (
+    DEFAULT_MAX_WORKERS,
+    ResultadoDescarga,
+    descargar_varias,
+    imprimir_resumen_descargas,
+)
+from utils.canonical_labels import DECIL
+
+URL_INE = "https://servicios.ine.es/wstempus/js/ES/DATOS_TABLA/{tabla}"
+
+# Clave de caché (nombre de la tabla en el almacén) -> código o ruta de la tabla wstempus
+TABLAS_INE = {
+    "df_ipc_anual": "24077",
+    "df_umbral_limpio": "t00/ICV/dim1/l0/11205_4.px",
+    "df_carencia_material": "9973",
+    "df_arope_edad_sexo": "29287",
+    "df_arope_hogar": "60259",
+    "df_arope_laboral": "74862",
+    "df_gini_ccaa": "60143",
+    "df_renta_decil": "t00/ICV/dim1/l0/11106_2.px",
+    "df_poblacion": "56936",
+    "df_poblacion_ccaa_edad": "66014",
+    "df_arope_ccaa": "29288",
+    "df_epf_gasto": "24900",
+    "df_ipc_sectorial": "50902",
+}
+
+# Clave de caché -> tabla SQL de 01c (y de utils/validation_rules.py)
+TABLA_VALIDACION_INE = {
+    "df_ipc_anual": "INE_IPC_Nacional",
+    "df_umbral_limpio": "INE_Umbral_Pobreza_Hogar",
+    "df_carencia_material": "INE_Carencia_Material_Decil",
+    "df_arope_edad_sexo": "INE_AROPE_Edad_Sexo",
+    "df_arope_hogar": "INE_AROPE_Hogar",
+    "df_arope_laboral": "INE_AROPE_Laboral",
+    "df_gini_ccaa": "INE_Gini_S80S20_CCAA",
+    "df_renta_decil": "INE_Renta_Media_Decil",
+    "df_poblacion": "INE_Poblacion_Edad_Sexo_Nacionalidad",
+    "df_poblacion_ccaa_edad": "INE_Poblacion_Edad_Sexo_CCAA",
+    "df_arope_ccaa": "INE_AROPE_CCAA",
+    "df_epf_gasto": "INE_Gasto_Medio_Hogar_Quintil",
+    "df_ipc_sectorial": "INE_IPC_Sectorial_ECOICOP",
+}
+
+# Columnas del DataFrame vacío que se guarda si la descarga o el parseo fallan
+COLUMNAS_VACIAS = {
+    "df_ipc_anual": ["Anio", "IPC_Medio_Anual", "Inflacion_Anual_%"],
+    "df_umbral_limpio": ["Anio", "Tipo_Hogar", "Umbral_Pobreza_Euros"],
+    "df_carencia_material": ["Item", "Año", "Valor", "Decil"],
+    "df_arope_edad_sexo": ["Año", "Sexo", "Edad", "Indicador", "Valor"],
+    "df_arope_hogar": ["Año", "Tipo_Hogar", "Indicador", "Valor"],
+    "df_arope_laboral": ["Sexo", "Situacion_Laboral", "Territorio", "Año", "AROPE"],
+    "df_gini_ccaa": ["Territorio", "Año", "Gini", "S80/S20"],
+    "df_renta_decil": ["Decil", "Año", "Media", "Mediana"],
+    "df_poblacion": ["Año", "Sexo", "Edad", "Poblacion"],
+    "df_poblacion_ccaa_edad": ["Año", "CCAA", "Sexo", "Edad", "Poblacion"],
+    "df_arope_ccaa": ["Año", "CCAA", "Indicador", "Valor"],
+    "df_epf_gasto": ["Año", "Quintil", "Grupo_Gasto", "Tipo_Valor", "Valor"],
+    "df_ipc_sectorial": [
+        "Anio",
+        "Categoria_ECOICOP",
+        "IPC_Indice",
+        "Inflacion_Sectorial_%",
+    ],
+}
+
+
+def url_tabla_ine(tabla: str) -> str:
+    return URL_INE.format(tabla=tabla)
+
+
+# =============================================================================
+# APLANADO COLUMNAR DE SERIES (lista "Data" -> formato largo)
+# =============================================================================
+
+CAMPOS_DATA = ("Anyo", "NombrePeriodo", "Valor")
+BLOQUE_SERIES = 1000
+
+
+def aplanar_series(
+    data: Iterable,
+    campos: Iterable[str] = CAMPOS_DATA,
+    bloque: int = BLOQUE_SERIES,
+) -> pd.DataFrame:
+    """
+    Explota la lista `Data` de cada serie wstempus en un DataFrame largo.
+
+    Pasada columnar por bloques de `bloque` series: los puntos de cada bloque se
+    encadenan y cada campo se extrae como columna (float64 si es numérico), así
+    que con un iterador (`src.etl.streaming.iterar_series_ine`) solo hay un
+    bloque de dicts vivo a la vez. El `Nombre` de la serie viaja como
+    categórica (un código por fila, una cadena por serie).
+
+    Args:
+        data: Respuesta JSON de DATOS_TABLA (lista o iterador de series)
+        campos: Claves de cada punto de `Data` a conservar
+        bloque: Series que se convierten a columnas de una vez
+
+    Returns:
+        DataFrame con `Nombre` (categórica) y una columna por campo
+    """
+    campos = list(campos)
+    series = (
+        s for s in data or [] if isinstance(s, dict) and isinstance(s.get("Data"), list)
+    )
+    nombres, longitudes = [], []
+    bloques = {campo: [] for campo in campos}
+    while True:
+        lote = list(islice(series, bloque))
+        if not lote:
+            break
+        puntos_por_serie = [[p for p in s["Data"] if isinstance(p, dict)] for s in lote]
+        nombres.extend(s.get("Nombre") or "" for s in lote)
+        longitudes.extend(len(p) for p in puntos_por_serie)
+        puntos = list(chain.from_iterable(puntos_por_serie))
+        for campo in campos:
+            bloques[campo].append(_columna([p.get(campo) for p in puntos]))
+
+    categorias, inversa = np.unique(
+        np.array(nombres, dtype=object), return_inverse=True
+    )
+    columnas = {
+        "Nombre": pd.Categorical.from_codes(
+            np.repeat(inversa.astype(np.int32), np.array(longitudes, dtype=np.int64)),
+            categories=pd.Index(categorias, dtype=object),
+        )
+    }
+    for campo in campos:
+        columnas[campo] = _unir_bloques(bloques[campo])
+    return pd.DataFrame(columnas)
+
+
+def _columna(valores: list) -> np.ndarray:
+    """Valores JSON -> float64 si son numéricos (null -> NaN); si no, object."""
+    if not any(isinstance(v, str) for v in valores):
+        try:
+            return np.array(valores, dtype=np.float64)
+        except (TypeError, ValueError):
+            pass
+    return np.array(valores, dtype=object)
+
+
+def _unir_bloques(bloques: list) -> np.ndarray:
+    """Concatena las columnas de cada bloque; si alguna es object, todas (NaN -> None)."""
+    if not bloques:
+        return np.array([], dtype=np.float64)
+    if all(b.dtype == np.float64 for b in bloques):
+        return np.concatenate(bloques)
+    objetos = []
+    for b in bloques:
+        if b.dtype == np.float64:
+            nulos = np.isnan(b)
+            b = b.astype(object)
+            b[nulos] = None
+        objetos.append(b)
+    return np.concatenate(objetos)
+
+
+def _nombres(largo: pd.DataFrame) -> pd.Series:
+    """Nombres únicos de serie (categorías de `Nombre`) para parsear una sola vez."""
+    return pd.Series(largo["Nombre"].cat.categories, dtype=object)
+
+
+def _por_nombre(largo: pd.DataFrame, valores) -> pd.Categorical:
+    """Expande a filas un atributo calculado sobre los nombres únicos."""
+    codigos = largo["Nombre"].cat.codes.to_numpy()
+    return pd.Categorical(np.asarray(valores, dtype=object)).take(codigos)
+
+
+def _filas_validas(largo: pd.DataFrame, por_nombre) -> np.ndarray:
+    """Máscara por fila a partir de una máscara booleana sobre nombres únicos."""
+    return np.asarray(por_nombre, dtype=bool)[largo["Nombre"].cat.codes.to_numpy()]
+
+
+def _contiene(nombres: pd.Series, *literales: str) -> np.ndarray:
+    """True si el nombre contiene alguno de los literales (sin regex)."""
+    mask = np.zeros(len(nombres), dtype=bool)
+    for literal in literales:
+        mask |= nombres.str.contains(literal, regex=False, na=False).to_numpy()
+    return mask
+
+
+def _no_vacio(columna: pd.Series) -> pd.Series:
+    """Equivale a la comprobación `if valor:` del notebook (None, 0 y '' fuera)."""
+    return columna.notna() & (columna != 0) & (columna != "")
+
+
+# =============================================================================
+# TRANSFORMACIONES (una por tabla, equivalentes a las celdas de 01a)
+# =============================================================================
+
+
+def transformar_ipc_anual(data: list) -> pd.DataFrame:
+    """IPC general (24077): media anual del índice y variación anual."""
+    largo = aplanar_series(data)
+    periodo = largo["Anyo"].where(largo["Anyo"].notna(), largo["NombrePeriodo"])
+    df = pd.DataFrame(
+        {
+            "Anio": pd.to_numeric(periodo.astype(str), errors="coerce").astype("Int64"),
+            "IPC_Indice": pd.to_numeric(largo["Valor"], errors="coerce"),
+        }
+    )
+
+    df_anual = (
+        df.groupby("Anio", as_index=False)
+        .agg({"IPC_Indice": "mean"})
+        .rename(columns={"IPC_Indice": "IPC_Medio_Anual"})
+    )
+    df_anual["IPC_Medio_Anual"] = df_anual["IPC_Medio_Anual"].round(3)
+    df_anual["Inflacion_Anual_%"] = df_anual["IPC_Medio_Anual"].pct_change() * 100
+    df_anual["Inflacion_Anual_%"] = df_anual["Inflacion_Anual_%"].round(2)
+    return df_anual
+
+
+def transformar_umbral(data: list) -> pd.DataFrame:
+    """Umbral de pobreza por tipo de hogar (ICV 11205)."""
+    largo = aplanar_series(data, campos=("NombrePeriodo", "Valor"))
+    return pd.DataFrame(
+        {
+            "Anio": largo["NombrePeriodo"].astype(int),
+            "Tipo_Hogar": largo["Nombre"],
+            "Umbral_Pobreza_Euros": largo["Valor"].astype(float),
+        }
+    )
+
+
+# Nombres ordinales del diccionario compartido ("Primer decil" -> "D1")
+DECILES_CARENCIA = {
+    variante: decil
+    for variante, decil in DECIL.variants.items()
+    if variante.endswith(" decil")
+}
+PATRON_DECIL_CARENCIA = "(" + "|".join(re.escape(k) for k in DECILES_CARENCIA) + ")"
+
+
+def transformar_carencia(data: list) -> pd.DataFrame:
+    """Carencia material por decil (9973)."""
+    largo = aplanar_series(data, campos=("Anyo", "Valor"))
+    decil = (
+        _nombres(largo)
+        .str.extract(PATRON_DECIL_CARENCIA, expand=False)
+        .map(DECILES_CARENCIA)
+        .fillna("Total Nacional")
+    )
+    valor = largo["Valor"]
+    if valor.dtype == object:
+        valor = valor.astype(str).str.replace(",", ".")
+    df = pd.DataFrame(
+        {
+            # Item conserva el nombre completo de la serie, como en la tabla SQL actual
+            "Item": largo["Nombre"],
+            "Año": pd.to_numeric(largo["Anyo"], errors="coerce").astype("Int64"),
+            "Valor": pd.to_numeric(valor, errors="coerce"),
+            "Decil": _por_nombre(largo, decil),
+        }
+    )
+    return df.dropna(subset=["Valor", "Año"])
+
+
+RANGOS_EDAD_AROPE = [
+    "Menos de 16",
+    "16 a 29",
+    "30 a 44",
+    "45 a 64",
+    "65 y más",
+    "Menos de 18",
+    "18 a 64",
+]
+
+
+def _edad_arope(nombres: pd.Series) -> np.ndarray:
+    total = _contiene(nombres, "Total") & ~_contiene(nombres, *RANGOS_EDAD_AROPE)
+    return np.select(
+        [
+            total,
+            _contiene(nombres, "Menos de 16", "Menores de 16"),
+            _contiene(nombres, "16 a 29"),
+            _contiene(nombres, "30 a 44"),
+            _contiene(nombres, "45 a 64"),
+            _contiene(nombres, "65 y más", "65 y +"),
+            _contiene(nombres, "Menos de 18", "Menores de 18"),
+            _contiene(nombres, "18 a 64"),
+        ],
+        [
+            "Total",
+            "Menores de 16 años",
+            "16 a 29 años",
+            "30 a 44 años",
+            "45 a 64 años",
+            "65 y más años",
+            "Menos de 18 años",
+            "18 a 64 años",
+        ],
+        default="Total",
+    )
+
+
+def _con_anyo_y_valor(data: list) -> pd.DataFrame:
+    """Formato largo con solo los puntos que tienen `Anyo` y `Valor`."""
+    largo = aplanar_series(data, campos=("Anyo", "Valor"))
+    largo = largo[largo["Anyo"].notna() & largo["Valor"].notna()]
+    return largo.reset_index(drop=True)
+
+
+def transformar_arope_edad_sexo(data: list) -> pd.DataFrame:
+    """AROPE por edad y sexo (29287)."""
+    largo = _con_anyo_y_valor(data)
+    nombres = _nombres(largo)
+    sexo = np.select(
+        [_contiene(nombres, "Hombre"), _contiene(nombres, "Mujer")],
+        ["Hombre", "Mujer"],
+        default="Total",
+    )
+    indicador = np.select(
+        [
+            _contiene(nombres, "En riesgo de pobreza") & ~_contiene(nombres, "AROPE"),
+            _contiene(nombres, "Carencia material"),
+            _contiene(nombres, "Baja intensidad"),
+        ],
+        ["AROP", "Carencia Material Severa", "Baja Intensidad Laboral"],
+        default="AROPE",
+    )
+    df = pd.DataFrame(
+        {
+            "Año": largo["Anyo"].astype(int),
+            "Sexo": _por_nombre(largo, sexo),
+            "Edad": _por_nombre(largo, _edad_arope(nombres)),
+            "Indicador": _por_nombre(largo, indicador),
+            "Valor": largo["Valor"].astype(float),
+        },
+        columns=COLUMNAS_VACIAS["df_arope_edad_sexo"],
+    )
+    return df.drop_duplicates(subset=["Año", "Sexo", "Edad"], keep="first")
+
+
+def _tipo_hogar_arope(nombres: pd.Series) -> np.ndarray:
+    total = _contiene(nombres, "Total") & ~_contiene(
+        nombres,
+        "1 adulto",
+        "2 adultos",
+        "Otros",
+        "No consta",
+        "Hogares de una persona",
+    )
+    return np.select(
+        [
+            total,
+            _contiene(
+                nombres,
+                "1 adulto con 1 ó más niños dependientes",
+                "1 adulto con 1 o más niños dependientes",
+            ),
+            _contiene(
+                nombres,
+                "2 adultos con 1 ó más niños dependientes",
+                "2 adultos con 1 o más niños dependientes",
+            ),
+            _contiene(nombres, "2 adultos sin niños dependientes"),
+            _contiene(nombres, "Hogares de una persona"),
+            _contiene(nombres, "Otros hogares con niños dependientes"),
+            _contiene(nombres, "Otros hogares sin niños dependientes"),
+            _contiene(nombres, "No consta"),
+        ],
+        [
+            "Total",
+            "1 adulto con 1 o más niños dependientes",
+            "2 adultos con 1 o más niños dependientes",
+            "2 adultos sin niños dependientes",
+            "Hogares de una persona",
+            "Otros hogares con niños dependientes",
+            "Otros hogares sin niños dependientes",
+            "No consta",
+        ],
+        default="Desconocido",
+    )
+
+
+def transformar_arope_hogar(data: list) -> pd.DataFrame:
+    """AROPE por tipo de hogar (60259), sin la categoría 'No consta'."""
+    largo = _con_anyo_y_valor(data)
+    nombres = _nombres(largo)
+    nombres_lower = nombres.str.lower()
+    indicador = np.select(
+        [
+            _contiene(nombres, "En riesgo de pobreza")
+            & ~_contiene(nombres_lower, "exclusión"),
+            _contiene(nombres_lower, "carencia material"),
+            _contiene(nombres_lower, "baja intensidad"),
+        ],
+        ["AROP", "Carencia Material Severa", "Baja Intensidad Laboral"],
+        default="AROPE",
+    )
+    df = pd.DataFrame(
+        {
+            "Año": largo["Anyo"].astype(int),
+            "Tipo_Hogar": _por_nombre(largo, _tipo_hogar_arope(nombres)),
+            "Indicador": _por_nombre(largo, indicador),
+            "Valor": largo["Valor"].astype(float),
+        },
+        columns=COLUMNAS_VACIAS["df_arope_hogar"],
+    )
+    return df[df["Tipo_Hogar"] != "No consta"].copy()
+
+
+def _parte(partes: pd.Series, i: int) -> pd.Series:
+    """Elemento `i` (sin espacios) de nombres ya divididos; NaN si no existe."""
+    return partes.str[i].str.strip()
+
+
+def transformar_arope_laboral(data: list) -> pd.DataFrame:
+    """AROPE por situación laboral (74862)."""
+    largo = _con_anyo_y_valor(data)
+    partes = _nombres(largo).str.split(".")
+    territorio_raw = _parte(partes, 2)
+    territorio = np.select(
+        [
+            _contiene(territorio_raw, "UE27"),
+            _contiene(territorio_raw, "Total Nacional"),
+        ],
+        ["UE-27", "España"],
+        default=territorio_raw.to_numpy(dtype=object),
+    )
+    return pd.DataFrame(
+        {
+            "Sexo": _por_nombre(largo, _parte(partes, 0).fillna("Total")),
+            "Situacion_Laboral": _por_nombre(largo, _parte(partes, 1).fillna("Total")),
+            "Territorio": _por_nombre(largo, territorio),
+            "Año": largo["Anyo"].astype(int),
+            "AROPE": largo["Valor"].astype(float),
+        },
+        columns=COLUMNAS_VACIAS["df_arope_laboral"],
+    )
+
+
+def _indicador_desigualdad(nombres: pd.Series) -> np.ndarray:
+    nombres_lower = nombres.str.lower()
+    return np.select(
+        [
+            _contiene(nombres_lower, "imputado"),
+            _contiene(nombres_lower, "gini"),
+            _contiene(nombres_lower, "s80", "d80"),
+        ],
+        [None, "Gini", "S80/S20"],
+        default=None,
+    )
+
+
+def transformar_gini_ccaa(data: list) -> pd.DataFrame:
+    """Gini y S80/S20 por CCAA (60143), Gini en escala 0-1."""
+    largo = _con_anyo_y_valor(data)
+    nombres = _nombres(largo)
+    indicador = _indicador_desigualdad(nombres)
+    largo = largo[_filas_validas(largo, pd.notna(indicador))]
+    df = pd.DataFrame(
+        {
+            "Territorio": _por_nombre(largo, _parte(nombres.str.split("."), 0)),
+            "Indicador": _por_nombre(largo, indicador).astype(object),
+            "Año": largo["Anyo"].astype(int),
+            "Valor": largo["Valor"].astype(float),
+        }
+    )
+    df_gini = df.pivot_table(
+        index=["Territorio", "Año"], columns="Indicador", values="Valor", observed=True
+    ).reset_index()
+
+    for col in ("S80/S20", "Gini"):
+        if col not in df_gini.columns:
+            raise ValueError(
+                f"Columna '{col}' no encontrada en el pivot. "
+                f"Columnas disponibles: {df_gini.columns.tolist()}"
+            )
+
+    if df_gini["Gini"].max() > 1:
+        df_gini["Gini"] = df_gini["Gini"] / 100.0
+    return df_gini
+
+
+def transformar_renta_decil(data: list) -> pd.DataFrame:
+    """Renta media y mediana por decil (ICV 11106)."""
+    largo = aplanar_series(data, campos=("NombrePeriodo", "Valor"))
+    nombres = _nombres(largo)
+    partes = nombres.str.split(",")
+    decil = _parte(partes, 1)
+    filas = _filas_validas(largo, partes.str.len() >= 2)
+    filas &= (largo["NombrePeriodo"].notna() & largo["Valor"].notna()).to_numpy()
+    largo = largo[filas]
+
+    df_raw = pd.DataFrame(
+        {
+            "Indicador": _por_nombre(largo, _parte(partes, 0)).astype(object),
+            "Decil": _por_nombre(largo, DECIL.recode(decil)),
+            "Año": largo["NombrePeriodo"].astype(int),
+            "Valor": largo["Valor"].astype(float),
+        }
+    )
+    df = df_raw.pivot_table(
+        index=["Decil", "Año"],
+        columns="Indicador",
+        values="Valor",
+        aggfunc="first",
+        observed=True,
+    ).reset_index()
+    df.columns.name = None
+    mapeo_columnas = {"Renta media": "Media", "Renta mediana": "Mediana"}
+    return df.rename(columns={c: mapeo_columnas.get(c, c) for c in df.columns})
+
+
+EDADES_POBLACION = {
+    "De 0 a 4 años": "0-4",
+    "De 5 a 9 años": "5-9",
+    "De 10 a 14 años": "10-14",
+    "De 15 a 19 años": "15-19",
+    "De 20 a 24 años": "20-24",
+    "De 25 a 29 años": "25-29",
+    "De 30 a 34 años": "30-34",
+    "De 35 a 39 años": "35-39",
+    "De 40 a 44 años": "40-44",
+    "De 45 a 49 años": "45-49",
+    "De 50 a 54 años": "50-54",
+    "De 55 a 59 años": "55-59",
+    "De 60 a 64 años": "60-64",
+    "De 65 a 69 años": "65-69",
+    "De 70 a 74 años": "70-74",
+    "De 75 a 79 años": "75-79",
+    "De 80 a 84 años": "80-84",
+    "De 85 a 89 años": "85-89",
+    "De 90 a 94 años": "90-94",
+    "95 y más años": "95+",
+    "90 y más años": "90+",
+}
+
+
+def _anio_periodo(periodo: pd.Series) -> pd.Series:
+    """Año de 'AAAA' o 'AAAATn'; NaN si no es un año entero."""
+    anio = pd.to_numeric(
+        periodo.astype(str).str.split("T").str[0], errors="coerce"
+    ).astype(float)
+    return anio.where(anio == np.floor(anio))
+
+
+def transformar_poblacion(data: list) -> pd.DataFrame:
+    """Población por edad y sexo, nacionalidad total (56936), media anual."""
+    largo = aplanar_series(data)
+    partes = _nombres(largo).str.split(".")
+    edad = _parte(partes, 2)
+    sexo_raw = _parte(partes, 3)
+    sexo = np.select(
+        [_contiene(sexo_raw, "Hombres"), _contiene(sexo_raw, "Mujeres")],
+        ["Hombres", "Mujeres"],
+        default="Total",
+    )
+    nombre_valido = (partes.str.len() >= 4) & (_parte(partes, 1) == "Total")
+
+    periodo = largo["NombrePeriodo"].where(
+        largo["NombrePeriodo"].notna(), largo["Anyo"]
+    )
+    anio = _anio_periodo(periodo)
+    filas = _filas_validas(largo, nombre_valido)
+    filas &= (periodo.notna() & largo["Valor"].notna() & anio.notna()).to_numpy()
+    if not filas.any():
+        return pd.DataFrame(columns=COLUMNAS_VACIAS["df_poblacion"])
+
+    anio = anio[filas].astype(int)
+    largo = largo[filas]
+    df_raw = pd.DataFrame(
+        {
+            "Anio": anio.to_numpy(),
+            "Sexo": _por_nombre(largo, sexo),
+            "Edad": _por_nombre(largo, edad.map(EDADES_POBLACION).fillna(edad)),
+            "Poblacion": largo["Valor"].astype(float).to_numpy(),
+        }
+    )
+    return df_raw.groupby(["Anio", "Sexo", "Edad"], as_index=False, observed=True)[
+        "Poblacion"
+    ].mean()
+
+
+CCAA_INE = [
+    "Total Nacional",
+    "Andalucía",
+    "Aragón",
+    "Asturias, Principado de",
+    "Balears, Illes",
+    "Canarias",
+    "Cantabria",
+    "Castilla y León",
+    "Castilla - La Mancha",
+    "Cataluña",
+    "Comunitat Valenciana",
+    "Extremadura",
+    "Galicia",
+    "Madrid, Comunidad de",
+    "Murcia, Región de",
+    "Navarra, Comunidad Foral de",
+    "País Vasco",
+    "Rioja, La",
+    "Ceuta",
+    "Melilla",
+]
+SEXOS_INE = ["Ambos sexos", "Hombres", "Mujeres"]
+
+
+def _ccaa_sexo_edad(nombre: str):
+    """(CCAA, sexo, edad) de un nombre de serie 66014; se evalúa por nombre único."""
+    ccaa = sexo = edad = None
+    for parte in (p.strip() for p in nombre.split(".")):
+        if not parte:
+            continue
+        if any(c in parte for c in CCAA_INE):
+            ccaa = parte
+        elif any(s in parte for s in SEXOS_INE):
+            sexo = parte
+        elif "Personas" not in parte and parte not in [
+            "Total Nacional",
+            "Ambos sexos",
+            "Hombres",
+            "Mujeres",
+        ]:
+            edad = parte
+    return ccaa, sexo, edad
+
+
+def transformar_poblacion_ccaa(data: list) -> pd.DataFrame:
+    """Población por CCAA, sexo y edad (66014), en personas."""
+    largo = aplanar_series(data, campos=("Anyo", "Valor"))
+    atributos = pd.DataFrame(
+        [_ccaa_sexo_edad(n) for n in _nombres(largo)], columns=["CCAA", "Sexo", "Edad"]
+    )
+    filas = _filas_validas(largo, atributos.notna().all(axis=1))
+    filas &= (_no_vacio(largo["Anyo"]) & _no_vacio(largo["Valor"])).to_numpy()
+    if not filas.any():
+        return pd.DataFrame(columns=COLUMNAS_VACIAS["df_poblacion_ccaa_edad"])
+
+    largo = largo[filas].reset_index(drop=True)
+    return pd.DataFrame(
+        {
+            "Anio": largo["Anyo"].astype(str).str[:4].astype(int),
+            "CCAA": _por_nombre(largo, atributos["CCAA"]),
+            "Sexo": _por_nombre(largo, atributos["Sexo"]),
+            "Edad": _por_nombre(largo, atributos["Edad"]),
+            "Poblacion": largo["Valor"].astype(float) * 1000,
+        }
+    )
+
+
+def transformar_arope_ccaa(data: list) -> pd.DataFrame:
+    """AROPE por CCAA (29288), filtrado a indicadores de pobreza/exclusión."""
+    largo = aplanar_series(data, campos=("Anyo", "Valor"))
+    partes = _nombres(largo).str.split(".")
+    filas = _filas_validas(largo, partes.str.len() >= 3)
+    filas &= (_no_vacio(largo["Anyo"]) & _no_vacio(largo["Valor"])).to_numpy()
+    if not filas.any():
+        return pd.DataFrame(columns=COLUMNAS_VACIAS["df_arope_ccaa"])
+
+    largo = largo[filas].reset_index(drop=True)
+    df = pd.DataFrame(
+        {
+            "Anio": largo["Anyo"].astype(str).str[:4].astype(int),
+            "CCAA": _por_nombre(largo, _parte(partes, 0)),
+            "Indicador": _por_nombre(largo, _parte(partes, 2)),
+            "Valor": largo["Valor"].astype(float),
+        }
+    )
+    df_filtrado = df[
+        df["Indicador"].str.contains(
+            "AROPE|riesgo de pobreza|exclusión social", case=False, na=False
+        )
+    ]
+    return df_filtrado if not df_filtrado.empty else df.copy()
+
+
+def _tipo_valor_epf(nombre: str) -> str:
+    if "Dato base." not in nombre:
+        return "Gasto_Medio"
+    partes_despues = nombre.split("Dato base.")[-1]
+    resto = re.sub(r"Quintil\s*(\d+|Total)\s*\.?\s*$", "", partes_despues).strip()
+    if "Gasto medio por hogar" in resto:
+        return "Gasto_Hogar"
+    if "Gasto medio por persona" in resto:
+        return "Gasto_Persona"
+    if "Distribución (porcentajes horizontales)" in resto:
+        return "Distribucion_H"
+    if "Distribución (porcentajes verticales)" in resto:
+        return "Distribucion_V"
+    return "Gasto_Medio"
+
+
+def transformar_epf_gasto(data: list) -> pd.DataFrame:
+    """Gasto medio por hogar y quintil (EPF 24900)."""
+    largo = aplanar_series(data, campos=("Anyo", "Valor"))
+    filas = (_no_vacio(largo["Anyo"]) & largo["Valor"].notna()).to_numpy()
+    if not filas.any():
+        return pd.DataFrame(columns=COLUMNAS_VACIAS["df_epf_gasto"])
+
+    largo = largo[filas].reset_index(drop=True)
+    nombres = _nombres(largo)
+    quintil = nombres.str.extract(r"Quintil\s*(\d+)", flags=re.IGNORECASE, expand=False)
+    quintil = ("Q" + quintil).fillna("Total")
+    con_grupo = _contiene(nombres, "Total Nacional.") & _contiene(nombres, "Dato base.")
+    grupo = (
+        nombres.str.split("Total Nacional.", regex=False)
+        .str[-1]
+        .str.split("Dato base.", regex=False)
+        .str[0]
+        .str.strip()
+        .str.replace(" ", "_", regex=False)
+    )
+    return pd.DataFrame(
+        {
+            "Anio": largo["Anyo"].astype(str).str[:4].astype(int),
+            "Quintil": _por_nombre(largo, quintil),
+            "Grupo_Gasto": _por_nombre(largo, grupo.where(con_grupo, "Índice_General")),
+            "Tipo_Valor": _por_nombre(largo, nombres.map(_tipo_valor_epf)),
+            "Valor": largo["Valor"].astype(float),
+        }
+    )
+
+
+def _largo_ipc_sectorial(largo: pd.DataFrame) -> pd.DataFrame:
+    nombres = _nombres(largo).str.strip()
+    partes = nombres.str.replace("Total Nacional. ", "", regex=False).str.rsplit(
+        ". ", n=1
+    )
+    nombre_valido = nombres.str.startswith("Total Nacional. ") & (partes.str.len() == 2)
+    filas = _filas_validas(largo, nombre_valido)
+    filas &= largo["NombrePeriodo"].notna().to_numpy()
+    largo = largo[filas].reset_index(drop=True)
+    return pd.DataFrame(
+        {
+            "Anio": largo["NombrePeriodo"].astype(int),
+            "Categoria_ECOICOP": _por_nombre(largo, _parte(partes, 0)),
+            "Tipo_Metrica": _por_nombre(largo, partes.str[1].str.rstrip(". ")),
+            "IPC_Indice": largo["Valor"].astype(float),
+        }
+    )
+
+
+def _largo_ipc_sectorial_fallback(largo: pd.DataFrame) -> pd.DataFrame:
+    """Heurística del notebook: aceptar cualquier 'Nombre' partiendo por el último '. '."""
+    nombres = _nombres(largo).str.strip()
+    partes = nombres.str.rsplit(". ", n=1)
+    dos_partes = partes.str.len() == 2
+    categoria = _parte(partes, 0).where(dos_partes, nombres)
+    tipo_metrica = partes.str[1].str.rstrip(". ").str.strip().where(dos_partes, "")
+
+    periodo = largo["NombrePeriodo"].where(
+        _no_vacio(largo["NombrePeriodo"]), largo["Anyo"]
+    )
+    anio = pd.to_numeric(periodo.astype(str).str[:4], errors="coerce")
+    valor = pd.to_numeric(largo["Valor"], errors="coerce")
+    filas = (_no_vacio(periodo) & anio.notna() & valor.notna()).to_numpy()
+    largo = largo[filas]
+    return pd.DataFrame(
+        {
+            "Anio": anio[filas].astype(int).to_numpy(),
+            "Categoria_ECOICOP": _por_nombre(largo, categoria),
+            "Tipo_Metrica": _por_nombre(largo, tipo_metrica),
+            "IPC_Indice": valor[filas].to_numpy(),
+        }
+    )
+
+
+def _anadir_inflacion_sectorial(df_anual: pd.DataFrame) -> pd.DataFrame:
+    df_anual["Inflacion_Sectorial_%"] = pd.NA
+    mask_variacion = (
+        df_anual["Tipo_Metrica"]
+        .astype(str)
+        .str.lower()
+        .str.contains("variación", na=False)
+    )
+    df_anual.loc[mask_variacion, "Inflacion_Sectorial_%"] = df_anual.loc[
+        mask_variacion, "IPC_Indice"
+    ]
+    # Categorías sin 'variación': variación anual calculada a partir del índice
+    for cat in df_anual["Categoria_ECOICOP"].unique():
+        cat_idx = df_anual["Categoria_ECOICOP"] == cat
+        sub = df_anual.loc[cat_idx].sort_values("Anio")
+        if sub["Inflacion_Sectorial_%"].isna().all():
+            vals = sub["IPC_Indice"].astype(float).pct_change() * 100
+            df_anual.loc[cat_idx, "Inflacion_Sectorial_%"] = vals.values
+    return df_anual
+
+
+def transformar_ipc_sectorial(data: list) -> pd.DataFrame:
+    """IPC sectorial ECOICOP (50902): media anual e inflación sectorial."""
+    largo = aplanar_series(data)
+    df = _largo_ipc_sectorial(largo)
+    if df.empty and len(largo):
+        print("[WARN] IPC sectorial sin series 'Total Nacional'; usando fallback")
+        df = _largo_ipc_sectorial_fallback(largo)
+    if df.empty:
+        return pd.DataFrame(columns=COLUMNAS_VACIAS["df_ipc_sectorial"])
+
+    df_anual = df.groupby(
+        ["Anio", "Categoria_ECOICOP", "Tipo_Metrica"], as_index=False, observed=True
+    )["IPC_Indice"].mean()
+    df_anual = df_anual.sort_values(by=["Categoria_ECOICOP", "Tipo_Metrica", "Anio"])
+    return _anadir_inflacion_sectorial(df_anual)
+
+
+TRANSFORMACIONES_INE: Dict[str, Callable[[list], pd.DataFrame]] = {
+    "df_ipc_anual": transformar_ipc_anual,
+    "df_umbral_limpio": transformar_umbral,
+    "df_carencia_material": transformar_carencia,
+    "df_arope_edad_sexo": transformar_arope_edad_sexo,
+    "df_arope_hogar": transformar_arope_hogar,
+    "df_arope_laboral": transformar_arope_laboral,
+    "df_gini_ccaa": transformar_gini_ccaa,
+    "df_renta_decil": transformar_renta_decil,
+    "df_poblacion": transformar_poblacion,
+    "df_poblacion_ccaa_edad": transformar_poblacion_ccaa,
+    "df_arope_ccaa": transformar_arope_ccaa,
+    "df_epf_gasto": transformar_epf_gasto,
+    "df_ipc_sectorial": transformar_ipc_sectorial,
+}
+
+
+# =============================================================================
+# ORQUESTACIÓN
+# =============================================================================
+
+
+def transformar_resultado(clave: str, resultado: ResultadoDescarga) -> pd.DataFrame:
+    """
+    Aplica la transformación de la tabla a una descarga correcta.
+
+    Si el cuerpo está en disco se lee como flujo (una serie cada vez) en vez
+    de cargar la lista completa de series con `json`.
+    """
+    if resultado.en_disco and streaming.disponible():
+        with resultado.abrir() as f:
+            return TRANSFORMACIONES_INE[clave](streaming.iterar_series_ine(f))
+    return TRANSFORMACIONES_INE[clave](resultado.json())
+
+
+def extraer_ine(
+    tablas: Optional[Iterable[str]] = None,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    cache_dir: Optional[Path] = None,
+    guardar: bool = True,
+    session=None,
+    flujo: Optional[bool] = None,
+    **kwargs_descarga,
+) -> Dict[str, pd.DataFrame]:
+    """
+    Descarga en paralelo y transforma las tablas INE configuradas.
+
+    Args:
+        tablas: Claves de `TABLAS_INE` a extraer (todas si None)
+        max_workers: Número máximo de descargas simultáneas
+        cache_dir: Directorio del almacén de tablas (por defecto `CACHE_DIR`)
+        guardar: Si True, escribe `<clave>.parquet` en `cache_dir`
+        session: Sesión HTTP compartida opcional
+        flujo: Volcar las respuestas a disco y leerlas como flujo (por defecto,
+            si `ijson` está instalado)
+        **kwargs_descarga: timeout / reintentos / backoff / cache para `descargar_varias`
+
+    Returns:
+        Diccionario {clave: DataFrame}
+    """
+    tablas = list(tablas) if tablas is not None else list(TABLAS_INE)
+    desconocidas = [t for t in tablas if t not in TABLAS_INE]
+    if desconocidas:
+        raise ValueError(f"Tablas INE no configuradas: {desconocidas}")
+
+    cache_dir = Path(cache_dir) if cache_dir is not None else CACHE_DIR
+    if guardar:
+        ensure_dir(cache_dir)
+
+    peticiones = {t: url_tabla_ine(TABLAS_INE[t]) for t in tablas}
+    kwargs_descarga.setdefault(
+        "en_disco", streaming.disponible() if flujo is None else flujo
+    )
+    resultados = descargar_varias(
+        peticiones, max_workers=max_workers, session=session, **kwargs_descarga
+    )
+    imprimir_resumen_descargas(resultados)
+
+    dataframes = {}
+    for clave in tablas:
+        resultado = resultados[clave]
+        try:
+            if not resultado.ok:
+                raise RuntimeError(resultado.error)
+            df = transformar_resultado(clave, resultado)
+        except Exception as e:
+            print(f"[ERR] {clave}: {e}")
+            df = pd.DataFrame(columns=COLUMNAS_VACIAS[clave])
+        dataframes[clave] = df
+        if guardar:
+            ruta = guardar_tabla(df, clave, cache_dir, etapa="ine", compactar=True)
+            print(f"  [OK] {clave}: {len(df)} registros -> {ruta.name}")
+
+    return dataframes
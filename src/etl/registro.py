@@ -0,0 +1,371 @@
+"""
+Registro declarativo de fuentes del ETL
+=======================================
+
+Una entrada (`Fuente`) por tabla SQL: de qué servicio sale (INE / Eurostat), el
+código de tabla o dataset, la función que la parsea, los filtros, la tabla
+intermedio (`clave_cache`) y la tabla de destino en 01c. Los notebooks y el CLI
+(`python -m src.etl`) leen este registro en lugar de mantener sus propias listas.
+
+Las tablas Eurostat España / UE27 / Ranking de un mismo indicador comparten una
+única descarga (el ranking con todas las geografías) y se derivan filtrando
+`geo_code`, igual que en 01b. Lo mismo con el impacto redistributivo: una sola
+extracción de todos los países alimenta las tablas España y UE27.
+
+Uso:
+    from src.etl.registro import REGISTRO, extraer_fuentes, seleccionar
+    extraer_fuentes(seleccionar(["INE_Gini_S80S20_CCAA"]), jobs=8)
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+import pandas as pd
+
+from src.almacen import EXTENSION, guardar_tabla
+from src.config import CACHE_DIR, ensure_dir
+from src.etl import streaming
+from src.etl.descarga import crear_sesion, descargar
+from src.etl.eurostat import extraer_dataset_eurostat, extraer_impacto_redistributivo
+from src.etl.ine import (
+    COLUMNAS_VACIAS,
+    TABLA_VALIDACION_INE,
+    TABLAS_INE,
+    TRANSFORMACIONES_INE,
+    transformar_resultado,
+    url_tabla_ine,
+)
+
+ORIGENES = ("INE", "EUROSTAT")
+
+# Ventana de años de las tablas Eurostat (celda de configuración de 01b)
+ANIO_DESDE_EUROSTAT, ANIO_HASTA_EUROSTAT = 2015, 2024
+GEO_ESPANA, GEO_UE27 = "ES", "EU27_2020"
+COLUMNAS_DEPURACION = ["age", "age_label", "sex", "sex_label"]
+
+
+class Fuente:
+    """Una tabla de salida del ETL y cómo se obtiene."""
+
+    def __init__(
+        self,
+        tabla_sql: str,
+        origen: str,
+        codigo: str,
+        clave_cache: str,
+        parser: Callable,
+        filtros: Optional[Dict[str, Optional[str]]] = None,
+        value_name: Optional[str] = None,
+        geo: Optional[str] = None,
+        descartar: Iterable[str] = (),
+    ):
+        """
+        Args:
+            tabla_sql: Tabla de destino en SQL (y en utils/validation_rules.py)
+            origen: 'INE' o 'EUROSTAT'
+            codigo: Tabla wstempus o dataset Eurostat
+            clave_cache: Nombre de la tabla en el almacén de CACHE_DIR
+            parser: Transformación INE, o función de extracción Eurostat
+            filtros: Argumentos filter_* de la extracción Eurostat
+            value_name: Columna de valores (Eurostat)
+            geo: geo_code con el que se filtra la descarga compartida (ES / UE27)
+            descartar: Columnas que se eliminan antes de guardar
+        """
+        if origen not in ORIGENES:
+            raise ValueError(f"Origen desconocido: {origen}")
+        self.tabla_sql = tabla_sql
+        self.origen = origen
+        self.codigo = codigo
+        self.clave_cache = clave_cache
+        self.parser = parser
+        self.filtros = dict(filtros or {})
+        self.value_name = value_name
+        self.geo = geo
+        self.descartar = list(descartar)
+
+    @property
+    def clave_descarga(self) -> tuple:
+        """Fuentes con la misma clave comparten descarga y parseo."""
+        return (
+            self.origen,
+            self.codigo,
+            self.parser.__name__,
+            tuple(sorted(self.filtros.items())),
+            self.value_name,
+        )
+
+    def __repr__(self) -> str:
+        return f"Fuente({self.tabla_sql!r}, {self.origen}, {self.codigo!r})"
+
+
+def _fuentes_ine() -> List[Fuente]:
+    return [
+        Fuente(
+            TABLA_VALIDACION_INE[clave],
+            "INE",
+            TABLAS_INE[clave],
+            clave,
+            TRANSFORMACIONES_INE[clave],
+        )
+        for clave in TABLAS_INE
+    ]
+
+
+# (indicador SQL, prefijo de caché, clave de caché del ranking, dataset, columna, filtros)
+INDICADORES_EUROSTAT = [
+    ("Gini", "df_gini", "df_gini_todos", "ilc_di12", "Gini", {"filter_unit": "PC"}),
+    (
+        "AROP",
+        "df_arop",
+        "df_arop_eu_todos",
+        "ilc_li02",
+        "AROP_%",
+        {"filter_unit": "PC", "filter_indic": "LI_R_MD60"},
+    ),
+    (
+        "S80S20",
+        "df_s80s20",
+        "df_s80s20_todos",
+        "ilc_di11",
+        "S80S20_Ratio",
+        {"filter_unit": "RAT"},
+    ),
+    (
+        "Brecha_Pobreza",
+        "df_gap",
+        "df_gap_todos",
+        "sdg_10_30",
+        "Brecha_Pobreza_%",
+        {"filter_age": "TOTAL", "filter_sex": "T"},
+    ),
+]
+
+
+def _fuentes_eurostat() -> List[Fuente]:
+    fuentes = []
+    for (
+        indicador,
+        prefijo,
+        clave_todos,
+        codigo,
+        columna,
+        filtros,
+    ) in INDICADORES_EUROSTAT:
+        filtros = {"filter_age": "TOTAL", "filter_sex": "T", **filtros}
+        comun = dict(
+            codigo=codigo,
+            parser=extraer_dataset_eurostat,
+            filtros={"filter_geo": None, **filtros},
+            value_name=columna,
+        )
+        fuentes += [
+            Fuente(
+                f"EUROSTAT_{indicador}_Espana",
+                "EUROSTAT",
+                clave_cache=f"{prefijo}_es",
+                geo=GEO_ESPANA,
+                **comun,
+            ),
+            Fuente(
+                f"EUROSTAT_{indicador}_UE27",
+                "EUROSTAT",
+                clave_cache=f"{prefijo}_ue27",
+                geo=GEO_UE27,
+                **comun,
+            ),
+            Fuente(
+                f"EUROSTAT_{indicador}_Ranking",
+                "EUROSTAT",
+                clave_cache=clave_todos,
+                descartar=COLUMNAS_DEPURACION,
+                **comun,
+            ),
+        ]
+    for geo, sufijo, tabla in [
+        (GEO_ESPANA, "es", "Espana"),
+        (GEO_UE27, "ue27", "UE27"),
+    ]:
+        fuentes.append(
+            Fuente(
+                f"EUROSTAT_Impacto_Redistributivo_{tabla}",
+                "EUROSTAT",
+                "ilc_di12b+ilc_di12c+ilc_di12",
+                f"df_impacto_redistrib_{sufijo}",
+                extraer_impacto_redistributivo,
+                geo=geo,
+                descartar=COLUMNAS_DEPURACION,
+            )
+        )
+    return fuentes
+
+
+# Tabla SQL -> Fuente, en el orden de carga de 01c
+REGISTRO: Dict[str, Fuente] = {
+    f.tabla_sql: f for f in _fuentes_ine() + _fuentes_eurostat()
+}
+
+
+def tablas_sql(origen: Optional[str] = None) -> Dict[str, str]:
+    """{tabla SQL: clave de caché} (lo que 01c carga desde el almacén)."""
+    return {
+        t: f.clave_cache
+        for t, f in REGISTRO.items()
+        if origen is None or f.origen == origen
+    }
+
+
+def seleccionar(
+    solo: Optional[Iterable[str]] = None, origen: Optional[str] = None
+) -> List[Fuente]:
+    """
+    Fuentes del registro por tabla SQL o clave de caché, y/o por origen.
+
+    Raises:
+        ValueError: Si algún nombre no está en el registro
+    """
+    fuentes = list(REGISTRO.values())
+    if origen is not None:
+        origen = origen.upper()
+        if origen not in ORIGENES:
+            raise ValueError(f"Origen desconocido: {origen} (válidos: {ORIGENES})")
+        fuentes = [f for f in fuentes if f.origen == origen]
+    if solo is None:
+        return fuentes
+    por_nombre = {}
+    for f in fuentes:
+        por_nombre[f.tabla_sql.lower()] = f
+        por_nombre[f.clave_cache.lower()] = f
+    desconocidas = [n for n in solo if n.lower() not in por_nombre]
+    if desconocidas:
+        raise ValueError(f"Fuentes no registradas: {desconocidas}")
+    elegidas = {por_nombre[n.lower()].tabla_sql for n in solo}
+    return [f for f in fuentes if f.tabla_sql in elegidas]
+
+
+# =============================================================================
+# EJECUCIÓN
+# =============================================================================
+
+
+def _ejecutar_ine(fuente: Fuente, session, **kwargs_descarga) -> pd.DataFrame:
+    kwargs_descarga.setdefault("en_disco", streaming.disponible())
+    resultado = descargar(
+        session, fuente.clave_cache, url_tabla_ine(fuente.codigo), **kwargs_descarga
+    )
+    if not resultado.ok:
+        raise RuntimeError(resultado.error)
+    return transformar_resultado(fuente.clave_cache, resultado)
+
+
+def _ejecutar_eurostat(fuente: Fuente, session, **kwargs_descarga) -> pd.DataFrame:
+    kwargs = dict(fuente.filtros, session=session, **kwargs_descarga)
+    if fuente.parser is extraer_dataset_eurostat:
+        kwargs.update(desde=ANIO_DESDE_EUROSTAT, hasta=ANIO_HASTA_EUROSTAT)
+        return fuente.parser(fuente.codigo, fuente.value_name, **kwargs)
+    return fuente.parser(**kwargs)
+
+
+def _derivar(fuente: Fuente, df: pd.DataFrame) -> pd.DataFrame:
+    """Subconjunto geográfico y limpieza de columnas de una descarga compartida."""
+    if fuente.geo is not None:
+        if df.empty:
+            return pd.DataFrame()
+        df = df[df["geo_code"] == fuente.geo].reset_index(drop=True)
+    cols_drop = [c for c in fuente.descartar if c in df.columns]
+    return df.drop(columns=cols_drop) if cols_drop else df
+
+
+def _vacio(fuente: Fuente) -> pd.DataFrame:
+    if fuente.origen == "INE":
+        return pd.DataFrame(columns=COLUMNAS_VACIAS[fuente.clave_cache])
+    return pd.DataFrame()
+
+
+def extraer_fuentes(
+    fuentes: Iterable[Fuente],
+    jobs: int = 8,
+    cache_dir: Optional[Path] = None,
+    guardar: bool = True,
+    session=None,
+    **kwargs_descarga,
+) -> Dict[str, pd.DataFrame]:
+    """
+    Extrae las fuentes en paralelo (en proceso) e informa del tiempo de cada una.
+
+    Las fuentes con la misma `clave_descarga` se resuelven con una sola
+    descarga; el tiempo que se informa es el de esa descarga compartida.
+
+    Args:
+        fuentes: Entradas del registro (ver `seleccionar`)
+        jobs: Número de descargas simultáneas
+        cache_dir: Directorio del almacén de tablas (por defecto `CACHE_DIR`)
+        guardar: Si True, escribe `<clave_cache>.parquet`
+        session: Sesión HTTP compartida (se crea una si no se indica)
+        **kwargs_descarga: timeout / reintentos / backoff / cache / en_disco
+
+    Returns:
+        Diccionario {tabla SQL: DataFrame}
+    """
+    fuentes = list(fuentes)
+    cache_dir = Path(cache_dir) if cache_dir is not None else CACHE_DIR
+    if guardar:
+        ensure_dir(cache_dir)
+    grupos: Dict[tuple, List[Fuente]] = {}
+    for f in fuentes:
+        grupos.setdefault(f.clave_descarga, []).append(f)
+
+    propia = session is None
+    if propia:
+        session = crear_sesion(pool_size=max(1, jobs))
+
+    def _tarea(fuente: Fuente):
+        inicio = time.perf_counter()
+        ejecutar = _ejecutar_ine if fuente.origen == "INE" else _ejecutar_eurostat
+        try:
+            df, error = ejecutar(fuente, session, **kwargs_descarga), None
+        except Exception as e:
+            df, error = None, f"{type(e).__name__}: {e}"
+        return df, error, time.perf_counter() - inicio
+
+    print(
+        f"[INFO] Extrayendo {len(fuentes)} fuentes ({len(grupos)} descargas, {jobs} en paralelo)"
+    )
+    inicio_total = time.perf_counter()
+    dataframes, tiempos = {}, {}
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+            futuros = {
+                pool.submit(_tarea, grupo[0]): grupo for grupo in grupos.values()
+            }
+            for futuro in as_completed(futuros):
+                df, error, segundos = futuro.result()
+                for fuente in futuros[futuro]:
+                    tiempos[fuente.tabla_sql] = segundos
+                    if error is not None:
+                        print(f"  [ERR] {fuente.tabla_sql}: {error}")
+                        dataframes[fuente.tabla_sql] = _vacio(fuente)
+                    else:
+                        dataframes[fuente.tabla_sql] = _derivar(fuente, df)
+    finally:
+        if propia:
+            session.close()
+
+    for fuente in fuentes:
+        df = dataframes[fuente.tabla_sql]
+        if guardar:
+            guardar_tabla(
+                df,
+                fuente.clave_cache,
+                cache_dir,
+                etapa=f"registro_{fuente.origen.lower()}",
+                compactar=True,
+            )
+        estado = "[OK]" if len(df) else "[WARN]"
+        print(
+            f"  {estado} {fuente.tabla_sql}: {len(df)} filas, "
+            f"{tiempos[fuente.tabla_sql]:.2f}s -> {fuente.clave_cache}{EXTENSION}"
+        )
+    print(f"[INFO] {len(fuentes)} fuentes en {time.perf_counter() - inicio_total:.2f}s")
+    return {f.tabla_sql: dataframes[f.tabla_sql] for f in fuentes}
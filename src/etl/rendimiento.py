@@ -0,0 +1,115 @@
+"""
+Benchmark de la etapa de extracción contra `ServidorLocal`
+==========================================================
+
+`medir_extraccion` ejecuta el registro de fuentes contra el servidor local:
+
+- Por fuente (cada descarga compartida, en serie): tiempo, peticiones/s, MB
+  servidos y pico de memoria (`tracemalloc`, que añade sobrecoste al tiempo).
+- Etapa completa (todas las fuentes con `jobs` hilos, sin trazas): tiempo,
+  peticiones/s y MB/s.
+
+`comparar_con_referencia` marca como regresión cualquier métrica de
+rendimiento que caiga más de `umbral` respecto a una ejecución de referencia
+guardada (ver `scripts/benchmark_extraccion.py`).
+"""
+
+import time
+import tracemalloc
+from typing import Dict, Iterable, List, Optional
+
+from src.etl.registro import Fuente, extraer_fuentes, seleccionar
+from src.etl.servidor_local import ServidorLocal
+
+DEFAULT_UMBRAL_REGRESION = 0.20  # caída relativa tolerada de peticiones/s
+
+
+def _medida(segundos: float, peticiones: int, n_bytes: int) -> Dict[str, float]:
+    return {
+        "segundos": round(segundos, 4),
+        "peticiones": peticiones,
+        "peticiones_s": round(peticiones / max(segundos, 1e-9), 2),
+        "mb": round(n_bytes / 1e6, 3),
+        "mb_s": round(n_bytes / 1e6 / max(segundos, 1e-9), 3),
+    }
+
+
+def _ejecutar(servidor: ServidorLocal, fuentes: List[Fuente], jobs: int, trazar: bool):
+    servidor.reiniciar_contadores()
+    session = servidor.sesion(pool_size=jobs)
+    if trazar:
+        tracemalloc.start()
+    inicio = time.perf_counter()
+    try:
+        dfs = extraer_fuentes(fuentes, jobs=jobs, guardar=False, session=session)
+        segundos = time.perf_counter() - inicio
+        pico = tracemalloc.get_traced_memory()[1] if trazar else None
+    finally:
+        if trazar:
+            tracemalloc.stop()
+        session.close()
+    medida = _medida(segundos, servidor.peticiones, servidor.bytes_servidos)
+    medida["filas"] = int(sum(len(df) for df in dfs.values()))
+    if pico is not None:
+        medida["pico_mb"] = round(pico / 1e6, 2)
+    return medida, dfs
+
+
+def medir_extraccion(
+    servidor: ServidorLocal,
+    fuentes: Optional[Iterable[Fuente]] = None,
+    jobs: int = 8,
+    por_fuente: bool = True,
+) -> Dict[str, dict]:
+    """
+    Mide la extracción de `fuentes` (todo el registro si None).
+
+    Returns:
+        {"etapa": medida, "fuentes": {tabla SQL: medida}}; cada medida tiene
+        segundos, peticiones, peticiones_s, mb, mb_s, filas (y pico_mb por fuente)
+    """
+    fuentes = list(fuentes) if fuentes is not None else seleccionar()
+    etapa, _ = _ejecutar(servidor, fuentes, jobs, trazar=False)
+    resultado = {"etapa": etapa, "fuentes": {}}
+    if por_fuente:
+        grupos: Dict[tuple, List[Fuente]] = {}
+        for f in fuentes:
+            grupos.setdefault(f.clave_descarga, []).append(f)
+        for grupo in grupos.values():
+            # Las fuentes de una descarga compartida comparten tiempo y memoria
+            medida, dfs = _ejecutar(servidor, grupo, jobs=1, trazar=True)
+            for f in grupo:
+                resultado["fuentes"][f.tabla_sql] = {
+                    **medida,
+                    "filas": len(dfs[f.tabla_sql]),
+                }
+    return resultado
+
+
+def comparar_con_referencia(
+    actual: Dict[str, dict],
+    referencia: Dict[str, dict],
+    umbral: float = DEFAULT_UMBRAL_REGRESION,
+) -> List[str]:
+    """
+    Regresiones de peticiones/s frente a la referencia.
+
+    Returns:
+        Lista de mensajes (vacía si no hay regresiones)
+    """
+    medidas = [("etapa", actual["etapa"], referencia.get("etapa"))]
+    medidas += [
+        (tabla, medida, referencia.get("fuentes", {}).get(tabla))
+        for tabla, medida in actual.get("fuentes", {}).items()
+    ]
+    regresiones = []
+    for nombre, medida, ref in medidas:
+        if not ref or not ref.get("peticiones_s"):
+            continue
+        caida = 1 - medida["peticiones_s"] / ref["peticiones_s"]
+        if caida > umbral:
+            regresiones.append(
+                f"{nombre}: {medida['peticiones_s']:.1f} peticiones/s frente a "
+                f"{ref['peticiones_s']:.1f} (-{caida:.0%}, umbral {umbral:.0%})"
+            )
+    return regresiones
@@ -0,0 +1,218 @@
+"""
+Servidor HTTP local que sustituye a INE / Eurostat en tests y benchmarks
+========================================================================
+
+Sirve payloads grabados (la caché bruta de `cache_http.py`) o sintéticos
+(`sinteticos.py`, escalables) con latencia y ancho de banda configurables, de
+modo que la etapa de extracción completa se puede medir y someter a tests de
+regresión sin red.
+
+Las URLs reales no cambian: `ServidorLocal.sesion()` devuelve una sesión
+`requests` que redirige cada petición al servidor local conservando el origen
+en la cabecera `X-Origen`; el servidor reconstruye la URL real y la busca en
+sus rutas (coincidencia exacta, o por segmento de ruta para los datasets
+Eurostat con clave SDMX) y, si no está, en la caché bruta.
+
+Uso:
+    with ServidorLocal(latencia=0.05, ancho_banda=5e6) as servidor:
+        servidor.registrar_payloads(payloads_sinteticos(escala=4))
+        extraer_fuentes(seleccionar(), session=servidor.sesion(8))
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qsl, urlsplit
+
+import requests
+
+from src.etl.cache_http import CacheHTTP
+from src.etl.descarga import DEFAULT_MAX_WORKERS, crear_sesion
+from src.etl.eurostat import DATASETS_REDISTRIBUTIVOS, URL_EUROSTAT
+from src.etl.ine import TABLAS_INE, url_tabla_ine
+from src.etl.sinteticos import generar_ine_tabla, generar_sdmx_sintetico
+
+TAM_BLOQUE_ENVIO = 64 * 1024  # bytes por escritura al limitar el ancho de banda
+CABECERA_ORIGEN = "X-Origen"
+
+# Datasets Eurostat que extrae el registro de fuentes
+DATASETS_EUROSTAT = ["ilc_di12", "ilc_li02", "ilc_di11", "sdg_10_30"] + [
+    codigo for codigo, _ in DATASETS_REDISTRIBUTIVOS if codigo != "ilc_di12"
+]
+
+
+def payloads_sinteticos(escala: int = 1, seed: int = 0) -> Dict[str, bytes]:
+    """
+    {URL real: cuerpo JSON} para todas las tablas INE y datasets Eurostat.
+
+    `escala` multiplica las series INE y las geografías Eurostat (≈ tamaño del
+    payload y trabajo de parseo).
+    """
+    payloads = {
+        url_tabla_ine(tabla): generar_ine_tabla(clave, escala=escala, seed=seed)
+        for clave, tabla in TABLAS_INE.items()
+    }
+    for codigo in DATASETS_EUROSTAT:
+        payloads[f"{URL_EUROSTAT}/{codigo}"] = generar_sdmx_sintetico(
+            n_geo=40 * escala,
+            anios=range(2003, 2025),
+            units=("PC", "RAT"),
+            indicadores=("LI_R_MD60",),
+            seed=seed,
+        )
+    return {
+        url: json.dumps(p, ensure_ascii=False).encode("utf-8")
+        for url, p in payloads.items()
+    }
+
+
+class SesionLocal(requests.Session):
+    """Sesión que envía todas las peticiones al servidor local."""
+
+    def __init__(self, url_base: str):
+        super().__init__()
+        self.url_base = url_base
+
+    def request(self, method, url, *args, **kwargs):
+        partes = urlsplit(url)
+        cabeceras = dict(kwargs.pop("headers", None) or {})
+        cabeceras[CABECERA_ORIGEN] = f"{partes.scheme}://{partes.netloc}"
+        local = (
+            self.url_base + partes.path + (f"?{partes.query}" if partes.query else "")
+        )
+        return super().request(method, local, *args, headers=cabeceras, **kwargs)
+
+
+class ServidorLocal:
+    """Servidor HTTP en un hilo con rutas {URL real: payload}."""
+
+    def __init__(
+        self,
+        latencia: float = 0.0,
+        ancho_banda: Optional[float] = None,
+        cache: Optional[CacheHTTP] = None,
+    ):
+        """
+        Args:
+            latencia: Segundos de espera antes de responder cada petición
+            ancho_banda: Bytes/s por conexión (None = sin límite)
+            cache: Caché bruta de la que servir respuestas grabadas
+        """
+        self.latencia = latencia
+        self.ancho_banda = ancho_banda
+        self.cache = cache
+        self.rutas: Dict[str, bytes] = {}
+        self.peticiones = 0
+        self.bytes_servidos = 0
+        self._lock = threading.Lock()
+        self._httpd: Optional[ThreadingHTTPServer] = None
+        self._hilo: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------------ rutas
+    def registrar(self, url: str, contenido: bytes):
+        """Sirve `contenido` para `url` y para las URLs que cuelgan de ella."""
+        self.rutas[url.rstrip("/")] = contenido
+
+    def registrar_payloads(self, payloads: Dict[str, bytes]):
+        for url, contenido in payloads.items():
+            self.registrar(url, contenido)
+
+    def _buscar(self, url: str, params: Dict[str, str]) -> Optional[bytes]:
+        ruta = url.rstrip("/")
+        while ruta:
+            if ruta in self.rutas:
+                return self.rutas[ruta]
+            if ruta.count("/") <= 2:
+                break
+            ruta = ruta.rsplit("/", 1)[0]
+        if self.cache is not None:
+            entrada = self.cache.buscar(url, params or None)
+            if entrada is not None:
+                return self.cache.leer(entrada)
+        return None
+
+    # -------------------------------------------------------------- contadores
+    def reiniciar_contadores(self):
+        with self._lock:
+            self.peticiones = 0
+            self.bytes_servidos = 0
+
+    def _contar(self, n_bytes: int):
+        with self._lock:
+            self.peticiones += 1
+            self.bytes_servidos += n_bytes
+
+    # ---------------------------------------------------------------- servidor
+    @property
+    def url_base(self) -> str:
+        host, puerto = self._httpd.server_address[:2]
+        return f"http://{host}:{puerto}"
+
+    def iniciar(self) -> "ServidorLocal":
+        servidor = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                partes = urlsplit(self.path)
+                origen = self.headers.get(CABECERA_ORIGEN, "")
+                params = dict(parse_qsl(partes.query))
+                contenido = servidor._buscar(origen + partes.path, params)
+                if servidor.latencia:
+                    time.sleep(servidor.latencia)
+                if contenido is None:
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    servidor._contar(0)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(contenido)))
+                self.end_headers()
+                servidor._enviar(self.wfile, contenido)
+                servidor._contar(len(contenido))
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._httpd.daemon_threads = True
+        self._hilo = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._hilo.start()
+        return self
+
+    def _enviar(self, wfile, contenido: bytes):
+        if not self.ancho_banda:
+            wfile.write(contenido)
+            return
+        vista = memoryview(contenido)
+        for inicio in range(0, len(vista), TAM_BLOQUE_ENVIO):
+            fin = inicio + TAM_BLOQUE_ENVIO
+            bloque = vista[inicio:fin]
+            wfile.write(bloque)
+            time.sleep(len(bloque) / self.ancho_banda)
+
+    def detener(self):
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def sesion(self, pool_size: int = DEFAULT_MAX_WORKERS) -> SesionLocal:
+        """Sesión keep-alive (como `crear_sesion`) dirigida a este servidor."""
+        plantilla = crear_sesion(pool_size)
+        session = SesionLocal(self.url_base)
+        for prefijo, adapter in plantilla.adapters.items():
+            session.mount(prefijo, adapter)
+        session.headers.update(plantilla.headers)
+        return session
+
+    def __enter__(self) -> "ServidorLocal":
+        return self.iniciar()
+
+    def __exit__(self, *exc):
+        self.detener()
@@ -0,0 +1,277 @@
+"""
+Payloads sintéticos INE / Eurostat
+==================================
+
+Generadores de respuestas con la misma forma que wstempus DATOS_TABLA y que el
+SDMX-JSON (JSON-stat) de Eurostat. Se usan en tests y benchmarks para medir el
+ETL sin depender de los servicios reales.
+"""
+
+from typing import Dict, List, Optional
+
+import numpy as np
+
+GEOS_BASE = [
+    "EU27_2020",
+    "ES",
+    "DE",
+    "FR",
+    "IT",
+    "PT",
+    "NL",
+    "BE",
+    "AT",
+    "SE",
+    "FI",
+    "DK",
+    "IE",
+    "PL",
+    "CZ",
+    "SK",
+    "HU",
+    "RO",
+    "BG",
+    "GR",
+    "HR",
+    "SI",
+    "EE",
+    "LV",
+    "LT",
+    "LU",
+    "MT",
+    "CY",
+]
+
+
+def _categoria(codigos: List[str], etiquetas: Optional[Dict[str, str]] = None) -> dict:
+    etiquetas = etiquetas or {}
+    return {
+        "category": {
+            "index": {c: i for i, c in enumerate(codigos)},
+            "label": {c: etiquetas.get(c, c) for c in codigos},
+        }
+    }
+
+
+def generar_sdmx_sintetico(
+    n_geo: int = 40,
+    anios: range = range(2003, 2025),
+    units: List[str] = ("PC", "THS_PER"),
+    indicadores: List[str] = ("LI_R_MD60", "LI_R_MD50", "LI_R_MD40"),
+    sexos: List[str] = ("T", "M", "F"),
+    edades: List[str] = ("TOTAL", "Y_LT18", "Y18-64", "Y_GE65"),
+    densidad: float = 0.9,
+    seed: int = 0,
+) -> dict:
+    """
+    Genera un payload JSON-stat con dimensiones [freq, unit, indic_il, sex, age, geo, time].
+
+    Args:
+        n_geo: Número de geografías (se completan con códigos ficticios)
+        densidad: Fracción de celdas con valor (el resto se omite, como en Eurostat)
+    """
+    rng = np.random.default_rng(seed)
+    geos = list(GEOS_BASE[:n_geo]) + [
+        f"X{i:03d}" for i in range(n_geo - len(GEOS_BASE))
+    ]
+    dims = {
+        "freq": _categoria(["A"]),
+        "unit": _categoria(list(units)),
+        "indic_il": _categoria(list(indicadores)),
+        "sex": _categoria(list(sexos), {"T": "Total", "M": "Males", "F": "Females"}),
+        "age": _categoria(list(edades)),
+        "geo": _categoria(geos, {"ES": "Spain", "EU27_2020": "European Union - 27"}),
+        "time": _categoria([str(a) for a in anios]),
+    }
+    size = [len(d["category"]["index"]) for d in dims.values()]
+    total = int(np.prod(size))
+    claves = np.flatnonzero(rng.random(total) < densidad)
+    valores = np.round(rng.uniform(5, 40, len(claves)), 1)
+    return {
+        "version": "2.0",
+        "class": "dataset",
+        "id": list(dims.keys()),
+        "size": size,
+        "value": {str(k): float(v) for k, v in zip(claves, valores)},
+        "dimension": dims,
+    }
+
+
+CCAA_SINTETICAS = ["Total Nacional", "Andalucía", "Cataluña", "Madrid, Comunidad de"]
+SEXOS_INE_SINTETICOS = ["Ambos sexos", "Hombres", "Mujeres"]
+
+INDICADORES_AROPE = [
+    "Tasa de riesgo de pobreza o exclusión social (AROPE)",
+    "En riesgo de pobreza (renta año anterior a la entrevista)",
+    "Con carencia material severa",
+    "Viviendo en hogares con baja intensidad en el trabajo",
+]
+SEXOS_AROPE = ["Ambos sexos", "Hombres", "Mujeres"]
+EDADES_AROPE = [
+    "Total",
+    "Menores de 16 años",
+    "De 16 a 29 años",
+    "De 30 a 44 años",
+    "De 45 a 64 años",
+    "65 y más años",
+]
+
+
+def generar_ine_sintetico(
+    n_series: int = 2000,
+    n_periodos: int = 500,
+    densidad: float = 0.95,
+    seed: int = 0,
+) -> list:
+    """
+    Genera una respuesta DATOS_TABLA con nombres al estilo de la tabla 29287.
+
+    Cada serie tiene `n_periodos` puntos mensuales (Anyo / NombrePeriodo / Valor
+    y los campos FK_* que devuelve wstempus); n_series * n_periodos observaciones.
+
+    Args:
+        densidad: Fracción de puntos con `Valor` (el resto llega como null)
+    """
+    rng = np.random.default_rng(seed)
+    combinaciones = [
+        (i, s, e) for i in INDICADORES_AROPE for s in SEXOS_AROPE for e in EDADES_AROPE
+    ]
+    data = []
+    for n in range(n_series):
+        indicador, sexo, edad = combinaciones[n % len(combinaciones)]
+        valores = np.round(rng.uniform(5, 45, n_periodos), 1)
+        nulos = rng.random(n_periodos) >= densidad
+        data.append(
+            {
+                "COD": f"ECV{n}",
+                "Nombre": f"Total Nacional. {indicador}. {sexo}. {edad}. Serie {n // len(combinaciones)}.",
+                "FK_Unidad": 135,
+                "FK_Escala": 1,
+                "Data": [
+                    {
+                        "Fecha": 946684800000 + j * 2629800000,
+                        "FK_TipoDato": 1,
+                        "FK_Periodo": j % 12 + 1,
+                        "Anyo": 2000 + j // 12,
+                        "NombrePeriodo": f"{2000 + j // 12}M{j % 12 + 1:02d}",
+                        "Valor": None if nulos[j] else float(valores[j]),
+                        "Secreto": False,
+                    }
+                    for j in range(n_periodos)
+                ],
+            }
+        )
+    return data
+
+
+# Nombres de serie por tabla INE (formato que espera cada transformación de ine.py)
+_GRUPOS_EPF = ["01 Alimentos y bebidas no alcohólicas", "04 Vivienda", "07 Transporte"]
+_DECILES = [
+    "Primer decil",
+    "Segundo decil",
+    "Tercer decil",
+    "Cuarto decil",
+    "Quinto decil",
+]
+NOMBRES_SERIES_INE: Dict[str, List[str]] = {
+    "df_ipc_anual": ["Índice general. Índice."],
+    "df_umbral_limpio": [
+        "Hogares de una persona",
+        "2 adultos y 2 niños menores de 14 años",
+    ],
+    "df_carencia_material": [
+        f"No puede permitirse ir de vacaciones. {d}." for d in _DECILES
+    ],
+    "df_arope_edad_sexo": [
+        f"Total Nacional. {i}. {s}. {e}."
+        for i in INDICADORES_AROPE
+        for s in SEXOS_AROPE
+        for e in EDADES_AROPE
+    ],
+    "df_arope_hogar": [
+        f"{h}. Tasa de riesgo de pobreza o exclusión social (AROPE). Total."
+        for h in ["Hogares de una persona", "2 adultos sin niños dependientes", "Total"]
+    ],
+    "df_arope_laboral": [
+        f"{s}. {sl}. Total Nacional. AROPE."
+        for s in SEXOS_AROPE
+        for sl in ["Ocupados", "Parados", "Jubilados"]
+    ],
+    "df_gini_ccaa": [
+        f"{c}. {i}."
+        for c in CCAA_SINTETICAS
+        for i in ["Coeficiente de Gini", "S80/S20"]
+    ],
+    "df_renta_decil": [
+        f"{i},{d}" for i in ["Renta media", "Renta mediana"] for d in _DECILES
+    ],
+    "df_poblacion": [
+        f"Total Nacional. Total. {e}. {s}. Personas."
+        for e in ["De 0 a 4 años", "De 5 a 9 años", "95 y más años"]
+        for s in SEXOS_INE_SINTETICOS
+    ],
+    "df_poblacion_ccaa_edad": [
+        f"{c}. {s}. {e}. Personas."
+        for c in CCAA_SINTETICAS
+        for s in SEXOS_INE_SINTETICOS
+        for e in ["De 0 a 4 años", "De 5 a 9 años"]
+    ],
+    "df_arope_ccaa": [
+        f"{c}. Total. Tasa de riesgo de pobreza o exclusión social (AROPE)."
+        for c in CCAA_SINTETICAS
+    ],
+    "df_epf_gasto": [
+        f"Total Nacional. {g}. Dato base. Gasto medio por hogar. Quintil {q}."
+        for g in _GRUPOS_EPF
+        for q in range(1, 6)
+    ],
+    "df_ipc_sectorial": [
+        f"Total Nacional. {g}. {m}."
+        for g in _GRUPOS_EPF
+        for m in ["Índice", "Variación anual"]
+    ],
+}
+# Tablas cuyo periodo se lee de `NombrePeriodo` como año ('2020') y no de `Anyo`
+_PERIODO_ANUAL = {"df_umbral_limpio", "df_renta_decil", "df_ipc_sectorial"}
+_PERIODOS_POR_ANIO = {"df_ipc_anual": 12, "df_poblacion": 2}
+
+
+def generar_ine_tabla(
+    clave: str, anios: range = range(2008, 2025), escala: int = 1, seed: int = 0
+) -> list:
+    """
+    Respuesta DATOS_TABLA sintética para una tabla de `TABLAS_INE`.
+
+    Los nombres de serie siguen el formato de la tabla real, de modo que la
+    transformación de `ine.py` produce filas. `escala` repite la lista de
+    series para aumentar el payload (y el trabajo de parseo) linealmente.
+    """
+    rng = np.random.default_rng(seed)
+    por_anio = _PERIODOS_POR_ANIO.get(clave, 1)
+    data = []
+    for _ in range(escala):
+        for nombre in NOMBRES_SERIES_INE[clave]:
+            valores = np.round(rng.uniform(5, 120, len(anios) * por_anio), 2)
+            puntos = []
+            for j, valor in enumerate(valores):
+                anio = anios[j // por_anio]
+                if clave in _PERIODO_ANUAL:
+                    periodo = str(anio)
+                elif por_anio == 12:
+                    periodo = f"{anio}M{j % 12 + 1:02d}"
+                elif por_anio == 2:
+                    periodo = f"{anio}T{j % 2 * 2 + 1}"
+                else:
+                    periodo = str(anio)
+                puntos.append(
+                    {
+                        "Fecha": 0,
+                        "FK_TipoDato": 1,
+                        "Anyo": anio,
+                        "NombrePeriodo": periodo,
+                        "Valor": float(valor),
+                        "Secreto": False,
+                    }
+                )
+            data.append({"COD": f"SINT{len(data)}", "Nombre": nombre, "Data": puntos})
+    return data
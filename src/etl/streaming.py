@@ -0,0 +1,139 @@
+"""
+Lectura incremental de respuestas JSON (INE / Eurostat)
+=======================================================
+
+`response.json()` construye todo el payload como dicts de Python antes de
+decodificarlo: con los datasets Eurostat de todas las geografías son cientos de
+MB transitorios. Aquí el JSON se recorre como flujo con `ijson` y solo se
+materializa lo necesario:
+
+- SDMX-JSON: `metadatos_sdmx` lee `id`/`size`/`dimension` (pequeños) y
+  `bloques_valores_sdmx` entrega el mapa `value` en bloques de arrays
+  (claves int64, valores float64) que el decodificador filtra uno a uno.
+- DATOS_TABLA: `iterar_series_ine` devuelve las series de una en una para
+  `aplanar_series`, que las convierte a columnas por bloques.
+
+Las fuentes son rutas, bytes o ficheros binarios; los flujos no rebobinables se
+vuelcan antes a un temporal en disco porque SDMX necesita dos pasadas (en
+Eurostat `value` llega antes que `dimension`).
+
+`ijson` es opcional: sin él, `disponible()` devuelve False y los llamadores
+vuelven a `json.load`.
+"""
+
+import io
+import shutil
+import tempfile
+from contextlib import contextmanager
+from itertools import islice
+from pathlib import Path
+from typing import IO, Iterator, Tuple, Union
+
+import numpy as np
+
+try:
+    import ijson
+except ImportError:  # pragma: no cover - dependencia opcional
+    ijson = None
+
+TAM_BLOQUE_VALORES = 50_000  # observaciones SDMX por bloque
+
+Fuente = Union[str, Path, bytes, IO[bytes]]
+
+
+def disponible() -> bool:
+    """True si `ijson` está instalado."""
+    return ijson is not None
+
+
+def _requerir_ijson():
+    if ijson is None:
+        raise ImportError("La lectura incremental requiere 'ijson' (pip install ijson)")
+
+
+@contextmanager
+def abrir_fuente(fuente: Fuente) -> Iterator[IO[bytes]]:
+    """
+    Abre la fuente como fichero binario rebobinable.
+
+    Las rutas se abren, los bytes se envuelven en BytesIO y los flujos no
+    rebobinables (p.ej. `response.raw`) se copian a un temporal por bloques.
+    """
+    if isinstance(fuente, (str, Path)):
+        with open(fuente, "rb") as f:
+            yield f
+    elif isinstance(fuente, (bytes, bytearray)):
+        yield io.BytesIO(fuente)
+    elif getattr(fuente, "seekable", lambda: False)():
+        yield fuente
+    else:
+        with tempfile.TemporaryFile() as tmp:
+            shutil.copyfileobj(fuente, tmp, 1 << 20)
+            tmp.seek(0)
+            yield tmp
+
+
+def _primero(f: IO[bytes], prefijo: str):
+    f.seek(0)
+    return next(ijson.items(f, prefijo, use_float=True), None)
+
+
+def metadatos_sdmx(f: IO[bytes]) -> Tuple[list, list, dict]:
+    """`id`, `size` y `dimension` de un SDMX-JSON, sin construir `value`."""
+    _requerir_ijson()
+    dimension = _primero(f, "dimension") or {}
+    ids = _primero(f, "id") or list(dimension.keys())
+    size = _primero(f, "size") or []
+    return ids, size, dimension
+
+
+def bloques_valores_sdmx(
+    f: IO[bytes], tam_bloque: int = TAM_BLOQUE_VALORES
+) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Recorre `value` y entrega bloques (claves int64, valores float64).
+
+    Admite el formato disperso ({"indice": valor}) y el denso (lista); los
+    nulos quedan como NaN.
+    """
+    _requerir_ijson()
+    f.seek(0)
+    pares = ijson.kvitems(f, "value", use_float=True)
+    leidos = 0
+    while True:
+        bloque = _llenar_bloque(((int(k), v) for k, v in pares), tam_bloque)
+        if not len(bloque[0]):
+            break
+        leidos += len(bloque[0])
+        yield bloque
+    if leidos:
+        return
+
+    # Formato denso: la posición en la lista es la clave
+    f.seek(0)
+    valores = ijson.items(f, "value.item", use_float=True)
+    inicio = 0
+    while True:
+        bloque = _llenar_bloque(enumerate(valores, inicio), tam_bloque)
+        if not len(bloque[0]):
+            break
+        inicio += len(bloque[0])
+        yield bloque
+
+
+_PAR = np.dtype([("clave", np.int64), ("valor", np.float64)])
+
+
+def _llenar_bloque(pares, tam_bloque: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Hasta `tam_bloque` pares (clave, valor) directamente a arrays NumPy."""
+    bloque = np.fromiter(
+        ((k, np.nan if v is None else v) for k, v in islice(pares, tam_bloque)),
+        dtype=_PAR,
+    )
+    return np.ascontiguousarray(bloque["clave"]), np.ascontiguousarray(bloque["valor"])
+
+
+def iterar_series_ine(f: IO[bytes]) -> Iterator[dict]:
+    """Series de una respuesta DATOS_TABLA (lista JSON), de una en una."""
+    _requerir_ijson()
+    return ijson.items(f, "item", use_float=True)
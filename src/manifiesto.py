@@ -0,0 +1,191 @@
+"""
+Manifiesto del almacén de tablas
+================================
+
+Cada escritura de `AlmacenTablas` registra en `<directorio>/_manifiesto.json`:
+
+    {"df_gini_ccaa": {"fichero": "df_gini_ccaa.parquet", "formato": "parquet",
+                      "sha256": "...", "bytes": 1234, "mtime_ns": ...,
+                      "filas": 340, "columnas": {"Territorio": "object", ...},
+                      "anio_min": 2008, "anio_max": 2023,
+                      "columnas_mojibake": ["Territorio"],
+                      "valores_mojibake": {"Territorio": {"AndalucÃ­a": 16}},
+                      "etapa": "ine",
+                      "escrito": "2025-11-20T11:13:45"}}
+
+Así las comprobaciones previas a la carga (`scripts/check_pickles.py`, el
+pre-check de 01c, `scripts/check_pickles_encoding.py`) responden sin leer los
+datos. Una entrada solo se da por válida si el fichero conserva el tamaño y la
+`mtime_ns` registrados; si no (fichero copiado a mano, manifiesto perdido por
+escrituras concurrentes de varios procesos), `AlmacenTablas.metadatos` la
+reconstruye leyendo la tabla una vez.
+"""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+ARCHIVO_MANIFIESTO = "_manifiesto.json"
+COLUMNAS_ANIO = ("Anio", "Año")
+# Secuencias típicas de UTF-8 leído como Latin-1/CP1252 y carácter de reemplazo
+PATRON_MOJIBAKE = re.compile(r"Ã.|Â|â|�")
+# Valores con mojibake (los más frecuentes) que se guardan por columna
+MAX_VALORES_MOJIBAKE = 20
+
+_lock = threading.Lock()
+
+
+def escribir_json(ruta: Path, datos: dict):
+    """Escribe `datos` como JSON de forma atómica (temporal + `os.replace`)."""
+    fd, tmp = tempfile.mkstemp(dir=ruta.parent, prefix=f".{ruta.name}.")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(datos, f, indent=1, ensure_ascii=False)
+        os.replace(tmp, ruta)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def hash_fichero(ruta: Path, bloque: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(ruta, "rb") as f:
+        for trozo in iter(lambda: f.read(bloque), b""):
+            h.update(trozo)
+    return h.hexdigest()
+
+
+def valores_con_mojibake(serie: pd.Series) -> Dict[str, int]:
+    """
+    {valor: filas} de los valores de `serie` con mojibake, de más a menos
+    frecuente. El patrón se evalúa una vez por valor distinto (o categoría).
+    """
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        codigos, unicos = serie.cat.codes.to_numpy(), serie.cat.categories
+    else:
+        codigos, unicos = pd.factorize(serie, use_na_sentinel=True)
+    if not len(unicos):
+        return {}
+    texto = pd.Series(unicos, dtype=object).astype(str)
+    marcados = np.flatnonzero(texto.str.contains(PATRON_MOJIBAKE).to_numpy())
+    if not len(marcados):
+        return {}
+    filas = np.bincount(codigos[codigos >= 0], minlength=len(unicos))
+    valores: Dict[str, int] = {}
+    for i in marcados[np.argsort(-filas[marcados], kind="stable")]:
+        if filas[i]:
+            valores[texto[i]] = valores.get(texto[i], 0) + int(filas[i])
+    return valores
+
+
+def mojibake_por_columna(
+    df: pd.DataFrame, limite: Optional[int] = None
+) -> Dict[str, Dict[str, int]]:
+    """
+    {columna: {valor: filas}} de las columnas de texto con mojibake; con
+    `limite`, solo los valores más frecuentes de cada columna.
+    """
+    resultado = {}
+    for col in df.select_dtypes(include=["object", "string", "category"]).columns:
+        valores = valores_con_mojibake(df[col])
+        if valores:
+            resultado[str(col)] = dict(list(valores.items())[:limite])
+    return resultado
+
+
+def columnas_con_mojibake(df: pd.DataFrame) -> List[str]:
+    """Columnas de texto con secuencias de mojibake (se evalúan valores únicos)."""
+    return list(mojibake_por_columna(df))
+
+
+def _rango_anio(df: pd.DataFrame):
+    columna = next((c for c in COLUMNAS_ANIO if c in df.columns), None)
+    if columna is None:
+        return None, None
+    anios = pd.to_numeric(df[columna], errors="coerce").dropna()
+    if anios.empty:
+        return None, None
+    return int(anios.min()), int(anios.max())
+
+
+def describir(
+    df: pd.DataFrame,
+    ruta: Path,
+    etapa: Optional[str] = None,
+    formato: Optional[str] = None,
+    sha256: Optional[str] = None,
+) -> dict:
+    """Entrada del manifiesto para `df` recién escrito en `ruta`."""
+    stat = ruta.stat()
+    anio_min, anio_max = _rango_anio(df)
+    mojibake = mojibake_por_columna(df, limite=MAX_VALORES_MOJIBAKE)
+    return {
+        "fichero": ruta.name,
+        "formato": formato or ruta.suffix.lstrip("."),
+        "sha256": sha256 or hash_fichero(ruta),
+        "bytes": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "filas": int(len(df)),
+        "columnas": {str(c): str(t) for c, t in df.dtypes.items()},
+        "anio_min": anio_min,
+        "anio_max": anio_max,
+        "columnas_mojibake": list(mojibake),
+        "valores_mojibake": mojibake,
+        "etapa": etapa,
+        "escrito": datetime.now().isoformat(timespec="seconds"),
+    }
+
+
+class Manifiesto:
+    """Lectura/escritura de `_manifiesto.json` de un directorio del almacén."""
+
+    def __init__(self, directorio: Path):
+        self.ruta = Path(directorio) / ARCHIVO_MANIFIESTO
+
+    def leer(self) -> Dict[str, dict]:
+        try:
+            return json.loads(self.ruta.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def _escribir(self, entradas: Dict[str, dict]):
+        escribir_json(self.ruta, entradas)
+
+    def reemplazar(self, entradas: Dict[str, dict]):
+        with _lock:
+            self._escribir(entradas)
+
+    def registrar(self, nombre: str, entrada: dict):
+        with _lock:
+            entradas = self.leer()
+            entradas[nombre] = entrada
+            self._escribir(entradas)
+
+    def eliminar(self, nombre: str):
+        with _lock:
+            entradas = self.leer()
+            if entradas.pop(nombre, None) is not None:
+                self._escribir(entradas)
+
+    def entrada(self, nombre: str) -> Optional[dict]:
+        """Entrada vigente de `nombre` (None si falta o el fichero ha cambiado)."""
+        entrada = self.leer().get(nombre)
+        if entrada is None:
+            return None
+        try:
+            stat = (self.ruta.parent / entrada["fichero"]).stat()
+        except OSError:
+            return None
+        if stat.st_size != entrada["bytes"] or stat.st_mtime_ns != entrada["mtime_ns"]:
+            return None
+        return entrada
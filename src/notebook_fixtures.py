@@ -1,24 +1,22 @@
 import sqlite3
-import unicodedata
+import time
+from collections.abc import MutableMapping
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Iterator, List, Optional
 
 import pandas as pd
 
+from src.almacen import AlmacenTablas, nombre_tabla
+from src.tipos import ampliar, aplicar_politica
+from utils.canonical_labels import ECOICOP, label_key
+from utils.canonical_schema import canonicalize
+
 
 def normalize_text_for_merge(val):
+    """Comparison key for labels (see utils.canonical_labels.label_key)."""
     if pd.isna(val):
         return val
-    s = str(val)
-    s = s.strip()
-    s = s.replace("_", " ")
-    s = s.replace(".", "")
-    s = " ".join(s.split())
-    # Remove diacritics
-    s = unicodedata.normalize("NFD", s)
-    s = "".join(ch for ch in s if unicodedata.category(ch) != "Mn")
-    s = s.lower()
-    return s
+    return label_key(val)
 
 
 def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
@@ -27,22 +25,11 @@ def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
     - Estandarizar a 'Anio' (ASCII-safe, sin tildes)
     - Ensure Gini, inflation columns are present
     - Normalize IPC/Inflacion columns names
+
+    Renames and aliases share the data of `df` (utils/canonical_schema.py);
+    a frame that is already canonical is returned as is.
     """
-    # Convertir 'Año' → 'Anio' (ASCII-safe)
-    if "Año" in df.columns:
-        if "Anio" in df.columns:
-            df = df.drop(columns=["Año"])
-        else:
-            df = df.rename(columns={"Año": "Anio"})
-    if "IPC_Medio_Anual" in df.columns and "Inflacion_Anual_%" not in df.columns:
-        df["Inflacion_Anual_%"] = df["IPC_Medio_Anual"]
-    if "Inflacion_Anual_%" in df.columns and "IPC_Medio_Anual" not in df.columns:
-        df["IPC_Medio_Anual"] = df["Inflacion_Anual_%"]
-    if "IPC_Indice" in df.columns and "Inflacion_Sectorial_%" not in df.columns:
-        df["Inflacion_Sectorial_%"] = df["IPC_Indice"]
-    if "Inflacion_Sectorial_%" in df.columns and "IPC_Indice" not in df.columns:
-        df["IPC_Indice"] = df["Inflacion_Sectorial_%"]
-    return df
+    return canonicalize(df)
 
 
 def normalize_umbral_dataframe(df: pd.DataFrame) -> pd.DataFrame:
@@ -54,263 +41,347 @@ def normalize_umbral_dataframe(df: pd.DataFrame) -> pd.DataFrame:
     """
     # canonical column names we want:
     # 'Año', 'Anio', 'Tipo_Hogar', 'Umbral_Euros', 'Umbral_Real_€_Base'
-    if "Año" in df.columns and "Anio" not in df.columns:
-        df["Anio"] = df["Año"]
-    if "Anio" in df.columns and "Año" not in df.columns:
-        df["Año"] = df["Anio"]
-    # Map older names to canonical ones
-    if "Umbral_Pobreza_Euros" in df.columns and "Umbral_Euros" not in df.columns:
-        df["Umbral_Euros"] = df["Umbral_Pobreza_Euros"]
-    if "Umbral_Real_€_Base" in df.columns and "Umbral_Euros" not in df.columns:
-        # keep Umbral_Real_€_Base but provide Umbral_Euros alias
-        df["Umbral_Euros"] = df["Umbral_Real_€_Base"]
-    if "Umbral_Euros" in df.columns and "Umbral_Real_€_Base" not in df.columns:
-        df["Umbral_Real_€_Base"] = df["Umbral_Euros"]
+    df = canonicalize(df, umbral=True)
+    cambios = {}
     if "Tipo_Hogar" not in df.columns:
-        df["Tipo_Hogar"] = "Hogares de una persona"
+        cambios["Tipo_Hogar"] = "Hogares de una persona"
     # Relax: ensure Umbral columns exist as floats
-    if "Umbral_Euros" in df.columns:
+    for col in ("Umbral_Euros", "Umbral_Real_€_Base"):
+        if col in df.columns and not pd.api.types.is_float_dtype(df[col]):
+            try:
+                cambios[col] = df[col].astype(float)
+            except Exception:
+                pass
+    if cambios:
+        for col, valor in cambios.items():
+            df[col] = valor
+        df = canonicalize(df, umbral=True)
+    return df
+
+
+def normalize_categoria_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Normalize categoria groups for IPC and Gasto tables to canonical `Categoria_ECOICOP` values.
+
+    Uses the shared `ECOICOP` label dictionary (utils/canonical_labels.py),
+    which recodes each distinct value once; unrecognized labels are kept.
+    """
+    if "Categoria_ECOICOP" in df.columns:
+        df["Categoria_ECOICOP"] = ECOICOP.recode(df["Categoria_ECOICOP"])
+    if "Grupo_Gasto" in df.columns:
+        df["Categoria_ECOICOP"] = ECOICOP.recode(df["Grupo_Gasto"])
+    return df
+
+
+DEFAULT_NAMESPACE_MAPPING = {
+    "df_ipc_sectorial": "df_ipc_sectorial",
+    "df_gasto": "df_epf_gasto",
+    "df_ipc_nacional": "df_ipc_anual",
+    "df_arope_edad": "df_arope_edad_sexo",
+    "df_gini_ccaa": "df_gini_ccaa",
+    "df_renta": "df_renta_decil",
+    "df_carencia": "df_carencia_material",
+}
+
+
+def normalize_loaded_table(df: pd.DataFrame, var: str, pkl: str) -> pd.DataFrame:
+    """Column/category normalizations applied to every table loaded for notebooks."""
+    # Año -> Anio and inflation / Umbral aliases, without copying data
+    umbral = var == "df_umbral" or "umbral" in pkl.lower()
+    df = canonicalize(df, umbral=umbral)
+    # Normalize categories (if applicable)
+    df = normalize_categoria_columns(df)
+    # If this is the Umbral table, apply Umbral normalization
+    if umbral:
+        df = normalize_umbral_dataframe(df)
+    # If the var is df_pivot_deciles, ensure decile labels are normalized
+    if var == "df_pivot_deciles":
         try:
-            df["Umbral_Euros"] = df["Umbral_Euros"].astype(float)
+            df = normalize_decile_columns(df)
         except Exception:
             pass
-    if "Umbral_Real_€_Base" in df.columns:
+    # Mark the final columns as canonical: validators and loaders skip the work
+    return canonicalize(df, umbral=umbral)
+
+
+def derive_pivot_deciles(df_renta: pd.DataFrame) -> Optional[pd.DataFrame]:
+    """Year x decile pivot of df_renta (None if it cannot be derived)."""
+    try:
+        dr = canonicalize(ampliar(df_renta))
+        # Choose the column to use for pivot values:
+        # Prefer explicit 'Valor', then any column that contains 'Renta', 'Media', 'Mean', or a numeric column.
+        val_col = None
+        if "Valor" in dr.columns:
+            val_col = "Valor"
+        else:
+            # case-insensitive search for likely columns
+            col_lc = [c.lower() for c in dr.columns]
+            for candidate in ("renta", "media", "mean", "valor", "median", "mediana"):
+                for i, c in enumerate(col_lc):
+                    if candidate in c:
+                        val_col = dr.columns[i]
+                        break
+                if val_col is not None:
+                    break
+        # If still not found, fallback to the first numeric column excluding the Decil/Anio columns
+        if val_col is None:
+            numeric_cols = [
+                c
+                for c in dr.select_dtypes(include=["number"]).columns
+                if str(c).lower() not in ("anio", "año")
+            ]
+            # Exclude Decil column if present
+            numeric_cols = [c for c in numeric_cols if "decil" not in str(c).lower()]
+            val_col = numeric_cols[0] if numeric_cols else None
+        if val_col is None or "Decil" not in dr.columns:
+            return None
+        pivot = dr.pivot_table(
+            index="Anio", columns="Decil", values=val_col, observed=True
+        )
         try:
-            df["Umbral_Real_€_Base"] = df["Umbral_Real_€_Base"].astype(float)
+            pivot = normalize_decile_columns(pivot)
         except Exception:
             pass
-    return df
+        return pivot
+    except Exception:
+        return None
 
 
-def normalize_categoria_columns(df: pd.DataFrame) -> pd.DataFrame:
-    """Normalize categoria groups for IPC and Gasto tables to canonical `Categoria_ECOICOP` values.
+def derive_arope_anual(df_arope_edad: pd.DataFrame) -> Optional[pd.DataFrame]:
+    """Yearly national AROPE series from df_arope_edad (None if not derivable)."""
+    try:
+        da = canonicalize(ampliar(df_arope_edad))
+        # Choose value column
+        val_col = "Valor" if "Valor" in da.columns else None
+        if val_col is None:
+            col_lc = [c.lower() for c in da.columns]
+            for candidate in ("valor", "arope", "indice"):
+                for i, c in enumerate(col_lc):
+                    if candidate in c:
+                        val_col = da.columns[i]
+                        break
+                if val_col is not None:
+                    break
+        # derive annual AROPE only when present
+        if val_col is None or not {"Indicador", "Sexo", "Edad"} <= set(da.columns):
+            return None
+        da_n = da[
+            (da.get("Sexo") == "Total")
+            & (da.get("Edad") == "Total")
+            & (da.get("Indicador") == "AROPE")
+        ]
+        idx_col = (
+            "Año"
+            if "Año" in da_n.columns
+            else "Anio" if "Anio" in da_n.columns else None
+        )
+        if idx_col is None:
+            return None
+        da_n = da_n.groupby(idx_col, observed=True)[val_col].mean().reset_index()
+        da_n.rename(columns={val_col: "AROPE_%"}, inplace=True)
+        return add_year_aliases(da_n)
+    except Exception:
+        return None
+
+
+# derived var -> (source var, derivation)
+DERIVED_TABLES = {
+    "df_pivot_deciles": ("df_renta", derive_pivot_deciles),
+    "df_arope_anual": ("df_arope_edad", derive_arope_anual),
+}
+
+
+class LazyNamespace(MutableMapping):
+    """Mapping varname -> DataFrame that loads each table on first access.
+
+    Reading a key loads the table from the store, normalizes it and memoizes
+    the result; derived tables (`df_pivot_deciles`, `df_arope_anual`) are
+    read from the store's derived-table cache (src/derivadas.py), which only
+    recomputes them when their source table changed. Keys are known without
+    reading data (a table is present if it exists in the store); a derived key
+    is present when its derivation succeeds, so checking `in` on it (or
+    iterating, `len`) materializes it. Assigned values are kept as-is, and a
+    derived key whose source was assigned is derived from that value.
 
-    This moves the repeated mapping logic from tests into a single helper.
+    `tiempos` records the seconds spent materializing each key, and
+    `materialized()` lists the keys already loaded.
     """
-    mapeo_categorias = {
-        "Alimentos_y_bebidas_no_alcohólicas.": "Alimentos y bebidas no alcohólicas",
-        "Bebidas_alcohólicas_y_tabaco.": "Bebidas alcohólicas y tabaco",
-        "Vestido_y_calzado.": "Vestido y calzado",
-        "Vivienda,_agua,_electricidad,_gas_y_otros_combustibles.": "Vivienda, agua, electricidad, gas y otros combustibles",
-        "Muebles,_artículos_del_hogar_y_artículos_para_el_mantenimiento_corriente_del_hogar.": "Muebles, artículos del hogar y artículos para el mantenimiento corriente del hogar",
-        "Sanidad.": "Sanidad",
-        "Transporte.": "Transporte",
-        "Comunicaciones.": "Comunicaciones",
-        "Ocio_y_cultura.": "Ocio y cultura",
-        "Enseñanza.": "Enseñanza",
-        "Restaurantes_y_hoteles.": "Restaurantes y hoteles",
-        "Otros_bienes_y_servicios.": "Otros bienes y servicios",
-    }
-    norm_output_to_output = {
-        normalize_text_for_merge(v): v for v in mapeo_categorias.values()
-    }
-    norm_key_to_output = {
-        normalize_text_for_merge(k): v for k, v in mapeo_categorias.items()
-    }
-    if "Categoria_ECOICOP" in df.columns:
-        df["Categoria_ECOICOP"] = df["Categoria_ECOICOP"].apply(
-            lambda x: norm_output_to_output.get(normalize_text_for_merge(x), x)
+
+    def __init__(
+        self,
+        almacen: AlmacenTablas,
+        mapping: Dict[str, str],
+        mmap: bool = False,
+        compactar: bool = True,
+    ):
+        self._almacen = almacen
+        self._mmap = mmap
+        self._compactar = compactar
+        self._sources = {
+            var: pkl for var, pkl in mapping.items() if almacen.existe(pkl)
+        }
+        self._values: Dict[str, pd.DataFrame] = {}
+        self._missing = set()
+        self._assigned = set()
+        self.tiempos: Dict[str, float] = {}
+
+    def _derived(self, key: str) -> bool:
+        return (
+            key in DERIVED_TABLES
+            and DERIVED_TABLES[key][0] in self._sources
+            and key not in self._missing
         )
-    if "Grupo_Gasto" in df.columns:
-        df["Categoria_ECOICOP"] = df["Grupo_Gasto"].map(mapeo_categorias)
-        mask = df["Categoria_ECOICOP"].isna()
-        if mask.any():
-            df.loc[mask, "Categoria_ECOICOP"] = df.loc[mask, "Grupo_Gasto"].apply(
-                lambda x: norm_key_to_output.get(normalize_text_for_merge(x), x)
+
+    def _cached_derivation(self, key: str) -> bool:
+        """True if `key` can be read from the store's derived-table cache.
+
+        Only when the source is the unmodified store table the registered
+        derivation reads; a source assigned in the namespace is derived here.
+        """
+        from src.derivadas import REGISTRO
+
+        origen = DERIVED_TABLES[key][0]
+        return (
+            key in REGISTRO
+            and origen not in self._assigned
+            and REGISTRO[key].entradas == [nombre_tabla(self._sources[origen])]
+        )
+
+    def _materialize(self, key: str) -> pd.DataFrame:
+        inicio = time.perf_counter()
+        if key in self._sources:
+            pkl = self._sources[key]
+            df = normalize_loaded_table(
+                self._almacen.leer(pkl, mmap=self._mmap), key, pkl
             )
-    return df
+            if self._compactar:
+                df = aplicar_politica(df)
+        elif self._cached_derivation(key):
+            from src.derivadas import materializar
+
+            try:
+                df = materializar(key, self._almacen)
+            except ValueError:
+                self._missing.add(key)
+                raise KeyError(key)
+        else:
+            origen, derivar = DERIVED_TABLES[key]
+            fuente = self[origen]
+            inicio = time.perf_counter()  # source load is timed under its own key
+            df = derivar(fuente)
+            if df is None:
+                self._missing.add(key)
+                raise KeyError(key)
+        self.tiempos[key] = time.perf_counter() - inicio
+        self._values[key] = df
+        return df
+
+    def __getitem__(self, key: str) -> pd.DataFrame:
+        if key in self._values:
+            return self._values[key]
+        if key in self._sources or self._derived(key):
+            return self._materialize(key)
+        raise KeyError(key)
 
+    def __setitem__(self, key: str, value: pd.DataFrame):
+        self._values[key] = value
+        self._assigned.add(key)
 
-def load_pickles_to_namespace(pickle_dir: Path, mapping: Dict[str, str] = None):
-    """Load pickles into global namespace variables based on mapping.
+    def __delitem__(self, key: str):
+        if key not in self:
+            raise KeyError(key)
+        self._values.pop(key, None)
+        self._sources.pop(key, None)
+        self._assigned.add(key)
+        self._missing.add(key)
+
+    def __contains__(self, key) -> bool:
+        if key in self._values or key in self._sources:
+            return True
+        if not self._derived(key):
+            return False
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self) -> Iterator[str]:
+        claves = list(self._values)
+        for var in list(self._sources):
+            claves.extend(
+                derivada
+                for derivada, (origen, _) in DERIVED_TABLES.items()
+                if origen == var and derivada in self
+            )
+            claves.append(var)
+        return iter(dict.fromkeys(claves))
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def materialized(self) -> List[str]:
+        return list(self._values)
+
+    def __repr__(self) -> str:
+        pendientes = [k for k in self._sources if k not in self._values]
+        return f"LazyNamespace(loaded={self.materialized()}, pending={pendientes})"
+
+
+def load_pickles_to_namespace(
+    pickle_dir: Path,
+    mapping: Dict[str, str] = None,
+    mmap: bool = False,
+    compactar: bool = True,
+) -> LazyNamespace:
+    """Cached tables for a notebook namespace, loaded on first access.
+
+    Nothing is read here: each table is loaded, normalized and memoized the
+    first time its key is accessed, and `df_pivot_deciles` / `df_arope_anual`
+    are derived from `df_renta` / `df_arope_edad` only when requested (see
+    LazyNamespace; `ns.tiempos` has the seconds spent per key).
 
     Args:
-        pickle_dir: Path to outputs/pickle_cache
-        mapping: dict varname -> pickle filename
+        pickle_dir: Path to outputs/pickle_cache (table store, see src/almacen.py)
+        mapping: dict varname -> table name (legacy "*.pkl" file names accepted)
+        mmap: For Arrow IPC tables, map numeric columns read-only instead of
+            copying them (see AlmacenTablas.leer)
+        compactar: Keep the compact dtypes of src/tipos.py (categorical
+            dimensions, int16 Anio, float32 values) after the normalizations,
+            which may widen some columns again
     Returns:
-        dict of varname -> DataFrame
+        LazyNamespace (a mutable mapping) of varname -> DataFrame
     """
     if mapping is None:
-        mapping = {
-            "df_ipc_sectorial": "df_ipc_sectorial.pkl",
-            "df_gasto": "df_epf_gasto.pkl",
-            "df_ipc_nacional": "df_ipc_anual.pkl",
-            "df_arope_edad": "df_arope_edad_sexo.pkl",
-            "df_gini_ccaa": "df_gini_ccaa.pkl",
-            "df_renta": "df_renta_decil.pkl",
-            "df_carencia": "df_carencia_material.pkl",
-        }
-    results = {}
-    pickle_dir = Path(pickle_dir)
-    for var, pkl in mapping.items():
-        p = pickle_dir / pkl
-        if p.exists():
-            df = pd.read_pickle(p)
-            # normalize column names: Año -> Anio (ASCII-safe)
-            if "Año" in df.columns:
-                if "Anio" in df.columns:
-                    df = df.drop(columns=["Año"])
-                else:
-                    df = df.rename(columns={"Año": "Anio"})
-            # Standardize inflation column names
-            if (
-                "IPC_Medio_Anual" in df.columns
-                and "Inflacion_Anual_%" not in df.columns
-            ):
-                # Some pickles may use IPC_Medio_Anual which is index-like; use it as Inflacion_Anual_% if present
-                df["Inflacion_Anual_%"] = df["IPC_Medio_Anual"]
-            if (
-                "Inflacion_Anual_%" in df.columns
-                and "IPC_Medio_Anual" not in df.columns
-            ):
-                df["IPC_Medio_Anual"] = df["Inflacion_Anual_%"]
-            # Sectorial: ensure IPC_Indice exists when Inflation column exists and vice versa
-            if "IPC_Indice" in df.columns and "Inflacion_Sectorial_%" not in df.columns:
-                df["Inflacion_Sectorial_%"] = df["IPC_Indice"]
-            if "Inflacion_Sectorial_%" in df.columns and "IPC_Indice" not in df.columns:
-                df["IPC_Indice"] = df["Inflacion_Sectorial_%"]
-            # ensure Gini column name present
-            if "Gini" in df.columns:
-                df["Gini"] = df["Gini"]
-            # Apply general normalizations
-            df = normalize_columns(df)
-            # Normalize categories (if applicable)
-            df = normalize_categoria_columns(df)
-            # If this is the Umbral table, apply Umbral normalization
-            if var == "df_umbral" or "umbral" in p.name.lower():
-                df = normalize_umbral_dataframe(df)
-            # If the var is df_pivot_deciles, ensure decile labels are normalized
-            if var == "df_pivot_deciles":
-                try:
-                    df = normalize_decile_columns(df)
-                except Exception:
-                    pass
-            # If the var is df_renta, also derive df_pivot_deciles for convenience
-            if var == "df_renta":
-                try:
-                    dr = df.copy()
-                    if "Año" in dr.columns and "Anio" not in dr.columns:
-                        dr["Anio"] = dr["Año"]
-                    # Choose the column to use for pivot values:
-                    # Prefer explicit 'Valor', then any column that contains 'Renta', 'Media', 'Mean', or a numeric column.
-                    val_col = None
-                    if "Valor" in dr.columns:
-                        val_col = "Valor"
-                    else:
-                        # case-insensitive search for likely columns
-                        col_lc = [c.lower() for c in dr.columns]
-                        for candidate in (
-                            "renta",
-                            "media",
-                            "mean",
-                            "valor",
-                            "median",
-                            "mediana",
-                        ):
-                            for i, c in enumerate(col_lc):
-                                if candidate in c:
-                                    val_col = dr.columns[i]
-                                    break
-                            if val_col is not None:
-                                break
-                    # If still not found, fallback to the first numeric column excluding the Decil/Anio columns
-                    if val_col is None:
-                        numeric_cols = [
-                            c
-                            for c in dr.select_dtypes(include=["number"]).columns
-                            if str(c).lower() not in ("anio", "año")
-                        ]
-                        # Exclude Decil column if present
-                        numeric_cols = [
-                            c for c in numeric_cols if "decil" not in str(c).lower()
-                        ]
-                        val_col = numeric_cols[0] if numeric_cols else None
-                    if val_col is not None and "Decil" in dr.columns:
-                        pivot = dr.pivot_table(
-                            index="Anio", columns="Decil", values=val_col
-                        )
-                        try:
-                            pivot = normalize_decile_columns(pivot)
-                        except Exception:
-                            pass
-                        results["df_pivot_deciles"] = pivot
-                except Exception:
-                    pass
-            # If the var is df_arope_edad, derive a yearly series for AROPE (df_arope_anual)
-            if var == "df_arope_edad":
-                try:
-                    da = df.copy()
-                    # Ensure a year alias exists
-                    if "Año" in da.columns and "Anio" not in da.columns:
-                        da["Anio"] = da["Año"]
-                    if "Anio" in da.columns and "Año" not in da.columns:
-                        da["Año"] = da["Anio"]
-                    # Choose value column
-                    val_col = "Valor" if "Valor" in da.columns else None
-                    if val_col is None:
-                        col_lc = [c.lower() for c in da.columns]
-                        for candidate in ("valor", "arope", "indice"):
-                            for i, c in enumerate(col_lc):
-                                if candidate in c:
-                                    val_col = da.columns[i]
-                                    break
-                            if val_col is not None:
-                                break
-                    # derive annual AROPE only when present
-                    if (
-                        val_col is not None
-                        and "Indicador" in da.columns
-                        and "Sexo" in da.columns
-                        and "Edad" in da.columns
-                    ):
-                        da_n = da[
-                            (da.get("Sexo") == "Total")
-                            & (da.get("Edad") == "Total")
-                            & (da.get("Indicador") == "AROPE")
-                        ]
-                        idx_col = (
-                            "Año"
-                            if "Año" in da_n.columns
-                            else "Anio" if "Anio" in da_n.columns else None
-                        )
-                        if idx_col is not None:
-                            da_n = da_n.groupby(idx_col)[val_col].mean().reset_index()
-                            da_n.rename(columns={val_col: "AROPE_%"}, inplace=True)
-                            da_n = add_year_aliases(da_n)
-                            results["df_arope_anual"] = da_n
-                except Exception:
-                    pass
-            results[var] = df
-    return results
+        mapping = DEFAULT_NAMESPACE_MAPPING
+    return LazyNamespace(AlmacenTablas(pickle_dir), mapping, mmap, compactar)
 
 
 def create_sqlite_from_pickles(
     pickle_dir: Path, sqlite_path: Path, table_mapping: Dict[str, str] = None
 ):
-    """Create a sqlite DB with tables from pickles.
+    """Create a sqlite DB with tables from the cached table store.
 
     Args:
-        pickle_dir: Path to pickle cache
+        pickle_dir: Path to the table store (outputs/pickle_cache)
         sqlite_path: path to sqlite db to create
-        table_mapping: mapping pickle filename -> table name
+        table_mapping: mapping cached table name (or legacy pickle filename) -> table name
     """
-    pickle_dir = Path(pickle_dir)
+    almacen = AlmacenTablas(pickle_dir)
     sqlite_path = Path(sqlite_path)
     conn = sqlite3.connect(str(sqlite_path))
     if table_mapping is None:
         table_mapping = {
-            "df_ipc_sectorial.pkl": "INE_IPC_Sectorial_ECOICOP",
-            "df_epf_gasto.pkl": "INE_Gasto_Medio_Hogar_Quintil",
-            "df_ipc_anual.pkl": "INE_IPC_Nacional",
-            "df_arope_edad_sexo.pkl": "INE_AROPE_Edad_Sexo",
-            "df_gini_ccaa.pkl": "INE_Gini_S80S20_CCAA",
-            "df_renta_decil.pkl": "INE_Renta_Media_Decil",
-            "df_carencia_material.pkl": "INE_Carencia_Material_Decil",
+            "df_ipc_sectorial": "INE_IPC_Sectorial_ECOICOP",
+            "df_epf_gasto": "INE_Gasto_Medio_Hogar_Quintil",
+            "df_ipc_anual": "INE_IPC_Nacional",
+            "df_arope_edad_sexo": "INE_AROPE_Edad_Sexo",
+            "df_gini_ccaa": "INE_Gini_S80S20_CCAA",
+            "df_renta_decil": "INE_Renta_Media_Decil",
+            "df_carencia_material": "INE_Carencia_Material_Decil",
         }
     for pkl_name, table in table_mapping.items():
-        pkl = pickle_dir / pkl_name
-        if pkl.exists():
-            df = pd.read_pickle(pkl)
+        if almacen.existe(pkl_name):
+            df = almacen.leer(pkl_name)
             # Normalize df columns
             df = normalize_columns(df)
             # If this relates to Umbral table, normalize Umbral columns
@@ -324,6 +395,8 @@ def create_sqlite_from_pickles(
                 or table.lower().startswith("ine_gasto")
             ):
                 df = normalize_categoria_columns(df)
+            # float32 -> float64 with the original decimals, categoricals -> TEXT
+            df = ampliar(df)
             df.to_sql(table, conn, if_exists="replace", index=False)
     conn.close()
 
@@ -342,12 +415,7 @@ def add_year_aliases(df: pd.DataFrame) -> pd.DataFrame:
     Returns:
         DataFrame with only 'Anio' column (no 'Año')
     """
-    if "Año" in df.columns:
-        if "Anio" in df.columns:
-            df = df.drop(columns=["Año"])
-        else:
-            df = df.rename(columns={"Año": "Anio"})
-    return df
+    return canonicalize(df)
 
 
 def normalize_decile_columns(df: pd.DataFrame) -> pd.DataFrame:
@@ -374,7 +442,8 @@ def normalize_decile_columns(df: pd.DataFrame) -> pd.DataFrame:
         return s
 
     try:
-        df = df.copy()
+        # New column labels only: the data is shared with the input
+        df = df.copy(deep=False)
         # If MultiIndex columns, try to extract the decile part from tuple elements
         if hasattr(df.columns, "nlevels") and df.columns.nlevels > 1:
             new_cols = []
@@ -0,0 +1,334 @@
+"""
+Salidas particionadas de los notebooks de análisis
+==================================================
+
+Los resultados de `outputs/` (`gini_s80s20_nacional`,
+`inflacion_diferencial_quintil`, `trayectoria_covid_2019_2023`...) se
+reescribían como un único `.parquet` en cada ejecución y había que leerlos
+enteros. `escribir_salida` los guarda como dataset Parquet con particiones
+Hive, por año y por territorio si la tabla lo tiene. La columna de año se
+normaliza antes a `Anio` (`canonical_year`), así todas las salidas comparten
+la misma clave de partición:
+
+    outputs/gini_s80s20_nacional/
+        _salida.json                     # particiones, tipos y hash de cada partición
+        Anio=2008/part-0.parquet
+        Anio=2009/part-0.parquet
+        ...
+
+Modos de escritura:
+
+- `overwrite_particiones` (por defecto): reescribe solo las particiones
+  presentes en `df` cuyo contenido ha cambiado; el resto no se toca. Añadir un
+  año nuevo a una serie completa escribe una sola partición.
+- `append`: añade solo particiones nuevas; si alguna partición de `df` ya
+  existe no escribe nada y lanza ValueError (repetir un append no duplica filas).
+- `overwrite`: borra el dataset y lo escribe de nuevo.
+
+`leer_salida(nombre, anios=(2019, 2023))` poda las particiones por año (y por
+cualquier columna de partición con `filtros`) sin abrir los demás ficheros, y
+devuelve las columnas en el orden y con los tipos originales. Los `.parquet`
+de un solo fichero se siguen leyendo hasta convertirlos:
+    python -m src.salidas migrar [--only gini_s80s20_nacional]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+from urllib.parse import quote
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from src.almacen import COLUMNAS_ANIO, COMPRESION, Anios, _filtros_anio
+from src.config import OUTPUTS_DIR
+from src.manifiesto import escribir_json
+from utils.canonical_schema import YEAR_COLUMN, canonical_year
+
+MODOS = ("overwrite_particiones", "append", "overwrite")
+COLUMNAS_TERRITORIO = ("Territorio", "CCAA", "geo_code")
+FICHERO_META = "_salida.json"
+# Nombre de partición Hive para valores nulos (el mismo que usa pyarrow)
+PARTICION_NULA = "__HIVE_DEFAULT_PARTITION__"
+
+
+def particiones_por_defecto(columnas: Sequence[str]) -> List[str]:
+    """Año y, si existe, territorio."""
+    particiones = []
+    for candidatas in (COLUMNAS_ANIO, COLUMNAS_TERRITORIO):
+        columna = next((c for c in candidatas if c in columnas), None)
+        if columna is not None:
+            particiones.append(columna)
+    return particiones
+
+
+def _ruta(nombre: str, directorio: Optional[Path]) -> Path:
+    return Path(directorio if directorio is not None else OUTPUTS_DIR) / nombre
+
+
+def _leer_meta(ruta: Path) -> Optional[dict]:
+    try:
+        with open(ruta / FICHERO_META, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _segmento(columna: str, valor) -> str:
+    if pd.isna(valor):
+        return f"{columna}={PARTICION_NULA}"
+    return f"{columna}={quote(str(valor), safe='')}"
+
+
+def _relativa(particiones: Sequence[str], valores) -> str:
+    """Ruta Hive (`Anio=2020/Territorio=...`) de un grupo de `groupby`."""
+    valores = valores if isinstance(valores, tuple) else (valores,)
+    return "/".join(_segmento(c, v) for c, v in zip(particiones, valores))
+
+
+def _hash_particion(df: pd.DataFrame) -> str:
+    h = hashlib.sha256()
+    h.update(json.dumps([[str(c), str(t)] for c, t in df.dtypes.items()]).encode())
+    h.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def _escribir_fichero(df: pd.DataFrame, destino: Path):
+    """Escribe un fichero de partición de forma atómica (temporal + `os.replace`)."""
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=destino.parent, prefix=".part-", suffix=".tmp")
+    os.close(fd)
+    try:
+        tabla = pa.Table.from_pandas(df, preserve_index=False)
+        pq.write_table(tabla, tmp, compression=COMPRESION)
+        os.replace(tmp, destino)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def escribir_salida(
+    df: pd.DataFrame,
+    nombre: str,
+    particiones: Optional[Sequence[str]] = None,
+    modo: str = "overwrite_particiones",
+    directorio: Optional[Path] = None,
+) -> Dict[str, int]:
+    """
+    Guarda `df` (sin su índice) como dataset Parquet particionado. La columna
+    de año se escribe como `Anio` aunque `df` la llame `Año`.
+
+    Args:
+        nombre: Nombre de la salida (`outputs/<nombre>/`)
+        particiones: Columnas de partición (por defecto año y territorio)
+        modo: 'overwrite_particiones', 'append' u 'overwrite'
+
+    Returns:
+        {"escritas": n, "sin_cambios": n} particiones
+
+    Raises:
+        ValueError: Si el modo no existe, la tabla no tiene columnas de
+            partición, sus particiones o columnas no coinciden con las de la
+            salida ya escrita (salvo con 'overwrite'), o con 'append' alguna
+            partición ya existe
+    """
+    if modo not in MODOS:
+        raise ValueError(f"Modo de escritura no soportado: {modo}")
+    ruta = _ruta(nombre, directorio)
+    df = canonical_year(df)
+    particiones = [
+        YEAR_COLUMN if c in COLUMNAS_ANIO else c
+        for c in (
+            particiones
+            if particiones is not None
+            else particiones_por_defecto(df.columns)
+        )
+    ]
+    if not particiones:
+        raise ValueError(f"{nombre}: sin columnas de partición (año / territorio)")
+
+    meta = _leer_meta(ruta)
+    if modo == "overwrite" or meta is None:
+        if ruta.exists():
+            shutil.rmtree(ruta)
+        meta = None
+    elif meta["particiones"] != particiones:
+        raise ValueError(
+            f"{nombre} está particionada por {meta['particiones']}, no {particiones}"
+        )
+    elif meta["tipos"] != {str(c): str(t) for c, t in df.dtypes.items()}:
+        raise ValueError(
+            f"{nombre}: el esquema ha cambiado; escribir con modo='overwrite'"
+        )
+    hashes = dict(meta["hashes"]) if meta else {}
+
+    resultado = {"escritas": 0, "sin_cambios": 0}
+    grupos = [
+        (_relativa(particiones, valores), grupo.drop(columns=particiones))
+        for valores, grupo in df.groupby(
+            particiones, dropna=False, sort=True, observed=True
+        )
+    ]
+    if modo == "append":
+        existentes = [
+            relativa
+            for relativa, _ in grupos
+            if relativa in hashes or any((ruta / relativa).glob("*.parquet"))
+        ]
+        if existentes:
+            raise ValueError(
+                f"{nombre}: las particiones {existentes} ya existen; usar "
+                "modo='overwrite_particiones' para reemplazarlas"
+            )
+    for relativa, datos in grupos:
+        carpeta = ruta / relativa
+        h = _hash_particion(datos)
+        if hashes.get(relativa) == h and (carpeta / "part-0.parquet").exists():
+            resultado["sin_cambios"] += 1
+            continue
+        for anterior in carpeta.glob("*.parquet"):
+            if anterior.name != "part-0.parquet":
+                anterior.unlink()
+        _escribir_fichero(datos, carpeta / "part-0.parquet")
+        hashes[relativa] = h
+        resultado["escritas"] += 1
+
+    ruta.mkdir(parents=True, exist_ok=True)
+    escribir_json(
+        ruta / FICHERO_META,
+        {
+            "particiones": particiones,
+            "columnas": [str(c) for c in df.columns],
+            "tipos": {str(c): str(t) for c, t in df.dtypes.items()},
+            "hashes": hashes,
+        },
+    )
+    return resultado
+
+
+def _tipo_particion(dtype: str) -> pa.DataType:
+    return pa.int64() if dtype.startswith(("int", "Int", "uint")) else pa.string()
+
+
+def leer_salida(
+    nombre: str,
+    columnas: Optional[Sequence[str]] = None,
+    anios: Optional[Anios] = None,
+    filtros: Optional[List[Tuple]] = None,
+    directorio: Optional[Path] = None,
+) -> pd.DataFrame:
+    """
+    Lee una salida podando particiones. Las filas salen ordenadas por las
+    columnas de partición (dentro de cada una, en el orden en que se escribieron).
+
+    Args:
+        columnas: Columnas a leer (todas si None)
+        anios: Año o rango (desde, hasta) inclusive sobre `Anio` / `Año`
+        filtros: Filtros adicionales [(columna, op, valor)], p.ej.
+            [("Territorio", "==", "Andalucía")]
+
+    Raises:
+        FileNotFoundError: Si la salida no existe
+        KeyError: Si se filtra por año y la salida no tiene columna de año
+    """
+    ruta = _ruta(nombre, directorio)
+    meta = _leer_meta(ruta)
+    legado = ruta.with_suffix(".parquet")
+    if meta is None and not legado.exists():
+        raise FileNotFoundError(f"Salida no encontrada: {ruta}")
+
+    disponibles = meta["columnas"] if meta else pq.read_schema(legado).names
+    filtros = list(filtros or [])
+    if anios is not None:
+        columna = next((c for c in COLUMNAS_ANIO if c in disponibles), None)
+        if columna is None:
+            raise KeyError(f"{nombre} no tiene columna de año")
+        filtros.extend(_filtros_anio(columna, anios))
+
+    if meta is None:
+        return pq.read_table(
+            legado,
+            columns=list(columnas) if columnas is not None else None,
+            filters=filtros or None,
+        ).to_pandas()
+
+    esquema = pa.schema(
+        [(c, _tipo_particion(meta["tipos"][c])) for c in meta["particiones"]]
+    )
+    tabla = pq.read_table(
+        ruta,
+        columns=list(columnas) if columnas is not None else None,
+        filters=filtros or None,
+        partitioning=ds.partitioning(esquema, flavor="hive"),
+    )
+    df = tabla.to_pandas()
+    orden = [c for c in meta["columnas"] if c in df.columns]
+    df = df[orden]
+    for c in meta["particiones"]:
+        if c in df.columns and str(df[c].dtype) != meta["tipos"][c]:
+            df[c] = df[c].astype(meta["tipos"][c])
+    return df.sort_values(
+        [c for c in meta["particiones"] if c in df.columns], kind="stable"
+    ).reset_index(drop=True)
+
+
+def migrar(
+    nombres: Optional[Sequence[str]] = None, directorio: Optional[Path] = None
+) -> Dict[str, str]:
+    """Convierte `outputs/<nombre>.parquet` en salidas particionadas."""
+    base = Path(directorio if directorio is not None else OUTPUTS_DIR)
+    ficheros = (
+        [base / f"{n}.parquet" for n in nombres]
+        if nombres
+        else sorted(base.glob("*.parquet"))
+    )
+    resultado = {}
+    for fichero in ficheros:
+        nombre = fichero.stem
+        try:
+            df = pd.read_parquet(fichero)
+            if not isinstance(df.index, pd.RangeIndex):
+                df = df.reset_index()
+            escrito = escribir_salida(df, nombre, modo="overwrite", directorio=base)
+            fichero.unlink()
+            particiones = ", ".join(_leer_meta(base / nombre)["particiones"])
+            resultado[nombre] = f"{escrito['escritas']} particiones ({particiones})"
+        except Exception as e:
+            resultado[nombre] = f"error: {type(e).__name__}: {e}"
+    return resultado
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.salidas", description="Salidas particionadas"
+    )
+    sub = parser.add_subparsers(dest="comando", required=True)
+    p_migrar = sub.add_parser("migrar", help="Convertir outputs/*.parquet")
+    p_migrar.add_argument("--directorio", type=Path, default=OUTPUTS_DIR)
+    p_migrar.add_argument("--only", action="append", help="Salida(s) a convertir")
+    args = parser.parse_args(argv)
+
+    nombres = (
+        [n for valor in args.only for n in valor.split(",") if n] if args.only else None
+    )
+    errores = 0
+    for nombre, resultado in migrar(nombres, args.directorio).items():
+        if resultado.startswith("error"):
+            errores += 1
+            print(f"  [ERR] {nombre}: {resultado}")
+        else:
+            print(f"  [OK] {nombre}: {resultado}")
+    return 1 if errores else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,214 @@
+"""
+Política de tipos compactos para las tablas del almacén
+=======================================================
+
+Las tablas del pipeline se guardaban con dimensiones como `object`, `Anio`
+como int64 y todos los valores como float64. La política se deriva de
+`expected_types` / `primary_key` / `expected_columns` de
+`utils/validation_rules.py` (por nombre de columna, que es el mismo en todas
+las tablas):
+
+- Dimensiones (columnas `str` y columnas de texto de la clave primaria):
+  `category`, si hay repetición suficiente para que compense.
+- Año (`Anio` / `Año`): int16.
+- Otras columnas enteras declaradas o de la clave (p.ej. `Decil`): el entero
+  más pequeño que las contiene.
+- Valores float64: float32 solo si no se pierde precisión, es decir, si los
+  datos tienen como mucho `DECIMALES_MAX` decimales y float32 los conserva
+  todos (20345.67 sí; una media con 15 decimales sigue en float64).
+
+`AlmacenTablas.guardar(..., compactar=True)` aplica la política al escribir y
+Parquet / Arrow IPC conservan los tipos al leer. Para comparar con datos recién
+descargados o para escribir en SQL, `ampliar` deshace la conversión de los
+flotantes (float32 -> float64 con los decimales originales) y de las
+categóricas.
+"""
+
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+COLUMNAS_ANIO = ("Anio", "Año")
+DECIMALES_MAX = 6
+# Una columna de texto pasa a categórica si sus valores distintos no superan
+# esta fracción de las filas (con texto casi único no se ahorra memoria)
+FRACCION_UNICOS_MAX = 0.5
+
+Politica = Dict[str, str]
+
+
+@lru_cache(maxsize=1)
+def politica_por_defecto() -> Politica:
+    """
+    {columna: 'category' | 'int16' | 'integer'} según las reglas de validación.
+
+    Los flotantes no necesitan entrada: toda columna float64 se reduce si la
+    precisión lo permite.
+    """
+    from utils.validation_rules import ALL_VALIDATION_RULES
+
+    politica = {}
+    for reglas in ALL_VALIDATION_RULES.values():
+        tipos = reglas.get("expected_types", {})
+        columnas = [*reglas.get("primary_key", []), *reglas.get("expected_columns", [])]
+        for col in [*columnas, *tipos]:
+            if col in COLUMNAS_ANIO:
+                politica[col] = "int16"
+            elif tipos.get(col) is int:
+                politica[col] = "integer"
+            elif tipos.get(col) is not float:
+                # Texto declarado o columna de la clave sin tipo: dimensión
+                politica.setdefault(col, "category")
+    return politica
+
+
+def _decimales(valores: np.ndarray) -> Optional[int]:
+    """Menor número de decimales (<= DECIMALES_MAX) que representa todos los valores."""
+    for decimales in range(DECIMALES_MAX + 1):
+        if np.array_equal(np.round(valores, decimales), valores):
+            return decimales
+    return None
+
+
+def _a_float32(serie: pd.Series) -> Optional[pd.Series]:
+    """La serie en float32 si conserva todos sus valores; None si no."""
+    valores = serie.to_numpy(dtype="float64")
+    finitos = valores[np.isfinite(valores)]
+    if len(finitos) and np.abs(finitos).max() > np.finfo("float32").max:
+        return None
+    decimales = _decimales(finitos)
+    if decimales is None:
+        return None
+    reducidos = finitos.astype("float32")
+    if not np.array_equal(np.round(reducidos.astype("float64"), decimales), finitos):
+        return None
+    return serie.astype("float32")
+
+
+def _a_entero(serie: pd.Series, tipo: str) -> Optional[pd.Series]:
+    if not pd.api.types.is_integer_dtype(serie) or isinstance(
+        serie.dtype, pd.CategoricalDtype
+    ):
+        return None
+    if serie.isna().any():
+        return None  # enteros nullables (Int64) con NA: se dejan como están
+    if tipo == "int16":
+        if len(serie) and (serie.min() < -(2**15) or serie.max() >= 2**15):
+            return None
+        return serie.astype("int16")
+    return pd.to_numeric(serie, downcast="integer")
+
+
+def _a_categoria(serie: pd.Series) -> Optional[pd.Series]:
+    if not (
+        pd.api.types.is_object_dtype(serie) or pd.api.types.is_string_dtype(serie)
+    ) or isinstance(serie.dtype, pd.CategoricalDtype):
+        return None
+    # Solo texto: una columna object con números o mezclas se deja como está
+    no_nulos = serie.dropna()
+    if not pd.api.types.is_string_dtype(no_nulos.infer_objects()):
+        return None
+    if serie.nunique(dropna=True) > FRACCION_UNICOS_MAX * max(len(serie), 1):
+        return None
+    return serie.astype("category")
+
+
+def aplicar_politica(
+    df: pd.DataFrame, politica: Optional[Politica] = None
+) -> pd.DataFrame:
+    """
+    Devuelve `df` con los tipos compactos de la política (no modifica `df`).
+
+    Las columnas que no encajan (texto casi único, años fuera de int16,
+    flotantes que perderían decimales, nulos en enteros) se dejan como están.
+    """
+    politica = politica_por_defecto() if politica is None else politica
+    cambios = {}
+    for col in df.columns:
+        serie = df[col]
+        if not isinstance(serie, pd.Series):
+            continue  # nombres de columna duplicados
+        tipo = politica.get(col)
+        nueva = None
+        if tipo == "int16":
+            nueva = _a_entero(serie, "int16")
+        elif tipo is not None and pd.api.types.is_integer_dtype(serie):
+            # Dimensiones numéricas (Decil, Quintil...): entero más pequeño
+            nueva = _a_entero(serie, "integer")
+        elif tipo == "category":
+            nueva = _a_categoria(serie)
+        if nueva is None and serie.dtype == "float64":
+            nueva = _a_float32(serie)
+        if nueva is not None and nueva.dtype != serie.dtype:
+            cambios[col] = nueva
+    return _reemplazar(df, cambios)
+
+
+def _reemplazar(df: pd.DataFrame, cambios: dict) -> pd.DataFrame:
+    if not cambios:
+        return df
+    salida = df.copy(deep=False)
+    for col, serie in cambios.items():
+        salida[col] = serie
+    return salida
+
+
+def memoria(df: pd.DataFrame) -> int:
+    """Bytes que ocupa `df` en memoria (contando el texto de las columnas object)."""
+    return int(df.memory_usage(deep=True, index=True).sum())
+
+
+def compactar(
+    df: pd.DataFrame, politica: Optional[Politica] = None
+) -> Tuple[pd.DataFrame, dict]:
+    """
+    Aplica la política y mide el ahorro.
+
+    Returns:
+        (DataFrame compacto, {"antes": bytes, "despues": bytes,
+         "columnas": {columna: "object -> category", ...}})
+    """
+    compacto = aplicar_politica(df, politica)
+    informe = {
+        "antes": memoria(df),
+        "despues": memoria(compacto),
+        "columnas": {
+            str(c): f"{df[c].dtype} -> {compacto[c].dtype}"
+            for c in df.columns
+            if isinstance(df[c], pd.Series) and df[c].dtype != compacto[c].dtype
+        },
+    }
+    return compacto, informe
+
+
+def _ampliar_float32(serie: pd.Series) -> pd.Series:
+    """float32 -> float64 recuperando los decimales con los que se redujo."""
+    valores = serie.to_numpy(dtype="float32")
+    anchos = valores.astype("float64")
+    finitos = np.isfinite(valores)
+    for decimales in range(DECIMALES_MAX + 1):
+        redondeados = np.round(anchos[finitos], decimales)
+        if np.array_equal(redondeados.astype("float32"), valores[finitos]):
+            anchos[finitos] = redondeados
+            break
+    return pd.Series(anchos, index=serie.index, name=serie.name)
+
+
+def ampliar(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Deshace la compactación de valores y dimensiones: float32 -> float64 con
+    los mismos decimales que antes de reducir y categóricas -> object. Los
+    enteros pequeños se mantienen (SQL los recibe como SMALLINT).
+    """
+    cambios = {}
+    for col in df.columns:
+        serie = df[col]
+        if not isinstance(serie, pd.Series):
+            continue
+        if serie.dtype == "float32":
+            cambios[col] = _ampliar_float32(serie)
+        elif isinstance(serie.dtype, pd.CategoricalDtype):
+            cambios[col] = serie.astype(serie.cat.categories.dtype)
+    return _reemplazar(df, cambios)
@@ -15,6 +15,13 @@ import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 
+from utils.canonical_schema import (
+    YEAR_COLUMN,
+    YEAR_VARIANTS,
+    canonical_year,
+    is_canonical,
+)
+
 # =============================================================================
 # FUNCIONES DE VALIDACIÓN BÁSICA
 # =============================================================================
@@ -96,26 +103,23 @@ def _normalize_year_column(
     df: pd.DataFrame, columna_año: str = "Anio", verbose: bool = False
 ):
     """
-    Normaliza la columna de año aceptando 'Anio' o 'Año' (fallback).
+    Normaliza la columna de año aceptando 'Anio', 'Año' o 'Anyo' (fallback),
+    sin copiar datos (ver utils/canonical_schema.py).
     Devuelve (df_modificado, columna_año_nombre)
     """
     if columna_año in df.columns:
         return df, columna_año
-    if "Anyo" in df.columns:
-        # Some data may use 'Anyo' (no diacritics) - treat it as 'Anio'
-        df2 = df.copy()
-        df2["Anio"] = df2["Anyo"]
-        if verbose:
-            print("[WARN] Se renombró 'Anyo' a 'Anio' temporalmente para validación")
-        return df2, "Anio"
-    if "Año" in df.columns:
-        df2 = df.copy()
-        df2["Anio"] = df2["Año"]
-        if verbose:
-            print("[WARN] Se renombró 'Año' a 'Anio' temporalmente para validación")
-        return df2, "Anio"
-    # No column found
-    return df, None
+    canonico = df if is_canonical(df) else canonical_year(df)
+    if YEAR_COLUMN not in canonico.columns:
+        # No column found
+        return df, None
+    if verbose:
+        origen = next((c for c in YEAR_VARIANTS if c in df.columns), None)
+        if origen is not None:
+            print(
+                f"[WARN] Se renombró '{origen}' a 'Anio' temporalmente para validación"
+            )
+    return canonico, YEAR_COLUMN
 
 
 def validar_rango(
@@ -256,17 +260,11 @@ def validar_continuidad_temporal(
     - Gaps por errores de ETL
     - Gaps legítimos (ej: cambios metodológicos, datos no publicados)
     """
-    # Normalize year column: accept 'Anio' or fallback to 'Año'
-    if columna_año not in df.columns:
-        if "Año" in df.columns:
-            # Create a temporary 'Anio' column mapped from 'Año'
-            df = df.copy()
-            df["Anio"] = df["Año"]
-            columna_año = "Anio"
-            if verbose:
-                print("[WARN] Se renombró 'Año' a 'Anio' temporalmente para validación")
-        else:
-            raise ValueError(f"Columna '{columna_año}' no encontrada en DataFrame")
+    # Normalize year column: accept 'Anio' or fallback to 'Año' / 'Anyo'
+    df, columna_encontrada = _normalize_year_column(df, columna_año, verbose)
+    if columna_encontrada is None:
+        raise ValueError(f"Columna '{columna_año}' no encontrada en DataFrame")
+    columna_año = columna_encontrada
 
     gaps_encontrados = {}
 
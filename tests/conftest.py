@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.almacen import AlmacenTablas
+
+ANIOS_VALIDACION = np.arange(2015, 2024)
+
+
+@pytest.fixture
+def almacen_validacion(tmp_path):
+    """
+    Almacén del ETL con las tablas que compara check_integration (INE_AROPE_Hogar,
+    EUROSTAT_AROP/Gini/S80S20_Espana, INE_Gini_S80S20_CCAA), en `tmp_path/almacen`.
+    """
+    n = len(ANIOS_VALIDACION)
+    almacen = AlmacenTablas(tmp_path / "almacen")
+    almacen.guardar(
+        pd.DataFrame(
+            {
+                "Anio": np.repeat(ANIOS_VALIDACION, 2),
+                "Tipo_Hogar": ["Total"] * 2 * n,
+                "Indicador": ["AROP", "AROPE"] * n,
+                "Valor": np.tile([20.0, 26.0], n),
+            }
+        ),
+        "df_arope_hogar",
+        compactar=True,
+    )
+    espana = pd.DataFrame(
+        {"Anio": ANIOS_VALIDACION, "geo_code": "ES", "sex": "T", "age": "TOTAL"}
+    )
+    almacen.guardar(espana.assign(**{"AROP_%": 20.5}), "df_arop_es")
+    almacen.guardar(
+        pd.DataFrame(
+            {"Año": ANIOS_VALIDACION, "Territorio": "Total Nacional", "Gini": 0.32}
+        ).assign(**{"S80/S20": 5.6}),
+        "df_gini_ccaa",
+    )
+    # Escala 0-100, como antes de normalize_for_sql (01c)
+    almacen.guardar(
+        pd.DataFrame({"Anio": ANIOS_VALIDACION, "geo_code": "ES", "Gini": 32.0}),
+        "df_gini_es",
+    )
+    almacen.guardar(
+        pd.DataFrame({"Anio": ANIOS_VALIDACION, "geo_code": "ES", "S80S20_Ratio": 5.0}),
+        "df_s80s20_es",
+    )
+    return almacen
@@ -0,0 +1,219 @@
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+from src.almacen import AlmacenTablas, main, nombre_tabla
+from src.manifiesto import hash_fichero
+
+
+def _tabla(n=1000):
+    return pd.DataFrame(
+        {
+            "Anio": [2008 + i % 16 for i in range(n)],
+            "Territorio": [f"CCAA {i % 19}" for i in range(n)],
+            "Gini": [30.0 + (i % 7) / 10 for i in range(n)],
+        }
+    )
+
+
+def test_guardar_y_leer_ida_y_vuelta(tmp_path):
+    almacen = AlmacenTablas(tmp_path)
+    df = _tabla()
+    ruta = almacen.guardar(df, "df_gini_ccaa")
+
+    assert ruta.suffix == ".parquet"
+    assert almacen.nombres() == ["df_gini_ccaa"]
+    pd.testing.assert_frame_equal(almacen.leer("df_gini_ccaa"), df)
+    # Se acepta el nombre de fichero antiguo
+    pd.testing.assert_frame_equal(almacen.leer("df_gini_ccaa.pkl"), df)
+    assert nombre_tabla(ruta) == "df_gini_ccaa"
+
+
+def test_proyeccion_y_filtro_por_anio_en_row_groups(tmp_path):
+    almacen = AlmacenTablas(tmp_path, filas_por_grupo=100)
+    df = _tabla().sort_values("Anio", ignore_index=True)
+    ruta = almacen.guardar(df, "df_gini_ccaa")
+    assert pq.ParquetFile(ruta).num_row_groups == 10
+
+    leido = almacen.leer("df_gini_ccaa", columnas=["Anio", "Gini"], anios=(2015, 2017))
+    esperado = df.loc[df["Anio"].between(2015, 2017), ["Anio", "Gini"]]
+    assert list(leido.columns) == ["Anio", "Gini"]
+    pd.testing.assert_frame_equal(leido, esperado.reset_index(drop=True))
+    assert almacen.leer("df_gini_ccaa", anios=2023)["Anio"].eq(2023).all()
+    assert almacen.columnas("df_gini_ccaa") == ["Anio", "Territorio", "Gini"]
+
+    almacen.guardar(pd.DataFrame({"x": [1]}), "sin_anio")
+    with pytest.raises(KeyError):
+        almacen.leer("sin_anio", anios=2020)
+
+
+def test_lee_pickles_antiguos_y_los_migra(tmp_path):
+    df = _tabla(50).rename(columns={"Anio": "Año"})
+    df.to_pickle(tmp_path / "df_legado.pkl")
+    pd.Series([1, 2]).to_pickle(tmp_path / "no_es_df.pkl")
+    almacen = AlmacenTablas(tmp_path)
+
+    filtrado = almacen.leer("df_legado", columnas=["Año"], anios=(None, 2010))
+    assert filtrado["Año"].max() == 2010
+
+    assert main(["migrar", "--directorio", str(tmp_path)]) == 1
+    assert (tmp_path / "df_legado.parquet").exists()
+    assert not (tmp_path / "df_legado.pkl").exists()
+    pd.testing.assert_frame_equal(almacen.leer("df_legado"), df)
+    assert (tmp_path / "no_es_df.pkl").exists()
+
+    pd.DataFrame({"x": [1]}).to_pickle(tmp_path / "df_sin_anio.pkl")
+    with pytest.raises(KeyError, match="df_sin_anio no tiene columna de año"):
+        almacen.leer("df_sin_anio", anios=2010)
+
+
+def test_migrar_conservando_no_pierde_la_tabla_si_falla(tmp_path, monkeypatch):
+    df = _tabla(20)
+    df.to_pickle(tmp_path / "df_legado.pkl")
+    almacen = AlmacenTablas(tmp_path)
+
+    def falla(*args, **kwargs):
+        raise OSError("disco lleno")
+
+    monkeypatch.setattr(almacen, "_guardar", falla)
+    assert almacen.migrar_pickles(conservar=True)["df_legado"].startswith("error")
+    assert almacen.nombres() == ["df_legado"]
+    assert not (tmp_path / "df_legado.pkl.bak").exists()
+
+    monkeypatch.undo()
+    assert almacen.migrar_pickles(conservar=True) == {"df_legado": "parquet"}
+    assert (tmp_path / "df_legado.pkl.bak").exists()
+    pd.testing.assert_frame_equal(almacen.leer("df_legado"), df)
+
+
+def test_columnas_no_representables_se_guardan_como_pickle(tmp_path, capsys):
+    almacen = AlmacenTablas(tmp_path)
+    df = pd.DataFrame({"Anio": [2020, 2021], "Valor": [1, "a"]})
+    ruta = almacen.guardar(df, "df_mixto")
+
+    assert ruta.suffix == ".pkl"
+    assert "[WARN]" in capsys.readouterr().out
+    pd.testing.assert_frame_equal(almacen.leer("df_mixto"), df)
+
+    with pytest.raises(FileNotFoundError):
+        almacen.leer("df_inexistente")
+
+
+def test_arrow_ipc_mapea_columnas_numericas_sin_copiar(tmp_path):
+    almacen = AlmacenTablas(tmp_path, formato="arrow")
+    df = _tabla()
+    almacen.guardar(df, "df_gini_ccaa")
+    AlmacenTablas(tmp_path).guardar(df, "df_otra")
+    assert almacen.convertir(["df_otra"]) == {"df_otra": "arrow"}
+    assert sorted(p.name for p in tmp_path.glob("df_*")) == [
+        "df_gini_ccaa.arrow",
+        "df_otra.arrow",
+    ]
+
+    mapeado = almacen.leer("df_gini_ccaa", mmap=True)
+    pd.testing.assert_frame_equal(mapeado, df)
+    # Sin copia: el array apunta al fichero mapeado y es de solo lectura
+    assert not mapeado["Gini"].to_numpy().flags.writeable
+    copia = almacen.leer("df_gini_ccaa")
+    copia.loc[0, "Gini"] = 0.0
+
+    filtrado = almacen.leer("df_gini_ccaa", columnas=["Anio"], anios=(2020, None))
+    pd.testing.assert_frame_equal(
+        filtrado, df.loc[df["Anio"] >= 2020, ["Anio"]].reset_index(drop=True)
+    )
+
+
+def test_manifiesto_responde_sin_leer_datos(tmp_path, monkeypatch):
+    almacen = AlmacenTablas(tmp_path)
+    df = _tabla(200)
+    df.loc[3, "Territorio"] = "AndalucÃ­a"
+    ruta = almacen.guardar(df, "df_gini_ccaa", etapa="ine")
+
+    meta = almacen.manifiesto.leer()["df_gini_ccaa"]
+    assert meta["fichero"] == ruta.name and meta["formato"] == "parquet"
+    assert meta["sha256"] == hash_fichero(ruta)
+    assert meta["filas"] == 200
+    assert meta["columnas"] == {
+        "Anio": "int64",
+        "Territorio": "object",
+        "Gini": "float64",
+    }
+    assert (meta["anio_min"], meta["anio_max"]) == (2008, 2023)
+    assert meta["columnas_mojibake"] == ["Territorio"]
+    assert meta["etapa"] == "ine"
+
+    def sin_lectura(*args, **kwargs):
+        raise AssertionError("metadatos no debe leer la tabla")
+
+    monkeypatch.setattr(AlmacenTablas, "leer", sin_lectura)
+    assert almacen.metadatos("df_gini_ccaa.pkl") == meta
+
+
+def test_manifiesto_se_reconstruye_si_el_fichero_cambia(tmp_path):
+    almacen = AlmacenTablas(tmp_path)
+    almacen.guardar(_tabla(10), "df_a", etapa="01a")
+    # Escritura por fuera del almacén: la entrada deja de ser válida
+    (tmp_path / "df_a.parquet").unlink()
+    _tabla(30).to_parquet(tmp_path / "df_a.parquet")
+    pd.DataFrame({"x": []}).to_pickle(tmp_path / "df_b.pkl")
+
+    assert almacen.manifiesto.entrada("df_a") is None
+    meta = almacen.metadatos("df_a")
+    assert meta["filas"] == 30 and meta["etapa"] == "01a"
+    assert almacen.manifiesto.entrada("df_a") == meta
+    assert almacen.reconstruir_manifiesto()["df_b"]["filas"] == 0
+
+    almacen.eliminar("df_a")
+    assert "df_a" not in almacen.manifiesto.leer()
+
+
+def test_snapshots_deduplicados_y_rollback(tmp_path):
+    almacen = AlmacenTablas(tmp_path)
+    fija, cambia = _tabla(100), _tabla(50)
+    almacen.guardar(fija, "df_fija")
+    almacen.guardar(cambia, "df_cambia")
+    primero = almacen.crear_snapshot("inicial")
+    objetos = sorted(tmp_path.glob("_objetos/*/*"))
+
+    almacen.guardar(fija.copy(), "df_fija")  # mismo contenido: ningún objeto nuevo
+    assert sorted(tmp_path.glob("_objetos/*/*")) == objetos
+    assert not list(tmp_path.glob(".*"))
+    almacen.guardar(cambia.assign(Gini=0.0), "df_cambia")
+    almacen.guardar(_tabla(5), "df_nueva")
+    assert len(list(tmp_path.glob("_objetos/*/*"))) == len(objetos) + 2
+
+    previo = almacen.rollback(primero[:15])
+    assert almacen.nombres() == ["df_cambia", "df_fija"]
+    pd.testing.assert_frame_equal(almacen.leer("df_cambia"), cambia)
+    assert almacen.metadatos("df_cambia")["sha256"] == hash_fichero(
+        tmp_path / "df_cambia.parquet"
+    )
+    assert [s["id"] for s in almacen.snapshots()] == [primero, previo]
+
+    almacen.rollback(previo)
+    assert almacen.leer("df_cambia")["Gini"].eq(0.0).all()
+    sha_inicial = almacen.snapshots()[0]["tablas"]["df_cambia"]["sha256"]
+    assert almacen.purgar(conservar=0)[0] == 1
+    assert almacen.snapshots() == []
+    assert not list(tmp_path.glob(f"_objetos/*/{sha_inicial}*"))
+
+
+def test_escritura_fallida_no_toca_la_tabla(tmp_path, monkeypatch):
+    almacen = AlmacenTablas(tmp_path)
+    df = _tabla(20)
+    almacen.guardar(df, "df_a")
+
+    def fallo(*args, **kwargs):
+        raise OSError("disco lleno")
+
+    monkeypatch.setattr(pq, "write_table", fallo)
+    with pytest.raises(OSError):
+        almacen.guardar(_tabla(40), "df_a")
+    pd.testing.assert_frame_equal(almacen.leer("df_a"), df)
+    assert sorted(p.name for p in tmp_path.iterdir() if p.is_file()) == [
+        "_manifiesto.json",
+        "df_a.parquet",
+    ]
+
+    with pytest.raises(KeyError):
+        almacen.rollback("no-existe")
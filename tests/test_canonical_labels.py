@@ -0,0 +1,73 @@
+import pandas as pd
+
+from src.notebook_fixtures import normalize_categoria_columns
+from utils.canonical_labels import DECIL, ECOICOP, TIPO_METRICA, LabelDictionary
+
+
+def test_recode_variantes_mojibake_y_contadores():
+    sexo = LabelDictionary("Sexo", {"Hombres": ["Hombre", "Varones"], "Mujeres": []})
+    serie = pd.Series(["Hombre", "varones", None, "Mujeres", "No consta"] * 100)
+
+    recodificada = sexo.recode(serie)
+    assert recodificada.iloc[:5].tolist() == [
+        "Hombres",
+        "Hombres",
+        None,
+        "Mujeres",
+        "No consta",
+    ]
+    assert sexo.report() == {"hits": 300, "misses": {"No consta": 100}}
+    assert sexo.recode(serie, keep_unmapped=False).iloc[4] is None
+
+    # Formas con mojibake y claves sin tildes, '_' ni '.'
+    assert DECIL.lookup("SÃ©ptimo decil") == "D7"
+    assert DECIL.lookup("decimo_decil.") == "D10"
+    assert ECOICOP.lookup("EnseÃ±anza") == "Enseñanza"
+    assert TIPO_METRICA.lookup("Variaci�n mensual") == "Variación mensual"
+    # Regla de respaldo de Tipo_Metrica
+    assert TIPO_METRICA.lookup("Índice general. Variación anual") == "Variación anual"
+    assert TIPO_METRICA.lookup("Ponderaciones") is None
+
+
+def test_recode_categorica_reasigna_codigos():
+    DECIL.reset()
+    serie = pd.Series(
+        pd.Categorical(
+            ["Primer decil", "D1", "Décimo decil", "Total", "Otro"],
+            categories=[
+                "D1",
+                "Décimo decil",
+                "Otro",
+                "Primer decil",
+                "Sin uso",
+                "Total",
+            ],
+        )
+    )
+    recodificada = DECIL.recode(serie)
+    assert isinstance(recodificada.dtype, pd.CategoricalDtype)
+    assert recodificada.tolist() == ["D1", "D1", "D10", "Total", "Otro"]
+    # Las categorías sin filas no cuentan como etiquetas no reconocidas
+    assert DECIL.report() == {"hits": 4, "misses": {"Otro": 1}}
+
+
+def test_normalize_categoria_columns_usa_el_diccionario():
+    gasto = pd.DataFrame(
+        {
+            "Grupo_Gasto": [
+                "Alimentos_y_bebidas_no_alcohólicas.",
+                "Vestido y calzado",
+                "Índice_General",
+            ]
+        }
+    )
+    assert normalize_categoria_columns(gasto)["Categoria_ECOICOP"].tolist() == [
+        "Alimentos y bebidas no alcohólicas",
+        "Vestido y calzado",
+        "Índice_General",
+    ]
+    ipc = pd.DataFrame({"Categoria_ECOICOP": ["ocio y cultura", "Sanidad"]})
+    assert normalize_categoria_columns(ipc)["Categoria_ECOICOP"].tolist() == [
+        "Ocio y cultura",
+        "Sanidad",
+    ]
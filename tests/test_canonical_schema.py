@@ -0,0 +1,95 @@
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from notebook_fixtures import add_year_aliases, normalize_columns
+from utils.canonical_schema import canonical_year, canonicalize, is_canonical
+from utils.validation_framework import check_schema, check_uniqueness
+
+
+def _tabla(n=200_000):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        {
+            "Año": 2008 + np.arange(n) % 16,
+            "Decil": np.arange(n) // 16,
+            "Inflacion_Anual_%": rng.normal(2, 1, n),
+            "Umbral_Pobreza_Euros": rng.uniform(8_000, 12_000, n),
+        }
+    )
+
+
+def _pico(funcion):
+    """(resultado, bytes de pico asignados durante `funcion`)."""
+    tracemalloc.start()
+    try:
+        resultado = funcion()
+        return resultado, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def test_canonicalize_renombra_y_crea_alias_sin_copiar():
+    df = _tabla()
+    canonico, pico = _pico(lambda: canonicalize(df, umbral=True))
+    _, pico_copia = _pico(df.copy)
+
+    assert list(canonico.columns) == [
+        "Anio",
+        "Decil",
+        "Inflacion_Anual_%",
+        "Umbral_Pobreza_Euros",
+        "IPC_Medio_Anual",
+        "Umbral_Euros",
+        "Umbral_Real_€_Base",
+        "Año",
+    ]
+    # Los mismos buffers con otro nombre; `df` no cambia
+    for nuevo, origen in [
+        ("Anio", "Año"),
+        ("IPC_Medio_Anual", "Inflacion_Anual_%"),
+        ("Umbral_Euros", "Umbral_Pobreza_Euros"),
+        ("Umbral_Real_€_Base", "Umbral_Pobreza_Euros"),
+    ]:
+        assert np.shares_memory(canonico[nuevo].to_numpy(), df[origen].to_numpy())
+    assert "Anio" not in df.columns
+    # Una copia ocupa toda la tabla; canonicalizar, solo índices y etiquetas
+    assert pico_copia >= df.memory_usage(index=False).sum()
+    assert pico < pico_copia / 100
+    solo_anio = canonical_year(df)
+    assert list(solo_anio.columns)[0] == "Anio" and "IPC_Medio_Anual" not in solo_anio
+    assert np.shares_memory(solo_anio["Anio"].to_numpy(), df["Año"].to_numpy())
+
+
+def test_tabla_canonica_no_se_copia_en_validadores_ni_cargadores(monkeypatch):
+    df = canonicalize(_tabla())
+    assert is_canonical(df) and canonicalize(df) is df
+
+    copias = []
+    copy_original = pd.DataFrame.copy
+
+    def contar(self, deep=True):
+        if deep:
+            copias.append(self.shape)
+        return copy_original(self, deep=deep)
+
+    monkeypatch.setattr(pd.DataFrame, "copy", contar)
+
+    def validar():
+        assert check_schema(
+            df, ["Año", "Decil", "Inflacion_Anual_%", "Umbral_Pobreza_Euros"]
+        )
+        assert not check_uniqueness(df, ["Año"])
+        assert normalize_columns(df) is df
+        assert add_year_aliases(df) is df
+
+    _, pico = _pico(validar)
+    assert copias == []
+    # Antes cada validador hacía un df.copy() completo (~6 MB aquí)
+    assert pico < df.memory_usage(index=False).sum()
+
+    # La marca deja de valer si cambian las columnas
+    df2 = df.rename(columns={"Anio": "Año"})
+    assert not is_canonical(df2)
+    assert "Anio" in canonicalize(df2).columns
@@ -0,0 +1,99 @@
+import importlib.util
+import json
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+from src.almacen import AlmacenTablas
+from src.manifiesto import MAX_VALORES_MOJIBAKE, valores_con_mojibake
+
+RUTA_SCRIPT = (
+    Path(__file__).resolve().parent.parent / "scripts" / "check_pickles_encoding.py"
+)
+
+
+def _script():
+    spec = importlib.util.spec_from_file_location("check_pickles_encoding", RUTA_SCRIPT)
+    modulo = importlib.util.module_from_spec(spec)
+    # Importable by name so the process pool can pickle its worker
+    sys.modules[spec.name] = modulo
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+def _tabla():
+    return pd.DataFrame(
+        {
+            "Anio": [2020, 2021, 2022, 2023] * 3,
+            "Territorio": ["AndalucÃ\xada", "Aragón", "Castilla y LeÃ³n", None] * 3,
+            "Sexo": pd.Categorical(
+                ["Ambos sexos", "Mujeres", "Hombres", "Hombres"] * 3
+            ),
+            "Valor": range(12),
+        }
+    )
+
+
+def test_valores_con_mojibake_cuenta_filas_por_valor_distinto():
+    df = _tabla()
+    df.loc[0, "Territorio"] = "Castilla y LeÃ³n"
+    assert valores_con_mojibake(df["Territorio"]) == {
+        "Castilla y LeÃ³n": 4,
+        "AndalucÃ\xada": 2,
+    }
+    sexo = pd.Series(pd.Categorical(["MÃ¡s", "x"], categories=["MÃ¡s", "x", "Ã±"]))
+    # Las categorías sin filas no cuentan
+    assert valores_con_mojibake(sexo) == {"MÃ¡s": 1}
+
+
+def test_escaneo_por_manifiesto_y_por_datos_coinciden(tmp_path):
+    almacen = AlmacenTablas(tmp_path)
+    almacen.guardar(_tabla(), "df_ccaa")
+    almacen.guardar(_tabla(), "df_ccaa_compacta", compactar=True)
+    AlmacenTablas(tmp_path, formato="arrow").guardar(
+        _tabla().drop(columns="Territorio"), "df_limpia"
+    )
+    script = _script()
+
+    por_manifiesto, origen = script.scan_store(tmp_path)
+    assert set(origen.values()) == {"manifest"}
+    por_datos, origen = script.scan_store(tmp_path, data=True, workers=2)
+    assert set(origen.values()) == {"data"}
+    assert sorted(por_manifiesto) == sorted(por_datos)
+    assert ("df_ccaa_compacta", "Territorio", "Castilla y LeÃ³n", 3) in por_datos
+
+    # Entradas del manifiesto anteriores a `valores_mojibake`: se leen los datos
+    entradas = almacen.manifiesto.leer()
+    del entradas["df_ccaa"]["valores_mojibake"]
+    almacen.manifiesto.reemplazar(entradas)
+    _, origen = script.scan_store(tmp_path)
+    assert origen == {
+        "df_ccaa": "data",
+        "df_ccaa_compacta": "manifest",
+        "df_limpia": "manifest",
+    }
+
+    informe = tmp_path / "informe.json"
+    assert script.main(["--directory", str(tmp_path), "--json", str(informe)]) == 1
+    problemas = json.loads(informe.read_text(encoding="utf-8"))["issues"]
+    assert {
+        "table": "df_ccaa",
+        "column": "Territorio",
+        "value": "AndalucÃ\xada",
+        "count": 3,
+    } in problemas
+    assert {p["table"] for p in problemas} == {"df_ccaa", "df_ccaa_compacta"}
+
+
+def test_columna_en_el_limite_del_manifiesto_se_lee_de_los_datos(tmp_path):
+    n = MAX_VALORES_MOJIBAKE + 5
+    df = pd.DataFrame({"Territorio": [f"RegiÃ³n {i}" for i in range(n)]})
+    almacen = AlmacenTablas(tmp_path)
+    almacen.guardar(df, "df_corrupta")
+    assert len(almacen.metadatos("df_corrupta")["valores_mojibake"]["Territorio"]) < n
+
+    problemas, origen = _script().scan_store(tmp_path)
+
+    assert origen == {"df_corrupta": "data"}
+    assert len(problemas) == n
@@ -0,0 +1,93 @@
+import pandas as pd
+import pytest
+
+from src import derivadas
+from src.almacen import AlmacenTablas
+from src.derivadas import estado, main, materializar
+from src.notebook_fixtures import derive_pivot_deciles, load_pickles_to_namespace
+
+
+def _renta(factor=1.0):
+    deciles = [f"D{d}" for d in range(1, 11)] + ["Total"]
+    medias = [1000.0 * d * factor for d in range(1, 11)] + [5000.0 * factor]
+    return pd.DataFrame(
+        {"Año": [2008] * 11 + [2009] * 11, "Decil": deciles * 2, "Media": medias * 2}
+    )
+
+
+def _almacen(tmp_path):
+    almacen = AlmacenTablas(tmp_path)
+    almacen.guardar(_renta(), "df_renta_decil", compactar=True)
+    almacen.guardar(
+        pd.DataFrame(
+            {
+                "Anio": [2007, 2008, 2009],
+                "IPC_Medio_Anual": [90.0, 94.0, 93.8],
+                "Inflacion_Anual_%": [2.8, 4.1, -0.3],
+            }
+        ),
+        "df_ipc_anual",
+        compactar=True,
+    )
+    return almacen
+
+
+@pytest.fixture
+def contador(monkeypatch):
+    """Cuenta las veces que se ejecuta la función de df_pivot_deciles."""
+    llamadas = []
+    derivada = derivadas.REGISTRO["df_pivot_deciles"]
+    original = derivada.funcion
+    monkeypatch.setattr(
+        derivada, "funcion", lambda t: llamadas.append(1) or original(t)
+    )
+    return llamadas
+
+
+def test_materializar_reutiliza_hasta_que_cambia_la_entrada(tmp_path, contador):
+    almacen = _almacen(tmp_path)
+    assert estado("df_pivot_deciles", almacen) == "ausente"
+
+    pivot = materializar("df_pivot_deciles", almacen)
+    assert pivot.loc[2009, "D10"] == 10000.0
+    assert estado("df_pivot_deciles", almacen) == "vigente"
+    pd.testing.assert_frame_equal(materializar("df_pivot_deciles", almacen), pivot)
+    assert len(contador) == 1
+
+    # Reescribir la entrada con el mismo contenido no invalida; con otro, sí
+    almacen.guardar(_renta(), "df_renta_decil", compactar=True)
+    assert estado("df_pivot_deciles", almacen) == "vigente"
+    almacen.guardar(_renta(2.0), "df_renta_decil", compactar=True)
+    assert estado("df_pivot_deciles", almacen) == "desactualizada"
+    assert materializar("df_pivot_deciles", almacen).loc[2009, "D10"] == 20000.0
+    assert len(contador) == 2
+
+
+def test_renta_real_deflactada_base_2008(tmp_path):
+    almacen = _almacen(tmp_path)
+    real = materializar("df_renta_real_deciles", almacen)
+    assert real.loc[2008, "D1"] == 1000.0
+    assert real.loc[2009, "D1"] == pytest.approx(1000.0 / 0.997)
+    assert real.loc[2009, "Total"] == pytest.approx(5000.0 / 0.997)
+
+
+def test_namespace_lee_la_derivada_materializada(tmp_path, contador, capsys):
+    almacen = _almacen(tmp_path)
+    assert main(["--directorio", str(tmp_path)]) == 0
+    salida = capsys.readouterr().out
+    assert "[OK] df_pivot_deciles: recalculada" in salida
+    assert "[WARN] df_arope_anual: sin entradas" in salida
+
+    ns = load_pickles_to_namespace(tmp_path)
+    pivot = ns["df_pivot_deciles"]
+    assert ns.materialized() == ["df_pivot_deciles"]
+    assert len(contador) == 1
+    pd.testing.assert_frame_equal(
+        pivot, derive_pivot_deciles(ns["df_renta"]), check_names=False
+    )
+
+    # Si el notebook sustituye la tabla de origen, la derivada sale de ella
+    ns = load_pickles_to_namespace(tmp_path)
+    ns["df_renta"] = _renta(3.0).rename(columns={"Año": "Anio"})
+    assert ns["df_pivot_deciles"].loc[2009, "D10"] == 30000.0
+    assert estado("df_pivot_deciles", almacen) == "vigente"
@@ -0,0 +1,119 @@
+import json
+
+from src.etl.cache_http import CacheHTTP
+from src.etl.descarga import descargar
+
+
+class FakeResponse:
+    def __init__(self, payload, status_code=200, headers=None):
+        self.status_code = status_code
+        self.content = b"" if payload is None else json.dumps(payload).encode("utf-8")
+        self.headers = headers or {}
+        self.cerrada = False
+
+    def close(self):
+        self.cerrada = True
+
+
+class ServidorETag:
+    """Responde 304 si el cliente envía el ETag vigente."""
+
+    def __init__(self, payload, etag=None):
+        self.payload = payload
+        self.etag = etag
+        self.peticiones = []
+
+    def get(self, url, params=None, timeout=None, headers=None, stream=False):
+        headers = headers or {}
+        self.peticiones.append(headers)
+        if self.etag and headers.get("If-None-Match") == self.etag:
+            return FakeResponse(None, 304)
+        cabeceras = {"ETag": self.etag} if self.etag else {}
+        return FakeResponse(self.payload, 200, cabeceras)
+
+
+class Respuestas:
+    """Devuelve las respuestas dadas, en orden."""
+
+    def __init__(self, *respuestas):
+        self.respuestas = list(respuestas)
+
+    def get(self, url, params=None, timeout=None, headers=None, stream=False):
+        return self.respuestas.pop(0)
+
+
+class SinRed:
+    def get(self, *args, **kwargs):
+        raise AssertionError("no debería haber peticiones en modo offline")
+
+
+def test_revalidacion_condicional_con_etag(tmp_path):
+    cache = CacheHTTP(tmp_path)
+    servidor = ServidorETag([{"Nombre": "serie", "Data": []}], etag='"v1"')
+
+    primera = descargar(servidor, "t", "http://fake/t", cache=cache)
+    segunda = descargar(servidor, "t", "http://fake/t", cache=cache)
+
+    assert primera.ok and not primera.desde_cache
+    assert servidor.peticiones[1] == {"If-None-Match": '"v1"'}
+    assert segunda.ok and segunda.desde_cache
+    assert segunda.json() == primera.json()
+    assert len(list((tmp_path / "objetos").rglob("*.gz"))) == 1
+
+
+def test_ttl_sin_validadores(tmp_path):
+    servidor = ServidorETag({"value": {"0": 1.0}})
+    cache = CacheHTTP(tmp_path, ttl_horas=1)
+    descargar(servidor, "t", "http://fake/t", params={"a": 1}, cache=cache)
+    assert descargar(
+        servidor, "t", "http://fake/t", params={"a": 1}, cache=cache
+    ).desde_cache
+    assert len(servidor.peticiones) == 1
+
+    caducada = CacheHTTP(tmp_path, ttl_horas=0)
+    assert not descargar(
+        servidor, "t", "http://fake/t", params={"a": 1}, cache=caducada
+    ).desde_cache
+    assert len(servidor.peticiones) == 2
+
+
+def test_modo_offline_sin_red(tmp_path):
+    descargar(ServidorETag([1, 2, 3]), "t", "http://fake/t", cache=CacheHTTP(tmp_path))
+
+    offline = CacheHTTP(tmp_path, offline=True)
+    resultado = descargar(SinRed(), "t", "http://fake/t", cache=offline)
+    assert resultado.ok and resultado.json() == [1, 2, 3]
+
+    ausente = descargar(SinRed(), "otra", "http://fake/otra", cache=offline)
+    assert not ausente.ok
+    assert "offline" in ausente.error
+
+
+def test_descarga_en_disco_se_guarda_y_se_lee_como_flujo(tmp_path):
+    cache = CacheHTTP(tmp_path / "cache", ttl_horas=1)
+    payload = {"value": {str(i): float(i) for i in range(1000)}}
+    servidor = ServidorETag(payload)
+
+    primera = descargar(servidor, "t", "http://fake/t", cache=cache, en_disco=True)
+    assert primera.en_disco and primera.contenido == b""
+    assert primera.bytes == len(json.dumps(payload).encode("utf-8"))
+
+    segunda = descargar(servidor, "t", "http://fake/t", cache=cache, en_disco=True)
+    assert segunda.desde_cache and segunda.en_disco
+    with segunda.abrir() as f:
+        assert json.load(f) == payload
+    assert len(servidor.peticiones) == 1
+
+
+def test_reintento_cierra_la_respuesta_y_304_sin_copia_es_error(tmp_path):
+    fallida = FakeResponse(None, 503)
+    servidor = Respuestas(fallida, FakeResponse({"ok": 1}))
+    resultado = descargar(servidor, "t", "http://fake/t", backoff=0, en_disco=True)
+    assert resultado.ok and resultado.intentos == 2
+    assert fallida.cerrada
+
+    no_modificada = FakeResponse(None, 304)
+    servidor = Respuestas(no_modificada)
+    resultado = descargar(servidor, "t", "http://fake/t", cache=CacheHTTP(tmp_path))
+    assert resultado.error == "HTTP 304 sin copia en caché"
+    assert resultado.intentos == 1 and no_modificada.cerrada
@@ -0,0 +1,201 @@
+import json
+import math
+
+import pandas as pd
+import pytest
+
+from src.etl import eurostat
+from src.etl.cache_http import CacheHTTP
+from src.etl.eurostat import (
+    ARCHIVO_DIMENSIONES,
+    DATASETS_REDISTRIBUTIVOS,
+    DIMENSIONES_DATASET,
+    URL_EUROSTAT,
+    consulta_eurostat,
+    extraer_dataset_eurostat,
+    extraer_impacto_redistributivo,
+    filtros_sdmx,
+    parsear_eurostat_sdmx,
+    parsear_eurostat_sdmx_por_observacion,
+)
+from src.etl.sinteticos import generar_sdmx_sintetico
+
+
+@pytest.fixture(autouse=True)
+def _dimensiones_aisladas(monkeypatch):
+    """Los órdenes aprendidos en un test no se filtran a los siguientes."""
+    copia = {codigo: list(ids) for codigo, ids in DIMENSIONES_DATASET.items()}
+    monkeypatch.setattr(eurostat, "_dimensiones_cargadas", set())
+    yield
+    DIMENSIONES_DATASET.clear()
+    DIMENSIONES_DATASET.update(copia)
+
+
+def _como_objeto(df):
+    """Categóricas -> object para comparar con la implementación por observación."""
+    return df.astype(
+        {c: object for c in df.columns if isinstance(df[c].dtype, pd.CategoricalDtype)}
+    )
+
+
+@pytest.mark.parametrize(
+    "filtros",
+    [
+        {"filter_geo": "ES"},
+        {"filter_geo": None, "filter_unit": "PC", "filter_indic": "LI_R_MD60"},
+        {"filter_geo": "EU27_2020", "filter_age": None, "filter_sex": None},
+        {"filter_geo": None, "filter_age": None, "filter_sex": None},
+    ],
+)
+def test_decodificador_columnar_equivale_al_original(filtros):
+    payload = generar_sdmx_sintetico(n_geo=12, anios=range(2015, 2024), seed=1)
+    esperado = parsear_eurostat_sdmx_por_observacion(payload, "Valor", **filtros)
+    obtenido = parsear_eurostat_sdmx(payload, "Valor", **filtros)
+    assert len(esperado) > 0
+    pd.testing.assert_frame_equal(_como_objeto(obtenido), esperado)
+    assert isinstance(obtenido["geo_code"].dtype, pd.CategoricalDtype)
+
+
+def test_decodificador_sin_age_sex_y_valores_nulos():
+    payload = generar_sdmx_sintetico(n_geo=3, anios=range(2020, 2023))
+    # Sin dimensiones age/sex, como ilc_di12b/c; una de cada cuatro celdas nula
+    for dim in ("sex", "age"):
+        del payload["dimension"][dim]
+    payload["id"] = list(payload["dimension"])
+    payload["size"] = [
+        len(d["category"]["index"]) for d in payload["dimension"].values()
+    ]
+    n = math.prod(payload["size"])
+    payload["value"] = {str(i): (None if i % 4 == 0 else float(i)) for i in range(n)}
+
+    esperado = parsear_eurostat_sdmx_por_observacion(payload, "Gini", filter_geo="ES")
+    obtenido = parsear_eurostat_sdmx(payload, "Gini", filter_geo="ES")
+    pd.testing.assert_frame_equal(_como_objeto(obtenido), esperado)
+    assert "age" not in obtenido.columns
+    assert obtenido["Gini"].notna().all()
+
+
+class FakeSession:
+    """Responde el payload completo en la URL base y 404 en las URLs con clave."""
+
+    def __init__(self, payload, url_base, clave_existe=True):
+        self.payload = payload
+        self.url_base = url_base
+        self.clave_existe = clave_existe
+        self.llamadas = []
+
+    def get(self, url, params=None, timeout=None, headers=None, stream=False):
+        self.llamadas.append((url, dict(params or {})))
+        status = 200 if url == self.url_base or self.clave_existe else 404
+        return FakeResponse(self.payload if status == 200 else {}, status)
+
+
+class FakeResponse:
+    def __init__(self, payload, status_code):
+        self.status_code = status_code
+        self.content = json.dumps(payload).encode("utf-8")
+
+
+def test_consulta_eurostat_construye_clave_y_periodo():
+    filtros = filtros_sdmx(filter_geo=None, filter_unit="PC", filter_indic="LI_R_MD60")
+    url, params = consulta_eurostat("ilc_li02", filtros, desde=2015, hasta=2024)
+    assert url == f"{URL_EUROSTAT}/ilc_li02/.PC.LI_R_MD60.T.TOTAL."
+    assert params["sinceTimePeriod"] == "2015"
+    assert params["untilTimePeriod"] == "2024"
+    # Dataset sin estructura conocida: solo filtro temporal
+    url, params = consulta_eurostat("sdg_10_30", filtros, desde=2015)
+    assert url == f"{URL_EUROSTAT}/sdg_10_30"
+    assert "untilTimePeriod" not in params
+
+
+def test_extraer_vuelve_al_dataset_completo(monkeypatch):
+    payload = generar_sdmx_sintetico(n_geo=5, anios=range(2012, 2024))
+    monkeypatch.setitem(DIMENSIONES_DATASET, "ilc_li02", ["freq", "geo"])
+    session = FakeSession(payload, f"{URL_EUROSTAT}/ilc_li02", clave_existe=False)
+
+    df = extraer_dataset_eurostat(
+        "ilc_li02", "AROP_%", filter_unit="PC", desde=2015, session=session
+    )
+
+    assert [u for u, _ in session.llamadas] == [
+        f"{URL_EUROSTAT}/ilc_li02/.ES",
+        f"{URL_EUROSTAT}/ilc_li02",
+    ]
+    esperado = parsear_eurostat_sdmx(payload, "AROP_%", filter_unit="PC")
+    esperado = esperado[esperado["Anio"] >= 2015].reset_index(drop=True)
+    pd.testing.assert_frame_equal(df, esperado)
+    # El orden real de dimensiones se aprende de la respuesta completa
+    assert DIMENSIONES_DATASET["ilc_li02"] == payload["id"][:-1]
+
+
+class SessionPorDataset:
+    """Un payload por dataset (según la URL); anota las peticiones."""
+
+    def __init__(self, payloads):
+        self.payloads = payloads
+        self.llamadas = []
+
+    def get(self, url, params=None, timeout=None, headers=None, stream=False):
+        self.llamadas.append(url)
+        codigo = url.replace(URL_EUROSTAT + "/", "").split("/")[0]
+        return FakeResponse(self.payloads[codigo], 200)
+
+
+def test_orden_aprendido_se_persiste_y_da_clave_a_ilc_di11(tmp_path, monkeypatch):
+    payload = generar_sdmx_sintetico(n_geo=4, anios=range(2015, 2024))
+    session = SessionPorDataset({"ilc_di11": payload})
+    kwargs = dict(
+        filter_unit="PC", session=session, cache=CacheHTTP(tmp_path), flujo=False
+    )
+
+    primera = extraer_dataset_eurostat("ilc_di11", "S80S20_Ratio", **kwargs)
+
+    # Sin orden conocido la primera consulta va sin clave, pero su `id` se guarda
+    assert session.llamadas == [f"{URL_EUROSTAT}/ilc_di11"]
+    assert (tmp_path / ARCHIVO_DIMENSIONES).exists()
+
+    # Otro proceso: el orden se recupera del archivo junto a la caché
+    del DIMENSIONES_DATASET["ilc_di11"]
+    monkeypatch.setattr(eurostat, "_dimensiones_cargadas", set())
+    segunda = extraer_dataset_eurostat("ilc_di11", "S80S20_Ratio", **kwargs)
+
+    assert session.llamadas[-1] == f"{URL_EUROSTAT}/ilc_di11/.PC..T.TOTAL.ES"
+    pd.testing.assert_frame_equal(segunda, primera)
+
+
+def test_impacto_redistributivo_un_concat_para_todos_los_paises():
+    payloads = {
+        codigo: generar_sdmx_sintetico(
+            n_geo=6,
+            anios=range(2010, 2024),
+            indicadores=("GINI",),
+            densidad=0.7,
+            seed=i,
+        )
+        for i, (codigo, _) in enumerate(DATASETS_REDISTRIBUTIVOS)
+    }
+    session = SessionPorDataset(payloads)
+
+    todos = extraer_impacto_redistributivo(session=session, flujo=False)
+
+    assert len(session.llamadas) == 3
+    # Referencia: merges outer sucesivos como en la celda original de 01b
+    esperado = None
+    for codigo, columna in DATASETS_REDISTRIBUTIVOS:
+        df = _como_objeto(
+            parsear_eurostat_sdmx(
+                payloads[codigo], columna, filter_geo=None, filter_unit="PC"
+            )
+        )
+        df = df[["geo_code", "geo_name", "Anio", columna]]
+        claves = ["geo_code", "geo_name", "Anio"]
+        esperado = (
+            df if esperado is None else esperado.merge(df, on=claves, how="outer")
+        )
+    esperado = esperado.sort_values(["geo_code", "Anio"]).reset_index(drop=True)
+    pd.testing.assert_frame_equal(todos, esperado)
+
+    es = extraer_impacto_redistributivo("ES", session=session, flujo=False)
+    pd.testing.assert_frame_equal(
+        es, esperado[esperado["geo_code"] == "ES"].reset_index(drop=True)
+    )
@@ -0,0 +1,137 @@
+import json
+
+import pandas as pd
+
+from src.almacen import leer_tabla
+from src.etl.incremental import (
+    ARCHIVO_ESTADO,
+    clave_primaria,
+    extraer_ine_incremental,
+    fusionar_incremento,
+)
+from src.etl.ine import TABLAS_INE, url_tabla_ine
+from src.tipos import aplicar_politica
+
+URL_HOGAR = url_tabla_ine(TABLAS_INE["df_arope_hogar"])
+URL_IPC = url_tabla_ine(TABLAS_INE["df_ipc_anual"])
+
+
+class FakeResponse:
+    def __init__(self, payload):
+        self.status_code = 200
+        self.content = json.dumps(payload).encode("utf-8")
+        self.headers = {}
+
+
+class FakeSession:
+    """Responde con la serie recortada a `nult` periodos y anota las peticiones."""
+
+    def __init__(self, respuestas):
+        self.respuestas = respuestas
+        self.peticiones = []
+
+    def get(self, url, params=None, timeout=None, headers=None, stream=False):
+        self.peticiones.append((url, dict(params or {})))
+        nult = (params or {}).get("nult")
+        data = [
+            {**s, "Data": s["Data"][-nult:] if nult else s["Data"]}
+            for s in self.respuestas[url]
+        ]
+        return FakeResponse(data)
+
+
+def _hogar(valores):
+    """AROPE por tipo de hogar (60259): una serie con {año: valor}."""
+    return [
+        {
+            "Nombre": "Hogares de una persona. Tasa de riesgo de pobreza o exclusión social (AROPE). Total.",
+            "Data": [{"Anyo": a, "Valor": v} for a, v in sorted(valores.items())],
+        }
+    ]
+
+
+def _ipc(anios):
+    return [
+        {
+            "Nombre": "Índice general",
+            "Data": [
+                {"Anyo": a, "Valor": 100.0 + 2 * (a - 2018)}
+                for a in anios
+                for _ in range(12)
+            ],
+        }
+    ]
+
+
+def _primera_extraccion(tmp_path, session, tablas):
+    return extraer_ine_incremental(
+        tablas, cache_dir=tmp_path, session=session, anio_actual=2024
+    )
+
+
+def test_clave_primaria_usa_reglas_con_columnas_del_pickle():
+    df = pd.DataFrame(columns=["Año", "Tipo_Hogar", "Indicador", "Valor"])
+    assert clave_primaria("df_arope_hogar", df) == ["Año", "Tipo_Hogar", "Indicador"]
+
+
+def test_fusionar_incremento_sustituye_por_clave():
+    anterior = pd.DataFrame({"Anio": [2021, 2022], "Serie": ["a", "a"], "V": [1, 2]})
+    nuevo = pd.DataFrame(
+        {"Anio": [2020, 2022, 2023], "Serie": ["a", "a", "a"], "V": [9, 5, 6]}
+    )
+    fusion = fusionar_incremento(anterior, nuevo, ["Anio", "Serie"], desde=2022)
+    assert fusion["Anio"].tolist() == [2021, 2022, 2023]
+    assert fusion["V"].tolist() == [1, 5, 6]
+
+
+def test_incremental_pide_solo_periodos_nuevos(tmp_path):
+    session = FakeSession(
+        {
+            URL_HOGAR: _hogar({2020: 20.0, 2021: 21.0, 2022: 22.0}),
+            URL_IPC: _ipc(range(2018, 2023)),
+        }
+    )
+    _primera_extraccion(tmp_path, session, ["df_arope_hogar", "df_ipc_anual"])
+    assert all(params == {} for _, params in session.peticiones)
+
+    session.respuestas = {
+        URL_HOGAR: _hogar({2020: 20.0, 2021: 21.0, 2022: 22.5, 2023: 23.0}),
+        URL_IPC: _ipc(range(2018, 2024)),
+    }
+    session.peticiones = []
+    dfs = _primera_extraccion(tmp_path, session, ["df_arope_hogar", "df_ipc_anual"])
+
+    nult = dict((url, params.get("nult")) for url, params in session.peticiones)
+    assert nult == {URL_HOGAR: 3, URL_IPC: 36}
+    hogar = dfs["df_arope_hogar"]
+    assert hogar["Año"].tolist() == [2020, 2021, 2022, 2023]
+    assert hogar["Valor"].tolist() == [20.0, 21.0, 22.5, 23.0]
+    assert not hogar.duplicated(["Año", "Tipo_Hogar", "Indicador"]).any()
+    ipc = dfs["df_ipc_anual"]
+    assert ipc["Anio"].tolist() == list(range(2018, 2024))
+    assert ipc["Inflacion_Anual_%"].iloc[-1] == round(2 / 108 * 100, 2)
+    # Se guarda con la política de tipos compactos (src/tipos.py)
+    pd.testing.assert_frame_equal(
+        leer_tabla("df_arope_hogar", tmp_path), aplicar_politica(hogar)
+    )
+
+
+def test_revision_historica_fuerza_descarga_completa(tmp_path):
+    session = FakeSession({URL_HOGAR: _hogar({a: 20.0 for a in range(2015, 2023)})})
+    _primera_extraccion(tmp_path, session, ["df_arope_hogar"])
+
+    # Estado antiguo: toca comprobar revisiones; el INE ha corregido 2020
+    ruta_estado = tmp_path / ARCHIVO_ESTADO
+    estado = json.loads(ruta_estado.read_text(encoding="utf-8"))
+    estado["df_arope_hogar"]["ultima_revision"] = 0
+    ruta_estado.write_text(json.dumps(estado), encoding="utf-8")
+    valores = {a: 20.0 for a in range(2015, 2024)}
+    valores[2020] = 19.0
+    session.respuestas = {URL_HOGAR: _hogar(valores)}
+    session.peticiones = []
+
+    dfs = _primera_extraccion(tmp_path, session, ["df_arope_hogar"])
+    assert [p for _, p in session.peticiones] == [{"nult": 6}, {}]
+    hogar = dfs["df_arope_hogar"]
+    assert hogar["Año"].tolist() == list(range(2015, 2024))
+    assert hogar.loc[hogar["Año"] == 2020, "Valor"].item() == 19.0
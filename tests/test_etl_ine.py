@@ -0,0 +1,131 @@
+import json
+import threading
+import time
+
+import pandas as pd
+
+from src.almacen import leer_tabla
+from src.etl.descarga import descargar_varias
+from src.etl.ine import (
+    TABLAS_INE,
+    aplanar_series,
+    extraer_ine,
+    transformar_arope_edad_sexo,
+    transformar_carencia,
+    url_tabla_ine,
+)
+from src.tipos import aplicar_politica
+
+
+class FakeResponse:
+    def __init__(self, payload, status_code=200):
+        self.status_code = status_code
+        self.content = json.dumps(payload).encode("utf-8")
+        self.cerrada = False
+
+    def close(self):
+        self.cerrada = True
+
+
+class FakeSession:
+    """Sesión mínima que responde por URL y mide la concurrencia alcanzada."""
+
+    def __init__(self, respuestas, delay=0.02, fallos_previos=None):
+        self.respuestas = respuestas
+        self.delay = delay
+        self.fallos_previos = dict(fallos_previos or {})
+        self.activas = 0
+        self.max_activas = 0
+        self.lock = threading.Lock()
+
+    def get(self, url, params=None, timeout=None, headers=None, stream=False):
+        with self.lock:
+            self.activas += 1
+            self.max_activas = max(self.max_activas, self.activas)
+        time.sleep(self.delay)
+        with self.lock:
+            self.activas -= 1
+            if self.fallos_previos.get(url, 0) > 0:
+                self.fallos_previos[url] -= 1
+                return FakeResponse({}, status_code=503)
+        return FakeResponse(self.respuestas.get(url, []))
+
+
+def test_descargar_varias_respeta_limite_y_reintenta():
+    urls = {f"t{i}": f"http://fake/{i}" for i in range(8)}
+    session = FakeSession({}, fallos_previos={"http://fake/3": 2})
+    resultados = descargar_varias(urls, max_workers=3, session=session, backoff=0)
+    assert session.max_activas <= 3
+    assert all(r.ok for r in resultados.values())
+    assert resultados["t3"].intentos == 3
+    assert list(resultados) == list(urls)
+
+
+def test_extraer_ine_transforma_y_guarda(tmp_path):
+    umbral = [
+        {
+            "Nombre": "Hogares de una persona",
+            "Data": [
+                {"NombrePeriodo": "2022", "Valor": 10088.0},
+                {"NombrePeriodo": "2023", "Valor": 10990.0},
+            ],
+        }
+    ]
+    ipc = [{"Nombre": "Índice general", "Data": [{"Anyo": 2022, "Valor": 100.0}]}]
+    session = FakeSession(
+        {
+            url_tabla_ine(TABLAS_INE["df_umbral_limpio"]): umbral,
+            url_tabla_ine(TABLAS_INE["df_ipc_anual"]): ipc,
+        }
+    )
+    dfs = extraer_ine(
+        ["df_umbral_limpio", "df_ipc_anual"], cache_dir=tmp_path, session=session
+    )
+    assert list(dfs["df_umbral_limpio"]["Anio"]) == [2022, 2023]
+    assert dfs["df_ipc_anual"]["IPC_Medio_Anual"].iloc[0] == 100.0
+    guardado = leer_tabla("df_umbral_limpio", tmp_path)
+    pd.testing.assert_frame_equal(guardado, aplicar_politica(dfs["df_umbral_limpio"]))
+
+
+def test_aplanar_series_en_formato_largo():
+    data = [
+        {"Nombre": "A", "Data": [{"Anyo": 2020, "Valor": 1.0}, "basura"]},
+        {"Nombre": "B", "Data": [{"Anyo": 2021, "Valor": None}]},
+        {"Nombre": "A", "Data": [{"Anyo": 2022, "Valor": 3.0}]},
+        {"Nombre": "Sin datos"},
+    ]
+    largo = aplanar_series(data, campos=("Anyo", "Valor"))
+    assert list(largo["Nombre"].astype(str)) == ["A", "B", "A"]
+    assert list(largo["Nombre"].cat.categories) == ["A", "B"]
+    assert list(largo["Anyo"]) == [2020, 2021, 2022]
+    assert largo["Valor"].isna().tolist() == [False, True, False]
+
+
+def test_transformaciones_parsean_nombres_de_serie():
+    def serie(nombre, valores):
+        return {
+            "Nombre": nombre,
+            "Data": [{"Anyo": 2020 + i, "Valor": v} for i, v in enumerate(valores)],
+        }
+
+    arope = transformar_arope_edad_sexo(
+        [
+            serie("Tasa AROPE. Hombres. De 16 a 29 años.", [20.0, None]),
+            serie("En riesgo de pobreza (renta). Mujeres. Total.", [18.5, 19.0]),
+        ]
+    )
+    assert arope[["Sexo", "Edad", "Indicador"]].astype(str).values.tolist() == [
+        ["Hombre", "16 a 29 años", "AROPE"],
+        ["Mujer", "Total", "AROP"],
+        ["Mujer", "Total", "AROP"],
+    ]
+    assert list(arope["Año"]) == [2020, 2020, 2021]
+
+    carencia = transformar_carencia(
+        [
+            serie("Vacaciones. Total Nacional. Séptimo decil. Porcentaje", ["1,5"]),
+            serie("Vacaciones. Total Nacional. Porcentaje", [None]),
+        ]
+    )
+    assert carencia["Decil"].astype(str).tolist() == ["D7"]
+    assert carencia["Valor"].tolist() == [1.5]
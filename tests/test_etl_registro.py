@@ -0,0 +1,87 @@
+import json
+
+import pandas as pd
+import pytest
+
+from src.almacen import leer_tabla
+from src.etl.__main__ import main
+from src.etl.registro import REGISTRO, extraer_fuentes, seleccionar, tablas_sql
+from src.etl.sinteticos import generar_sdmx_sintetico
+from src.tipos import aplicar_politica
+from utils.validation_rules import ALL_VALIDATION_RULES
+
+
+class FakeResponse:
+    def __init__(self, payload):
+        self.status_code = 200
+        self.content = json.dumps(payload).encode("utf-8")
+        self.headers = {}
+
+
+class FakeSession:
+    """Mismo payload SDMX para cualquier URL; anota las peticiones."""
+
+    def __init__(self, payload):
+        self.payload = payload
+        self.llamadas = []
+
+    def get(self, url, params=None, timeout=None, headers=None, stream=False):
+        self.llamadas.append(url)
+        return FakeResponse(self.payload)
+
+
+def test_registro_cubre_las_tablas_de_validacion():
+    assert set(REGISTRO) == set(ALL_VALIDATION_RULES)
+    assert len(tablas_sql("INE")) == 13
+    assert len(tablas_sql("EUROSTAT")) == 14
+
+
+def test_seleccionar_por_tabla_o_clave_de_cache():
+    fuentes = seleccionar(["df_gini_ccaa", "EUROSTAT_Gini_Ranking"])
+    assert [f.tabla_sql for f in fuentes] == [
+        "INE_Gini_S80S20_CCAA",
+        "EUROSTAT_Gini_Ranking",
+    ]
+    assert all(f.origen == "EUROSTAT" for f in seleccionar(origen="eurostat"))
+    with pytest.raises(ValueError):
+        seleccionar(["INE_Inexistente"])
+
+
+def test_tablas_de_un_indicador_comparten_descarga(tmp_path):
+    payload = generar_sdmx_sintetico(n_geo=6, anios=range(2012, 2024))
+    session = FakeSession(payload)
+    fuentes = seleccionar(["df_arop_es", "df_arop_ue27", "df_arop_eu_todos"])
+
+    dfs = extraer_fuentes(fuentes, jobs=2, cache_dir=tmp_path, session=session)
+
+    assert len(session.llamadas) == 1
+    todos = dfs["EUROSTAT_AROP_Ranking"]
+    assert todos["Anio"].between(2015, 2024).all()
+    assert "age" not in todos.columns
+    for tabla, geo in [
+        ("EUROSTAT_AROP_Espana", "ES"),
+        ("EUROSTAT_AROP_UE27", "EU27_2020"),
+    ]:
+        df = dfs[tabla]
+        assert (df["geo_code"] == geo).all()
+        assert len(df) == (todos["geo_code"] == geo).sum()
+    pd.testing.assert_frame_equal(
+        leer_tabla("df_arop_es", tmp_path),
+        aplicar_politica(dfs["EUROSTAT_AROP_Espana"]),
+    )
+
+
+def test_cli_list_y_nombre_desconocido(capsys):
+    assert main(["list", "--only", "df_gini_ccaa,df_gap_todos"]) == 0
+    salida = capsys.readouterr().out.splitlines()
+    assert [linea.split()[0] for linea in salida] == [
+        "INE_Gini_S80S20_CCAA",
+        "EUROSTAT_Brecha_Pobreza_Ranking",
+    ]
+    assert main(["extract", "--only", "no_existe"]) == 2
+
+
+def test_cli_offline_sin_cache_es_error(monkeypatch, capsys):
+    monkeypatch.setenv("ETL_SIN_CACHE", "1")
+    assert main(["extract", "--only", "df_gini_ccaa", "--offline"]) == 2
+    assert "--offline" in capsys.readouterr().out
@@ -0,0 +1,73 @@
+import math
+import time
+
+import pytest
+import requests
+
+from src.etl.cache_http import CacheHTTP
+from src.etl.ine import TABLAS_INE, url_tabla_ine
+from src.etl.registro import seleccionar
+from src.etl.rendimiento import comparar_con_referencia, medir_extraccion
+from src.etl.servidor_local import ServidorLocal, payloads_sinteticos
+
+LATENCIA = 0.2
+JOBS = 8
+# Caída tolerada frente al límite teórico (latencia) de la etapa en paralelo
+UMBRAL_ETAPA = 0.5
+
+
+@pytest.fixture
+def servidor():
+    with ServidorLocal(latencia=LATENCIA) as s:
+        s.registrar_payloads(payloads_sinteticos())
+        yield s
+
+
+def test_servidor_sirve_rutas_grabadas_y_limita_ancho_de_banda(tmp_path):
+    url = url_tabla_ine(TABLAS_INE["df_arope_hogar"])
+    cache = CacheHTTP(directorio=tmp_path)
+    cache.guardar(url, None, b"[]")
+    with ServidorLocal(ancho_banda=1e6, cache=cache) as s:
+        s.registrar("https://ec.europa.eu/datos/ilc_li02", b"x" * 200_000)
+        session = s.sesion(2)
+        assert session.get(url).content == b"[]"
+        inicio = time.perf_counter()
+        respuesta = session.get("https://ec.europa.eu/datos/ilc_li02/.PC.ES")
+        assert len(respuesta.content) == 200_000
+        assert time.perf_counter() - inicio >= 0.15
+        assert session.get("https://ec.europa.eu/datos/ilc_li02b").status_code == 404
+    assert s.peticiones == 3
+
+
+def test_etapa_ine_en_paralelo_cerca_del_limite_de_latencia(servidor):
+    fuentes = seleccionar(origen="INE")
+    resultado = medir_extraccion(servidor, fuentes, jobs=JOBS, por_fuente=False)
+
+    etapa = resultado["etapa"]
+    assert etapa["peticiones"] == len(fuentes)
+    assert etapa["filas"] > 0
+    # Con JOBS hilos el mínimo son ceil(n / JOBS) rondas de latencia
+    limite = len(fuentes) / (math.ceil(len(fuentes) / JOBS) * LATENCIA)
+    referencia = {"etapa": {"peticiones_s": limite}}
+    assert comparar_con_referencia(resultado, referencia, UMBRAL_ETAPA) == []
+
+
+def test_comparar_detecta_regresiones_por_fuente():
+    referencia = {
+        "etapa": {"peticiones_s": 40.0},
+        "fuentes": {"INE_AROPE_Hogar": {"peticiones_s": 10.0}},
+    }
+    actual = {
+        "etapa": {"peticiones_s": 35.0},
+        "fuentes": {
+            "INE_AROPE_Hogar": {"peticiones_s": 7.0},
+            "INE_AROPE_CCAA": {"peticiones_s": 1.0},
+        },
+    }
+    regresiones = comparar_con_referencia(actual, referencia, umbral=0.2)
+    assert len(regresiones) == 1 and regresiones[0].startswith("INE_AROPE_Hogar")
+
+
+def test_sesion_local_no_sale_a_la_red(servidor):
+    with pytest.raises(requests.HTTPError):
+        servidor.sesion(1).get("https://servicios.ine.es/otra").raise_for_status()
@@ -0,0 +1,80 @@
+import io
+import json
+import tracemalloc
+
+import pandas as pd
+import pytest
+
+from src.etl import streaming
+from src.etl.descarga import ResultadoDescarga
+from src.etl.eurostat import parsear_eurostat_sdmx, parsear_eurostat_sdmx_flujo
+from src.etl.ine import transformar_arope_edad_sexo, transformar_resultado
+from src.etl.sinteticos import generar_ine_sintetico, generar_sdmx_sintetico
+
+pytestmark = pytest.mark.skipif(not streaming.disponible(), reason="ijson no instalado")
+
+# Techo de memoria del decodificador por flujo con bloques de 10.000 observaciones
+TECHO_PICO_MB = 4.0
+
+
+@pytest.mark.parametrize(
+    "filtros",
+    [
+        {"filter_geo": "ES", "filter_unit": "PC", "filter_indic": "LI_R_MD60"},
+        {"filter_geo": None, "filter_age": None, "filter_sex": None},
+    ],
+)
+def test_flujo_equivale_a_json_completo(filtros):
+    payload = generar_sdmx_sintetico(n_geo=8, anios=range(2010, 2024), densidad=0.7)
+    contenido = json.dumps(payload).encode("utf-8")
+    esperado = parsear_eurostat_sdmx(payload, "AROP_%", **filtros)
+    obtenido = parsear_eurostat_sdmx_flujo(
+        contenido, "AROP_%", tam_bloque=997, **filtros
+    )
+    pd.testing.assert_frame_equal(obtenido, esperado)
+
+
+def test_flujo_admite_value_denso():
+    payload = generar_sdmx_sintetico(n_geo=3, anios=range(2020, 2024), densidad=1.0)
+    total = len(payload["value"])
+    payload["value"] = [payload["value"].get(str(i)) for i in range(total)]
+    obtenido = parsear_eurostat_sdmx_flujo(
+        io.BytesIO(json.dumps(payload).encode("utf-8")), "v", tam_bloque=50
+    )
+    pd.testing.assert_frame_equal(obtenido, parsear_eurostat_sdmx(payload, "v"))
+
+
+def test_flujo_pico_de_memoria_acotado():
+    payload = generar_sdmx_sintetico(n_geo=40, anios=range(1960, 2025))
+    contenido = json.dumps(payload).encode("utf-8")
+    del payload
+
+    tracemalloc.start()
+    try:
+        df = parsear_eurostat_sdmx_flujo(
+            contenido,
+            "AROP_%",
+            filter_unit="PC",
+            filter_indic="LI_R_MD60",
+            tam_bloque=10_000,
+        )
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert len(df) == 50
+    # El payload (~2,6 MB de JSON, ~30 MB como dicts) no llega a materializarse
+    assert pico / 1e6 < TECHO_PICO_MB
+    assert pico < len(contenido)
+
+
+def test_transformacion_ine_desde_disco(tmp_path):
+    data = generar_ine_sintetico(n_series=150, n_periodos=24, densidad=0.8)
+    ruta = tmp_path / "ine.json"
+    ruta.write_text(json.dumps(data), encoding="utf-8")
+    resultado = ResultadoDescarga("df_arope_edad_sexo", "http://fake")
+    resultado.status = 200
+    resultado.volcar_a_disco(str(ruta))
+
+    obtenido = transformar_resultado("df_arope_edad_sexo", resultado)
+    pd.testing.assert_frame_equal(obtenido, transformar_arope_edad_sexo(data))
@@ -1,10 +1,12 @@
 import pandas as pd
 
 from notebook_fixtures import (
+    load_pickles_to_namespace,
     normalize_columns,
     normalize_decile_columns,
     normalize_umbral_dataframe,
 )
+from src.almacen import AlmacenTablas
 
 
 def test_normalize_columns_anio_alias():
@@ -60,3 +62,69 @@ def test_normalize_decile_columns_tuple_multiindex():
     df2 = normalize_decile_columns(df)
     assert "D1" in df2.columns and "D10" in df2.columns
     assert df2["D10"].iloc[0] == 900
+
+
+def _store_with_tables(tmp_path):
+    almacen = AlmacenTablas(tmp_path)
+    almacen.guardar(
+        pd.DataFrame(
+            {
+                "Año": [2019] * 10 + [2020] * 10,
+                "Decil": list(range(1, 11)) * 2,
+                "Valor": [1000.0 * d for d in range(1, 11)] * 2,
+            }
+        ),
+        "df_renta_decil",
+    )
+    almacen.guardar(
+        pd.DataFrame(
+            {
+                "Anio": [2019, 2020, 2020],
+                "Sexo": ["Total", "Total", "Mujeres"],
+                "Edad": ["Total"] * 3,
+                "Indicador": ["AROPE"] * 3,
+                "Valor": [25.3, 26.4, 27.0],
+            }
+        ),
+        "df_arope_edad_sexo",
+    )
+    almacen.guardar(pd.DataFrame({"Anio": [2020], "Gini": [0.32]}), "df_gini_ccaa")
+
+
+def test_load_pickles_to_namespace_is_lazy(tmp_path):
+    _store_with_tables(tmp_path)
+    ns = load_pickles_to_namespace(tmp_path)
+    assert ns.materialized() == []
+    assert "df_gini_ccaa" in ns and "df_gasto" not in ns
+    assert ns.materialized() == []
+
+    gini = ns["df_gini_ccaa"]
+    assert ns["df_gini_ccaa"] is gini  # memoized
+    assert ns.materialized() == ["df_gini_ccaa"]
+    assert set(ns.tiempos) == {"df_gini_ccaa"}
+
+    # A derived table is read from the store's derived-table cache: its
+    # source is not loaded into the namespace
+    pivot = ns["df_pivot_deciles"]
+    assert list(pivot.columns) == [f"D{i}" for i in range(1, 11)]
+    assert pivot.loc[2020, "D10"] == 10000.0
+    assert "df_arope_edad" not in ns.materialized()
+    assert "df_renta" not in ns.materialized()
+    assert set(ns.tiempos) == {"df_gini_ccaa", "df_pivot_deciles"}
+
+
+def test_load_pickles_to_namespace_mapping_interface(tmp_path):
+    _store_with_tables(tmp_path)
+    ns = load_pickles_to_namespace(tmp_path)
+    assert set(ns) == {
+        "df_arope_edad",
+        "df_arope_anual",
+        "df_gini_ccaa",
+        "df_renta",
+        "df_pivot_deciles",
+    }
+    assert ns["df_arope_anual"]["AROPE_%"].tolist() == [25.3, 26.4]
+    ns["df_extra"] = pd.DataFrame({"x": [1]})
+    assert ns.get("df_extra") is not None and ns.get("df_gasto") is None
+    del ns["df_renta"]
+    assert "df_renta" not in ns
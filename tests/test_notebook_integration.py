@@ -18,11 +18,11 @@ import shutil
 from pathlib import Path
 
 import nbformat
-import pandas as pd
 import pytest
 from nbclient import NotebookClient
 
 from notebook_fixtures import normalize_decile_columns
+from src.almacen import AlmacenTablas
 
 
 def run_notebook(nb_path: Path):
@@ -51,19 +51,21 @@ def test_execute_03_analisis_inflacion_diferencial_minimal(tmp_path: Path):
     # Create a loader cell that imports pickles and normalizes decile columns
     loader = (
         "print('===== LOADER CELL STARTING =====')\n"
-        "with open('DEBUG_LOADER.txt', 'w') as f: f.write('LOADER EXECUTED')\n"
         "import pandas as pd\n"
         "from pathlib import Path\n"
+        # Debug traces go to the test's tmp dir, not the kernel cwd (repo root)
+        f"debug_dir = Path(r'{tmp_path.as_posix()}')\n"
+        "with open(debug_dir / 'DEBUG_LOADER.txt', 'w') as f: f.write('LOADER EXECUTED')\n"
         "from src.notebook_fixtures import normalize_decile_columns, load_pickles_to_namespace, add_year_aliases\n"
         f"project_root = Path(r'{project_root.as_posix()}')\n"
         f"pickle_dir = project_root / 'outputs' / 'pickle_cache'\n"
         "mapping = {'df_renta': 'df_renta_decil.pkl', 'df_gini_s80s20': 'df_s80s20_es.pkl', 'df_gini_ccaa':'df_gini_ccaa.pkl', 'df_arope_edad':'df_arope_edad_sexo.pkl', 'df_umbral':'df_umbral_limpio.pkl'}\n"
         "ns = load_pickles_to_namespace(pickle_dir, mapping)\n"
         "print('DEBUG: ns keys after load_pickles_to_namespace:', list(ns.keys()))\n"
-        "with open('DEBUG_NS_KEYS.txt', 'w') as f: f.write(str(list(ns.keys())))\n"
+        "with open(debug_dir / 'DEBUG_NS_KEYS.txt', 'w') as f: f.write(str(list(ns.keys())))\n"
         "if 'df_arope_anual' in ns:\n"
         "    print('DEBUG: df_arope_anual exists in ns, columns:', list(ns['df_arope_anual'].columns))\n"
-        "    with open('DEBUG_AROPE_COLS.txt', 'w') as f: f.write(str(list(ns['df_arope_anual'].columns)))\n"
+        "    with open(debug_dir / 'DEBUG_AROPE_COLS.txt', 'w') as f: f.write(str(list(ns['df_arope_anual'].columns)))\n"
         "for k, df in ns.items():\n"
         "    globals()[k] = df\n"
         "if 'df_renta' in globals():\n"
@@ -119,11 +121,11 @@ def test_execute_03_analisis_inflacion_diferencial_minimal(tmp_path: Path):
         "            pass\n"
         "    # Derive df_arope_anual from df_arope_edad (annual AROPE by Sexo/Edad)\n"
         "    try:\n"
-        "        with open('DEBUG_AROPE_DERIVATION_CHECK.txt', 'w') as f:\n"
+        "        with open(debug_dir / 'DEBUG_AROPE_DERIVATION_CHECK.txt', 'w') as f:\n"
         "            f.write(f\"df_arope_edad in globals: {'df_arope_edad' in globals()}\\n\")\n"
         "            f.write(f\"df_arope_anual in globals: {'df_arope_anual' in globals()}\\n\")\n"
         "        if 'df_arope_edad' in globals() and 'df_arope_anual' not in globals():\n"
-        "            with open('DEBUG_AROPE_MANUAL_DERIVATION.txt', 'w') as f: f.write('MANUAL DERIVATION RAN')\n"
+        "            with open(debug_dir / 'DEBUG_AROPE_MANUAL_DERIVATION.txt', 'w') as f: f.write('MANUAL DERIVATION RAN')\n"
         "            da = globals()['df_arope_edad'].copy()\n"
         "            if 'Año' not in da.columns and 'Anio' in da.columns:\n"
         "                da['Año'] = da['Anio']\n"
@@ -188,9 +190,11 @@ def test_execute_03_analisis_inflacion_diferencial_minimal(tmp_path: Path):
     run_notebook(tmp_nb)
     # After execution, load executed notebook to inspect envs or rely on pickles
     # Validate consistency on pickles directly in the workspace: df_renta pivot -> normalize
-    pkl = pickle_cache / "df_renta_decil.pkl"
-    assert pkl.exists(), "Pickle for df_renta not found in outputs/pickle_cache"
-    df_renta = pd.read_pickle(pkl)
+    almacen = AlmacenTablas(pickle_cache)
+    assert almacen.existe(
+        "df_renta_decil"
+    ), "Table for df_renta not found in outputs/pickle_cache"
+    df_renta = almacen.leer("df_renta_decil")
     if "Año" in df_renta.columns and "Anio" not in df_renta.columns:
         df_renta["Anio"] = df_renta["Año"]
     val_col = (
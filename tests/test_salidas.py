@@ -0,0 +1,112 @@
+import pandas as pd
+import pytest
+
+from src.salidas import escribir_salida, leer_salida, main
+
+
+def _serie(anios, factor=1.0):
+    return pd.DataFrame(
+        {
+            "Año": list(anios),
+            "Gini": [30.0 + (a - 2008) * factor for a in anios],
+            "S80S20": [5.5] * len(anios),
+        }
+    )
+
+
+def _canonica(df):
+    return df.rename(columns={"Año": "Anio"})
+
+
+def _mtimes(ruta):
+    return {p.parent.name: p.stat().st_mtime_ns for p in ruta.rglob("*.parquet")}
+
+
+def test_nuevo_anio_reescribe_una_particion(tmp_path):
+    assert escribir_salida(_serie(range(2008, 2012)), "gini", directorio=tmp_path) == {
+        "escritas": 4,
+        "sin_cambios": 0,
+    }
+    antes = _mtimes(tmp_path / "gini")
+
+    resultado = escribir_salida(_serie(range(2008, 2013)), "gini", directorio=tmp_path)
+    assert resultado == {"escritas": 1, "sin_cambios": 4}
+    despues = _mtimes(tmp_path / "gini")
+    assert {k: despues[k] for k in antes} == antes
+    # `Año` se normaliza a `Anio`, la clave de partición de todas las salidas
+    assert "Anio=2012" in despues
+
+    pd.testing.assert_frame_equal(
+        leer_salida("gini", directorio=tmp_path), _canonica(_serie(range(2008, 2013)))
+    )
+    # Poda por año y proyección de columnas
+    df = leer_salida(
+        "gini", columnas=["Anio", "Gini"], anios=(2011, None), directorio=tmp_path
+    )
+    assert df["Anio"].tolist() == [2011, 2012] and list(df.columns) == ["Anio", "Gini"]
+
+
+def test_modos_append_y_overwrite(tmp_path):
+    escribir_salida(_serie([2019, 2020]), "gini", directorio=tmp_path)
+    nuevo = _serie([2021], factor=2.0)
+    assert escribir_salida(nuevo, "gini", modo="append", directorio=tmp_path) == {
+        "escritas": 1,
+        "sin_cambios": 0,
+    }
+    # Repetir el append (o tocar una partición existente) no duplica filas
+    with pytest.raises(ValueError, match="ya existen"):
+        escribir_salida(nuevo, "gini", modo="append", directorio=tmp_path)
+    with pytest.raises(ValueError, match="ya existen"):
+        escribir_salida(
+            _serie([2020, 2022]), "gini", modo="append", directorio=tmp_path
+        )
+    assert leer_salida("gini", directorio=tmp_path)["Anio"].tolist() == [
+        2019,
+        2020,
+        2021,
+    ]
+
+    # overwrite_particiones reemplaza la partición
+    escribir_salida(_serie([2021]), "gini", directorio=tmp_path)
+    assert len(list((tmp_path / "gini" / "Anio=2021").glob("*.parquet"))) == 1
+    assert leer_salida("gini", anios=2021, directorio=tmp_path)["Gini"].tolist() == [
+        43.0
+    ]
+
+    escribir_salida(_serie([2021]), "gini", modo="overwrite", directorio=tmp_path)
+    assert leer_salida("gini", directorio=tmp_path)["Anio"].tolist() == [2021]
+
+    with pytest.raises(ValueError, match="esquema"):
+        escribir_salida(
+            _serie([2022]).drop(columns="S80S20"), "gini", directorio=tmp_path
+        )
+
+
+def test_particion_por_territorio_y_migracion(tmp_path):
+    df = pd.DataFrame(
+        {
+            "Anio": [2020, 2020, 2021],
+            "Territorio": ["Andalucía", "Islas Baleares/Illes Balears", "Andalucía"],
+            "Valor": [1.0, 2.0, 3.0],
+        }
+    )
+    df.to_parquet(tmp_path / "indicador_ccaa.parquet", index=False)
+    # Sin migrar se lee el fichero único
+    pd.testing.assert_frame_equal(
+        leer_salida("indicador_ccaa", directorio=tmp_path), df
+    )
+
+    assert main(["migrar", "--directorio", str(tmp_path)]) == 0
+    assert not (tmp_path / "indicador_ccaa.parquet").exists()
+    assert (
+        tmp_path / "indicador_ccaa" / "Anio=2021" / "Territorio=Andaluc%C3%ADa"
+    ).is_dir()
+    pd.testing.assert_frame_equal(
+        leer_salida("indicador_ccaa", directorio=tmp_path), df
+    )
+    solo = leer_salida(
+        "indicador_ccaa",
+        filtros=[("Territorio", "==", "Andalucía")],
+        directorio=tmp_path,
+    )
+    assert solo["Anio"].tolist() == [2020, 2021]
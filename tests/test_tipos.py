@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+
+from src.almacen import AlmacenTablas, main
+from src.notebook_fixtures import create_sqlite_from_pickles
+from src.tipos import ampliar, compactar, politica_por_defecto
+
+
+def _tabla(n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "Anio": 2008 + np.arange(n) % 16,
+            "Territorio": [f"CCAA {i % 19}" for i in range(n)],
+            "Decil": 1 + np.arange(n) % 10,
+            "Valor": np.round(rng.uniform(5_000, 40_000, n), 2),
+            "Media": rng.normal(0, 1, n),
+        }
+    )
+
+
+def test_politica_derivada_de_las_reglas():
+    politica = politica_por_defecto()
+    assert politica["Anio"] == "int16"
+    assert politica["Territorio"] == "category"
+    assert politica["Tipo_Hogar"] == "category"
+    assert politica["geo_code"] == "category"
+    assert "Valor" not in politica
+
+
+def test_enteros_nullables_con_na_se_dejan_como_estan():
+    df = pd.DataFrame(
+        {
+            "Anio": pd.array([2020, None], dtype="Int64"),
+            "Decil": pd.array([1, None], dtype="Int64"),
+            "v": [1.5, 2.25],
+        }
+    )
+    compacto, _ = compactar(df)
+    assert compacto["Anio"].dtype == "Int64"
+    assert compacto["Decil"].dtype == "Int64"
+    assert compacto["v"].dtype == "float32"
+    sin_na, _ = compactar(df.dropna())
+    assert sin_na["Anio"].dtype == "int16"
+
+
+def test_compactar_conserva_valores_y_mide_el_ahorro():
+    df = _tabla()
+    compacto, informe = compactar(df)
+
+    assert compacto["Anio"].dtype == "int16"
+    assert isinstance(compacto["Territorio"].dtype, pd.CategoricalDtype)
+    assert compacto["Decil"].dtype == "int8"
+    assert compacto["Valor"].dtype == "float32"
+    # Muchos decimales: float32 perdería precisión
+    assert compacto["Media"].dtype == "float64"
+    assert informe["despues"] < informe["antes"] / 2
+    assert informe["columnas"]["Territorio"] == "object -> category"
+    # No modifica el original y se puede deshacer sin perder decimales
+    assert df["Valor"].dtype == "float64"
+    pd.testing.assert_frame_equal(
+        ampliar(compacto).astype({"Anio": "int64", "Decil": "int64"}), df
+    )
+
+
+def test_tipos_compactos_persisten_en_el_almacen(tmp_path, capsys):
+    almacen = AlmacenTablas(tmp_path)
+    almacen.guardar(_tabla(), "df_renta_decil", compactar=True)
+    almacen.guardar(_tabla(), "df_sin_compactar")
+
+    leido = almacen.leer("df_renta_decil")
+    assert leido["Anio"].dtype == "int16"
+    assert leido["Valor"].dtype == "float32"
+    assert isinstance(leido["Territorio"].dtype, pd.CategoricalDtype)
+    memoria = almacen.metadatos("df_renta_decil")["memoria"]
+    assert memoria["despues"] < memoria["antes"]
+    assert almacen.metadatos("df_renta_decil")["columnas"]["Anio"] == "int16"
+
+    assert main(["compactar", "--directorio", str(tmp_path)]) == 0
+    assert "df_sin_compactar" in capsys.readouterr().out
+    assert almacen.leer("df_sin_compactar")["Valor"].dtype == "float32"
+
+
+def test_sqlite_recibe_los_valores_originales(tmp_path):
+    import sqlite3
+
+    df = _tabla(200)
+    AlmacenTablas(tmp_path).guardar(df, "df_renta_decil", compactar=True)
+    db = tmp_path / "t.db"
+    create_sqlite_from_pickles(tmp_path, db, {"df_renta_decil": "INE_Renta"})
+    with sqlite3.connect(db) as conn:
+        sql = pd.read_sql("SELECT * FROM INE_Renta", conn)
+    pd.testing.assert_series_equal(sql["Valor"], df["Valor"])
+    assert sql["Territorio"].tolist() == df["Territorio"].tolist()
@@ -0,0 +1,77 @@
+import json
+
+import pandas as pd
+
+from utils import validation_cache
+from utils.validation_cache import ValidationCache, integration_key, rules_key
+from utils.validation_engine import validate_table
+from utils.validation_framework import ValidationReport
+from utils.validation_runner import INTEGRATION_REPORT, StoreLoader, run_validation
+
+ANIOS = range(2015, 2024)
+TABLAS = ["INE_AROPE_Hogar", "EUROSTAT_Gini_Espana"]
+
+
+def test_lookup_por_huella_y_reglas(tmp_path):
+    cache = ValidationCache(tmp_path)
+    report = ValidationReport("INE_AROPE_Hogar")
+    report.records_original = 10
+    report.add_error("Años faltantes: [2016]")
+    report.add_warning("Nulos en Valor: 10.0%")
+    key = rules_key("INE_AROPE_Hogar")
+    cache.store("INE_AROPE_Hogar", None, report, key)
+    assert not cache.path("INE_AROPE_Hogar").exists()
+
+    cache.store("INE_AROPE_Hogar", "h1", report, key)
+    guardado = json.loads(cache.path("INE_AROPE_Hogar").read_text(encoding="utf-8"))
+    assert guardado["report"] == report.to_dict()
+    leido = cache.lookup("INE_AROPE_Hogar", "h1", key)
+    assert leido.to_dict() == report.to_dict()
+    assert leido.errors == report.errors and leido.warnings == report.warnings
+    assert cache.lookup("INE_AROPE_Hogar", "h2", key) is None
+    assert cache.lookup("INE_AROPE_Hogar", "h1", rules_key("INE_AROPE_CCAA")) is None
+    assert cache.lookup("INE_AROPE_Hogar", None, key) is None
+    assert integration_key({"a": "h1", "b": None}) is None
+    assert integration_key({"a": "h1", "b": "h2"}) != integration_key(
+        {"a": "h1", "b": "h3"}
+    )
+
+
+def test_solo_se_revalida_lo_que_cambia(almacen_validacion, tmp_path, monkeypatch):
+    almacen = almacen_validacion
+    loader = StoreLoader(almacen.directorio)
+    cache = ValidationCache(tmp_path / "cache")
+
+    def validar():
+        return run_validation(TABLAS, loader=loader, workers=2, cache=cache)
+
+    primera = validar()
+    assert [r.cached for r in primera.results] == [False, False, False]
+    segunda = validar()
+    assert [r.cached for r in segunda.results] == [True, True, True]
+    assert segunda.summary() == primera.summary()
+    assert segunda.results[0].report.info == primera.results[0].report.info
+
+    # Cambia una tabla de check_integration: ella y la integración
+    almacen.guardar(
+        pd.DataFrame({"Anio": ANIOS, "geo_code": "ES", "Gini": 0.5}), "df_gini_es"
+    )
+    tercera = validar()
+    assert [r.cached for r in tercera.results] == [True, False, False]
+    assert tercera.results[2].table == INTEGRATION_REPORT
+    assert "[ERR] Diferencia Gini excesiva: 56.25%" in tercera.results[2].report.errors
+    esperado = validate_table(loader("EUROSTAT_Gini_Espana"), "EUROSTAT_Gini_Espana")
+    assert tercera.results[1].report.info == esperado.info
+
+    # Cambian las reglas de una tabla: solo esa
+    reglas = validation_cache.get_rules
+
+    def get_rules(table_name):
+        rules = dict(reglas(table_name))
+        if table_name == "INE_AROPE_Hogar":
+            rules["expected_years"] = range(2015, 2025)
+        return rules
+
+    monkeypatch.setattr(validation_cache, "get_rules", get_rules)
+    cuarta = run_validation(TABLAS, loader=loader, workers=1, cache=cache)
+    assert [r.cached for r in cuarta.results] == [False, True, True]
@@ -0,0 +1,87 @@
+import importlib.util
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.tipos import aplicar_politica
+from utils.validation_engine import ValidationPlan, compile_plan, validate_table
+
+RUTA_SCRIPT = (
+    Path(__file__).resolve().parent.parent / "scripts" / "benchmark_validacion.py"
+)
+
+
+def _benchmark():
+    spec = importlib.util.spec_from_file_location("benchmark_validacion", RUTA_SCRIPT)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+def _mensajes(report):
+    return (
+        report.errors,
+        report.warnings,
+        report.info,
+        report.records_original,
+        report.records_excluded,
+    )
+
+
+def _arope(n=3_000, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(
+        {
+            "Anio": rng.integers(2013, 2024, n),
+            "Tipo_Hogar": rng.choice(["Hogar de una persona", "No consta"], n),
+            "Indicador": rng.choice(["AROPE", "AROP", None], n),
+            "Valor": rng.uniform(0, 100, n),
+        }
+    )
+    df.loc[rng.integers(0, n, 400), "Valor"] = np.nan
+    return df
+
+
+@pytest.mark.parametrize("compacta", [False, True])
+def test_mismos_mensajes_que_las_funciones_check(compacta):
+    benchmark = _benchmark()
+    for tabla, df in [
+        ("INE_IPC_Sectorial_ECOICOP", benchmark.ipc_sectorial_sintetico(20_000)),
+        ("INE_AROPE_Hogar", _arope()),
+    ]:
+        df = aplicar_politica(df) if compacta else df
+        anterior = benchmark.validar_anterior(df, tabla)
+        motor = validate_table(df, tabla)
+        assert _mensajes(motor) == _mensajes(anterior)
+        assert motor.has_errors()
+
+
+def test_clave_unica_rangos_y_anios_completos():
+    anios = np.arange(2015, 2024)
+    df = pd.DataFrame(
+        {
+            "Anio": np.repeat(anios, 3),
+            "geo_name": pd.Categorical(["España", "Francia", "Italia"] * len(anios)),
+            "Gini": np.linspace(0.25, 0.35, 3 * len(anios)),
+        }
+    )
+    report = validate_table(df, "EUROSTAT_Gini_UE27")
+    assert report.errors == [] and report.warnings == []
+    assert report.info[1:] == [
+        "[INFO] Unicidad verificada: clave ('Anio', 'geo_name') sin duplicados",
+        "[INFO] Valores faltantes: 0 nulos totales dentro de umbrales",
+        "[INFO] Columna 'Gini': valores en rango [0, 1.0]",
+        "[INFO] Columna 'Anio': valores en rango [2015, 2025]",
+        "[INFO] Continuidad temporal: 9 años completos",
+    ]
+    # El plan de las reglas configuradas se compila una vez
+    assert compile_plan("EUROSTAT_Gini_UE27") is compile_plan("EUROSTAT_Gini_UE27")
+
+    # Reglas propias; 'Año' se lee como 'Anio'
+    plan = ValidationPlan("propia", {"primary_key": ["Año"], "expected_years": []})
+    report = plan.run(df.rename(columns={"Anio": "Año"}))
+    assert report.errors == [
+        "[ERR] Duplicados encontrados en clave ('Anio',): 27 registros"
+    ]
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+
+from utils.validation_framework import (
+    _fix_mojibake,
+    _normalize_text_str,
+    normalize_text,
+    normalize_tipo_metrica,
+)
+
+
+def test_fix_mojibake_y_normalize_text():
+    assert _fix_mojibake("VariaciÃ³n en lo que va de aÃ±o") == (
+        "Variación en lo que va de año"
+    )
+    assert _fix_mojibake("Precio â‚¬") == "Precio €"
+    # Al borrar U+FFFD se forma una secuencia que aún hay que corregir
+    assert _fix_mojibake("Â�€") == "€"
+    assert normalize_text("  Índice_ (base 2021)  ") == "Indice base 2021"
+    assert normalize_text("Variación\tanual") == "Variacion anual"
+    assert normalize_text(None) is None
+
+    _normalize_text_str.cache_clear()
+    for _ in range(3):
+        normalize_text("Índice")
+    assert _normalize_text_str.cache_info().hits == 2
+
+
+def test_normalize_tipo_metrica_por_valores_unicos():
+    serie = pd.Series(
+        ["VariaciÃ³n anual", None, "variacion  mensual", "INDICE", np.nan, "Otra"]
+        * 1000,
+        name="Tipo_Metrica",
+    )
+
+    normalizada = normalize_tipo_metrica(serie)
+    assert normalizada.name == "Tipo_Metrica"
+    assert normalizada.iloc[[0, 2, 3, 5]].tolist() == [
+        "Variación anual",
+        "Variación mensual",
+        "Índice",
+        "Otra",
+    ]
+    # Los nulos se conservan tal cual
+    assert normalizada.iloc[1] is None and np.isnan(normalizada.iloc[4])
+
+    categorica = normalize_tipo_metrica(serie.astype("category"))
+    assert isinstance(categorica.dtype, pd.CategoricalDtype)
+    assert set(categorica.cat.categories) == {
+        "Variación anual",
+        "Variación mensual",
+        "Índice",
+        "Otra",
+    }
+    pd.testing.assert_series_equal(
+        categorica.astype(object).fillna(np.nan), normalizada.fillna(np.nan)
+    )
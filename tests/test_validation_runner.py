@@ -0,0 +1,101 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.validation_engine import validate_table
+from utils.validation_framework import ValidationReport
+from utils.validation_runner import (
+    INTEGRATION_REPORT,
+    SqlLoader,
+    StoreLoader,
+    check_integration,
+    run_validation,
+)
+
+ANIOS = np.arange(2015, 2024)
+
+
+def test_run_validation_en_paralelo(almacen_validacion):
+    loader = StoreLoader(almacen_validacion.directorio)
+    tablas = ["INE_AROPE_Hogar", "EUROSTAT_Gini_Espana", "EUROSTAT_AROP_UE27"]
+    run = run_validation(tablas, loader=loader, workers=2)
+
+    assert [r.table for r in run.results] == tablas + [INTEGRATION_REPORT]
+    for result in run.results[:2]:
+        esperado = validate_table(loader(result.table), result.table)
+        assert result.report.errors == esperado.errors
+        assert result.report.warnings == esperado.warnings
+        assert result.report.info == esperado.info
+    assert loader("EUROSTAT_Gini_Espana")["Gini"].max() <= 1
+    # Tabla que no está en el almacén
+    assert run.results[2].status == "ERROR"
+    assert run.results[2].report.errors[0].startswith("[ERR] Error al cargar tabla:")
+
+    # Mismo resultado en secuencial
+    secuencial = run_validation(tablas, loader=loader, workers=1)
+    assert secuencial.summary() == run.summary()
+    resumen = run.summary()
+    assert {i["table"] for i in resumen["failed"]} >= {"EUROSTAT_AROP_UE27"}
+    assert run.speedup > 0
+
+    integracion = run.results[-1].report
+    assert integracion.info == [
+        "[INFO] Solapamiento temporal: 9 años comunes",
+        "[INFO] Coherencia INE-EUROSTAT buena: dif. máx. 2.50%",
+        "[INFO] Coherencia Gini perfecta: dif. máx. 0.00%",
+    ]
+    assert integracion.errors == ["[ERR] Diferencia S80/S20 excesiva: 10.71%"]
+
+
+def test_check_integration_sin_tablas():
+    report = check_integration({}, ValidationReport(INTEGRATION_REPORT))
+    assert report.warnings == [
+        "[WARN] Validación temporal omitida: tablas no disponibles",
+        "[WARN] Validación de valores omitida",
+        "[WARN] Validación Gini omitida",
+        "[WARN] Validación S80/S20 omitida",
+    ]
+
+
+def test_sql_loader_aplica_tipos_compactos():
+    loader = SqlLoader()
+    loader._conn = sqlite3.connect(":memory:")
+    pd.DataFrame({"Anio": np.repeat(ANIOS, 2), "geo_code": "ES", "Gini": 0.25}).to_sql(
+        "EUROSTAT_Gini_Espana", loader._conn, index=False
+    )
+
+    df = loader("EUROSTAT_Gini_Espana")
+
+    assert df["Anio"].dtype == "int16"
+    assert isinstance(df["geo_code"].dtype, pd.CategoricalDtype)
+    assert df["Gini"].dtype == "float32"
+
+
+def test_sql_loader_huella_con_sha256_de_las_filas():
+    consultas = []
+
+    class Cursor:
+        def execute(self, sql):
+            consultas.append(sql)
+
+        def fetchone(self):
+            return 18, "AB" * 32
+
+    class Conexion:
+        def cursor(self):
+            return Cursor()
+
+    loader = SqlLoader()
+    loader._conn = Conexion()
+
+    assert loader.fingerprint("EUROSTAT_Gini_Espana") == f"sql:18:{'AB' * 32}"
+    assert "FROM EUROSTAT_Gini_Espana AS t" in consultas[0]
+    assert "HASHBYTES('SHA2_256'" in consultas[0]
+    assert "CHECKSUM" not in consultas[0]
+
+
+def test_run_validation_rechaza_tablas_sin_reglas(tmp_path):
+    with pytest.raises(ValueError, match="INE_IPC_Anual"):
+        run_validation(["INE_IPC_Anual"], loader=StoreLoader(tmp_path), workers=1)
@@ -0,0 +1,231 @@
+"""
+Diccionarios de Etiquetas Canónicas
+===================================
+Un único componente para armonizar categorías entre módulos (ECOICOP,
+Tipo_Metrica, deciles). Cada diccionario se compila una vez al importar:
+valores canónicos, variantes conocidas y sus formas con mojibake
+(UTF-8 leído como CP1252 / Latin-1, o con el carácter U+FFFD), indexadas por
+texto exacto y por clave normalizada (sin tildes, '_' ni '.', minúsculas).
+
+`recode(series)` trabaja sobre los valores distintos (o las categorías) y
+reasigna códigos, sin lambdas por fila. Cada diccionario lleva la cuenta de
+filas reconocidas y de etiquetas no reconocidas, de modo que las que faltan
+se ven sin volver a recorrer la columna:
+
+    from utils.canonical_labels import ECOICOP
+    df["Categoria_ECOICOP"] = ECOICOP.recode(df["Grupo_Gasto"])
+    ECOICOP.report()  # {"hits": 9800, "misses": {"Otros gastos": 200}}
+"""
+
+import unicodedata
+from collections import Counter
+from typing import Callable, Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+
+def label_key(value) -> Optional[str]:
+    """Comparison key: no diacritics, '_' as space, no '.', collapsed spaces, lowercase."""
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    s = str(value).strip().replace("_", " ").replace(".", "")
+    s = " ".join(s.split())
+    s = unicodedata.normalize("NFD", s)
+    return "".join(ch for ch in s if unicodedata.category(ch) != "Mn").lower()
+
+
+def mojibake_forms(label: str) -> set:
+    """How `label` looks after common encoding accidents (empty if ASCII)."""
+    if label.isascii():
+        return set()
+    raw = label.encode("utf-8")
+    return {
+        raw.decode("cp1252", errors="replace"),
+        raw.decode("latin-1"),
+        "".join(c if c.isascii() else "�" for c in label),
+        "".join(c for c in label if c.isascii()),
+    } - {label}
+
+
+class LabelDictionary:
+    """Canonical labels plus variants, applied as a vectorized recode."""
+
+    def __init__(
+        self,
+        name: str,
+        labels: Dict[str, Iterable[str]],
+        fallback: Optional[Callable[[str], Optional[str]]] = None,
+    ):
+        """
+        Args:
+            name: Dictionary name (used in reports)
+            labels: {canonical: [variant, ...]}; the canonical value is
+                itself a variant, and mojibake forms are added for all
+            fallback: Optional rule for labels not in the dictionary; returns
+                a canonical value or None
+        """
+        self.name = name
+        self.canonical = list(labels)
+        self.fallback = fallback
+        self.variants: Dict[str, str] = {}
+        for canonical, variants in labels.items():
+            for variant in [canonical, *variants]:
+                self.variants.setdefault(variant, canonical)
+        self._exact: Dict[str, str] = {}
+        self._by_key: Dict[str, str] = {}
+        for variant, canonical in self.variants.items():
+            for form in [variant, *sorted(mojibake_forms(variant))]:
+                self._exact.setdefault(form, canonical)
+                self._by_key.setdefault(label_key(form), canonical)
+        self.hits = 0
+        self.misses: Counter = Counter()
+
+    def lookup(self, label) -> Optional[str]:
+        """Canonical value for one label, or None if it is not recognized."""
+        if isinstance(label, str) and label in self._exact:
+            return self._exact[label]
+        canonical = self._by_key.get(label_key(label))
+        if canonical is None and self.fallback is not None:
+            canonical = self.fallback(label)
+            if canonical not in self.canonical:
+                canonical = None
+        return canonical
+
+    def recode(self, series: pd.Series, keep_unmapped: bool = True) -> pd.Series:
+        """Map `series` to canonical labels, once per distinct value.
+
+        Unrecognized labels are kept as they are (or set to null with
+        `keep_unmapped=False`) and counted in `misses`; nulls are kept. A
+        categorical series stays categorical; otherwise the result is object.
+        """
+        categorical = isinstance(series.dtype, pd.CategoricalDtype)
+        if categorical:
+            uniques = series.cat.categories
+            codes = series.cat.codes.to_numpy()
+        else:
+            codes, uniques = pd.factorize(series, use_na_sentinel=True)
+
+        counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+        targets = []
+        for label, rows in zip(uniques, counts):
+            canonical = self.lookup(label)
+            if canonical is None:
+                if rows:
+                    self.misses[label] += int(rows)
+                canonical = label if keep_unmapped else None
+            else:
+                self.hits += int(rows)
+            targets.append(canonical)
+
+        target = pd.Categorical(targets)
+        new_codes = target.codes.take(np.maximum(codes, 0)) if len(targets) else codes
+        new_codes = np.where(codes >= 0, new_codes, -1)
+        if categorical:
+            return pd.Series(
+                pd.Categorical.from_codes(new_codes, dtype=target.dtype),
+                index=series.index,
+                name=series.name,
+            )
+        values = np.append(target.categories.to_numpy(dtype=object), None).take(
+            new_codes
+        )
+        nulls = codes == -1
+        if nulls.any():
+            # Keep the original null (None / NaN) like the per-row functions did
+            values[nulls] = series.to_numpy(dtype=object)[nulls]
+        return pd.Series(values, index=series.index, name=series.name).infer_objects()
+
+    def report(self) -> dict:
+        """Rows recognized and {unrecognized label: rows} since the last reset."""
+        return {"hits": self.hits, "misses": dict(self.misses.most_common())}
+
+    def reset(self):
+        self.hits = 0
+        self.misses.clear()
+
+    def __repr__(self) -> str:
+        return (
+            f"LabelDictionary({self.name!r}, canonical={len(self.canonical)}, "
+            f"hits={self.hits}, misses={sum(self.misses.values())})"
+        )
+
+
+# =============================================================================
+# DICCIONARIOS
+# =============================================================================
+
+# Grupos ECOICOP: forma del IPC sectorial (canónica) y de la EPF ('_' y '.')
+_ECOICOP_GRUPOS = [
+    "Alimentos y bebidas no alcohólicas",
+    "Bebidas alcohólicas y tabaco",
+    "Vestido y calzado",
+    "Vivienda, agua, electricidad, gas y otros combustibles",
+    "Muebles, artículos del hogar y artículos para el mantenimiento corriente del hogar",
+    "Sanidad",
+    "Transporte",
+    "Comunicaciones",
+    "Ocio y cultura",
+    "Enseñanza",
+    "Restaurantes y hoteles",
+    "Otros bienes y servicios",
+]
+ECOICOP = LabelDictionary(
+    "ECOICOP", {g: [g.replace(" ", "_") + "."] for g in _ECOICOP_GRUPOS}
+)
+
+
+def _tipo_metrica_rule(value) -> Optional[str]:
+    """Substring rules for Tipo_Metrica variants not in the dictionary."""
+    from utils.validation_framework import normalize_text
+
+    s = " ".join(normalize_text(value).lower().split())
+    if "variacion anual" in s or ("variacion" in s and "anual" in s):
+        return "Variación anual"
+    if "variacion mensual" in s or ("variacion" in s and "mensual" in s):
+        return "Variación mensual"
+    if (
+        "variacion en lo que va de" in s
+        or ("variacion" in s and "ano" in s)
+        or ("variacion" in s and "va de" in s)
+    ):
+        return "Variación en lo que va de año"
+    if "indice" in s or "ndice" in s:
+        return "Índice"
+    return None
+
+
+TIPO_METRICA = LabelDictionary(
+    "Tipo_Metrica",
+    {
+        "Índice": [],
+        "Variación anual": [],
+        "Variación mensual": [],
+        "Variación en lo que va de año": [],
+    },
+    fallback=_tipo_metrica_rule,
+)
+
+_ORDINALES = [
+    "Primer",
+    "Segundo",
+    "Tercer",
+    "Cuarto",
+    "Quinto",
+    "Sexto",
+    "Séptimo",
+    "Octavo",
+    "Noveno",
+    "Décimo",
+]
+DECIL = LabelDictionary(
+    "Decil",
+    {
+        "Total": [],
+        **{
+            f"D{i}": [f"{o} decil", f"Decil {i}"]
+            + ([f"{label_key(o).capitalize()} decil"] if not o.isascii() else [])
+            for i, o in enumerate(_ORDINALES, start=1)
+        },
+    },
+)
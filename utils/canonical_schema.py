@@ -0,0 +1,147 @@
+"""
+Esquema Canónico de Columnas
+============================
+Una sola etapa, aplicada al cargar cada tabla, para los nombres de columna que
+antes se arreglaban en cada validador y cargador (muchas veces tras un
+`df.copy()` completo):
+
+- Año: 'Año', 'Anyo' o 'A�o' pasan a 'Anio' (si ya hay 'Anio', se quitan).
+- Alias de inflación: 'Inflacion_Anual_%' <-> 'IPC_Medio_Anual' e
+  'IPC_Indice' <-> 'Inflacion_Sectorial_%'.
+- Con `umbral=True`, alias de umbral: 'Umbral_Pobreza_Euros' /
+  'Umbral_Real_€_Base' -> 'Umbral_Euros' (y viceversa) y 'Año' junto a 'Anio'.
+
+`canonicalize(df)` no copia datos: los renombres solo cambian el índice de
+columnas y los alias son la misma columna con otro nombre (modificar una en
+sitio, p.ej. con `.loc`, modifica también su alias; asignarla con
+`df[col] = ...` la sustituye sin tocar el alias). No modifica `df`: devuelve
+otro DataFrame sobre los mismos arrays, marcado en `df.attrs` como canónico.
+Los validadores y cargadores que lo reciben de nuevo lo devuelven tal cual:
+
+    from utils.canonical_schema import canonicalize
+    df = canonicalize(almacen.leer("df_ipc_anual"))
+    check_schema(df, ["Anio", "IPC_Medio_Anual", "Inflacion_Anual_%"])  # sin copias
+
+La marca guarda las columnas que tenía el DataFrame al canonicalizarlo, así que
+deja de valer en cuanto se añade, quita o renombra una columna.
+`canonical_year(df)` hace solo el paso del año, para tablas que se escriben
+(almacén, SQL) y no deben llevar los alias como columnas de más, y para los
+validadores que reciben una tabla sin marcar.
+"""
+
+from typing import Dict, Iterable, List
+
+import pandas as pd
+
+YEAR_COLUMN = "Anio"
+YEAR_VARIANTS = ("Año", "Anyo", "A�o")
+INFLATION_ALIASES = (
+    ("Inflacion_Anual_%", "IPC_Medio_Anual"),
+    ("IPC_Indice", "Inflacion_Sectorial_%"),
+)
+# (alias, origen) en orden de preferencia: el primero cuyo origen exista
+UMBRAL_ALIASES = (
+    ("Umbral_Euros", "Umbral_Pobreza_Euros"),
+    ("Umbral_Euros", "Umbral_Real_€_Base"),
+    ("Umbral_Real_€_Base", "Umbral_Euros"),
+    ("Año", YEAR_COLUMN),
+)
+# Clave de `df.attrs` con (columnas, umbral) del último canonicalize
+MARK = "canonical_schema"
+
+
+def canonical_column(name) -> str:
+    """Canonical name of one column ('Año' / 'Anyo' -> 'Anio')."""
+    return YEAR_COLUMN if name in YEAR_VARIANTS else name
+
+
+def canonical_columns(names: Iterable) -> List:
+    """Canonical names, in order and without duplicates."""
+    return list(dict.fromkeys(canonical_column(n) for n in names))
+
+
+def is_canonical(df: pd.DataFrame, umbral: bool = False) -> bool:
+    """True if `df` comes from `canonicalize` and its columns have not changed."""
+    mark = df.attrs.get(MARK)
+    return (
+        mark is not None
+        and tuple(mark[0]) == tuple(df.columns)
+        and (mark[1] or not umbral)
+    )
+
+
+def _year_changes(columns: List):
+    """(columns to drop, {variant: 'Anio'}) for the year step."""
+    if YEAR_COLUMN in columns:
+        return [c for c in columns if c in YEAR_VARIANTS], {}
+    variant = next((c for c in columns if c in YEAR_VARIANTS), None)
+    drop = [c for c in columns if c in YEAR_VARIANTS and c != variant]
+    return drop, ({variant: YEAR_COLUMN} if variant is not None else {})
+
+
+def _aliases(columns: List, umbral: bool) -> Dict[str, str]:
+    """{alias: source} for the aliases missing from `columns`."""
+    present = set(columns)
+    aliases = {}
+    pairs = [p for a, b in INFLATION_ALIASES for p in ((a, b), (b, a))]
+    if umbral:
+        pairs.extend(UMBRAL_ALIASES)
+    for alias, source in pairs:
+        if alias not in present and source in present:
+            aliases[alias] = source
+            present.add(alias)
+    return aliases
+
+
+def canonical_year(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Only the year step ('Año' -> 'Anio'): for tables written back to the store
+    or to SQL, where aliases would become extra columns, and for validators
+    that only need the year. Shares the data of `df` and does not mark it.
+    """
+    drop, rename = _year_changes(list(df.columns))
+    if not drop and not rename:
+        return df
+    out = df.copy(deep=False)
+    for col in drop:
+        del out[col]
+    out.rename(columns=rename, inplace=True)
+    return out
+
+
+def canonicalize(df: pd.DataFrame, umbral: bool = False) -> pd.DataFrame:
+    """
+    `df` with canonical column names and aliases, without copying its data.
+
+    Args:
+        df: Table as read (not modified)
+        umbral: Also add the poverty-threshold aliases (df_umbral)
+
+    Returns:
+        `df` itself if it is already canonical; otherwise a new DataFrame
+        that shares the arrays of `df`
+    """
+    if is_canonical(df, umbral):
+        return df
+    columns = list(df.columns)
+    drop, rename = _year_changes(columns)
+    aliases = _aliases([rename.get(c, c) for c in columns if c not in drop], umbral)
+
+    if not aliases:
+        out = canonical_year(df)
+        out = df.copy(deep=False) if out is df else out
+    elif df.columns.is_unique:
+        # A dict of Series with copy=False keeps one block per array (no
+        # consolidation): renames and aliases reuse the original buffers
+        data = {rename.get(c, c): df[c] for c in columns if c not in drop}
+        for alias, source in aliases.items():
+            data[alias] = data[source]
+        out = pd.DataFrame(data, index=df.index, copy=False)
+    else:
+        # Duplicated column names cannot go through a dict; setitem copies
+        out = canonical_year(df).copy(deep=False)
+        for alias, source in aliases.items():
+            out[alias] = out[source]
+    out.attrs = dict(df.attrs)
+    out.attrs[MARK] = (tuple(out.columns), umbral)
+    return out
@@ -0,0 +1,130 @@
+"""
+Validación Incremental
+======================
+Guarda el reporte de cada tabla junto a las claves de lo que lo produjo, para
+no repetir la validación si nada cambió (p.ej. cuando el ETL solo refrescó un
+dataset de EUROSTAT). Cada entrada de `data/validated/cache/<tabla>.json`
+lleva:
+
+- `fingerprint`: huella del contenido de la tabla que da la fuente sin leer
+  los datos (sha256 del fichero en el manifiesto del almacén, SHA-256 de las
+  filas en SQL Server; ver `fingerprint` en utils/validation_runner.py)
+- `rules`: hash de `get_rules(tabla)` (+ umbral de nulos y CACHE_VERSION)
+- `report`: el ValidationReport como `to_dict()` (se reconstruye al leerlo)
+
+Si las dos claves coinciden, `lookup` devuelve el reporte guardado leyendo
+solo la entrada, sin cargar la tabla; si no, la tabla se valida entera con el
+plan compilado. Las comprobaciones entre tablas (INE <-> EUROSTAT) se guardan
+con la huella de todas sus tablas (`integration_key`), así que solo se
+repiten si cambió alguna.
+
+    from utils.validation_cache import ValidationCache, rules_key
+    cache = ValidationCache()
+    report = cache.lookup(tabla, huella, rules_key(tabla))  # None: validar
+    ...
+    cache.store(tabla, huella, report, rules_key(tabla))
+
+Validar por particiones de `Anio` (hash del contenido de cada año y volver a
+medir solo los años cambiados) no compensa aquí: hashear una tabla cargada
+cuesta más que validarla entera con el plan compilado.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, Optional
+
+from src.manifiesto import escribir_json
+from utils.config import MAX_NULL_PERCENT
+from utils.validation_framework import ValidationReport
+from utils.validation_rules import get_rules
+
+# Cambiarla al modificar los mensajes de la validación invalida la caché
+CACHE_VERSION = "2"
+CACHE_DIR = Path(__file__).resolve().parent.parent / "data" / "validated" / "cache"
+
+
+def rules_key(table_name: str, max_null_percent: float = MAX_NULL_PERCENT) -> str:
+    """Hash of the rule dict of `table_name` (ranges and types by repr)."""
+    contenido = json.dumps(
+        {
+            "version": CACHE_VERSION,
+            "rules": get_rules(table_name),
+            "max_null_percent": max_null_percent,
+        },
+        sort_keys=True,
+        default=repr,
+    )
+    return hashlib.sha256(contenido.encode("utf-8")).hexdigest()
+
+
+def integration_key(fingerprints: Dict[str, Optional[str]]) -> Optional[str]:
+    """Key of a cross-table check from its tables' fingerprints (None if any is)."""
+    if not fingerprints or any(f is None for f in fingerprints.values()):
+        return None
+    contenido = json.dumps(
+        {"version": CACHE_VERSION, "tables": fingerprints}, sort_keys=True
+    )
+    return hashlib.sha256(contenido.encode("utf-8")).hexdigest()
+
+
+class ValidationCache:
+    """One JSON file per table (or cross-table report) in `directory`."""
+
+    def __init__(self, directory: Optional[Path] = None):
+        self.directory = Path(directory) if directory is not None else CACHE_DIR
+
+    def path(self, name: str) -> Path:
+        return self.directory / f"{name}.json"
+
+    def get(self, name: str) -> Optional[dict]:
+        try:
+            with open(self.path(name), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, name: str, entry: dict):
+        """Write the entry atomically (`escribir_json`)."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        escribir_json(self.path(name), entry)
+
+    def clear(self, name: Optional[str] = None):
+        """Drop one entry, or all of them."""
+        rutas = [self.path(name)] if name else self.directory.glob("*.json")
+        for ruta in rutas:
+            if ruta.exists():
+                ruta.unlink()
+
+    def lookup(
+        self, name: str, fingerprint: Optional[str], key: Optional[str] = None
+    ) -> Optional[ValidationReport]:
+        """
+        Cached report if `fingerprint` (and the rules `key`, if given) match
+        the entry; None otherwise. Reads only the entry, not the table.
+        """
+        if fingerprint is None:
+            return None
+        entry = self.get(name)
+        if entry is None or entry.get("fingerprint") != fingerprint:
+            return None
+        if key is not None and entry.get("rules") != key:
+            return None
+        try:
+            return ValidationReport.from_dict(entry["report"])
+        except (KeyError, TypeError):
+            return None
+
+    def store(
+        self,
+        name: str,
+        fingerprint: Optional[str],
+        report: ValidationReport,
+        key: Optional[str] = None,
+    ):
+        """Save `report` under `fingerprint` (nothing without fingerprint)."""
+        if fingerprint is not None:
+            self.put(
+                name,
+                {"fingerprint": fingerprint, "rules": key, "report": report.to_dict()},
+            )
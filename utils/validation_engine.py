@@ -0,0 +1,457 @@
+"""
+Motor de Validación Compilado
+=============================
+Las reglas de `utils/validation_rules.py` se compilan una vez por tabla en un
+plan de ejecución (`ValidationPlan`). Antes, cada `check_*` del framework
+recorría el DataFrame por su cuenta (nulos dos veces, la clave primaria con
+`duplicated`, cada rango con dos máscaras, cada exclusión con un filtro...).
+El plan recorre cada columna una sola vez y reparte lo calculado entre todas
+las comprobaciones que la usan:
+
+- nulos: `isna` en numéricas y códigos en categóricas y texto (en texto, un
+  solo `factorize` da a la vez nulos, conteos para las exclusiones y códigos
+  de la clave)
+- min/max: rangos (solo si se salen se cuentan los valores fuera), base de los
+  códigos enteros de la clave y conjunto de años (`bincount` sobre `v - min`)
+- clave primaria: códigos enteros por columna combinados en una sola clave
+  (radix mixto) y contados con `bincount`, en lugar de `duplicated`
+- nulos condicionales: la subcadena se busca una vez por valor distinto
+
+Los mensajes del `ValidationReport` son los mismos que escriben las funciones
+`check_*` llamadas en el orden de los notebooks 02a / 02b:
+
+    from utils.validation_engine import validate_table
+    report = validate_table(df, "INE_AROPE_Hogar")
+    report.print_report()
+
+`coherence_checks` son descripciones y no se compilan; `check_time_coherence`
+sigue disponible en el framework para usarla a mano.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.canonical_schema import (
+    YEAR_COLUMN,
+    canonical_column,
+    canonical_columns,
+    canonical_year,
+    is_canonical,
+)
+from utils.config import MAX_NULL_PERCENT
+from utils.validation_framework import ValidationReport, check_schema
+from utils.validation_rules import get_rules
+
+# Espacio máximo de claves que se cuenta con bincount directamente (por
+# encima, se factoriza antes la clave combinada)
+MAX_BINCOUNT_KEYS = 1 << 24
+
+
+class _ColumnScan:
+    """Per-column statistics, each computed at most once and shared by checks."""
+
+    def __init__(self, series: pd.Series):
+        self.series = series
+        self.dtype = series.dtype
+        self.categorical = isinstance(self.dtype, pd.CategoricalDtype)
+        self.numeric = not self.categorical and (
+            pd.api.types.is_numeric_dtype(self.dtype)
+            or pd.api.types.is_bool_dtype(self.dtype)
+        )
+        # Nullable integers (Int64) may hold NA: they go through factorize
+        self.integer = isinstance(self.dtype, np.dtype) and self.dtype.kind in "iu"
+        self.text = self.dtype == object
+        self._cache = {}
+
+    def _get(self, name, compute):
+        if name not in self._cache:
+            self._cache[name] = compute()
+        return self._cache[name]
+
+    # --- Conteos -------------------------------------------------------------
+
+    def counts(self) -> pd.Series:
+        """Rows per value, nulls included (value_counts(dropna=False))."""
+
+        def compute():
+            if self.categorical or self.text:
+                # From the codes: one hash pass per text column
+                codes, size, labels = self.codes()
+                per = np.bincount(codes, minlength=size)
+                keep = per > 0
+                return pd.Series(per[keep], index=labels[keep])
+            return self.series.value_counts(dropna=False, sort=False)
+
+        return self._get("counts", compute)
+
+    def null_count(self) -> int:
+        def compute():
+            if self.integer:
+                return 0
+            if self.categorical:
+                return int((self.series.cat.codes.to_numpy() < 0).sum())
+            if self.text or "codes" in self._cache:
+                codes, size, _ = self.codes()
+                return int((codes == size - 1).sum())
+            return int(self.series.isna().sum())
+
+        return self._get("nulls", compute)
+
+    def null_mask(self) -> np.ndarray:
+        def compute():
+            if self.integer:
+                return np.zeros(len(self.series), dtype=bool)
+            if "codes" in self._cache or self.text or self.categorical:
+                codes, size, _ = self.codes()
+                return codes == size - 1
+            return self.series.isna().to_numpy()
+
+        return self._get("null_mask", compute)
+
+    # --- Rango ---------------------------------------------------------------
+
+    def minmax(self) -> Tuple:
+        """(min, max) skipping nulls, as the check_range message prints them."""
+        return self._get("minmax", lambda: (self.series.min(), self.series.max()))
+
+    # --- Códigos -------------------------------------------------------------
+
+    def codes(self) -> Tuple[np.ndarray, int, pd.Index]:
+        """
+        (codes, size, labels): int32 codes in [0, size), the last one for
+        nulls (one group, as in `duplicated`), and the label of each code
+        (`labels[size - 1]` is the null).
+        """
+
+        def compute():
+            n = len(self.series)
+            if self.categorical:
+                cats = self.dtype.categories
+                codes = self.series.cat.codes.to_numpy().astype(np.int32)
+                codes[codes < 0] = len(cats)
+                return codes, len(cats) + 1, self._labels(cats)
+            if self.integer and n:
+                lo, hi = (int(v) for v in self.minmax())
+                if hi - lo < max(2 * n, 1 << 16):
+                    codes = np.subtract(self.series.to_numpy(), lo, dtype=np.int32)
+                    return codes, hi - lo + 2, self._labels(np.arange(lo, hi + 1))
+            codes, uniques = pd.factorize(self.series, use_na_sentinel=True)
+            codes = codes.astype(np.int32 if len(uniques) < 1 << 31 else np.int64)
+            codes[codes < 0] = len(uniques)
+            return codes, len(uniques) + 1, self._labels(uniques)
+
+        return self._get("codes", compute)
+
+    def _labels(self, uniques) -> pd.Index:
+        """
+        Labels as object (integer years stay int) plus the null, as
+        `astype(str)` prints it: 'None' in text columns, 'nan' otherwise.
+        """
+        null = None if self.text else np.nan
+        return pd.Index([*pd.Index(uniques).tolist(), null], dtype=object)
+
+    # --- Años ----------------------------------------------------------------
+
+    def distinct(self) -> set:
+        """Distinct values as Python scalars (nulls included)."""
+
+        def compute():
+            codes, size, labels = self.codes()
+            present = np.bincount(codes, minlength=size) > 0
+            return set(labels[present].tolist())
+
+        return self._get("distinct", compute)
+
+
+def _combined_duplicates(scans: List[_ColumnScan]) -> int:
+    """Rows whose key appears more than once (`duplicated(keep=False).sum()`)."""
+    if not scans or len(scans[0].series) == 0:
+        return 0
+    codes = [scan.codes() for scan in scans]
+    # Mixed radix: key = ((c0 * s1) + c1) * s2 + c2 ..., in int32 if it fits
+    total = int(np.prod([float(size) for _, size, _ in codes]))
+    dtype = np.int32 if total < 1 << 31 else np.int64
+    key, space = codes[0][0].astype(dtype), codes[0][1]
+    for column, size, _ in codes[1:]:
+        if space * size >= 1 << 62:
+            key, uniques = pd.factorize(key)
+            key, space = key.astype(np.int64), len(uniques)
+        np.multiply(key, size, out=key)
+        np.add(key, column, out=key)
+        space *= size
+    if space > MAX_BINCOUNT_KEYS:
+        key, uniques = pd.factorize(key)
+        space = len(uniques)
+    per_key = np.bincount(key, minlength=space)
+    return int(per_key[per_key > 1].sum())
+
+
+class ValidationPlan:
+    """Rules of one table, compiled once; `run` applies them with one scan per column."""
+
+    def __init__(
+        self,
+        table_name: str,
+        rules: Optional[dict] = None,
+        max_null_percent: float = MAX_NULL_PERCENT,
+    ):
+        """
+        Args:
+            table_name: Table name (used in the report)
+            rules: Rule dict; by default `get_rules(table_name)`
+            max_null_percent: Threshold for the null check of every column
+        """
+        self.table_name = table_name
+        self.rules = get_rules(table_name) if rules is None else rules
+        self.max_null_percent = max_null_percent
+        rules = self.rules
+
+        self.schema = None
+        if "expected_columns" in rules or "expected_types" in rules:
+            self.schema = (
+                rules.get("expected_columns", []),
+                rules.get("expected_types", {}),
+            )
+        self.primary_key = (
+            list(rules["primary_key"]) if "primary_key" in rules else None
+        )
+        self.critical_columns = (
+            canonical_columns(rules["critical_columns"])
+            if "critical_columns" in rules
+            else None
+        )
+        self.conditional_nulls = {
+            canonical_column(col): dict(rule)
+            for col, rule in rules.get("conditional_nulls", {}).items()
+        }
+        self.range_checks = [
+            (canonical_column(col), lo, hi)
+            for col, (lo, hi) in rules.get("range_checks", {}).items()
+        ]
+        self.expected_years = rules.get("expected_years")
+        self.exclude_categories = {
+            canonical_column(col): list(categories)
+            for col, categories in rules.get("exclude_categories", {}).items()
+        }
+
+    def run(
+        self, df: pd.DataFrame, report: Optional[ValidationReport] = None
+    ) -> ValidationReport:
+        """
+        Validate `df` with one scan per column.
+
+        Returns:
+            The report (a new one if `report` is None) with `records_original`
+            and `records_excluded` filled in
+        """
+        report = report if report is not None else ValidationReport(self.table_name)
+        report.records_original = len(df)
+        if self.schema is not None:
+            # Metadata only (columns and dtypes)
+            check_schema(df, self.schema[0], self.schema[1], report)
+
+        # Year column as 'Anio' (no data copied)
+        df = df if is_canonical(df) else canonical_year(df)
+        scans: Dict[str, _ColumnScan] = {}
+
+        def scan(col) -> _ColumnScan:
+            if col not in scans:
+                scans[col] = _ColumnScan(df[col])
+            return scans[col]
+
+        if self.primary_key is not None:
+            self._check_primary_key(df, scan, report)
+        if self.critical_columns is not None:
+            self._check_nulls(df, scan, report)
+        if self.conditional_nulls:
+            self._check_conditional_nulls(df, scan, report)
+        for col, lo, hi in self.range_checks:
+            if col in df.columns:
+                self._check_range(col, lo, hi, scan(col), report)
+        if self.expected_years is not None and YEAR_COLUMN in df.columns:
+            self._check_years(scan(YEAR_COLUMN), report)
+        report.records_excluded = self._count_excluded(df, scan, report)
+        return report
+
+    # --- Pasos ---------------------------------------------------------------
+
+    def _check_primary_key(self, df, scan, report):
+        missing = [c for c in self.primary_key if canonical_column(c) not in df.columns]
+        if missing:
+            report.add_warning(f"Columnas de PK no encontradas: {missing}")
+            return
+        key = canonical_columns(self.primary_key)
+        duplicates = _combined_duplicates([scan(c) for c in key])
+        if duplicates > 0:
+            report.add_error(
+                f"Duplicados encontrados en clave {tuple(key)}: {duplicates} registros"
+            )
+        else:
+            report.add_info(f"Unicidad verificada: clave {tuple(key)} sin duplicados")
+
+    def _check_nulls(self, df, scan, report):
+        critical = [c for c in self.critical_columns if c in df.columns]
+        if not critical:
+            return
+        n = len(df)
+        valid = True
+        for col in critical:
+            null_count = scan(col).null_count()
+            if null_count > 0:
+                report.add_error(
+                    f"Columna crítica '{col}' tiene {null_count} nulos "
+                    f"({null_count/n*100:.2f}%)"
+                )
+                valid = False
+        total = 0
+        for col in df.columns:
+            null_count = scan(col).null_count()
+            total += null_count
+            if null_count > 0 and null_count / n > self.max_null_percent:
+                report.add_warning(
+                    f"Columna '{col}': {null_count} nulos ({null_count/n*100:.2f}%) "
+                    f"supera umbral {self.max_null_percent*100}%"
+                )
+        if valid:
+            report.add_info(
+                f"Valores faltantes: {total} nulos totales dentro de umbrales"
+            )
+
+    def _check_conditional_nulls(self, df, scan, report):
+        valid = True
+        for col, rule in self.conditional_nulls.items():
+            cond_col = rule.get("cond_column")
+            substrings = rule.get("cond_null_substrings", [])
+            if col not in df.columns:
+                report.add_warning(
+                    f"Columna condicional '{col}' no encontrada en DataFrame"
+                )
+                continue
+            if cond_col not in df.columns:
+                report.add_warning(
+                    f"Columna condicional de referencia '{cond_col}' no encontrada en DataFrame"
+                )
+                continue
+
+            # Substring match once per distinct value, then spread by code
+            codes, _, labels = scan(cond_col).codes()
+            text = pd.Series(labels.astype(str), dtype=object)
+            expected_by_code = np.zeros(len(labels), dtype=bool)
+            for subs in substrings:
+                expected_by_code |= text.str.contains(
+                    subs, case=False, na=False
+                ).to_numpy(dtype=bool)
+            expected = expected_by_code[codes]
+            nulls = scan(col).null_mask()
+
+            outside = int((nulls & ~expected).sum())
+            if outside > 0:
+                report.add_error(
+                    f"Columna '{col}' tiene {outside} nulos fuera de condición "
+                    f"(referencia {cond_col} not in {substrings})"
+                )
+                valid = False
+            inside = int((expected & ~nulls).sum())
+            if inside > 0:
+                report.add_warning(
+                    f"Columna '{col}' tiene {inside} valores NO-null donde se "
+                    f"esperaba NULL (referencia {cond_col} in {substrings})"
+                )
+        if valid:
+            report.add_info("Reglas condicionales de nulos verificadas correctamente")
+
+    def _check_range(self, col, min_val, max_val, scan, report):
+        actual_min, actual_max = scan.minmax()
+        # min/max skip nulls, like the comparisons of check_range
+        if scan.numeric and not (actual_min < min_val or actual_max > max_val):
+            report.add_info(f"Columna '{col}': valores en rango [{min_val}, {max_val}]")
+            return
+        values = scan.series
+        out = int(((values < min_val) | (values > max_val)).sum())
+        if out > 0:
+            report.add_error(
+                f"Columna '{col}': {out} valores fuera de rango [{min_val}, {max_val}]"
+                f" (rango real: [{actual_min:.2f}, {actual_max:.2f}])"
+            )
+        else:
+            report.add_info(f"Columna '{col}': valores en rango [{min_val}, {max_val}]")
+
+    def _check_years(self, scan, report):
+        actual = scan.distinct()
+        if self.expected_years:
+            expected = set(self.expected_years)
+            missing = expected - actual
+            if missing:
+                report.add_warning(f"Años faltantes: {sorted(missing)}")
+                return
+            extra = actual - expected
+            if extra:
+                report.add_info(f"Años inesperados: {sorted(extra)}")
+        else:
+            min_year, max_year = min(actual), max(actual)
+            missing = set(range(min_year, max_year + 1)) - actual
+            if missing:
+                report.add_warning(
+                    f"Años faltantes en el rango [{min_year}, {max_year}]: "
+                    f"{sorted(missing)}"
+                )
+                return
+        report.add_info(f"Continuidad temporal: {len(actual)} años completos")
+
+    def _count_excluded(self, df, scan, report) -> int:
+        excluded = 0
+        for col, categories in self.exclude_categories.items():
+            if col not in df.columns:
+                continue
+            counts = scan(col).counts()
+            for category in categories:
+                count = int(counts.get(category, 0))
+                if count > 0:
+                    excluded += count
+                    report.add_warning(
+                        f"Encontrados {count} registros de categoría '{category}' "
+                        f"en columna '{col}' (se recomienda excluir en análisis)"
+                    )
+        return excluded
+
+
+_PLANS: Dict[Tuple[str, float], ValidationPlan] = {}
+
+
+def compile_plan(
+    table_name: str, max_null_percent: float = MAX_NULL_PERCENT
+) -> ValidationPlan:
+    """Plan for the configured rules of `table_name`, compiled once per process."""
+    key = (table_name, max_null_percent)
+    if key not in _PLANS:
+        _PLANS[key] = ValidationPlan(table_name, max_null_percent=max_null_percent)
+    return _PLANS[key]
+
+
+def validate_table(
+    df: pd.DataFrame,
+    table_name: str,
+    report: Optional[ValidationReport] = None,
+    rules: Optional[dict] = None,
+    max_null_percent: float = MAX_NULL_PERCENT,
+) -> ValidationReport:
+    """
+    Validate `df` with the compiled rules of `table_name`.
+
+    Args:
+        df: Table to validate (not modified)
+        table_name: Key in ALL_VALIDATION_RULES
+        report: Report to add to (a new one if None)
+        rules: Rules to use instead of the configured ones (compiled each call)
+        max_null_percent: Threshold for the null check of every column
+
+    Returns:
+        ValidationReport
+    """
+    if rules is None:
+        plan = compile_plan(table_name, max_null_percent)
+    else:
+        plan = ValidationPlan(table_name, rules, max_null_percent)
+    return plan.run(df, report)
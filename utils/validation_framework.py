@@ -8,12 +8,23 @@ Fecha: 2025-11-13
 """
 
 import json
+import re
+import unicodedata
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
 import pandas as pd
 
+from utils.canonical_labels import TIPO_METRICA
+from utils.canonical_schema import (
+    canonical_column,
+    canonical_columns,
+    canonical_year,
+    is_canonical,
+)
+
 
 class ValidationReport:
     """Clase para almacenar resultados de validación"""
@@ -82,6 +93,21 @@ class ValidationReport:
             "status": "FAILED" if self.has_errors() else "PASSED",
         }
 
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ValidationReport":
+        """Reconstruye el reporte a partir de `to_dict` (p.ej. desde la caché)"""
+        report = cls(data["table_name"])
+        report.timestamp = data["timestamp"]
+        report.records_original = data["records_original"]
+        report.records_excluded = data["records_excluded"]
+        for msg in data["errors"]:
+            report.add_error(msg)
+        for msg in data["warnings"]:
+            report.add_warning(msg)
+        for msg in data["info"]:
+            report.add_info(msg)
+        return report
+
     def save_json(self, output_dir: str = "../../data/validated/logs"):
         """Guarda el reporte en formato JSON"""
         # Resolver ruta absoluta desde este archivo (utils/)
@@ -180,13 +206,13 @@ def check_schema(
     """
     valid = True
 
-    # Normalize year column names: accept 'Anio' or fallback to 'Año'/'Anyo'
-    if "Anio" not in df.columns and "Año" in df.columns:
-        df = df.copy()
-        df["Anio"] = df["Año"]
-    if "Anio" not in df.columns and "Anyo" in df.columns:
-        df = df.copy()
-        df["Anio"] = df["Anyo"]
+    # Year column as 'Anio' on both sides ('Año' / 'Anyo' accepted), without
+    # copying data; a frame already canonicalized at load time is used as is
+    if not is_canonical(df):
+        df = canonical_year(df)
+    expected_columns = canonical_columns(expected_columns)
+    if expected_types:
+        expected_types = {canonical_column(c): t for c, t in expected_types.items()}
     # Verificar columnas
     missing_cols = set(expected_columns) - set(df.columns)
     extra_cols = set(df.columns) - set(expected_columns)
@@ -211,6 +237,10 @@ def check_schema(
         for col, expected_type in expected_types.items():
             if col in df.columns:
                 actual_type = df[col].dtype
+                # Las categóricas (p.ej. geo_code del decodificador SDMX) se
+                # comparan por el tipo de sus categorías
+                if isinstance(actual_type, pd.CategoricalDtype):
+                    actual_type = actual_type.categories.dtype
                 # Simplificación: comparar familias de tipos
                 if expected_type == int and not pd.api.types.is_integer_dtype(
                     actual_type
@@ -262,13 +292,10 @@ def check_uniqueness(
     Returns:
         True si no hay duplicados, False si hay duplicados
     """
-    # Normalize year column names
-    if "Anio" not in df.columns and "Año" in df.columns:
-        df = df.copy()
-        df["Anio"] = df["Año"]
-    if "Anio" not in df.columns and "Anyo" in df.columns:
-        df = df.copy()
-        df["Anio"] = df["Anyo"]
+    # Year column as 'Anio' on both sides (no data copied)
+    if not is_canonical(df):
+        df = canonical_year(df)
+    primary_key = canonical_columns(primary_key)
     duplicates = df.duplicated(subset=primary_key, keep=False).sum()
 
     if duplicates > 0:
@@ -320,7 +347,8 @@ def check_nulls(
                         print(f"[ERR] {msg}")
                     valid = False
 
-    # Verificar todas las columnas contra umbral
+    # Verificar todas las columnas contra umbral (un solo recorrido, que
+    # también da el total)
     nulls = df.isnull().sum()
     for col, null_count in nulls.items():
         if null_count > 0:
@@ -333,7 +361,7 @@ def check_nulls(
                     print(f"[WARN] {msg}")
 
     if valid and report:
-        total_nulls = df.isnull().sum().sum()
+        total_nulls = nulls.sum()
         report.add_info(
             f"Valores faltantes: {total_nulls} nulos totales dentro de umbrales"
         )
@@ -420,6 +448,37 @@ def check_conditional_nulls(
     return valid
 
 
+# Common CP1252 -> UTF-8 mojibake sequences, applied in this order
+MOJIBAKE_REPLACEMENTS = {
+    "Ã¡": "á",
+    "Ã©": "é",
+    "Ã­": "í",
+    "Ã³": "ó",
+    "Ãº": "ú",
+    "Ã±": "ñ",
+    "Ã‘": "Ñ",
+    "Ã€": "À",
+    "Ã´": "ô",
+    "Ã“": "Ó",
+    "â": "'",
+    "\ufffd": "",
+    "Â€": "€",
+    "â‚¬": "€",
+}
+# Keys up to U+FFFD are replaced in one regex pass (alternatives tried in
+# dict order), which matches the sequential replaces: none of their outputs
+# starts a key. Dropping U+FFFD can join the two euro sequences, so those are
+# still replaced afterwards, in order.
+_MOJIBAKE_FINAL = ("Â€", "â‚¬")
+_MOJIBAKE_RE = re.compile(
+    "|".join(re.escape(k) for k in MOJIBAKE_REPLACEMENTS if k not in _MOJIBAKE_FINAL)
+)
+# Characters that are neither letters/digits (str.isalnum) nor whitespace
+_NON_ALNUM_RE = re.compile(r"[^\w\s]|_")
+# Distinct values memoized by normalize_text
+NORMALIZE_CACHE_SIZE = 4096
+
+
 def _fix_mojibake(s: str) -> str:
     """Attempt to fix common mojibake sequences from CP1252 -> UTF-8 mismatches.
     This is a best-effort approach using common sequences such as 'Ã¡' -> 'á'.
@@ -428,52 +487,37 @@ def _fix_mojibake(s: str) -> str:
         return s
     if not isinstance(s, str):
         s = str(s)
-    replacements = {
-        "Ã¡": "á",
-        "Ã©": "é",
-        "Ã­": "í",
-        "Ã³": "ó",
-        "Ãº": "ú",
-        "Ã±": "ñ",
-        "Ã‘": "Ñ",
-        "Ã€": "À",
-        "Ã´": "ô",
-        "Ã“": "Ó",
-        "â": "'",
-        "\ufffd": "",
-        "�": "",
-        "Â€": "€",
-        "â‚¬": "€",
-    }
-    for k, v in replacements.items():
+    s = _MOJIBAKE_RE.sub(lambda m: MOJIBAKE_REPLACEMENTS[m.group(0)], s)
+    for k in _MOJIBAKE_FINAL:
         if k in s:
-            s = s.replace(k, v)
+            s = s.replace(k, MOJIBAKE_REPLACEMENTS[k])
     return s
 
 
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def _normalize_text_str(s: str) -> str:
+    s = _fix_mojibake(s)
+    # Remove non-letter and non-digit characters (keep spaces); this also
+    # drops any Unicode replacement character still present
+    s = _NON_ALNUM_RE.sub("", s)
+    # Decompose (NFKD), then remove accents
+    s_nfkd = unicodedata.normalize("NFKD", s)
+    s_ascii = "".join([c for c in s_nfkd if not unicodedata.combining(c)])
+    return " ".join(s_ascii.split())
+
+
 def normalize_text(s: str) -> str:
     """Normalize text for stable comparisons.
 
     - Attempts to fix common mojibake sequences
     - Strips diacritics (returns ascii/lowercased normalized string)
     - Collapses whitespace
-    """
-    import unicodedata
 
+    Results are memoized (bounded LRU): columns repeat a few distinct values.
+    """
     if s is None:
         return s
-    s = _fix_mojibake(s)
-    # Remove Unicode replacement character if still present
-    s = s.replace("\ufffd", "").replace("�", "")
-    # Remove non-letter and non-digit characters (keep spaces)
-    import unicodedata as _ud
-
-    s = "".join(c for c in s if _ud.category(c)[0] in ("L", "N") or c.isspace())
-    # Normalize NFC to composed, then remove accents
-    s_nfkd = unicodedata.normalize("NFKD", s)
-    s_ascii = "".join([c for c in s_nfkd if not unicodedata.combining(c)])
-    s_clean = " ".join(s_ascii.strip().split())
-    return s_clean
+    return _normalize_text_str(s if isinstance(s, str) else str(s))
 
 
 def normalize_tipo_metrica(series: pd.Series) -> pd.Series:
@@ -484,43 +528,14 @@ def normalize_tipo_metrica(series: pd.Series) -> pd.Series:
         - 'Variación mensual'
         - 'Variación en lo que va de año'
         - 'Índice'
+
+    Uses the shared `TIPO_METRICA` label dictionary (utils/canonical_labels.py):
+    each distinct value is resolved once, and unrecognized labels are kept and
+    counted in `TIPO_METRICA.misses`.
     """
     if series is None:
         return series
-
-    def _map_value(v):
-        if pd.isna(v):
-            return v
-        s = normalize_text(v).lower()
-        # Accept variants like 'variación anual', 'variacin anual', 'variacion anual', etc.
-        s = (
-            s.replace("á", "a")
-            .replace("é", "e")
-            .replace("í", "i")
-            .replace("ó", "o")
-            .replace("ú", "u")
-            .replace("ñ", "n")
-        )
-        s = " ".join(s.split())
-
-        # Basic substring checks
-        if "variacion anual" in s or ("variacion" in s and "anual" in s):
-            return "Variación anual"
-        if "variacion mensual" in s or ("variacion" in s and "mensual" in s):
-            return "Variación mensual"
-        if (
-            "variacion en lo que va de ano" in s
-            or "variacion en lo que va de año" in s
-            or "variacion en lo que va de" in s
-            or ("variacion" in s and "ano" in s)
-            or ("variacion" in s and "va de" in s)
-        ):
-            return "Variación en lo que va de año"
-        if "indice" in s or "ndice" in s:
-            return "Índice"
-        return v
-
-    return series.apply(_map_value)
+    return TIPO_METRICA.recode(series)
 
 
 def check_range(
@@ -648,7 +663,8 @@ def check_year_continuity(
             print(f"[ERR] {msg}")
         return False
 
-    actual_years = set(df[year_column].unique())
+    # Python scalars, so messages print 2013 rather than np.int64(2013)
+    actual_years = set(df[year_column].unique().tolist())
 
     if expected_years:
         expected_set = set(expected_years)
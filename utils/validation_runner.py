@@ -0,0 +1,552 @@
+"""
+Ejecutor de Validación en Paralelo
+==================================
+Valida las tablas de `ALL_VALIDATION_RULES` en un pool de procesos, en lugar
+de ejecutar 02a / 02b / 02c uno tras otro con `jupyter nbconvert` y releer
+después los JSON de `data/validated/logs`. Cada tarea carga una tabla, la
+valida con el plan compilado (utils/validation_engine.py) y devuelve su
+`ValidationReport`; el resumen se construye en memoria. Las comprobaciones
+cruzadas INE <-> EUROSTAT de 02c (`check_integration`) son una tarea más.
+
+    from utils.validation_runner import SqlLoader, run_validation
+    run = run_validation(loader=SqlLoader(), workers=8)
+    run.summary()  # {"passed": [...], "failed": [...]}
+
+Las tablas se leen de SQL Server (`SqlLoader`, lo mismo que validan los
+notebooks) o del almacén del ETL (`StoreLoader`, sin pasar por SQL). El
+cargador se envía a cada proceso, así que debe poder serializarse (una
+instancia de una clase de módulo).
+
+Con `cache=ValidationCache()` la validación es incremental
+(utils/validation_cache.py): las tablas cuya huella (`loader.fingerprint`) y
+reglas no cambiaron devuelven su reporte guardado sin cargarse ni pasar por
+el pool, y check_integration solo se repite si cambió alguna de sus tablas.
+"""
+
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+import pandas as pd
+
+from utils.canonical_schema import canonical_year
+from utils.validation_cache import ValidationCache, integration_key, rules_key
+from utils.validation_engine import validate_table
+from utils.validation_framework import ValidationReport
+from utils.validation_rules import ALL_VALIDATION_RULES
+
+INTEGRATION_REPORT = "INTEGRACION_INE_EUROSTAT"
+# Tablas que compara check_integration (02c)
+INTEGRATION_TABLES = (
+    "INE_AROPE_Hogar",
+    "EUROSTAT_AROP_Espana",
+    "INE_Gini_S80S20_CCAA",
+    "EUROSTAT_Gini_Espana",
+    "EUROSTAT_S80S20_Espana",
+)
+
+Loader = Callable[[str], pd.DataFrame]
+
+
+# =============================================================================
+# CARGADORES
+# =============================================================================
+
+
+# Row hashes are sorted before hashing them together: the result does not
+# depend on the scan order and, unlike an XOR, counts every repeated row
+_FINGERPRINT_SQL = """
+SELECT COUNT_BIG(*),
+       CONVERT(CHAR(64), HASHBYTES('SHA2_256',
+           STRING_AGG(CONVERT(VARCHAR(MAX), h, 2), '') WITHIN GROUP (ORDER BY h)
+       ), 2)
+FROM (
+    SELECT HASHBYTES('SHA2_256',
+        (SELECT t.* FOR JSON PATH, WITHOUT_ARRAY_WRAPPER, INCLUDE_NULL_VALUES)) AS h
+    FROM {table} AS t
+) AS filas
+"""
+
+
+class SqlLoader:
+    """
+    Reads `SELECT * FROM <table>`; one connection per process. The result gets
+    the compact dtype policy (src/tipos.py), like tables read from the store.
+    Its fingerprint is the row count and a SHA-256 over the sorted SHA-256 of
+    every row (as JSON), computed by the server without sending the rows.
+    Unlike `CHECKSUM_AGG`, which XORs row checksums, it does not cancel out
+    repeated rows or collide on swapped values (needs SQL Server 2017+).
+    """
+
+    def __init__(self, connection_string: Optional[str] = None):
+        self.connection_string = connection_string
+        self._conn = None
+
+    def __getstate__(self):
+        # Connections are not sent to the workers: each opens its own
+        return {"connection_string": self.connection_string, "_conn": None}
+
+    def _connection(self):
+        if self._conn is None:
+            import pyodbc
+
+            from utils.config import DB_CONNECTION_STRING
+
+            self._conn = pyodbc.connect(self.connection_string or DB_CONNECTION_STRING)
+        return self._conn
+
+    def __call__(self, table_name: str) -> pd.DataFrame:
+        from src.tipos import aplicar_politica
+
+        return aplicar_politica(
+            pd.read_sql(f"SELECT * FROM {table_name}", self._connection())
+        )
+
+    def fingerprint(self, table_name: str) -> Optional[str]:
+        try:
+            cursor = self._connection().cursor()
+            cursor.execute(_FINGERPRINT_SQL.format(table=table_name))
+            rows, checksum = cursor.fetchone()
+        except Exception:
+            return None
+        return f"sql:{rows}:{checksum}"
+
+
+class StoreLoader:
+    """
+    Reads the table from the ETL store (its cache key in src/etl/registro.py),
+    with the year column and Gini scale that 01c writes to SQL. Compact
+    dtypes (category, int16, float32) are validated as they are.
+    """
+
+    def __init__(self, directory: Optional[Path] = None):
+        self.directory = directory
+
+    def _store(self, table_name: str):
+        """(AlmacenTablas, cache key of the table)."""
+        from src.almacen import AlmacenTablas
+        from src.config import CACHE_DIR
+        from src.etl.registro import tablas_sql
+
+        keys = tablas_sql()
+        if table_name not in keys:
+            raise KeyError(f"{table_name} no está en el registro de fuentes")
+        almacen = AlmacenTablas(
+            self.directory if self.directory is not None else CACHE_DIR
+        )
+        return almacen, keys[table_name]
+
+    def fingerprint(self, table_name: str) -> Optional[str]:
+        """sha256 of the stored file, from the manifest (no data read)."""
+        try:
+            almacen, key = self._store(table_name)
+            return f"almacen:{almacen.metadatos(key)['sha256']}"
+        except (KeyError, FileNotFoundError):
+            return None
+
+    def __call__(self, table_name: str) -> pd.DataFrame:
+        almacen, key = self._store(table_name)
+        df = canonical_year(almacen.leer(key, mmap=True))
+        # Like normalize_for_sql (01c): Gini on a 0-1 scale
+        if "Gini" in df.columns and pd.to_numeric(df["Gini"]).max() > 1:
+            df = df.copy(deep=False)
+            df["Gini"] = df["Gini"] / 100.0
+        return df
+
+
+# =============================================================================
+# TAREAS
+# =============================================================================
+
+
+class TableResult:
+    """
+    Report of one table plus its load and validation times (`cached`: taken
+    from the ValidationCache without loading the table).
+    """
+
+    def __init__(
+        self,
+        table: str,
+        report: ValidationReport,
+        load_seconds: float = 0.0,
+        validate_seconds: float = 0.0,
+        loaded: bool = True,
+        cached: bool = False,
+    ):
+        self.table = table
+        self.report = report
+        self.load_seconds = load_seconds
+        self.validate_seconds = validate_seconds
+        self.loaded = loaded
+        self.cached = cached
+
+    @property
+    def seconds(self) -> float:
+        return self.load_seconds + self.validate_seconds
+
+    @property
+    def status(self) -> str:
+        """PASSED / FAILED, or ERROR if the table could not be loaded."""
+        if not self.loaded:
+            return "ERROR"
+        return "FAILED" if self.report.has_errors() else "PASSED"
+
+
+def _fingerprint(loader: Loader, table_name: str) -> Optional[str]:
+    fingerprint = getattr(loader, "fingerprint", None)
+    return fingerprint(table_name) if fingerprint is not None else None
+
+
+def validate_one(table_name: str, loader: Loader) -> TableResult:
+    """Load and validate one table (what validate_ine_table did in 02a)."""
+    report = ValidationReport(table_name)
+    inicio = time.perf_counter()
+    try:
+        df = loader(table_name)
+    except Exception as e:
+        report.add_error(f"Error al cargar tabla: {e}")
+        return TableResult(
+            table_name, report, time.perf_counter() - inicio, loaded=False
+        )
+    cargada = time.perf_counter()
+    validate_table(df, table_name, report=report)
+    return TableResult(
+        table_name, report, cargada - inicio, time.perf_counter() - cargada
+    )
+
+
+def validate_integration(loader: Loader) -> TableResult:
+    """
+    Load the INTEGRATION_TABLES and run check_integration (02c); `loaded` is
+    False if some table could not be loaded.
+    """
+    report = ValidationReport(INTEGRATION_REPORT)
+    inicio = time.perf_counter()
+    frames = {}
+    for table in INTEGRATION_TABLES:
+        try:
+            frames[table] = loader(table)
+        except Exception as e:
+            report.add_error(f"No se pudo cargar {table}: {e}")
+            frames[table] = None
+    cargadas = time.perf_counter()
+    check_integration(frames, report)
+    return TableResult(
+        INTEGRATION_REPORT,
+        report,
+        cargadas - inicio,
+        time.perf_counter() - cargadas,
+        loaded=all(df is not None for df in frames.values()),
+    )
+
+
+# =============================================================================
+# COHERENCIA INE <-> EUROSTAT (02c)
+# =============================================================================
+
+
+def _max_diff_percent(ine: pd.DataFrame, eurostat: pd.DataFrame) -> Optional[float]:
+    """Max |INE - EUROSTAT| / INE in %, over the common years (None if none)."""
+    comparison = pd.merge(ine, eurostat, on="Anio", how="inner")
+    if len(comparison) == 0:
+        return None
+    ine_values = comparison.iloc[:, 1].astype(float)
+    eurostat_values = comparison.iloc[:, 2].astype(float)
+    return float(((ine_values - eurostat_values) / ine_values * 100).abs().max())
+
+
+def _spain_total(df: pd.DataFrame, years: set) -> pd.DataFrame:
+    """geo_code 'ES' (sex 'T', age 'TOTAL' where those columns exist)."""
+    mask = (df["geo_code"] == "ES") & df["Anio"].isin(years)
+    for col, value in (("sex", "T"), ("age", "TOTAL")):
+        if col in df.columns:
+            mask &= df[col] == value
+    return df[mask]
+
+
+def check_integration(
+    frames: Dict[str, Optional[pd.DataFrame]], report: ValidationReport
+) -> ValidationReport:
+    """
+    Cross-source checks of 02c: common years between INE_AROPE_Hogar and
+    EUROSTAT_AROP_Espana, then AROP, Gini and S80/S20 for Spain in both
+    sources over those years. Same messages as the notebook.
+
+    Args:
+        frames: {table: DataFrame or None if it could not be loaded}
+        report: Report to add to
+    """
+    ine_arope = frames.get("INE_AROPE_Hogar")
+    eurostat_arop = frames.get("EUROSTAT_AROP_Espana")
+    ine_gini = frames.get("INE_Gini_S80S20_CCAA")
+    eurostat_gini = frames.get("EUROSTAT_Gini_Espana")
+    eurostat_s80s20 = frames.get("EUROSTAT_S80S20_Espana")
+
+    # 1. Coherencia temporal
+    common_years = set()
+    if ine_arope is not None and eurostat_arop is not None:
+        ine_years = (
+            set(ine_arope["Anio"].unique().tolist())
+            if "Anio" in ine_arope.columns
+            else set()
+        )
+        if "Anio" in eurostat_arop.columns:
+            common_years = ine_years & set(eurostat_arop["Anio"].unique().tolist())
+            if len(common_years) >= 5:
+                report.add_info(
+                    f"Solapamiento temporal: {len(common_years)} años comunes"
+                )
+            elif common_years:
+                report.add_warning(
+                    f"Solapamiento temporal limitado: solo {len(common_years)} años comunes"
+                )
+            else:
+                report.add_error("No hay años comunes entre INE y EUROSTAT")
+        else:
+            report.add_warning("No se pudo determinar años en EUROSTAT")
+    else:
+        report.add_warning("Validación temporal omitida: tablas no disponibles")
+
+    # 2. AROP (riesgo de pobreza, no AROPE)
+    if ine_arope is not None and eurostat_arop is not None and common_years:
+        _check_arop(ine_arope, eurostat_arop, common_years, report)
+    else:
+        report.add_warning("Validación de valores omitida")
+
+    # 3. Gini y S80/S20: Total Nacional (INE) frente a España (EUROSTAT)
+    if ine_gini is not None and eurostat_gini is not None and common_years:
+        ine = None
+        if "Territorio" in ine_gini.columns:
+            ine = ine_gini[
+                (ine_gini["Territorio"] == "Total Nacional")
+                & ine_gini["Anio"].isin(common_years)
+            ][["Anio", "Gini"]]
+        else:
+            report.add_warning(
+                "No se pudo filtrar Total Nacional en INE_Gini_S80S20_CCAA"
+            )
+        eurostat = None
+        if "geo_code" in eurostat_gini.columns:
+            eurostat = eurostat_gini[
+                (eurostat_gini["geo_code"] == "ES")
+                & eurostat_gini["Anio"].isin(common_years)
+            ][["Anio", "Gini"]]
+        else:
+            report.add_warning("No se pudo filtrar España en EUROSTAT_Gini_Espana")
+        if ine is not None and eurostat is not None:
+            _grade("Gini", _max_diff_percent(ine, eurostat), report)
+    else:
+        report.add_warning("Validación Gini omitida")
+
+    if ine_gini is not None and eurostat_s80s20 is not None and common_years:
+        ine = None
+        if {"Territorio", "S80/S20"} <= set(ine_gini.columns):
+            ine = ine_gini[
+                (ine_gini["Territorio"] == "Total Nacional")
+                & ine_gini["Anio"].isin(common_years)
+            ][["Anio", "S80/S20"]]
+        else:
+            report.add_warning("No se pudo filtrar S80/S20 en INE_Gini_S80S20_CCAA")
+        eurostat = None
+        if {"geo_code", "S80S20_Ratio"} <= set(eurostat_s80s20.columns):
+            eurostat = _spain_total(eurostat_s80s20, common_years)[
+                ["Anio", "S80S20_Ratio"]
+            ]
+        else:
+            report.add_warning("No se pudo filtrar S80/S20 en EUROSTAT_S80S20_Espana")
+        if ine is not None and eurostat is not None:
+            _grade("S80/S20", _max_diff_percent(ine, eurostat), report)
+    else:
+        report.add_warning("Validación S80/S20 omitida")
+    return report
+
+
+def _check_arop(ine_arope, eurostat_arop, common_years, report):
+    ine = None
+    if {"Tipo_Hogar", "Indicador"} <= set(ine_arope.columns):
+        ine = ine_arope[
+            (ine_arope["Tipo_Hogar"] == "Total")
+            & (ine_arope["Indicador"] == "AROP")
+            & ine_arope["Anio"].isin(common_years)
+        ][["Anio", "Valor"]]
+        if len(ine) == 0:
+            report.add_warning("No se encontraron datos AROP en INE_AROPE_Hogar")
+            ine = None
+    else:
+        report.add_error("Estructura INE_AROPE_Hogar no tiene columnas esperadas")
+
+    if not {"geo_code", "Anio"} <= set(eurostat_arop.columns):
+        report.add_error(
+            "Estructura EUROSTAT_AROP_Espana no tiene columnas esperadas (geo_code, Anio)"
+        )
+        return
+    spain = _spain_total(eurostat_arop, common_years)
+    if len(spain) == 0:
+        report.add_warning(
+            "No se encontraron datos comparables (ES, T, TOTAL) en EUROSTAT"
+        )
+        return
+    if "AROP_%" not in spain.columns:
+        report.add_error(
+            "Columna de valor AROP_% no encontrada en EUROSTAT_AROP_Espana"
+        )
+        return
+    if ine is None:
+        return
+    max_diff = _max_diff_percent(ine, spain[["Anio", "AROP_%"]])
+    if max_diff is None:
+        report.add_warning("No hay datos comparables entre INE y EUROSTAT")
+    elif max_diff < 0.5:
+        report.add_info(f"Coherencia INE-EUROSTAT perfecta: dif. máx. {max_diff:.2f}%")
+    elif max_diff < 2:
+        report.add_info(f"Coherencia INE-EUROSTAT excelente: dif. máx. {max_diff:.2f}%")
+    elif max_diff < 5:
+        report.add_info(f"Coherencia INE-EUROSTAT buena: dif. máx. {max_diff:.2f}%")
+    elif max_diff < 10:
+        report.add_warning(f"Diferencia INE-EUROSTAT aceptable: hasta {max_diff:.2f}%")
+    else:
+        report.add_error(
+            f"Diferencia excesiva INE-EUROSTAT: {max_diff:.2f}% - Revisar metodología"
+        )
+
+
+def _grade(indicator: str, max_diff: Optional[float], report: ValidationReport):
+    """Gini / S80/S20 thresholds of 02c."""
+    if max_diff is None:
+        report.add_warning(f"No hay datos {indicator} comparables entre INE y EUROSTAT")
+    elif max_diff < 0.5:
+        report.add_info(f"Coherencia {indicator} perfecta: dif. máx. {max_diff:.2f}%")
+    elif max_diff < 2:
+        report.add_info(f"Coherencia {indicator} excelente: dif. máx. {max_diff:.2f}%")
+    elif max_diff < 5:
+        report.add_warning(
+            f"Coherencia {indicator} aceptable: dif. máx. {max_diff:.2f}%"
+        )
+    else:
+        report.add_error(f"Diferencia {indicator} excesiva: {max_diff:.2f}%")
+
+
+# =============================================================================
+# EJECUCIÓN
+# =============================================================================
+
+
+class ValidationRun:
+    """Results of one run, in table order, plus its wall-clock time."""
+
+    def __init__(self, results: List[TableResult], wall_seconds: float):
+        self.results = results
+        self.wall_seconds = wall_seconds
+
+    @property
+    def reports(self) -> Dict[str, ValidationReport]:
+        return {r.table: r.report for r in self.results}
+
+    @property
+    def speedup(self) -> float:
+        """Sum of per-table times over wall-clock time."""
+        return sum(r.seconds for r in self.results) / max(self.wall_seconds, 1e-9)
+
+    def summary(self) -> dict:
+        """
+        {"passed": [{"table", "warning_count"}], "failed": [{"table", "errors",
+        "error_count"}]}: the summary 02_run_validation.py built from the logs.
+        """
+        passed, failed = [], []
+        for r in sorted(self.results, key=lambda r: r.table):
+            errors = r.report.to_dict()["errors"]
+            if r.status == "PASSED":
+                passed.append(
+                    {"table": r.table, "warning_count": len(r.report.warnings)}
+                )
+            else:
+                failed.append(
+                    {"table": r.table, "errors": errors, "error_count": len(errors)}
+                )
+        return {"passed": passed, "failed": failed}
+
+
+def run_validation(
+    tables: Optional[Iterable[str]] = None,
+    loader: Optional[Loader] = None,
+    workers: Optional[int] = None,
+    integration: bool = True,
+    cache: Optional[ValidationCache] = None,
+) -> ValidationRun:
+    """
+    Validate tables concurrently, one process-pool task per table.
+
+    Args:
+        tables: Tables to validate (default: all of ALL_VALIDATION_RULES)
+        loader: Picklable callable table -> DataFrame (default: SqlLoader())
+        workers: Pool size (None: one per CPU; 1: in this process)
+        integration: Also run check_integration as one more task
+        cache: Validate incrementally; tables (and check_integration) whose
+            fingerprints match the cache are not loaded
+
+    Returns:
+        ValidationRun with one TableResult per table (integration last)
+
+    Raises:
+        ValueError: If a table has no rules in ALL_VALIDATION_RULES (it would
+            otherwise validate against nothing and pass)
+    """
+    tables = list(ALL_VALIDATION_RULES if tables is None else tables)
+    unknown = [t for t in tables if t not in ALL_VALIDATION_RULES]
+    if unknown:
+        raise ValueError(f"Tables without validation rules: {unknown}")
+    loader = loader if loader is not None else SqlLoader()
+    inicio = time.perf_counter()
+
+    # Unchanged tables first, in this process: one cache entry read each
+    results: Dict[str, TableResult] = {}
+    fingerprints: Dict[str, Optional[str]] = {}
+    pending = []
+    names = tables + ([INTEGRATION_REPORT] if integration else [])
+    for name in names:
+        if cache is None:
+            pending.append(name)
+            continue
+        t0 = time.perf_counter()
+        if name == INTEGRATION_REPORT:
+            fingerprints[name] = integration_key(
+                {
+                    t: fingerprints[t] if t in fingerprints else _fingerprint(loader, t)
+                    for t in INTEGRATION_TABLES
+                }
+            )
+            report = cache.lookup(name, fingerprints[name])
+        else:
+            fingerprints[name] = _fingerprint(loader, name)
+            report = cache.lookup(name, fingerprints[name], rules_key(name))
+        if report is None:
+            pending.append(name)
+        else:
+            results[name] = TableResult(
+                name, report, validate_seconds=time.perf_counter() - t0, cached=True
+            )
+
+    tasks = [
+        (
+            (validate_integration, loader)
+            if name == INTEGRATION_REPORT
+            else (validate_one, name, loader)
+        )
+        for name in pending
+    ]
+    if workers == 1 or len(tasks) <= 1:
+        done = [task[0](*task[1:]) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(*task) for task in tasks]
+            done = [f.result() for f in futures]
+    for result in done:
+        results[result.table] = result
+        if cache is not None and result.loaded:
+            key = (
+                None if result.table == INTEGRATION_REPORT else rules_key(result.table)
+            )
+            cache.store(result.table, fingerprints[result.table], result.report, key)
+    return ValidationRun([results[n] for n in names], time.perf_counter() - inicio)